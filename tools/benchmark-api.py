@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the latency of zun-api requests.
+
+Compare the latency of the requests when the compute API, with its RPC
+client, its scheduler driver and its placement clients, is built for each
+request with the latency when it is shared by the requests of the process.
+The requests are served by the pecan application of zun-api, the RPC
+messages are sent over the fake transport of oslo.messaging and the
+placement clients are built with placeholder credentials, placement is
+never contacted.
+
+Usage::
+
+    tools/benchmark-api.py [--requests N] [--containers N]
+
+The requests timed are ``GET /v1/containers`` and
+``POST /v1/containers/<id>/stop``.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pecan
+import pecan.testing
+
+from zun.api import hooks
+from zun.common import context as zun_context
+from zun.common import rpc
+from zun.compute import api as compute_api
+import zun.conf
+from zun.db.sqlalchemy import api as db_api
+from zun.db.sqlalchemy import models
+from zun.tests.unit.db import utils as db_utils
+
+CONF = zun.conf.CONF
+
+CONFIG = """[DEFAULT]
+transport_url = fake:/
+
+[keystone_auth]
+auth_type = password
+auth_url = http://127.0.0.1/identity/v3
+username = zun
+password = secret
+project_name = service
+user_domain_id = default
+project_domain_id = default
+"""
+
+HEADERS = {
+    'Accept': 'application/json',
+    'OpenStack-API-Version': 'container 1.45',
+    'X-User-Id': 'fake_user',
+    'X-Project-Id': 'fake_project',
+    'X-Roles': 'admin',
+}
+
+
+class PerRequestRPCHook(hooks.RPCHook):
+    """Build the compute API for each request, as done before."""
+
+    def before(self, state):
+        context = state.request.context
+        state.request.compute_api = compute_api.API(context)
+
+
+def make_app(rpc_hook):
+    return pecan.testing.load_test_app({
+        'app': {
+            'root': 'zun.api.controllers.root.RootController',
+            'modules': ['zun.api'],
+            'hooks': [
+                hooks.ContextHook(),
+                rpc_hook,
+                hooks.NoExceptionTracebackHook(),
+            ],
+        },
+    })
+
+
+def seed_containers(context, containers):
+    uuids = []
+    for i in range(containers):
+        container = db_utils.create_test_container(
+            context=context, id=None, uuid=None, name='container-%d' % i,
+            host=None, status='Running', project_id='fake_project',
+            user_id='fake_user')
+        uuids.append(container.uuid)
+    return uuids
+
+
+def run(app, uuids, requests):
+    timings = {'GET': [], 'POST': []}
+    # Warm up the application.
+    app.get('/v1/containers', headers=HEADERS)
+    for request in range(requests):
+        start = time.perf_counter()
+        app.get('/v1/containers', headers=HEADERS)
+        timings['GET'].append(time.perf_counter() - start)
+
+        uuid = uuids[request % len(uuids)]
+        start = time.perf_counter()
+        app.post('/v1/containers/%s/stop' % uuid, headers=HEADERS)
+        timings['POST'].append(time.perf_counter() - start)
+    return {method: statistics.median(values)
+            for method, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Number of requests of each kind to time.')
+    parser.add_argument('--containers', type=int, default=20,
+                        help='Number of containers listed by the requests.')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    config_file = os.path.join(tmpdir, 'zun.conf')
+    with open(config_file, 'w') as f:
+        f.write(CONFIG)
+    CONF([], project='zun', default_config_files=[config_file])
+    CONF.set_override('connection', 'sqlite:///%s' %
+                      os.path.join(tmpdir, 'zun.sqlite'), group='database')
+    rpc.init(CONF)
+
+    models.Base.metadata.create_all(db_api.get_engine())
+    context = zun_context.get_admin_context(all_projects=True)
+    uuids = seed_containers(context, args.containers)
+
+    per_request = run(make_app(PerRequestRPCHook()), uuids, args.requests)
+    shared = run(make_app(hooks.RPCHook()), uuids, args.requests)
+    print('%-8s %16s %14s %9s' % ('request', 'per request (ms)',
+                                  'shared (ms)', 'speedup'))
+    for method in ('GET', 'POST'):
+        print('%-8s %16.2f %14.2f %8.1fx' % (
+            method, per_request[method] * 1000, shared[method] * 1000,
+            per_request[method] / shared[method]))
+
+    os.remove(config_file)
+    os.remove(os.path.join(tmpdir, 'zun.sqlite'))
+    os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the serialization of a list of containers.
+
+Report the time spent formatting and dumping a list of containers as the
+API does, evaluating the policies of the keys for each container, once for
+the whole list, and once for the whole list with a sparse fieldset.
+
+Usage::
+
+    tools/benchmark-container-list.py [--rows N [N ...]] [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+
+from zun.api.controllers.v1.views import containers_view as view
+from zun.common import context as zun_context
+from zun.common import policy
+import zun.conf
+from zun import objects
+
+CONF = zun.conf.CONF
+URL = 'http://127.0.0.1:9517'
+
+
+def get_containers(context, rows):
+    containers = []
+    for i in range(rows):
+        containers.append(objects.Container(
+            context, id=i, uuid=uuidutils.generate_uuid(),
+            name='container-%d' % i, project_id=context.project_id,
+            user_id=context.user_id, image='cirros', command=['sleep', '1d'],
+            status='Running', status_reason=None, task_state=None,
+            cpu=1.0, memory='512', workdir='/', ports=[80, 443],
+            hostname='container-%d' % i, host='host-%d' % (i % 100),
+            environment={'KEY%d' % k: 'value' * 8 for k in range(20)},
+            labels={'label%d' % k: 'value' * 8 for k in range(20)},
+            addresses={uuidutils.generate_uuid(): [{
+                'addr': '10.0.%d.%d' % (i // 250 % 250, i % 250),
+                'version': 4, 'port': uuidutils.generate_uuid(),
+                'subnet_id': uuidutils.generate_uuid(),
+                'preserve_on_delete': False}]},
+            image_pull_policy=None, restart_policy={}, status_detail='Up',
+            interactive=False, tty=False, image_driver='docker',
+            security_groups=['default'], auto_remove=False, runtime=None,
+            disk=0, auto_heal=False, privileged=False, healthcheck={},
+            cpu_policy='shared', registry_id=None, entrypoint=[]))
+    return containers
+
+
+def per_container(context, containers):
+    return [view.format_container(context, URL, c) for c in containers]
+
+
+def per_list(context, containers, fields=None):
+    allowed_keys = view.get_allowed_keys(context, fields)
+    return [view.format_container(context, URL, c, allowed_keys)
+            for c in containers]
+
+
+def measure(func, repeat):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        jsonutils.dumps({'containers': func()})
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help='Numbers of containers to list.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of runs of each serialization.')
+    args = parser.parse_args()
+
+    CONF([], project='zun')
+    policy.init()
+    context = zun_context.RequestContext(user_id='user',
+                                         project_id='project',
+                                         roles=['member'])
+    fields = view.parse_fields('name,status,host')
+
+    print('%8s %16s %16s %16s' % ('rows', 'per container', 'per list',
+                                  'fields'))
+    for rows in args.rows:
+        containers = get_containers(context, rows)
+        print('%8d %13.1f ms %13.1f ms %13.1f ms' % (
+            rows,
+            measure(lambda: per_container(context, containers), args.repeat),
+            measure(lambda: per_list(context, containers), args.repeat),
+            measure(lambda: per_list(context, containers, fields),
+                    args.repeat)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the creation of many identical containers.
+
+Compare the wall-clock time of creating N containers one request at a time
+with the time of creating them with a single multi-create request. Both
+runs go through the quota checks, the container records, the scheduler and
+the placement claims of zun-api. The placement API is replaced by an
+in-process fake that sleeps for the given round trip time on each call, and
+the RPC casts to the compute hosts are dropped.
+
+Usage::
+
+    tools/benchmark-multi-create.py [--count N] [--hosts N]
+                                    [--placement-latency MS]
+
+A temporary SQLite database is used unless a connection URL is given.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from zun.api.controllers.v1 import containers as containers_controller
+from zun.common import consts
+from zun.common import context as zun_context
+from zun.common import rpc
+from zun.compute import api as compute_api
+import zun.conf
+from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as db_api
+from zun.db.sqlalchemy import models
+from zun import objects
+from zun.scheduler.client import report
+
+CONF = zun.conf.CONF
+
+
+class FakePlacementClient(object):
+    """Answer the calls to placement after a simulated round trip."""
+
+    def __init__(self, rp_uuids, latency):
+        self.rp_uuids = rp_uuids
+        self.latency = latency
+        self.calls = 0
+
+    def _request(self):
+        self.calls += 1
+        time.sleep(self.latency)
+
+    def _ensure_traits(self, context, traits):
+        self._request()
+
+    def get_allocation_candidates(self, context, resources):
+        self._request()
+        alloc_reqs = [{'allocations': {rp_uuid: {'resources': {}}}}
+                      for rp_uuid in self.rp_uuids]
+        summaries = {rp_uuid: {} for rp_uuid in self.rp_uuids}
+        return alloc_reqs, summaries, '1.29'
+
+    def claim_resources(self, context, consumer_uuid, alloc_request,
+                        project_id, user_id, allocation_request_version=None,
+                        consumer_generation=None):
+        self._request()
+        return True
+
+    def delete_allocation_for_container(self, context, uuid):
+        self._request()
+
+
+class FakeComputeRPC(object):
+
+    def __init__(self):
+        self.casts = 0
+
+    def container_create(self, *args, **kwargs):
+        self.casts += 1
+
+
+def seed_hosts(context, hosts):
+    rp_uuids = []
+    for i in range(hosts):
+        hostname = 'host-%d' % i
+        rp_uuid = uuidutils.generate_uuid()
+        dbapi.create_compute_node(context, {
+            'uuid': rp_uuid, 'rp_uuid': rp_uuid, 'hostname': hostname,
+            'mem_total': 1024 * 1024, 'mem_free': 1024 * 1024,
+            'mem_available': 1024 * 1024, 'mem_used': 0,
+            'total_containers': 0, 'running_containers': 0,
+            'paused_containers': 0, 'stopped_containers': 0,
+            'cpus': 1024, 'cpu_used': 0.0, 'disk_total': 100000,
+            'disk_used': 0, 'disk_quota_supported': False,
+            'runtimes': ['runc'], 'enable_cpu_pinning': False})
+        dbapi.create_zun_service({
+            'host': hostname, 'binary': 'zun-compute', 'disabled': False,
+            'last_seen_up': timeutils.utcnow()})
+        rp_uuids.append(rp_uuid)
+    return rp_uuids
+
+
+def get_compute_api(context, rp_uuids, latency):
+    placement = FakePlacementClient(rp_uuids, latency)
+    # Hand the fake to the scheduler client and driver built by the API.
+    report.SchedulerReportClient = lambda *args, **kwargs: placement
+    api = compute_api.API(context)
+    api.rpcapi = FakeComputeRPC()
+    return api, placement
+
+
+def new_container(context, name):
+    container = objects.Container(
+        context, name=name, image='cirros', image_driver='docker',
+        project_id=context.project_id, user_id=context.user_id,
+        cpu=0.1, memory='64', status=consts.CREATING,
+        container_type=consts.TYPE_CONTAINER)
+    container.create(context)
+    return container
+
+
+def create_one_by_one(context, api, count):
+    controller = containers_controller.ContainersController()
+    for i in range(count):
+        controller._check_container_quotas(context,
+                                           {'cpu': 0.1, 'memory': '64'})
+        container = new_container(context, 'single-%d' % i)
+        api.container_create(context, container, {}, [], {}, False)
+
+
+def create_batch(context, api, count):
+    controller = containers_controller.ContainersController()
+    controller._check_container_quotas(context, {'cpu': 0.1, 'memory': '64'},
+                                       count=count)
+    containers = [new_container(context, 'batch-%d' % i)
+                  for i in range(count)]
+    api.containers_create(context, containers, {}, [], {}, False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connection',
+                        help='SQLAlchemy URL of the database to benchmark.')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='Number of containers to create.')
+    parser.add_argument('--hosts', type=int, default=50,
+                        help='Number of compute hosts.')
+    parser.add_argument('--placement-latency', type=float, default=10,
+                        help='Round trip time of a placement call in ms.')
+    args = parser.parse_args()
+
+    CONF([], project='zun')
+    tmpdir = None
+    connection = args.connection
+    if not connection:
+        tmpdir = tempfile.mkdtemp()
+        connection = 'sqlite:///%s' % os.path.join(tmpdir, 'zun.sqlite')
+    CONF.set_override('connection', connection, group='database')
+    CONF.set_override('max_container_count', args.count, group='api')
+    for resource in ('containers', 'memory', 'cpu', 'disk'):
+        CONF.set_override(resource, -1, group='quota')
+    # The casts are dropped, the transport is never connected.
+    rpc.init(CONF)
+
+    engine = db_api.get_engine()
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    admin = zun_context.get_admin_context(all_projects=True)
+    context = zun_context.RequestContext(user_id='user',
+                                         project_id='project')
+    rp_uuids = seed_hosts(admin, args.hosts)
+
+    print('Creating %d containers on %d hosts with a placement latency of '
+          '%.1f ms' % (args.count, args.hosts, args.placement_latency))
+    for title, create in (('one by one', create_one_by_one),
+                          ('multi-create', create_batch)):
+        api, placement = get_compute_api(context, rp_uuids,
+                                         args.placement_latency / 1000)
+        start = time.perf_counter()
+        create(context, api, args.count)
+        elapsed = time.perf_counter() - start
+        print('%-14s %8.2f s  %6d placement calls  %6d casts'
+              % (title, elapsed, placement.calls, api.rpcapi.casts))
+
+    if tmpdir:
+        os.remove(os.path.join(tmpdir, 'zun.sqlite'))
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the latency of the ports of the containers with the port pool.
+
+Compare the latency of getting the Neutron port of a container when the port
+is created for the container with the latency when the port is taken from
+the pool of the host. The containers are created and deleted in bursts. The
+Neutron server is an in-memory fake whose calls sleep for the given number
+of milliseconds.
+
+Usage::
+
+    tools/benchmark-port-pool.py [--bursts N] [--burst-size N]
+                                 [--create-ms MS] [--update-ms MS]
+"""
+
+import argparse
+import sys
+import time
+from unittest import mock
+
+from zun.common import clients
+from zun.common import context as zun_context
+import zun.conf
+from zun.network import neutron
+from zun.network import port_pool
+from zun.tests.unit.network import fake_neutron
+
+CONF = zun.conf.CONF
+
+PROJECT_ID = 'fake_project'
+NETWORK_ID = 'fake-net-id'
+
+
+def run(neutron_api, bursts, burst_size):
+    latencies = []
+    container = mock.Mock(host=CONF.host)
+    requested_network = {'network': NETWORK_ID, 'preserve_on_delete': False}
+    for burst in range(bursts):
+        ports = []
+        for i in range(burst_size):
+            container.uuid = 'container-%d-%d' % (burst, i)
+            start = time.perf_counter()
+            addresses, port = neutron_api.create_or_update_port(
+                container, NETWORK_ID, requested_network, 'compute:kuryr',
+                set_binding_host=True)
+            latencies.append(time.perf_counter() - start)
+            ports.append(port['id'])
+        neutron_api.delete_or_unbind_ports(ports, ports)
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return mean * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bursts', type=int, default=5,
+                        help='Number of bursts of containers.')
+    parser.add_argument('--burst-size', type=int, default=20,
+                        help='Number of containers of a burst.')
+    parser.add_argument('--create-ms', type=float, default=200,
+                        help='Latency of the creation of a port.')
+    parser.add_argument('--update-ms', type=float, default=30,
+                        help='Latency of the other calls to Neutron.')
+    args = parser.parse_args()
+
+    CONF([], project='zun')
+    CONF.set_override('port_pool_min_size', args.burst_size,
+                      group='network')
+    CONF.set_override('port_pool_max_size', args.burst_size * 2,
+                      group='network')
+    CONF.set_override('port_pool_refill_interval', 0.1, group='network')
+    update = args.update_ms / 1000
+    client = fake_neutron.FakeNeutronClient(
+        networks=[NETWORK_ID],
+        latency={'create_port': args.create_ms / 1000, 'update_port': update,
+                 'show_port': update, 'delete_port': update})
+    context = zun_context.RequestContext(user_id='fake_user',
+                                         project_id=PROJECT_ID)
+
+    with mock.patch.object(clients.OpenStackClients, 'neutron',
+                           return_value=client):
+        neutron_api = neutron.NeutronAPI(context)
+        without_pool = run(neutron_api, args.bursts, args.burst_size)
+        port_pool.start_pool()
+        try:
+            # Let the pool learn the network and fill up.
+            run(neutron_api, 1, 1)
+            time.sleep(args.burst_size * args.create_ms / 1000 + 0.5)
+            with_pool = run(neutron_api, args.bursts, args.burst_size)
+        finally:
+            port_pool.stop_pool()
+
+    print('%-12s %12s %12s' % ('port pool', 'mean (ms)', 'p95 (ms)'))
+    print('%-12s %12.1f %12.1f' % (('off',) + without_pool))
+    print('%-12s %12.1f %12.1f' % (('on',) + with_pool))
+    print('speedup: %.1fx' % (without_pool[0] / with_pool[0]))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
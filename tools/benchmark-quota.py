@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the container creation throughput of a large project.
+
+Compare the throughput of the quota check followed by the creation of the
+container in the database when each quota resource is counted by its own
+query with the throughput when the resources are counted by a single
+query. The containers are stored in a temporary SQLite database.
+
+Usage::
+
+    tools/benchmark-quota.py [--containers N] [--creates N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from oslo_utils import uuidutils
+
+from zun.api.controllers.v1 import containers as containers_controller
+from zun.common import consts
+from zun.common import context as zun_context
+from zun.common import quota
+import zun.conf
+from zun.db.sqlalchemy import api as db_api
+from zun.db.sqlalchemy import models
+from zun import objects
+
+CONF = zun.conf.CONF
+QUOTAS = quota.QUOTAS
+
+PROJECT_ID = 'fake_project'
+DELTAS = {'cpu': 0.5, 'memory': 512, 'disk': 10}
+
+
+def check_per_resource(context, deltas):
+    """Check the quotas by counting each resource, as done before."""
+    check_kwargs = {'containers': 1}
+    for res_name, res_delta in deltas.items():
+        count = objects.Container.get_count(context, PROJECT_ID,
+                                            flag=res_name)
+        check_kwargs[res_name] = count + res_delta
+    check_kwargs['containers'] += objects.Container.get_count(
+        context, PROJECT_ID, flag='containers')
+    QUOTAS.limit_check(context, PROJECT_ID, **check_kwargs)
+
+
+def check_single_query(context, deltas):
+    containers_controller.ContainersController()._check_container_quotas(
+        context, deltas)
+
+
+def seed_containers(containers):
+    engine = db_api.get_engine()
+    rows = [{'uuid': uuidutils.generate_uuid(),
+             'name': 'container-%d' % i,
+             'project_id': PROJECT_ID,
+             'user_id': 'fake_user',
+             'container_type': consts.TYPE_CONTAINER,
+             'status': 'Running',
+             'cpu': DELTAS['cpu'],
+             'memory': str(DELTAS['memory']),
+             'disk': DELTAS['disk']}
+            for i in range(containers)]
+    with engine.begin() as connection:
+        connection.execute(models.Container.__table__.insert(), rows)
+
+
+def run(context, check, creates):
+    start = time.perf_counter()
+    for i in range(creates):
+        check(context, DELTAS)
+        container = objects.Container(
+            context, uuid=uuidutils.generate_uuid(),
+            name='created-%d' % i, project_id=PROJECT_ID,
+            user_id='fake_user', status='Creating',
+            cpu=DELTAS['cpu'], memory=str(DELTAS['memory']),
+            disk=DELTAS['disk'])
+        container.create(context)
+    return creates / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--containers', type=int, default=50000,
+                        help='Number of containers of the project.')
+    parser.add_argument('--creates', type=int, default=200,
+                        help='Number of containers to create.')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    database = os.path.join(tmpdir, 'zun.sqlite')
+    CONF([], project='zun')
+    CONF.set_override('connection', 'sqlite:///%s' % database,
+                      group='database')
+    # The quotas are not under test, make sure they never reject a create.
+    for resource in ('containers', 'cpu', 'memory', 'disk'):
+        CONF.set_override(resource, -1, group='quota')
+
+    models.Base.metadata.create_all(db_api.get_engine())
+    seed_containers(args.containers)
+    context = zun_context.RequestContext(user_id='fake_user',
+                                         project_id=PROJECT_ID)
+
+    per_resource = run(context, check_per_resource, args.creates)
+    single_query = run(context, check_single_query, args.creates)
+    print('%-24s %12s' % ('quota check', 'creates/s'))
+    print('%-24s %12.1f' % ('one query per resource', per_resource))
+    print('%-24s %12.1f' % ('single query', single_query))
+    print('speedup: %.1fx' % (single_query / per_resource))
+
+    os.remove(database)
+    os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
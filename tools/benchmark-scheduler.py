@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the loading of the host states by the filter scheduler.
+
+Compare the time spent per scheduling request to build the state of every
+compute host from its compute node with the time spent to refresh the
+states cached by the host manager. Between two requests, a number of
+compute nodes report a new usage, as zun-compute does periodically.
+
+Usage::
+
+    tools/benchmark-scheduler.py [--hosts N [N ...]] [--requests N]
+                                 [--updates N]
+
+A temporary SQLite database is used unless a connection URL is given.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from zun.common import context as zun_context
+import zun.conf
+from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as db_api
+from zun.db.sqlalchemy import models
+from zun import objects
+from zun.scheduler import host_manager
+from zun.scheduler.host_state import HostState
+
+CONF = zun.conf.CONF
+
+
+def seed_hosts(context, hosts):
+    node_uuids = []
+    for i in range(hosts):
+        hostname = 'host-%d' % i
+        node_uuid = uuidutils.generate_uuid()
+        dbapi.create_compute_node(context, {
+            'uuid': node_uuid, 'rp_uuid': node_uuid, 'hostname': hostname,
+            'mem_total': 1024 * 1024, 'mem_free': 1024 * 1024,
+            'mem_available': 1024 * 1024, 'mem_used': 0,
+            'total_containers': 0, 'running_containers': 0,
+            'paused_containers': 0, 'stopped_containers': 0,
+            'cpus': 1024, 'cpu_used': 0.0, 'disk_total': 100000,
+            'disk_used': 0, 'disk_quota_supported': False,
+            'runtimes': ['runc'], 'enable_cpu_pinning': False})
+        dbapi.create_zun_service({
+            'host': hostname, 'binary': 'zun-compute', 'disabled': False,
+            'last_seen_up': timeutils.utcnow()})
+        node_uuids.append(node_uuid)
+    return node_uuids
+
+
+def get_services(context):
+    return {service.host: service
+            for service in objects.ZunService.list_by_binary(
+                context, 'zun-compute')}
+
+
+def rebuild_host_states(context, manager):
+    """Build the state of every host, as done before the host manager."""
+    services = get_services(context)
+    host_states = []
+    for node in objects.ComputeNode.list(context):
+        service = services.get(node.hostname)
+        if service is None:
+            continue
+        host_state = HostState(node.hostname)
+        host_state.update(compute_node=node, service=service)
+        host_states.append(host_state)
+    return host_states
+
+
+def cached_host_states(context, manager):
+    return manager.get_host_states(context, get_services(context))
+
+
+def report_usage(context, node_uuids, updates, request):
+    for i in range(updates):
+        node_uuid = node_uuids[(request * updates + i) % len(node_uuids)]
+        dbapi.update_compute_node(context, node_uuid,
+                                  {'mem_used': request % 1024})
+
+
+def run(context, node_uuids, get_host_states, requests, updates):
+    manager = host_manager.HostManager()
+    # Warm up the cache of the host manager.
+    get_host_states(context, manager)
+    timings = []
+    for request in range(requests):
+        report_usage(context, node_uuids, updates, request)
+        start = time.perf_counter()
+        host_states = get_host_states(context, manager)
+        timings.append(time.perf_counter() - start)
+        assert len(host_states) == len(node_uuids)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connection',
+                        help='SQLAlchemy URL of the database to benchmark.')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 5000],
+                        help='Numbers of compute hosts to benchmark.')
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Number of scheduling requests to time.')
+    parser.add_argument('--updates', type=int, default=10,
+                        help='Number of compute nodes reporting a new usage '
+                             'between two requests.')
+    args = parser.parse_args()
+
+    CONF([], project='zun')
+    tmpdir = None
+    connection = args.connection
+    if not connection:
+        tmpdir = tempfile.mkdtemp()
+        connection = 'sqlite:///%s' % os.path.join(tmpdir, 'zun.sqlite')
+    CONF.set_override('connection', connection, group='database')
+
+    engine = db_api.get_engine()
+    context = zun_context.get_admin_context(all_projects=True)
+    print('%8s %14s %14s %9s' % ('hosts', 'rebuild (ms)', 'cached (ms)',
+                                 'speedup'))
+    for hosts in args.hosts:
+        models.Base.metadata.drop_all(engine)
+        models.Base.metadata.create_all(engine)
+        node_uuids = seed_hosts(context, hosts)
+        rebuild = run(context, node_uuids, rebuild_host_states,
+                      args.requests, args.updates)
+        cached = run(context, node_uuids, cached_host_states,
+                     args.requests, args.updates)
+        print('%8d %14.1f %14.1f %8.1fx' % (hosts, rebuild * 1000,
+                                            cached * 1000, rebuild / cached))
+
+    if tmpdir:
+        os.remove(os.path.join(tmpdir, 'zun.sqlite'))
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
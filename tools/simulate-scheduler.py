@@ -0,0 +1,472 @@
+#!/usr/bin/env python
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Simulate the filter scheduler on a synthetic inventory.
+
+Replay a trace of container arrivals through the scheduler client, the
+filters, the weighers and the host states of zun-api, and report the
+latency of the scheduling decisions, the time spent in each filter and how
+well the containers are packed on the hosts.
+
+The inventory is a set of compute nodes and zun-compute services written to
+the database. A fraction of the hosts have CPU pinning enabled, a fraction
+have a pool of PCI devices and every host has a label ``tier`` set to
+``gold`` or ``silver``. The placement API is replaced by an in-process fake
+which tracks the VCPU, MEMORY_MB and DISK_GB usage of the hosts, and the
+claims of zun-compute are emulated by pinning the CPUs of the NUMA node and
+allocating the PCI devices chosen by the scheduler.
+
+The trace is a file with one JSON object per line, e.g.::
+
+    {"cpu": 2, "memory": 2048, "disk": 10, "cpu_policy": "dedicated",
+     "pci": 1, "labels": {"tier": "gold"}}
+
+All the keys are optional. Without a trace, a random trace of the given
+number of containers is generated; ``--dump-trace`` saves it to be replayed
+later, e.g. to compare two versions of the scheduler on the same workload.
+
+Usage::
+
+    tools/simulate-scheduler.py [--hosts N] [--containers N]
+                                [--trace FILE | --dump-trace FILE]
+                                [--filters NAME [NAME ...]] [--seed N]
+
+A temporary SQLite database is used unless a connection URL is given.
+"""
+
+import argparse
+import collections
+import functools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+import os_resource_classes as orc
+from oslo_utils import timeutils
+
+from zun.common import context as zun_context
+from zun.common import exception
+import zun.conf
+from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as db_api
+from zun.db.sqlalchemy import models
+from zun import objects
+from zun.objects import pci_device_pool
+from zun.scheduler.client import query
+from zun.scheduler.client import report
+
+CONF = zun.conf.CONF
+
+DEFAULT_FILTERS = ['AvailabilityZoneFilter', 'ComputeFilter', 'RuntimeFilter',
+                   'RamFilter', 'DiskFilter', 'CpuSetFilter',
+                   'PciPassthroughFilter', 'LabelFilter']
+
+# The shapes of the random trace and their share of the arrivals.
+SHAPES = [
+    (0.35, {'cpu': 0.5, 'memory': 512, 'disk': 1}),
+    (0.25, {'cpu': 2, 'memory': 2048, 'disk': 10}),
+    (0.10, {'cpu': 4, 'memory': 8192, 'disk': 20}),
+    (0.10, {'cpu': 4, 'memory': 4096, 'cpu_policy': 'dedicated'}),
+    (0.05, {'cpu': 8, 'memory': 8192, 'cpu_policy': 'dedicated'}),
+    (0.10, {'cpu': 2, 'memory': 2048, 'pci': 1}),
+    (0.05, {'cpu': 1, 'memory': 1024, 'labels': {'tier': 'gold'}}),
+]
+
+PCI_VENDOR_ID = '8086'
+PCI_PRODUCT_ID = '1520'
+
+
+class FakePlacementClient(object):
+    """Answer the calls to placement from the usage of the hosts."""
+
+    def __init__(self, inventories):
+        self.inventories = inventories
+        self.usages = {rp_uuid: collections.Counter()
+                       for rp_uuid in inventories}
+        self.allocations = {}
+        self.elapsed = 0.0
+
+    def _ensure_traits(self, context, traits):
+        pass
+
+    def get_allocation_candidates(self, context, resources):
+        start = time.perf_counter()
+        requested = resources.merged_resources()
+        alloc_reqs = []
+        summaries = {}
+        for rp_uuid, inventory in self.inventories.items():
+            usage = self.usages[rp_uuid]
+            if all(usage[rc] + amount <= inventory.get(rc, 0)
+                   for rc, amount in requested.items()):
+                alloc_reqs.append({'allocations': {
+                    rp_uuid: {'resources': dict(requested)}}})
+                summaries[rp_uuid] = {}
+                if len(alloc_reqs) == CONF.scheduler.max_placement_results:
+                    break
+        self.elapsed += time.perf_counter() - start
+        return alloc_reqs, summaries, '1.29'
+
+    def claim_resources(self, context, consumer_uuid, alloc_request,
+                        project_id, user_id, allocation_request_version=None,
+                        consumer_generation=None):
+        for rp_uuid, alloc in alloc_request['allocations'].items():
+            self.usages[rp_uuid].update(alloc['resources'])
+        self.allocations[consumer_uuid] = alloc_request
+        return True
+
+    def delete_allocation_for_container(self, context, uuid):
+        alloc_request = self.allocations.pop(uuid, None)
+        if alloc_request is None:
+            return
+        for rp_uuid, alloc in alloc_request['allocations'].items():
+            self.usages[rp_uuid].subtract(alloc['resources'])
+
+
+class StageTimer(object):
+    """Accumulate the time spent in each stage of the filter scheduler."""
+
+    def __init__(self, driver):
+        self.elapsed = collections.Counter()
+        self.hosts_in = collections.Counter()
+        self.hosts_out = collections.Counter()
+        for filter_ in driver.enabled_filters:
+            filter_.filter_all = self._wrap_filter(filter_)
+        driver._get_host_states = self._wrap('host states',
+                                             driver._get_host_states)
+        handler = driver.weight_handler
+        handler.get_weighed_objects = self._wrap(
+            'weighers', handler.get_weighed_objects)
+        driver._consume_selected_host = self._wrap(
+            'consume', driver._consume_selected_host)
+
+    def _wrap(self, name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.elapsed[name] += time.perf_counter() - start
+        return wrapper
+
+    def _wrap_filter(self, filter_):
+        name = filter_.__class__.__name__
+        filter_all = filter_.filter_all
+
+        def wrapper(filter_obj_list, container, extra_spec):
+            hosts = list(filter_obj_list)
+            start = time.perf_counter()
+            # The filters return a generator, consume it to time the
+            # filtering itself.
+            result = filter_all(hosts, container, extra_spec)
+            if result is not None:
+                result = list(result)
+            self.elapsed[name] += time.perf_counter() - start
+            self.hosts_in[name] += len(hosts)
+            self.hosts_out[name] += len(result or [])
+            return result
+        return wrapper
+
+
+def random_uuid(rng):
+    # The UUIDs are drawn from the seeded generator since the hosts are
+    # ordered by UUID, so that a seed gives the same placement.
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed_hosts(context, args, rng):
+    """Create the compute nodes and services of the inventory."""
+    inventories = {}
+    for i in range(args.hosts):
+        hostname = 'host-%d' % i
+        node_uuid = random_uuid(rng)
+        cpus_per_node = args.host_cpus // args.numa_nodes
+        mem_per_node = args.host_memory // args.numa_nodes
+        numa_nodes = [
+            objects.NUMANode(
+                id=n,
+                cpuset=set(range(n * cpus_per_node, (n + 1) * cpus_per_node)),
+                pinned_cpus=set(), mem_total=mem_per_node,
+                mem_available=mem_per_node)
+            for n in range(args.numa_nodes)]
+        pools = []
+        if rng.random() < args.pci_hosts:
+            pools = [objects.PciDevicePool(
+                vendor_id=PCI_VENDOR_ID, product_id=PCI_PRODUCT_ID,
+                numa_node=n, tags={'dev_type': 'type-PCI'},
+                count=args.pci_devices // args.numa_nodes)
+                for n in range(args.numa_nodes)]
+        node = objects.ComputeNode(
+            context, uuid=node_uuid, rp_uuid=node_uuid, hostname=hostname,
+            numa_topology=objects.NUMATopology(nodes=numa_nodes),
+            mem_total=args.host_memory, mem_free=args.host_memory,
+            mem_available=args.host_memory, mem_used=0,
+            total_containers=0, running_containers=0, paused_containers=0,
+            stopped_containers=0, cpus=args.host_cpus, cpu_used=0.0,
+            disk_total=args.host_disk, disk_used=0,
+            disk_quota_supported=True, runtimes=['runc'],
+            enable_cpu_pinning=rng.random() < args.pinning_hosts,
+            labels={'tier': rng.choice(['gold', 'silver'])},
+            pci_device_pools=pci_device_pool.PciDevicePoolList(objects=pools))
+        node.create(context)
+        dbapi.create_zun_service({
+            'host': hostname, 'binary': 'zun-compute', 'disabled': False,
+            'last_seen_up': timeutils.utcnow()})
+        inventories[node_uuid] = {
+            orc.VCPU: int(args.host_cpus * args.cpu_allocation_ratio),
+            orc.MEMORY_MB: args.host_memory,
+            orc.DISK_GB: args.host_disk,
+        }
+    return inventories
+
+
+def generate_trace(count, rng):
+    weights = [weight for weight, shape in SHAPES]
+    shapes = [shape for weight, shape in SHAPES]
+    return [dict(rng.choices(shapes, weights)[0]) for i in range(count)]
+
+
+def load_trace(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def new_request(context, index, arrival, rng):
+    container = objects.Container(
+        context, uuid=random_uuid(rng), name='sim-%d' % index,
+        image='cirros', image_driver='docker',
+        project_id=context.project_id, user_id=context.user_id,
+        cpu=arrival.get('cpu'), memory=str(arrival.get('memory', 512)),
+        disk=arrival.get('disk', 0), runtime='runc',
+        cpu_policy=arrival.get('cpu_policy', 'shared'))
+    requests = []
+    if arrival.get('pci'):
+        requests.append(objects.ContainerPCIRequest(
+            count=arrival['pci'],
+            spec=[{'vendor_id': PCI_VENDOR_ID,
+                   'product_id': PCI_PRODUCT_ID}]))
+    extra_spec = {
+        'hints': {'label:%s' % k: v
+                  for k, v in arrival.get('labels', {}).items()},
+        'pci_requests': objects.ContainerPCIRequests(requests=requests),
+        'availability_zone': None,
+        'requested_host': None,
+    }
+    return container, extra_spec
+
+
+def emulate_compute_claim(host_state, container, extra_spec, limits):
+    """Apply the NUMA and PCI claims zun-compute makes on the host."""
+    if container.cpu_policy == 'dedicated':
+        node_id = limits['cpuset']['node']
+        for numa_node in host_state.numa_topology.nodes:
+            if numa_node.id == node_id:
+                free = sorted(numa_node.free_cpus)
+                numa_node.pin_cpus(set(free[:int(container.cpu)]))
+                numa_node.mem_available -= int(container.memory)
+    pci_requests = extra_spec['pci_requests'].requests
+    if pci_requests:
+        host_state.pci_stats.apply_requests(pci_requests)
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of the sorted values."""
+    if not values:
+        return 0.0
+    rank = max(int(round(percent / 100.0 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def report_latency(latencies, failures):
+    latencies = sorted(latencies)
+    print('\nDecisions: %d placed, %d without a valid host'
+          % (len(latencies) - failures, failures))
+    print('Latency (ms): p50 %.2f  p90 %.2f  p99 %.2f  max %.2f  mean %.2f'
+          % tuple([percentile(latencies, p) * 1000 for p in (50, 90, 99)] +
+                  [latencies[-1] * 1000 if latencies else 0.0,
+                   sum(latencies) / max(len(latencies), 1) * 1000]))
+
+
+def report_breakdown(total, placement, timer):
+    print('\nTime breakdown:')
+    print('  %-24s %10s %7s %12s' % ('stage', 'total ms', 'share',
+                                     'hosts in/out'))
+    rows = [('placement (fake)', placement, '')]
+    for name, elapsed in timer.elapsed.items():
+        hosts = ''
+        if name in timer.hosts_in:
+            hosts = '%d/%d' % (timer.hosts_in[name], timer.hosts_out[name])
+        rows.append((name, elapsed, hosts))
+    rows.append(('other', total - placement - sum(timer.elapsed.values()),
+                 ''))
+    for name, elapsed, hosts in rows:
+        print('  %-24s %10.1f %6.1f%% %12s'
+              % (name, elapsed * 1000, elapsed / total * 100, hosts))
+
+
+def report_packing(placement, host_states, trace):
+    used = [rp_uuid for rp_uuid, usage in placement.usages.items()
+            if usage[orc.MEMORY_MB] > 0]
+    print('\nPacking: %d of %d hosts used' % (len(used), len(host_states)))
+    for rc in (orc.VCPU, orc.MEMORY_MB, orc.DISK_GB):
+        total = sum(inv[rc] for inv in placement.inventories.values())
+        used_total = sum(placement.inventories[rp][rc] for rp in used)
+        consumed = sum(usage[rc] for usage in placement.usages.values())
+        print('  %-10s %5.1f%% of the inventory, %5.1f%% of the used hosts'
+              % (rc, consumed / max(total, 1) * 100,
+                 consumed / max(used_total, 1) * 100))
+
+    # The free capacity is stranded when the host it is on cannot fit the
+    # largest shape of the trace anymore.
+    shared = [a for a in trace if a.get('cpu_policy') != 'dedicated']
+    if shared:
+        largest = max(shared, key=lambda a: (a.get('memory', 512),
+                                             a.get('cpu', 0)))
+        need = {orc.VCPU: max(int(largest.get('cpu', 1)), 1),
+                orc.MEMORY_MB: largest.get('memory', 512)}
+        free_mem = stranded = 0
+        for rp_uuid, inventory in placement.inventories.items():
+            usage = placement.usages[rp_uuid]
+            free = {rc: inventory[rc] - usage[rc] for rc in need}
+            free_mem += free[orc.MEMORY_MB]
+            if any(free[rc] < amount for rc, amount in need.items()):
+                stranded += free[orc.MEMORY_MB]
+        print('Fragmentation: %.1f%% of the free memory is on hosts which '
+              'cannot fit %s' % (stranded / max(free_mem, 1) * 100, need))
+
+    dedicated = [a.get('cpu', 1) for a in trace
+                 if a.get('cpu_policy') == 'dedicated']
+    if dedicated:
+        largest = max(dedicated)
+        free_cpus = stranded = 0
+        for host_state in host_states:
+            if not host_state.enable_cpu_pinning:
+                continue
+            for numa_node in host_state.numa_topology.nodes:
+                free_cpus += numa_node.avail_cpus
+                if numa_node.avail_cpus < largest:
+                    stranded += numa_node.avail_cpus
+        print('NUMA fragmentation: %.1f%% of the free dedicated CPUs are on '
+              'NUMA nodes which cannot fit %d CPUs'
+              % (stranded / max(free_cpus, 1) * 100, largest))
+
+    pools = [pool for host_state in host_states if host_state.pci_stats
+             for pool in host_state.pci_stats.pools]
+    if pools:
+        print('PCI devices: %d free' % sum(pool['count'] for pool in pools))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connection',
+                        help='SQLAlchemy URL of the database to use.')
+    parser.add_argument('--hosts', type=int, default=500,
+                        help='Number of compute hosts.')
+    parser.add_argument('--host-cpus', type=int, default=32,
+                        help='Number of CPUs of a host.')
+    parser.add_argument('--host-memory', type=int, default=128 * 1024,
+                        help='Memory of a host in MB.')
+    parser.add_argument('--host-disk', type=int, default=1000,
+                        help='Disk of a host in GB.')
+    parser.add_argument('--numa-nodes', type=int, default=2,
+                        help='Number of NUMA nodes of a host.')
+    parser.add_argument('--pinning-hosts', type=float, default=0.25,
+                        help='Fraction of the hosts with CPU pinning.')
+    parser.add_argument('--pci-hosts', type=float, default=0.25,
+                        help='Fraction of the hosts with PCI devices.')
+    parser.add_argument('--pci-devices', type=int, default=4,
+                        help='Number of PCI devices of a host with PCI '
+                             'devices.')
+    parser.add_argument('--cpu-allocation-ratio', type=float, default=1.0,
+                        help='Ratio of the VCPU inventory to the CPUs.')
+    parser.add_argument('--containers', type=int, default=2000,
+                        help='Number of containers of the random trace.')
+    parser.add_argument('--trace',
+                        help='File of the container arrivals to replay.')
+    parser.add_argument('--dump-trace',
+                        help='File to save the replayed trace to.')
+    parser.add_argument('--filters', nargs='+', default=DEFAULT_FILTERS,
+                        help='Names of the enabled filters.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random inventory and trace.')
+    args = parser.parse_args()
+
+    CONF([], project='zun')
+    tmpdir = None
+    connection = args.connection
+    if not connection:
+        tmpdir = tempfile.mkdtemp()
+        connection = 'sqlite:///%s' % os.path.join(tmpdir, 'zun.sqlite')
+    CONF.set_override('connection', connection, group='database')
+    CONF.set_override('enabled_filters', args.filters, group='scheduler')
+    # The services are seeded once, keep them up for the whole run.
+    CONF.set_override('service_down_time', 24 * 3600)
+
+    engine = db_api.get_engine()
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(args.seed)
+    admin = zun_context.get_admin_context(all_projects=True)
+    context = zun_context.RequestContext(user_id='user',
+                                         project_id='project')
+    inventories = seed_hosts(admin, args, rng)
+    trace = (load_trace(args.trace) if args.trace
+             else generate_trace(args.containers, rng))
+    if args.dump_trace:
+        with open(args.dump_trace, 'w') as f:
+            for arrival in trace:
+                f.write(json.dumps(arrival, sort_keys=True) + '\n')
+
+    placement = FakePlacementClient(inventories)
+    report.SchedulerReportClient = lambda *args, **kwargs: placement
+    client = query.SchedulerClient()
+    driver = client.driver
+    host_states = {host_state.hostname: host_state
+                   for host_state in driver._get_host_states(context, None)}
+    timer = StageTimer(driver)
+
+    print('Scheduling %d containers on %d hosts with the filters %s'
+          % (len(trace), args.hosts, ', '.join(args.filters)))
+    latencies = []
+    failures = 0
+    start_all = time.perf_counter()
+    for index, arrival in enumerate(trace):
+        container, extra_spec = new_request(context, index, arrival, rng)
+        start = time.perf_counter()
+        try:
+            dests = client.select_destinations(context, [container],
+                                               extra_spec)
+        except exception.NoValidHost:
+            failures += 1
+            dests = []
+        latencies.append(time.perf_counter() - start)
+        for dest in dests:
+            emulate_compute_claim(host_states[dest['host']], container,
+                                  extra_spec, dest['limits'])
+    total = time.perf_counter() - start_all
+
+    report_latency(latencies, failures)
+    report_breakdown(total, placement.elapsed, timer)
+    report_packing(placement, list(host_states.values()), trace)
+
+    if tmpdir:
+        os.remove(os.path.join(tmpdir, 'zun.sqlite'))
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
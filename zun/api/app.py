@@ -20,6 +20,7 @@ import pecan
 from zun.api import config as api_config
 from zun.api import middleware
 from zun.common import config as common_config
+from zun.compute import api as compute_api
 import zun.conf
 
 CONF = zun.conf.CONF
@@ -63,5 +64,14 @@ def load_app():
     return deploy.loadapp("config:" + cfg_file)
 
 
+def warm_up():
+    """Build what the requests of the process share before serving them."""
+    try:
+        compute_api.get_api()
+    except Exception:
+        LOG.exception("Failed to build the compute API, it will be built "
+                      "by the first request instead.")
+
+
 def app_factory(global_config, **local_conf):
     return setup_app()
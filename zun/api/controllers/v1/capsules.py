@@ -148,7 +148,9 @@ class CapsuleController(base.Controller):
                                         marker_obj,
                                         sort_key,
                                         sort_dir,
-                                        filters=filters)
+                                        filters=filters,
+                                        expected_attrs=['containers',
+                                                        'init_containers'])
 
         return CapsuleCollection.convert_with_links(
             capsules, limit, url=resource_url, expand=expand,
@@ -26,16 +26,20 @@ class Collection(base.APIBase):
         """Return whether collection has more items."""
         return len(self.collection) and len(self.collection) == limit
 
-    def get_next(self, limit, url=None, **kwargs):
+    def get_next(self, limit, url=None, cursor=None, **kwargs):
         """Return a link to the next subset of the collection."""
         if not self.has_next(limit):
             return None
 
         resource_url = url or self._type
         q_args = ''.join(['%s=%s&' % (key, kwargs[key]) for key in kwargs])
-        next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
-            'args': q_args, 'limit': limit,
-            'marker': self.collection[-1]['uuid']}
+        if cursor:
+            next_args = '?%(args)slimit=%(limit)d&cursor=%(cursor)s' % {
+                'args': q_args, 'limit': limit, 'cursor': cursor}
+        else:
+            next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
+                'args': q_args, 'limit': limit,
+                'marker': self.collection[-1]['uuid']}
 
         return link.make_link('next', pecan.request.host_url,
                               resource_url, next_args)['href']
@@ -13,10 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import shlex
 
 from neutronclient.common import exceptions as n_exc
 from oslo_log import log as logging
+from oslo_utils import excutils
 from oslo_utils import strutils
 from oslo_utils import uuidutils
 import pecan
@@ -71,12 +73,17 @@ class ContainerCollection(collection.Collection):
 
     @staticmethod
     def convert_with_links(rpc_containers, limit, url=None,
-                           expand=False, **kwargs):
+                           expand=False, fields=None, **kwargs):
         context = pecan.request.context
         collection = ContainerCollection()
+        # Evaluate the policies once for all the containers of the list
+        allowed_keys = view.get_allowed_keys(
+            context, view.parse_fields(fields) if fields else None)
         collection.containers = \
-            [view.format_container(context, url, p)
+            [view.format_container(context, url, p, allowed_keys)
              for p in rpc_containers]
+        if fields:
+            kwargs['fields'] = fields
         collection.next = collection.get_next(limit, url=url, **kwargs)
         return collection
 
@@ -92,11 +99,30 @@ class ContainersActionsController(base.Controller):
         policy.enforce(context, "container:actions",
                        action="container:actions")
         container = api_utils.get_resource('Container', container_ident)
+        limit = kwargs.pop('limit', None)
+        cursor = kwargs.pop('cursor', None)
+        if limit is not None:
+            api_utils.version_check('limit', '1.43')
+            limit = api_utils.validate_limit(limit)
+        marker = api_utils.get_pagination_marker('ContainerAction',
+                                                 cursor=cursor)
         actions_raw = objects.ContainerAction.get_by_container_uuid(
-            context, container.uuid)
+            context, container.uuid, limit=limit, marker=marker)
         actions = [actions_view.format_action(a) for a in actions_raw]
 
-        return {"containerActions": actions}
+        result = {"containerActions": actions}
+        if limit is not None or cursor:
+            next_link = None
+            if limit and len(actions_raw) == limit:
+                next_cursor = api_utils.encode_cursor(actions_raw[-1],
+                                                      'created_at')
+                resource_url = 'containers/%s/container_actions' % (
+                    container.uuid)
+                next_link = link.make_link(
+                    'next', pecan.request.host_url, resource_url,
+                    '?limit=%d&cursor=%s' % (limit, next_cursor))['href']
+            result['next'] = next_link
+        return result
 
     @pecan.expose('json')
     @exception.wrap_pecan_controller_exception
@@ -182,6 +208,9 @@ class ContainersController(base.Controller):
         sort_key = kwargs.pop('sort_key', 'id')
         resource_url = kwargs.pop('resource_url', None)
         expand = kwargs.pop('expand', None)
+        fields = kwargs.pop('fields', None)
+        if fields is not None:
+            api_utils.version_check('fields', '1.45')
 
         container_allowed_filters = ['name', 'image', 'project_id', 'user_id',
                                      'memory', 'host', 'task_state', 'status',
@@ -193,11 +222,9 @@ class ContainersController(base.Controller):
                 context.can(policy_action, might_not_exist=True)
                 filter_value = kwargs.pop(filter_key)
                 filters[filter_key] = filter_value
-        marker_obj = None
-        marker = kwargs.pop('marker', None)
-        if marker:
-            marker_obj = objects.Container.get_by_uuid(context,
-                                                       marker)
+        marker_obj = api_utils.get_pagination_marker(
+            'Container', kwargs.pop('marker', None),
+            kwargs.pop('cursor', None))
         if kwargs:
             unknown_params = [str(k) for k in kwargs]
             msg = _("Unknown parameters: %s") % ", ".join(unknown_params)
@@ -208,10 +235,14 @@ class ContainersController(base.Controller):
                                             marker_obj,
                                             sort_key,
                                             sort_dir,
-                                            filters=filters)
+                                            filters=filters,
+                                            expected_attrs=['registry'])
+        cursor = api_utils.get_next_cursor(containers, sort_key)
         return ContainerCollection.convert_with_links(containers, limit,
                                                       url=resource_url,
                                                       expand=expand,
+                                                      fields=fields,
+                                                      cursor=cursor,
                                                       sort_key=sort_key,
                                                       sort_dir=sort_dir)
 
@@ -227,6 +258,12 @@ class ContainersController(base.Controller):
             policy.enforce(context, "container:get_one_all_projects",
                            action="container:get_one_all_projects")
             context.all_projects = True
+        allowed_keys = None
+        fields = kwargs.get('fields')
+        if fields is not None:
+            api_utils.version_check('fields', '1.45')
+            allowed_keys = view.get_allowed_keys(context,
+                                                 view.parse_fields(fields))
         container = api_utils.get_resource('Container', container_ident)
         check_policy_on_container(container.as_dict(), "container:get_one")
         if container.host:
@@ -237,7 +274,7 @@ class ContainersController(base.Controller):
                 LOG.error("Failed to get container details: %s", str(e))
 
         return view.format_container(context, pecan.request.host_url,
-                                     container)
+                                     container, allowed_keys)
 
     def _generate_name_for_container(self):
         """Generate a random name like: zeta-22-container."""
@@ -293,7 +330,7 @@ class ContainersController(base.Controller):
     def post(self, run=False, **container_dict):  # noqa
         return self._do_post(run, **container_dict)
 
-    @base.Controller.api_version("1.40")  # noqa
+    @base.Controller.api_version("1.40", "1.43")  # noqa
     @pecan.expose('json')
     @api_utils.enforce_content_types(['application/json'])
     @exception.wrap_pecan_controller_exception
@@ -302,6 +339,15 @@ class ContainersController(base.Controller):
     def post(self, run=False, **container_dict):  # noqa
         return self._do_post(run, **container_dict)
 
+    @base.Controller.api_version("1.44")  # noqa
+    @pecan.expose('json')
+    @api_utils.enforce_content_types(['application/json'])
+    @exception.wrap_pecan_controller_exception
+    @validation.validate_query_param(pecan.request, schema.query_param_create)
+    @validation.validated(schema.container_create_v144)
+    def post(self, run=False, **container_dict):  # noqa
+        return self._do_post(run, **container_dict)
+
     def _do_post(self, run=False, **container_dict):
         """Create or run a new container.
 
@@ -331,8 +377,28 @@ class ContainersController(base.Controller):
             raise exception.InvalidValue(_('Valid run or interactive '
                                            'values are: %s') % bools)
 
-        # Check container quotas
-        self._check_container_quotas(context, container_dict)
+        min_count = container_dict.pop('min_count', None)
+        max_count = container_dict.pop('max_count', None)
+        multiple = min_count is not None or max_count is not None
+        if multiple:
+            min_count, max_count = self._validate_counts(
+                container_dict, min_count, max_count)
+            # Check container quotas for the whole batch at once, falling
+            # back to the minimum number of containers.
+            try:
+                self._check_container_quotas(context, container_dict,
+                                             count=max_count)
+                count = max_count
+            except exception.OverQuota:
+                if min_count == max_count:
+                    raise
+                self._check_container_quotas(context, container_dict,
+                                             count=min_count)
+                count = min_count
+        else:
+            # Check container quotas
+            self._check_container_quotas(context, container_dict)
+            count = 1
 
         auto_remove = container_dict.pop('auto_remove', None)
         if auto_remove is not None:
@@ -401,9 +467,6 @@ class ContainersController(base.Controller):
 
         container_dict['project_id'] = context.project_id
         container_dict['user_id'] = context.user_id
-        name = container_dict.get('name') or \
-            self._generate_name_for_container()
-        container_dict['name'] = name
         self._set_default_resource_limit(container_dict)
         if container_dict.get('restart_policy'):
             utils.check_for_restart_policy(container_dict)
@@ -432,52 +495,107 @@ class ContainersController(base.Controller):
         extra_spec['availability_zone'] = container_dict.get(
             'availability_zone')
         extra_spec['requested_host'] = requested_host
-        new_container = objects.Container(context, **container_dict)
-        new_container.create(context)
+        name = container_dict.get('name')
+        hostname = container_dict.get('hostname')
+        new_containers = []
+        requested_volumes = {}
+        try:
+            for index in range(count):
+                values = copy.deepcopy(container_dict)
+                values['name'] = name or self._generate_name_for_container()
+                if name and count > 1:
+                    values['name'] = '%s-%d' % (name, index + 1)
+                if hostname and count > 1:
+                    values['hostname'] = '%s-%d' % (hostname, index + 1)
+                new_container = objects.Container(context, **values)
+                new_container.create(context)
+                new_containers.append(new_container)
+                requested_volumes.update(self._build_requested_volumes(
+                    context, new_container, copy.deepcopy(mounts)))
+        except Exception:
+            # None of the containers is scheduled unless all of them could
+            # be created.
+            with excutils.save_and_reraise_exception():
+                self._destroy_new_containers(context, new_containers,
+                                             requested_volumes)
 
         kwargs = {}
         kwargs['extra_spec'] = extra_spec
         kwargs['requested_networks'] = requested_networks
-        kwargs['requested_volumes'] = (
-            self._build_requested_volumes(context, new_container, mounts))
+        kwargs['requested_volumes'] = requested_volumes
         if pci_req.requests:
             kwargs['pci_requests'] = pci_req
         kwargs['run'] = run
+        pecan.response.status = 202
+        if multiple:
+            compute_api.containers_create(context, new_containers, **kwargs)
+            return {'containers': [
+                view.format_container(context, pecan.request.host_url, c)
+                for c in new_containers]}
+
         compute_api.container_create(context, new_container, **kwargs)
         # Set the HTTP Location Header
         pecan.response.location = link.build_url('containers',
                                                  new_container.uuid)
-        pecan.response.status = 202
         return view.format_container(context, pecan.request.host_url,
                                      new_container)
 
+    def _destroy_new_containers(self, context, containers,
+                                requested_volumes):
+        for container in containers:
+            container.destroy(context)
+            for volmap in requested_volumes.get(container.uuid, []):
+                try:
+                    volmap._destroy_volume(context)
+                except exception.VolumeNotFound:
+                    pass
+
+    def _validate_counts(self, container_dict, min_count, max_count):
+        min_count = int(min_count or 1)
+        max_count = int(max_count or min_count)
+        if min_count > max_count:
+            raise exception.InvalidValue(_(
+                "min_count must be less than or equal to max_count"))
+        if max_count > CONF.api.max_container_count:
+            raise exception.InvalidValue(_(
+                "max_count must be less than or equal to %d")
+                % CONF.api.max_container_count)
+        if max_count > 1:
+            if any(net.get('port') for net in container_dict.get('nets', [])):
+                raise exception.InvalidValue(_(
+                    "Unable to create multiple containers on a given port"))
+            if any(mount.get('source') for mount in
+                   container_dict.get('mounts', [])
+                   if mount.get('type', 'volume') == 'volume'):
+                raise exception.InvalidValue(_(
+                    "Unable to attach a given volume to multiple "
+                    "containers"))
+        return min_count, max_count
+
     def _check_container_quotas(self, context, container_delta_dict,
-                                update_container=False):
+                                update_container=False, count=1):
         deltas = {
-            'containers': 0 if update_container else 1,
-            'cpu': container_delta_dict.get('cpu', 0),
-            'memory': container_delta_dict.get('memory', 0),
-            'disk': container_delta_dict.get('disk', 0)
+            'containers': 0 if update_container else count,
+            'cpu': float(container_delta_dict.get('cpu') or 0) * count,
+            'memory': int(container_delta_dict.get('memory') or 0) * count,
+            'disk': int(container_delta_dict.get('disk') or 0) * count
         }
 
         def _check_deltas(context, deltas):
             """Check usage deltas against quota limits.
 
-            This does QUOTAS.count() followed by a QUOTAS.limit_check()
-            using the provided deltas.
+            This does QUOTAS.count_as_dict() followed by a
+            QUOTAS.limit_check() using the provided deltas.
 
             :param context: The request context, for access check.
             :param deltas: A dict of {resource_name: delta, ...} to check
                            against the quota limits.
             """
             check_kwargs = {}
-            count_as_dict = {}
             project_id = context.project_id
+            count_as_dict = QUOTAS.count_as_dict(context, list(deltas),
+                                                 project_id)
             for res_name, res_delta in deltas.items():
-                # TODO(kiennt): Apply count_as_dict method, query count usage
-                #               once rather than count each resource.
-                count_as_dict[res_name] = QUOTAS.count(context, res_name,
-                                                       project_id)
                 total = None
                 try:
                     if isinstance(count_as_dict[res_name], int):
@@ -936,7 +1054,8 @@ class ContainersController(base.Controller):
     @exception.wrap_pecan_controller_exception
     @validation.validate_query_param(pecan.request, schema.query_param_logs)
     def logs(self, container_ident, stdout=True, stderr=True,
-             timestamps=False, tail='all', since=None):
+             timestamps=False, tail='all', since=None, stream=False,
+             follow=False):
         """Get logs of the given container.
 
         :param container_ident: UUID or Name of a container.
@@ -947,6 +1066,9 @@ class ContainersController(base.Controller):
                      (default: get all logs)
         :param since: Show logs since a given datetime or
                      integer epoch (in seconds).
+        :param stream: Return the URL of a websocket relaying the logs
+                       instead of the logs.
+        :param follow: Keep relaying the new logs. Only used with stream.
         """
         container = api_utils.get_resource('Container', container_ident)
         check_policy_on_container(container.as_dict(), "container:logs")
@@ -955,14 +1077,28 @@ class ContainersController(base.Controller):
             stdout = strutils.bool_from_string(stdout, strict=True)
             stderr = strutils.bool_from_string(stderr, strict=True)
             timestamps = strutils.bool_from_string(timestamps, strict=True)
+            stream = strutils.bool_from_string(stream, strict=True)
+            follow = strutils.bool_from_string(follow, strict=True)
         except ValueError:
             bools = ', '.join(strutils.TRUE_STRINGS + strutils.FALSE_STRINGS)
-            raise exception.InvalidValue(_('Valid stdout, stderr and '
-                                           'timestamps values are: %s')
-                                         % bools)
-        LOG.debug('Calling compute.container_logs with %s', container.uuid)
+            raise exception.InvalidValue(_('Valid stdout, stderr, '
+                                           'timestamps, stream and follow '
+                                           'values are: %s') % bools)
         context = pecan.request.context
         compute_api = pecan.request.compute_api
+        if follow:
+            api_utils.version_check('follow', '1.41')
+            if not stream:
+                raise exception.InvalidValue(_('Parameter follow is only '
+                                               'supported with stream.'))
+        if stream:
+            api_utils.version_check('stream', '1.41')
+            LOG.debug('Calling compute.container_logs_stream with %s',
+                      container.uuid)
+            return compute_api.container_logs_stream(
+                context, container, stdout, stderr, timestamps, tail, since,
+                follow)
+        LOG.debug('Calling compute.container_logs with %s', container.uuid)
         return compute_api.container_logs(context, container, stdout, stderr,
                                           timestamps, tail, since)
 
@@ -1127,6 +1263,9 @@ class ContainersController(base.Controller):
                   {'uuid': container.uuid, 'path': kwargs['path']})
         context = pecan.request.context
         compute_api = pecan.request.compute_api
+        if self._is_stream(kwargs):
+            return compute_api.container_get_archive_stream(
+                context, container, kwargs['path'])
         data, stat = compute_api.container_get_archive(
             context, container, kwargs['path'], kwargs['encode_data'])
         return {"data": data, "stat": stat}
@@ -1155,7 +1294,7 @@ class ContainersController(base.Controller):
         :param container_ident: UUID or Name of a container.
         """
         kwargs['decode_data'] = True
-        self._put_archive(container_ident, **kwargs)
+        return self._put_archive(container_ident, **kwargs)
 
     def _put_archive(self, container_ident, **kwargs):
         container = api_utils.get_resource('Container', container_ident)
@@ -1166,10 +1305,25 @@ class ContainersController(base.Controller):
                   {'uuid': container.uuid, 'path': kwargs['path']})
         context = pecan.request.context
         compute_api = pecan.request.compute_api
+        if self._is_stream(kwargs):
+            return compute_api.container_put_archive_stream(
+                context, container, kwargs['path'])
         compute_api.container_put_archive(
             context, container, kwargs['path'], kwargs['data'],
             kwargs['decode_data'])
 
+    def _is_stream(self, kwargs):
+        try:
+            stream = strutils.bool_from_string(kwargs.get('stream', False),
+                                               strict=True)
+        except ValueError:
+            bools = ', '.join(strutils.TRUE_STRINGS + strutils.FALSE_STRINGS)
+            raise exception.InvalidValue(_('Valid stream values are: %s')
+                                         % bools)
+        if stream:
+            api_utils.version_check('stream', '1.42')
+        return stream
+
     @pecan.expose('json')
     @exception.wrap_pecan_controller_exception
     def stats(self, container_ident):
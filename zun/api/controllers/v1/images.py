@@ -111,19 +111,19 @@ class ImagesController(base.Controller):
         resource_url = kwargs.get('resource_url')
         expand = kwargs.get('expand')
         filters = None
-        marker_obj = None
-        marker = kwargs.get('marker')
-        if marker:
-            marker_obj = objects.Image.get_by_uuid(context, marker)
+        marker_obj = api_utils.get_pagination_marker(
+            'Image', kwargs.get('marker'), kwargs.get('cursor'))
         images = objects.Image.list(context,
                                     limit,
                                     marker_obj,
                                     sort_key,
                                     sort_dir,
                                     filters=filters)
+        cursor = api_utils.get_next_cursor(images, sort_key)
         return ImageCollection.convert_with_links(images, limit,
                                                   url=resource_url,
                                                   expand=expand,
+                                                  cursor=cursor,
                                                   sort_key=sort_key,
                                                   sort_dir=sort_dir)
 
@@ -77,6 +77,13 @@ container_create_v139['properties']['host'] = parameter_types.hostname
 container_create_v140 = copy.deepcopy(container_create_v139)
 container_create_v140['properties']['entrypoint'] = parameter_types.entrypoint
 
+# Add min_count and max_count to create multiple containers
+container_create_v144 = copy.deepcopy(container_create_v140)
+container_create_v144['properties']['min_count'] = (
+    parameter_types.positive_integer)
+container_create_v144['properties']['max_count'] = (
+    parameter_types.positive_integer)
+
 query_param_rename = {
     'type': 'object',
     'properties': {
@@ -131,7 +138,9 @@ query_param_logs = {
         'stderr': parameter_types.boolean_extended,
         'timestamps': parameter_types.boolean_extended,
         'tail': parameter_types.str_and_int,
-        'since': parameter_types.logs_since
+        'since': parameter_types.logs_since,
+        'stream': parameter_types.boolean_extended,
+        'follow': parameter_types.boolean_extended
     },
     'additionalProperties': False
 }
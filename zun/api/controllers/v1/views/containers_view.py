@@ -14,6 +14,8 @@
 import itertools
 
 from zun.api.controllers import link
+from zun.common import exception
+from zun.common.i18n import _
 from zun.common.policies import container as policies
 
 _basic_keys = (
@@ -57,14 +59,43 @@ _basic_keys = (
 )
 
 
-def format_container(context, url, container):
-    def transform(key, value):
-        if key not in _basic_keys:
-            return
+def get_allowed_keys(context, fields=None):
+    """Get the keys of the containers the context is allowed to see.
+
+    The policy is evaluated once per key so that the result can be applied
+    to all the containers of a response.
+
+    :param context: the request context.
+    :param fields: the keys requested by the user, if any.
+    """
+    keys = _basic_keys
+    if fields is not None:
+        keys = [key for key in keys if key in fields or key == 'uuid']
+    allowed = []
+    for key in keys:
         # strip the key if it is not allowed by policy
         policy_action = policies.CONTAINER % ('get_one:%s' % key)
-        if not context.can(policy_action, fatal=False, might_not_exist=True):
-            return
+        if context.can(policy_action, fatal=False, might_not_exist=True):
+            allowed.append(key)
+    return tuple(allowed)
+
+
+def parse_fields(fields):
+    """Parse the comma separated keys of the fields query parameter."""
+    fields = set(field.strip() for field in fields.split(','))
+    fields.discard('')
+    invalid = fields.difference(_basic_keys)
+    if invalid:
+        raise exception.InvalidValue(_("Invalid fields: %s")
+                                     % ", ".join(sorted(invalid)))
+    return fields
+
+
+def format_container(context, url, container, allowed_keys=None):
+    if allowed_keys is None:
+        allowed_keys = get_allowed_keys(context)
+
+    def transform(key, value):
         if key == 'uuid':
             yield ('uuid', value)
             if url:
@@ -84,4 +115,5 @@ def format_container(context, url, container):
             yield (key, value)
 
     return dict(itertools.chain.from_iterable(
-        transform(k, v) for k, v in container.as_dict().items()))
+        transform(k, getattr(container, k)) for k in allowed_keys
+        if k in container.fields and container.obj_attr_is_set(k)))
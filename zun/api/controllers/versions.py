@@ -73,10 +73,15 @@ REST_API_VERSION_HISTORY = """REST API Version History:
     * 1.38 - Add 'annotations' to capsule
     * 1.39 - Support requested host on container creation
     * 1.40 - Add support for specifying entrypoint of the image
+    * 1.41 - Add support for streaming the logs of a container
+    * 1.42 - Add support for streaming the archives of a container
+    * 1.43 - Add cursor based pagination
+    * 1.44 - Add min_count and max_count to create multiple containers
+    * 1.45 - Add fields to select the keys of the listed containers
 """
 
 BASE_VER = '1.1'
-CURRENT_MAX_VER = '1.40'
+CURRENT_MAX_VER = '1.45'
 
 
 class Version(object):
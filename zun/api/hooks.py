@@ -77,8 +77,7 @@ class RPCHook(hooks.PecanHook):
     """Attach the rpcapi object to the request so controllers can get to it."""
 
     def before(self, state):
-        context = state.request.context
-        state.request.compute_api = compute_api.API(context)
+        state.request.compute_api = compute_api.get_api()
 
 
 class NoExceptionTracebackHook(hooks.PecanHook):
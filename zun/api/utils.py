@@ -13,7 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import functools
+
+from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 import pecan
 
@@ -57,6 +60,53 @@ def validate_sort_dir(sort_dir):
     return sort_dir
 
 
+def get_pagination_marker(resource, marker=None, cursor=None):
+    """Get the marker of a paginated list.
+
+    :param resource: the resource type.
+    :param marker: the UUID of the last resource of the previous page.
+    :param cursor: the opaque cursor of the next page.
+
+    :returns: The marker to pass to the list method of the resource.
+    """
+    if cursor:
+        version_check('cursor', '1.43')
+        if marker:
+            raise exception.InvalidValue(_("Only one of marker and cursor "
+                                           "can be specified"))
+        return decode_cursor(cursor)
+    if marker:
+        resource = getattr(objects, resource)
+        return resource.get_by_uuid(pecan.request.context, marker)
+
+
+def encode_cursor(obj, sort_key='id'):
+    """Encode the sort key values of an object into an opaque cursor."""
+    keys = [sort_key, 'id'] if sort_key and sort_key != 'id' else ['id']
+    values = {key: getattr(obj, key) for key in keys}
+    cursor = base64.urlsafe_b64encode(jsonutils.dump_as_bytes(values))
+    return cursor.decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor into the sort key values it encodes."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = jsonutils.loads(data)
+    except (TypeError, ValueError):
+        values = None
+    if not isinstance(values, dict):
+        raise exception.InvalidValue(_("Invalid cursor: %s") % cursor)
+    return values
+
+
+def get_next_cursor(resources, sort_key='id'):
+    """Get the cursor of the page following the given resources, if any."""
+    req_version = pecan.request.version
+    if resources and req_version >= versions.Version('', '', '', '1.43'):
+        return encode_cursor(resources[-1], sort_key)
+
+
 def get_resource(resource, resource_ident):
     """Get the resource from the uuid or logical name.
 
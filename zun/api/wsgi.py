@@ -35,4 +35,6 @@ def init_application():
     LOG.debug("Configuration:")
     CONF.log_opt_values(LOG, log.DEBUG)
 
-    return app.load_app()
+    application = app.load_app()
+    app.warm_up()
+    return application
@@ -0,0 +1,208 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Writers of the container action events."""
+
+import threading
+
+from oslo_log import log as logging
+
+from zun.common import context as zun_context
+import zun.conf
+from zun import objects
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+_writer = None
+
+
+class EventWriter(object):
+    """Write the container action events to the database right away."""
+
+    def event_start(self, context, container_uuid, event_name):
+        objects.ContainerActionEvent.event_start(
+            context, container_uuid, event_name, want_result=False)
+
+    def event_finish(self, context, container_uuid, event_name,
+                     exc_val=None, exc_tb=None):
+        objects.ContainerActionEvent.event_finish(
+            context, container_uuid, event_name, exc_val=exc_val,
+            exc_tb=exc_tb, want_result=False)
+
+    def action_finish(self, context, container_uuid, action_name,
+                      exc_val=None, exc_tb=None):
+        objects.ContainerAction.action_finish(
+            context, container_uuid, action_name, exc_val=exc_val,
+            exc_tb=exc_tb, want_result=False)
+
+
+class BufferedEventWriter(EventWriter):
+    """Queue the container action events and write them in batches.
+
+    The start and the finish of an event queued in the same batch are
+    merged into a single record. The queue is written every
+    ``flush_interval`` seconds, or as soon as it holds ``flush_size``
+    records, by a background thread. The events of a context without a
+    project, e.g. the recovery of the containers when zun-compute starts,
+    and the events received once the writer is stopped are written right
+    away.
+    """
+
+    def __init__(self, flush_interval, flush_size):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._events = []
+        self._started_events = {}
+        self._actions = []
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and write the queued records."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _queue(self, records, values, key=None):
+        with self._lock:
+            if not self._running:
+                return False
+            records.append(values)
+            if key is not None:
+                self._started_events[key] = values
+            if len(self._events) + len(self._actions) >= self.flush_size:
+                self._wakeup.set()
+        return True
+
+    def event_start(self, context, container_uuid, event_name):
+        if not context.project_id:
+            return super(BufferedEventWriter, self).event_start(
+                context, container_uuid, event_name)
+        values = objects.ContainerActionEvent.pack_action_event_start(
+            context, container_uuid, event_name)
+        key = (container_uuid, context.request_id, event_name)
+        if not self._queue(self._events, values, key):
+            super(BufferedEventWriter, self).event_start(
+                context, container_uuid, event_name)
+
+    def event_finish(self, context, container_uuid, event_name,
+                     exc_val=None, exc_tb=None):
+        if not context.project_id:
+            return super(BufferedEventWriter, self).event_finish(
+                context, container_uuid, event_name, exc_val=exc_val,
+                exc_tb=exc_tb)
+        values = objects.ContainerActionEvent.pack_action_event_finish(
+            context, container_uuid, event_name, exc_val=exc_val,
+            exc_tb=exc_tb)
+        key = (container_uuid, context.request_id, event_name)
+        with self._lock:
+            started = self._started_events.pop(key, None)
+            if started is not None:
+                # The start is not written yet, write a single record.
+                started.update(values)
+                return
+        if not self._queue(self._events, values):
+            super(BufferedEventWriter, self).event_finish(
+                context, container_uuid, event_name, exc_val=exc_val,
+                exc_tb=exc_tb)
+
+    def action_finish(self, context, container_uuid, action_name,
+                      exc_val=None, exc_tb=None):
+        if not context.project_id:
+            return super(BufferedEventWriter, self).action_finish(
+                context, container_uuid, action_name, exc_val=exc_val,
+                exc_tb=exc_tb)
+        values = objects.ContainerAction.pack_action_finish(
+            context, container_uuid, action_name, exc_val=exc_val,
+            exc_tb=exc_tb)
+        if not self._queue(self._actions, values):
+            super(BufferedEventWriter, self).action_finish(
+                context, container_uuid, action_name, exc_val=exc_val,
+                exc_tb=exc_tb)
+
+    def flush(self):
+        """Write the queued records in a single batch."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                actions, self._actions = self._actions, []
+                self._started_events = {}
+            if not events and not actions:
+                return
+            try:
+                dropped = objects.ContainerActionEvent.record_batch(
+                    zun_context.get_admin_context(), events, actions)
+            except Exception:
+                LOG.exception('Failed to write %(events)d container action '
+                              'events and %(actions)d finished actions.',
+                              {'events': len(events),
+                               'actions': len(actions)})
+                return
+            for values in dropped:
+                LOG.warning('Container action of request %(request_id)s '
+                            'not found for container %(container_uuid)s, '
+                            'drop the record %(values)s.',
+                            {'request_id': values['request_id'],
+                             'container_uuid': values['container_uuid'],
+                             'values': values})
+
+
+def get_writer():
+    """Return the writer of the container action events of the process."""
+    global _writer
+    if _writer is None:
+        _writer = EventWriter()
+    return _writer
+
+
+def start_buffered_writer():
+    """Buffer the container action events if configured to."""
+    global _writer
+    if not CONF.compute.action_events_flush_interval:
+        return
+    if not isinstance(_writer, BufferedEventWriter):
+        _writer = BufferedEventWriter(
+            CONF.compute.action_events_flush_interval,
+            CONF.compute.action_events_flush_size)
+    _writer.start()
+
+
+def stop_buffered_writer():
+    """Write the buffered container action events and stop buffering."""
+    global _writer
+    if isinstance(_writer, BufferedEventWriter):
+        _writer.stop()
+        _writer = EventWriter()
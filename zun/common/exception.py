@@ -567,6 +567,10 @@ class ClassNotFound(NotFound):
     message = _("Class %(class_name)s could not be found: %(exception)s")
 
 
+class CachedImageNotFound(NotFound):
+    message = _("Image %(repo)s:%(tag)s of driver %(driver)s is not cached.")
+
+
 class ApiVersionsIntersect(ZunException):
     message = _("Version of %(name)s %(min_ver)s %(max_ver)s intersects "
                 "with another versions.")
@@ -588,6 +592,10 @@ class InvalidWebsocketToken(ZunException):
     message = _("Websocket token is invalid")
 
 
+class StreamInstanceNotFound(NotFound):
+    message = _("Stream instance with token %(token)s could not be found.")
+
+
 class ResourcesUnavailable(ZunException):
     message = _("Insufficient compute resources: %(reason)s.")
 
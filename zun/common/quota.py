@@ -126,9 +126,8 @@ class DbQuotaDriver(object):
                                                                  project_id)
         project_usages = {}
         if usages:
-            for resource in resources.values():
-                project_usages[resource.name] = resource.count(context,
-                                                               project_id)
+            project_usages = _count_resources(context, resources.values(),
+                                              project_id)
         return self._process_quotas(context, resources, project_id,
                                     project_quotas, quota_class,
                                     defaults=defaults, usages=project_usages)
@@ -391,7 +390,7 @@ class CountableResource(BaseResource):
     project ID.
     """
 
-    def __init__(self, name, count, flag=None):
+    def __init__(self, name, count=None, flag=None, count_as_dict=None):
         """Initalizes a CountableResource.
 
         Countable resources are those resources which directly
@@ -407,6 +406,11 @@ class CountableResource(BaseResource):
         Quota.count_(). It should return an integer specifying the
         count scoped to a project.
 
+        The resources counted by the same query can instead share a
+        count_as_dict function, which returns the counts of all of them
+        as a dict keyed by resource name, so that counting them together
+        runs the query once.
+
         Note that this counting is not performed a transaction-safe
         manner.
 
@@ -417,11 +421,17 @@ class CountableResource(BaseResource):
         :param flag: The name of the flag or configuration option
                      which specfies the default value of the quota
                      for this resource.
+        :param count_as_dict: A callable which returns the counts of
+                              this resource and of the resources sharing
+                              it, as a dict keyed by resource name.
         """
         super(CountableResource, self).__init__(name, flag=flag)
         self._count = count
+        self.count_as_dict = count_as_dict
 
     def count(self, context, project_id):
+        if self.count_as_dict is not None:
+            return self.count_as_dict(context, project_id)[self.name]
         return self._count(context, project_id)
 
 
@@ -523,6 +533,27 @@ class QuotaEngine(object):
 
         return res.count(context, project_id)
 
+    def count_as_dict(self, context, resources, project_id):
+        """Count several resources at once.
+
+        The resources sharing a count_as_dict function are counted by a
+        single call to it.
+
+        :param context: The request context, for access check.
+        :param resources: The names of the resources, as strings.
+        :param project_id: The ID of the project to count the resources of.
+        :returns: A dict of the counts keyed by resource name.
+        """
+
+        unknown = [name for name in resources
+                   if not hasattr(self._resources.get(name), 'count')]
+        if unknown:
+            raise exception.QuotaResourceUnknown(unknown=unknown)
+
+        return _count_resources(
+            context, [self._resources[name] for name in resources],
+            project_id)
+
     def limit_check(self, context, project_id=None, **values):
         """Check simple quota limits.
 
@@ -565,31 +596,39 @@ class QuotaEngine(object):
         return sorted(self._resources.keys())
 
 
-def _containers_count(context, project_id):
-    return objects.Container.get_count(context, project_id, flag='containers')
-
-
-def _cpu_count(context, project_id):
-    return round(objects.Container.get_count(
-        context, project_id, flag='cpu'), 3)
-
-
-def _disk_count(context, project_id):
-    return objects.Container.get_count(context, project_id, flag='disk')
+def _count_resources(context, resources, project_id):
+    """Count the resources, once per count_as_dict function."""
+    counts = {}
+    usages = {}
+    for resource in resources:
+        count_as_dict = getattr(resource, 'count_as_dict', None)
+        if count_as_dict is None:
+            counts[resource.name] = resource.count(context, project_id)
+            continue
+        if count_as_dict not in usages:
+            usages[count_as_dict] = count_as_dict(context, project_id)
+        counts[resource.name] = usages[count_as_dict][resource.name]
+    return counts
 
 
-def _memory_count(context, project_id):
-    return objects.Container.get_count(context, project_id, flag='memory')
+def _containers_usages(context, project_id):
+    usages = objects.Container.get_usages(context, project_id)
+    usages['cpu'] = round(usages['cpu'], 3)
+    return usages
 
 
 QUOTAS = QuotaEngine()
 
 
 resources = [
-    CountableResource('containers', _containers_count, flag='containers'),
-    CountableResource('memory', _memory_count, flag='memory'),
-    CountableResource('disk', _disk_count, flag='disk'),
-    CountableResource('cpu', _cpu_count, flag='cpu')
+    CountableResource('containers', flag='containers',
+                      count_as_dict=_containers_usages),
+    CountableResource('memory', flag='memory',
+                      count_as_dict=_containers_usages),
+    CountableResource('disk', flag='disk',
+                      count_as_dict=_containers_usages),
+    CountableResource('cpu', flag='cpu',
+                      count_as_dict=_containers_usages)
 ]
 
 
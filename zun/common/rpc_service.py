@@ -61,9 +61,16 @@ class Service(service.Service):
     def start(self):
         servicegroup.setup(CONF, self.binary, self.tg)
         for endpoint in self.endpoints:
+            if hasattr(endpoint, 'start_action_event_writer'):
+                endpoint.start_action_event_writer()
+            if hasattr(endpoint, 'start_port_pool'):
+                endpoint.start_port_pool()
             if hasattr(endpoint, 'init_containers'):
                 endpoint.init_containers(
                     context.get_admin_context(all_projects=True))
+            if hasattr(endpoint, 'start_event_watcher'):
+                endpoint.start_event_watcher(
+                    context.get_admin_context(all_projects=True))
             self.tg.add_dynamic_timer(
                 endpoint.run_periodic_tasks,
                 periodic_interval_max=CONF.periodic_interval_max,
@@ -75,6 +82,13 @@ class Service(service.Service):
         if self._server:
             self._server.stop()
             self._server.wait()
+        for endpoint in self.endpoints:
+            if hasattr(endpoint, 'stop_event_watcher'):
+                endpoint.stop_event_watcher()
+            if hasattr(endpoint, 'stop_action_event_writer'):
+                endpoint.stop_action_event_writer()
+            if hasattr(endpoint, 'stop_port_pool'):
+                endpoint.stop_port_pool()
         super(Service, self).stop()
 
     @classmethod
@@ -95,13 +109,13 @@ class API(object):
                                       serializer=serializer,
                                       timeout=timeout)
 
-    def _call(self, server, method, *args, **kwargs):
+    def _call(self, context, server, method, *args, **kwargs):
         cctxt = self._client.prepare(server=server)
-        return cctxt.call(self._context, method, *args, **kwargs)
+        return cctxt.call(context, method, *args, **kwargs)
 
-    def _cast(self, server, method, *args, **kwargs):
+    def _cast(self, context, server, method, *args, **kwargs):
         cctxt = self._client.prepare(server=server)
-        return cctxt.cast(self._context, method, *args, **kwargs)
+        return cctxt.cast(context, method, *args, **kwargs)
 
     def echo(self, message):
-        self._cast('echo', message=message)
+        self._cast(self._context, 'echo', message=message)
@@ -72,6 +72,8 @@ class WSGIService(service.ServiceBase):
 
         :returns: None
         """
+        # The workers are forked by now, each one builds its own.
+        app.warm_up()
         self.server.start()
 
     def stop(self):
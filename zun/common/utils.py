@@ -35,6 +35,7 @@ from oslo_utils import strutils
 import pecan
 
 from zun.api import utils as api_utils
+from zun.common import action_events
 from zun.common import clients
 from zun.common import consts
 from zun.common.docker_image import reference as docker_image
@@ -43,7 +44,6 @@ from zun.common.i18n import _
 from zun.common import privileged
 import zun.conf
 from zun.network import neutron
-from zun import objects
 
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
@@ -573,17 +573,17 @@ class EventReporter(object):
         self.container_uuids = container_uuids
 
     def __enter__(self):
+        writer = action_events.get_writer()
         for uuid in self.container_uuids:
-            objects.ContainerActionEvent.event_start(
-                self.context, uuid, self.event_name, want_result=False)
+            writer.event_start(self.context, uuid, self.event_name)
 
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        writer = action_events.get_writer()
         for uuid in self.container_uuids:
-            objects.ContainerActionEvent.event_finish(
-                self.context, uuid, self.event_name, exc_val=exc_val,
-                exc_tb=exc_tb, want_result=False)
+            writer.event_finish(self.context, uuid, self.event_name,
+                                exc_val=exc_val, exc_tb=exc_tb)
         return False
 
 
@@ -599,10 +599,10 @@ class FinishAction(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        writer = action_events.get_writer()
         for uuid in self.container_uuids:
-            objects.ContainerAction.action_finish(
-                self.context, uuid, self.action_name, exc_val=exc_val,
-                exc_tb=exc_tb, want_result=False)
+            writer.action_finish(self.context, uuid, self.action_name,
+                                 exc_val=exc_val, exc_tb=exc_tb)
         return False
 
 
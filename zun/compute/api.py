@@ -13,15 +13,20 @@
 """Handles all requests relating to compute resources (e.g. containers,
 networking and storage of containers, and compute hosts on which they run)."""
 
+import copy
+import os
+
 from oslo_log import log as logging
 
 from zun.common import consts
 from zun.common import exception
 from zun.common.i18n import _
 from zun.common import profiler
+from zun.common import utils
 from zun.compute import container_actions
 from zun.compute import rpcapi
 import zun.conf
+from zun.image import cache as image_cache
 from zun import objects
 from zun.scheduler.client import query as scheduler_client
 
@@ -29,12 +34,15 @@ from zun.scheduler.client import query as scheduler_client
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 
+_api = None
+_api_pid = None
+
 
 @profiler.trace_cls("rpc")
 class API(object):
     """API for interacting with the compute manager."""
 
-    def __init__(self, context):
+    def __init__(self, context=None):
         self.rpcapi = rpcapi.API(context=context)
         self.scheduler_client = scheduler_client.SchedulerClient()
         super(API, self).__init__()
@@ -48,7 +56,7 @@ class API(object):
                          pci_requests=None):
         requested_host = extra_spec.get('requested_host')
         if requested_host:
-            self._validate_host(context, new_container, requested_host,
+            self._validate_host(context, [new_container], requested_host,
                                 requested_volumes)
 
         try:
@@ -66,15 +74,85 @@ class API(object):
             new_container.save(context)
             raise
 
+        self._validate_image(context, new_container, host_state['host'])
+
+        self._record_action_start(context, new_container,
+                                  container_actions.CREATE)
+        self.rpcapi.container_create(context, host_state['host'],
+                                     new_container, host_state['limits'],
+                                     requested_networks, requested_volumes,
+                                     run, pci_requests)
+
+    def containers_create(self, context, new_containers, extra_spec,
+                          requested_networks, requested_volumes, run,
+                          pci_requests=None):
+        """Create a batch of identical containers.
+
+        The containers are scheduled at once, which asks placement for the
+        allocation candidates a single time, then the creation of each
+        container is cast to its selected host.
+        """
+        requested_host = extra_spec.get('requested_host')
+        if requested_host:
+            self._validate_host(context, new_containers, requested_host,
+                                requested_volumes)
+
+        try:
+            host_states = self._schedule_containers(context, new_containers,
+                                                    extra_spec)
+        except Exception as e:
+            for new_container in new_containers:
+                new_container.status = consts.ERROR
+                if isinstance(e, exception.NoValidHost):
+                    new_container.status_reason = _(
+                        "There are not enough hosts available.")
+                else:
+                    new_container.status_reason = _(
+                        "Unexpected exception occurred.")
+                new_container.save(context)
+            if isinstance(e, exception.NoValidHost):
+                return
+            raise
+
+        # The containers share the same image, check it once.
+        self._validate_image(context, new_containers[0],
+                             host_states[0]['host'])
+
+        for new_container, host_state in zip(new_containers, host_states):
+            self._record_action_start(context, new_container,
+                                      container_actions.CREATE)
+            self.rpcapi.container_create(
+                context, host_state['host'], new_container,
+                host_state['limits'], copy.deepcopy(requested_networks),
+                requested_volumes, run, pci_requests)
+
+    def _validate_image(self, context, new_container, host):
         # NOTE(mkrai): Intent here is to check the existence of image
         # before proceeding to create container. If image is not found,
         # container create will fail with 400 status.
         if CONF.api.enable_image_validation:
             try:
-                images = self.rpcapi.image_search(
-                    context, new_container.image,
-                    new_container.image_driver, True, new_container.registry,
-                    host_state['host'])
+                repo, tag = utils.parse_image_name(
+                    new_container.image, new_container.image_driver,
+                    registry=new_container.registry)
+                found = image_cache.lookup(context,
+                                           new_container.image_driver,
+                                           repo, tag,
+                                           registry=new_container.registry)
+                if found:
+                    return
+                if found is None:
+                    images = self.rpcapi.image_search(
+                        context, new_container.image,
+                        new_container.image_driver, True,
+                        new_container.registry, host)
+                    if len(images) <= 1:
+                        image_cache.record(context,
+                                           new_container.image_driver,
+                                           repo, tag, bool(images),
+                                           registry=new_container.registry)
+                else:
+                    images = []
                 if not images:
                     raise exception.ImageNotFound(image=new_container.image)
                 if len(images) > 1:
@@ -94,19 +172,13 @@ class API(object):
                 LOG.warning("Skip validation since image search failed with "
                             "unexpected exception: %s", str(e))
 
-        self._record_action_start(context, new_container,
-                                  container_actions.CREATE)
-        self.rpcapi.container_create(context, host_state['host'],
-                                     new_container, host_state['limits'],
-                                     requested_networks, requested_volumes,
-                                     run, pci_requests)
-
-    def _validate_host(self, context, container, host, requested_volumes):
+    def _validate_host(self, context, containers, host, requested_volumes):
         """Check whether compute nodes exist by validating the host.
         If host is supplied, we can lookup the ComputeNode in
         the API DB.
 
         :param context: The API request context.
+        :param containers: the containers requesting the host.
         :param host: Target host.
         :param requested_volumes: the requested volumes.
         :raises: exception.RequestedHostNotFound if we find no compute nodes
@@ -120,12 +192,13 @@ class API(object):
             except exception.ComputeNodeNotFound:
                 LOG.info('No compute node record found for host %(host)s.',
                          {'host': host})
-                container.destroy(context)
-                for volmap in requested_volumes[container.uuid]:
-                    try:
-                        volmap._destroy_volume(context)
-                    except exception.VolumeNotFound:
-                        pass
+                for container in containers:
+                    container.destroy(context)
+                    for volmap in requested_volumes[container.uuid]:
+                        try:
+                            volmap._destroy_volume(context)
+                        except exception.VolumeNotFound:
+                            pass
                 raise exception.RequestedHostNotFound(host=host)
 
     def _schedule_container(self, context, new_container, extra_spec):
@@ -134,6 +207,11 @@ class API(object):
                                                           extra_spec)
         return dests[0]
 
+    def _schedule_containers(self, context, new_containers, extra_spec):
+        return self.scheduler_client.select_destinations(context,
+                                                         new_containers,
+                                                         extra_spec)
+
     def container_delete(self, context, container, *args):
         self._record_action_start(context, container, container_actions.DELETE)
         return self.rpcapi.container_delete(context, container, *args)
@@ -172,6 +250,15 @@ class API(object):
         return self.rpcapi.container_logs(context, container, stdout, stderr,
                                           timestamps, tail, since)
 
+    def container_logs_stream(self, context, container, *args):
+        data = self.rpcapi.container_logs_stream(context, container, *args)
+        data['proxy_url'] = self._get_stream_url(container, data.pop('token'))
+        return data
+
+    def _get_stream_url(self, container, token):
+        return '%s?token=%s&uuid=%s&stream=1' % (
+            CONF.websocket_proxy.base_url, token, container.uuid)
+
     def container_exec(self, context, container, *args):
         data = self.rpcapi.container_exec(context, container, *args)
         token = data.pop('token', None)
@@ -221,6 +308,18 @@ class API(object):
     def container_put_archive(self, context, container, *args):
         return self.rpcapi.container_put_archive(context, container, *args)
 
+    def container_get_archive_stream(self, context, container, *args):
+        data = self.rpcapi.container_get_archive_stream(context, container,
+                                                        *args)
+        data['proxy_url'] = self._get_stream_url(container, data.pop('token'))
+        return data
+
+    def container_put_archive_stream(self, context, container, *args):
+        data = self.rpcapi.container_put_archive_stream(context, container,
+                                                        *args)
+        data['proxy_url'] = self._get_stream_url(container, data.pop('token'))
+        return data
+
     def container_stats(self, context, container):
         return self.rpcapi.container_stats(context, container)
 
@@ -256,3 +355,19 @@ class API(object):
 
     def resize_container(self, context, container, *args):
         return self.rpcapi.resize_container(context, container, *args)
+
+
+def get_api():
+    """Return the compute API shared by the requests of the process.
+
+    Building the API loads the scheduler driver with its filters and
+    weighers and creates the RPC and placement clients, so it is built once
+    per process and the context is passed to each of its calls. A forked
+    worker builds its own.
+    """
+    global _api, _api_pid
+    pid = os.getpid()
+    if _api is None or _api_pid != pid:
+        _api = API()
+        _api_pid = pid
+    return _api
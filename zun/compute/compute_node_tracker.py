@@ -12,9 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
-import copy
 import socket
+import time
 
 from oslo_log import log as logging
 import retrying
@@ -34,6 +33,11 @@ CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 COMPUTE_RESOURCE_SEMAPHORE = "compute_resources"
 
+# The usage of the node is computed by the tracker from the containers and
+# capsules it accounts for, the values reported by the driver are discarded
+# between two audits.
+TRACKED_USAGE_KEYS = ('cpu_used', 'mem_free', 'mem_used', 'running_containers')
+
 
 class ComputeNodeTracker(object):
     def __init__(self, host, container_driver, capsule_driver, reportclient):
@@ -42,7 +46,9 @@ class ComputeNodeTracker(object):
         self.capsule_driver = capsule_driver
         self.compute_node = None
         self.tracked_containers = {}
-        self.old_resources = collections.defaultdict(objects.ComputeNode)
+        # The primitives of the fields of the compute node as last saved.
+        self.saved_resources = {}
+        self.last_audit = None
         self.scheduler_client = scheduler_client.SchedulerClient()
         self.pci_tracker = None
         self.reportclient = reportclient
@@ -59,15 +65,24 @@ class ComputeNodeTracker(object):
             compute_node.pci_device_pools = dev_pools_obj
 
     def update_available_resources(self, context):
+        audit = self._audit_due()
         # TODO(hongbin): get available resources from capsule_driver
         # and aggregates resources
-        resources = self.container_driver.get_available_resources()
-        # We allow 'cpu_used' to be missing from the container driver,
-        # but the DB requires it to be non-null so just initialize it to 0.
-        resources.setdefault('cpu_used', 0)
+        if audit or not self.compute_node:
+            resources = self.container_driver.get_available_resources()
+            # We allow 'cpu_used' to be missing from the container driver,
+            # but the DB requires it to be non-null so just initialize it
+            # to 0.
+            resources.setdefault('cpu_used', 0)
+        else:
+            # Only probe the host for what changes with its containers, the
+            # rest is read again at the next audit.
+            resources = self.container_driver.get_host_usage()
+            for key in TRACKED_USAGE_KEYS:
+                resources.pop(key, None)
 
         # Check if the compute_node is already registered
-        node = self._get_compute_node(context)
+        node = self.compute_node or self._get_compute_node(context)
         if not node:
             # If not, register it and pass the object to the driver
             node = objects.ComputeNode(context)
@@ -80,7 +95,7 @@ class ComputeNodeTracker(object):
         node.rp_uuid = self._get_node_rp_uuid(context, node)
         self._setup_pci_tracker(context, node)
         self.compute_node = node
-        self._update_available_resource(context)
+        self._update_available_resource(context, audit)
         # NOTE(sbiswas7): Consider removing the return statement if not needed
         return node
 
@@ -92,9 +107,21 @@ class ComputeNodeTracker(object):
                 "labels", "disk_total", "disk_quota_supported", "runtimes",
                 "enable_cpu_pinning"]
         for key in keys:
-            if key in resources:
+            if key not in resources:
+                continue
+            # Only flag the fields whose value changed, so that they are the
+            # only ones written to the database.
+            if (not node.obj_attr_is_set(key) or
+                    obj_base.obj_to_primitive(getattr(node, key)) !=
+                    obj_base.obj_to_primitive(resources[key])):
                 setattr(node, key, resources[key])
 
+    def _audit_due(self):
+        """Whether the usage of the node should be computed from scratch."""
+        interval = CONF.compute.resource_audit_interval
+        return (self.last_audit is None or not interval or
+                time.monotonic() - self.last_audit >= interval)
+
     def _get_compute_node(self, context):
         """Returns compute node for the host"""
         try:
@@ -156,7 +183,8 @@ class ComputeNodeTracker(object):
             return claims.NopClaim()
 
         # We should have the compute node created here, just get it.
-        self.compute_node = self._get_compute_node(context)
+        if not self.compute_node:
+            self.compute_node = self._get_compute_node(context)
 
         claim = claims.Claim(context, container, self, self.compute_node,
                              pci_requests, limits=limits)
@@ -196,7 +224,8 @@ class ComputeNodeTracker(object):
             return claims.NopClaim()
 
         # We should have the compute node created here, just get it.
-        self.compute_node = self._get_compute_node(context)
+        if not self.compute_node:
+            self.compute_node = self._get_compute_node(context)
 
         claim = claims.UpdateClaim(context, new_container, old_container,
                                    self, self.compute_node, limits=limits)
@@ -314,26 +343,43 @@ class ComputeNodeTracker(object):
                         numa_node.unpin_cpus(cpuset_cpus_usage)
                         cn._changed_fields.add('numa_topology')
 
-    def _update(self, context, compute_node):
-        if not self._resource_change(compute_node):
-            return
-        # Persist the stats to the Scheduler
-        self.scheduler_client.update_resource(compute_node)
+    def _update(self, context, compute_node, sync_placement=False):
+        """Persist the changes of the compute node.
+
+        :param sync_placement: whether to also synchronize the inventory and
+                               the traits of the node with placement. They do
+                               not depend on the usage of the node, so that
+                               the claims do not need to.
+        """
+        changes = self._resource_change(compute_node)
+        if changes:
+            # Persist the stats to the Scheduler
+            self.scheduler_client.update_resource(compute_node)
+            self.saved_resources.update(changes)
 
-        self._update_to_placement(context, compute_node)
+        if sync_placement:
+            self._update_to_placement(context, compute_node)
 
-        if self.pci_tracker:
+        if self.pci_tracker and (changes or sync_placement):
             self.pci_tracker.save()
 
     def _resource_change(self, compute_node):
-        """Check to see if any resources have changed."""
-        hostname = compute_node.hostname
-        old_compute = self.old_resources[hostname]
-        if not obj_base.obj_equal_prims(
-                compute_node, old_compute, ['updated_at']):
-            self.old_resources[hostname] = copy.deepcopy(compute_node)
-            return True
-        return False
+        """Return the primitives of the fields changed since the last save.
+
+        The fields set back to the value they were saved with are not
+        reported as changed, so that they are not written again.
+        """
+        changes = {}
+        unchanged = set()
+        for field in compute_node.obj_what_changed():
+            value = obj_base.obj_to_primitive(getattr(compute_node, field))
+            if field in self.saved_resources and \
+                    self.saved_resources[field] == value:
+                unchanged.add(field)
+            else:
+                changes[field] = value
+        compute_node.obj_reset_changes(unchanged)
+        return changes
 
     @retrying.retry(stop_max_attempt_number=4,
                     retry_on_exception=lambda e: isinstance(
@@ -434,26 +480,31 @@ class ComputeNodeTracker(object):
                       'host %s', self.host)
 
     @utils.synchronized(COMPUTE_RESOURCE_SEMAPHORE)
-    def _update_available_resource(self, context):
+    def _update_available_resource(self, context, audit=True):
 
         # if we could not init the compute node the tracker will be
         # disabled and we should quit now
         if self.disabled(self.host):
             return
 
-        # Grab all containers assigned to this node:
-        containers = objects.Container.list_by_host(context, self.host)
-        capsules = objects.Capsule.list_by_host(context, self.host)
+        # Between two audits, the usage is kept up to date by the claims and
+        # the removals of the containers.
+        if audit:
+            # Grab all containers assigned to this node:
+            containers = objects.Container.list_by_host(context, self.host)
+            capsules = objects.Capsule.list_by_host(context, self.host)
 
-        # Now calculate usage based on container utilization:
-        self._update_usage_from_containers(context, containers + capsules)
+            # Now calculate usage based on container utilization:
+            self._update_usage_from_containers(context,
+                                               containers + capsules)
+            self.last_audit = time.monotonic()
 
         # No migration for docker, is there will be orphan container? Nova has.
 
         cn = self.compute_node
 
         # update the compute_node
-        self._update(context, cn)
+        self._update(context, cn, sync_placement=True)
         LOG.debug('Compute_service record updated for %(host)s',
                   {'host': self.host})
 
@@ -496,14 +547,14 @@ class ComputeNodeTracker(object):
         """Remove usage from the given container."""
         self._update_usage_from_container_update(context, old_container,
                                                  new_container)
-        self._update(self.compute_node)
+        self._update(context, self.compute_node)
 
     @utils.synchronized(COMPUTE_RESOURCE_SEMAPHORE)
     def remove_usage_from_container(self, context, container,
                                     is_removed=True):
         """Just a wrapper of the private function to hold lock."""
 
-        # We need to get the latest compute node info
-        self.compute_node = self._get_compute_node(context)
+        if not self.compute_node:
+            self.compute_node = self._get_compute_node(context)
         self._update_usage_from_container(context, container, is_removed)
         self._update(context, self.compute_node)
@@ -23,6 +23,7 @@ from oslo_utils import excutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
+from zun.common import action_events
 from zun.common import consts
 from zun.common import context
 from zun.common import exception
@@ -37,6 +38,7 @@ import zun.conf
 from zun.container import driver as driver_module
 from zun.image.glance import driver as glance
 from zun.network import neutron
+from zun.network import port_pool
 from zun import objects
 from zun.scheduler.client import report
 
@@ -54,6 +56,7 @@ class Manager(periodic_task.PeriodicTasks):
         self.host = CONF.host
         self._resource_tracker = None
         self.reportclient = report.SchedulerReportClient()
+        self.sync_container_state_stats = {}
 
     def _get_driver(self, container):
         if (isinstance(container, objects.Capsule) or
@@ -93,6 +96,31 @@ class Manager(periodic_task.PeriodicTasks):
                                                container,
                                                current_status)
 
+    def start_event_watcher(self, context):
+        try:
+            self.driver.start_event_watcher(context, self)
+        except NotImplementedError:
+            LOG.debug('Container driver does not support watching container '
+                      'events, rely on the periodic sync only.')
+
+    def stop_event_watcher(self):
+        try:
+            self.driver.stop_event_watcher()
+        except NotImplementedError:
+            pass
+
+    def start_action_event_writer(self):
+        action_events.start_buffered_writer()
+
+    def stop_action_event_writer(self):
+        action_events.stop_buffered_writer()
+
+    def start_port_pool(self):
+        port_pool.start_pool()
+
+    def stop_port_pool(self):
+        port_pool.stop_pool()
+
     def _init_container(self, context, container):
         """Initialize this container during zun-compute init."""
 
@@ -822,6 +850,30 @@ class Manager(periodic_task.PeriodicTasks):
             LOG.exception("Unexpected exception: %s", str(e))
             raise
 
+    @translate_exception
+    def container_logs_stream(self, context, container, stdout, stderr,
+                              timestamps, tail, since, follow):
+        LOG.debug('Granting access to the logs stream of container: %s',
+                  container.uuid)
+        token = self._create_stream_instance(
+            context, container, 'logs', stdout=stdout, stderr=stderr,
+            timestamps=timestamps, tail=tail, since=since, follow=follow)
+        return {'token': token}
+
+    def _create_stream_instance(self, context, container, stream_type,
+                                **params):
+        # The data is relayed by the websocket proxy straight from the
+        # Docker daemon, so only the access token goes through the RPC.
+        # The token is saved with the stream, so that the websocket proxy
+        # can use it once and only for this container.
+        token = uuidutils.generate_uuid()
+        stream_instance = objects.StreamInstance(
+            context, container_id=container.id, token=token,
+            type=stream_type, url=CONF.docker.docker_remote_api_url,
+            params=params)
+        stream_instance.create(context)
+        return token
+
     @translate_exception
     def container_exec(self, context, container, command, run, interactive):
         LOG.debug('Executing command in container: %s', container.uuid)
@@ -1005,6 +1057,38 @@ class Manager(periodic_task.PeriodicTasks):
             LOG.exception("Unexpected exception: %s", str(e))
             raise
 
+    @translate_exception
+    def container_get_archive_stream(self, context, container, path):
+        LOG.debug('Granting access to the archive of path %(path)s in '
+                  'container: %(uuid)s',
+                  {'path': path, 'uuid': container.uuid})
+        try:
+            stat = self.driver.get_archive_stat(context, container, path)
+        except exception.DockerError as e:
+            LOG.error("Error occurred while calling Docker archive API: %s",
+                      str(e))
+            raise
+        token = self._create_stream_instance(context, container,
+                                             'get_archive', path=path)
+        return {'token': token, 'stat': stat}
+
+    @translate_exception
+    def container_put_archive_stream(self, context, container, path):
+        LOG.debug('Granting access to upload an archive to path %(path)s '
+                  'in container: %(uuid)s',
+                  {'path': path, 'uuid': container.uuid})
+        try:
+            # Docker requires the destination path to exist, so fail early
+            # instead of once the client started uploading.
+            self.driver.get_archive_stat(context, container, path)
+        except exception.DockerError as e:
+            LOG.error("Error occurred while calling Docker archive API: %s",
+                      str(e))
+            raise
+        token = self._create_stream_instance(context, container,
+                                             'put_archive', path=path)
+        return {'token': token}
+
     @translate_exception
     def container_stats(self, context, container):
         LOG.debug('Displaying stats of the container: %s', container.uuid)
@@ -1237,11 +1321,14 @@ class Manager(periodic_task.PeriodicTasks):
     def sync_container_state(self, ctx):
         LOG.debug('Start syncing container states.')
 
-        containers = objects.Container.list(ctx)
-        self.driver.update_containers_states(ctx, containers, self)
-        capsules = objects.Capsule.list(ctx)
+        start_time = time.monotonic()
         # TODO(hongbin): use capsule driver to update capsules status
-        self.driver.update_containers_states(ctx, capsules, self)
+        stats = self.driver.update_containers_states(ctx, self)
+        stats['duration'] = time.monotonic() - start_time
+        self.sync_container_state_stats = stats
+        LOG.debug('Synced container states: read %(rows_read)d rows, '
+                  'wrote %(rows_written)d rows in %(duration).3f seconds.',
+                  stats)
 
     def network_detach(self, context, container, network):
         @utils.synchronized(container.uuid)
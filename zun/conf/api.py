@@ -37,12 +37,49 @@ api_service_opts = [
                default=1000,
                help='The maximum number of items returned in a single '
                     'response from a collection resource.'),
+    cfg.IntOpt('max_container_count',
+               default=1000,
+               min=1,
+               help='The maximum number of containers created by a single '
+                    'request.'),
     cfg.StrOpt('api_paste_config',
                default="api-paste.ini",
                help="Configuration file for WSGI definition of API."),
     cfg.BoolOpt('enable_image_validation',
                 default=False,
-                help="Enable image validation.")
+                help="Enable image validation."),
+    cfg.IntOpt('image_validation_cache_ttl',
+               default=3600,
+               min=0,
+               help="""
+Number of seconds an image found by an image driver is considered to exist
+by the image validation.
+
+The images found by the image validation and the images pulled by the
+compute hosts are recorded in the database, so the validation of the
+containers using them does not need to search the image from a compute
+host until the record expires. Set it to 0 to search the image for every
+container.
+
+Related options:
+
+* enable_image_validation
+"""),
+    cfg.IntOpt('image_validation_negative_cache_ttl',
+               default=60,
+               min=0,
+               help="""
+Number of seconds an image not found by an image driver is considered not to
+exist by the image validation.
+
+The creation of a container using it is rejected without searching the image
+until the record expires. Set it to 0 to search the image for every
+container.
+
+Related options:
+
+* enable_image_validation
+"""),
 ]
 
 
@@ -57,6 +57,35 @@ Possible values:
         'host_shared_with_nova',
         default=False,
         help='Whether this compute node is shared with nova'),
+    cfg.FloatOpt(
+        'action_events_flush_interval',
+        default=0,
+        min=0,
+        help="""
+Interval in seconds between the writes of the buffered container action
+events.
+By default, zun-compute writes the start and the finish of each event of a
+container action to the database while handling the request. If set, the
+events are queued instead, the start and the finish of an event are merged
+into a single record and the queue is written in a batch at this interval,
+so that the latency of the database is off the critical path of the
+container operations. The events of an action are visible in the API once
+written.
+Possible values:
+* 0 to write the events synchronously, or a positive number of seconds.
+Related options:
+* ``action_events_flush_size``
+"""),
+    cfg.IntOpt(
+        'action_events_flush_size',
+        default=100,
+        min=1,
+        help="""
+Number of buffered container action events which triggers a write before
+the end of the interval.
+Related options:
+* ``action_events_flush_interval``
+"""),
 ]
 
 service_opts = [
@@ -125,6 +154,21 @@ this option is used to reserve random pCPU(s) for the host.
 Possible values:
 * Any positive integer representing number of physical CPUs to reserve
   for the host.
+"""),
+    cfg.IntOpt('resource_audit_interval',
+               default=600,
+               min=0,
+               help="""
+Interval in seconds between the audits of the resources of the compute node.
+An audit probes the host for all its resources, including its NUMA topology
+and its disk, and computes the usage of the node from scratch from the
+containers and capsules assigned to it in the database. In between, the
+periodic update of the node only probes the host for its memory and its
+containers, and the usage of the node is kept up to date as the resources
+of the containers are claimed and released.
+Possible values:
+* 0 to audit the resources at every periodic update of the node, or a
+  positive number of seconds.
 """),
 ]
 
@@ -65,6 +65,41 @@ docker_opts = [
                help='The username of the default registry.'),
     cfg.StrOpt('default_registry_password',
                help='The password of the default registry.'),
+    cfg.IntOpt('api_client_pool_size',
+               default=10,
+               min=0,
+               help='Maximum number of docker API clients shared by the '
+                    'process. The clients keep their connection to the '
+                    'docker daemon alive between the calls. If all the '
+                    'clients are in use, the callers wait for a client to '
+                    'be released, up to api_client_pool_timeout seconds. '
+                    'Set it to 0 to create a new client for every call.'),
+    cfg.FloatOpt('api_client_pool_timeout',
+                 default=5,
+                 min=0,
+                 help='Number of seconds to wait for a pooled docker API '
+                      'client when all of them are in use. Once elapsed, '
+                      'the call uses a dedicated client instead, so that '
+                      'long calls holding the pooled clients don\'t block '
+                      'the other calls.'),
+    cfg.IntOpt('api_client_health_check_interval',
+               default=60,
+               min=0,
+               help='Interval in seconds after which an idle pooled docker '
+                    'API client is pinged before being reused. A client '
+                    'that fails the check is replaced by a new one.'),
+    cfg.BoolOpt('enable_event_watcher',
+                default=True,
+                help='If set, zun-compute subscribes to the event stream '
+                     'of the docker daemon and updates the container states '
+                     'as soon as they change. The periodic sync of the '
+                     'container states is still run to reconcile the '
+                     'events missed by the watcher.'),
+    cfg.IntOpt('event_watcher_retry_interval',
+               default=5,
+               min=1,
+               help='Interval in seconds to wait before reconnecting to '
+                    'the event stream of the docker daemon.'),
 ]
 
 ALL_OPTS = (docker_opts)
@@ -24,6 +24,42 @@ network_opts = [
                default='kuryr',
                help=('The network plugin driver name, you can find it by'
                      ' docker plugin list.')),
+    cfg.IntOpt('port_pool_min_size',
+               default=0,
+               min=0,
+               help="""
+Number of unbound Neutron ports kept ready by zun-compute for each network,
+project and set of security groups the containers of the host were created
+with.
+By default, a Neutron port is created while creating each container. If set,
+the containers requesting a network without a port or a fixed IP take a port
+of the pool instead, which only needs the binding of the port to be updated.
+The pool is replenished in the background, and the ports of the deleted
+containers go back to the pool.
+Possible values:
+* 0 to disable the pool, or a positive number of ports.
+Related options:
+* ``port_pool_max_size``
+* ``port_pool_refill_interval``
+"""),
+    cfg.IntOpt('port_pool_max_size',
+               default=10,
+               min=1,
+               help="""
+Maximum number of unbound Neutron ports kept by zun-compute for each network,
+project and set of security groups. The ports of the deleted containers are
+deleted rather than returned to a full pool.
+Related options:
+* ``port_pool_min_size``
+"""),
+    cfg.FloatOpt('port_pool_refill_interval',
+                 default=5,
+                 min=0.1,
+                 help="""
+Interval in seconds between the checks of the Neutron port pool, which
+create the ports missing to reach ``port_pool_min_size``. A port taken from
+the pool also triggers a check.
+"""),
 ]
 
 ALL_OPTS = (network_opts)
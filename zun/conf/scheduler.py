@@ -89,6 +89,128 @@ Related options:
 * All of the filters in this option *must* be present in the
   'scheduler_available_filters' option, or a SchedulerHostFilterNotFound
   exception will be raised.
+"""),
+    cfg.MultiStrOpt("weight_classes",
+                    default=["zun.scheduler.weights.all_weighers"],
+                    help="""
+Weighers that the scheduler will use.
+
+Only hosts which pass the filters are weighed. The weight for any host starts
+at 0, and the weighers order these hosts by adding to or subtracting from the
+weight assigned by the previous weigher. Weights may become negative. A
+container is placed on the host with the highest weight that can be claimed
+in placement.
+
+By default, this is set to all weighers that are included with Zun.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect.
+
+Possible values:
+
+* A list of zero or more strings, where each string corresponds to the name of
+  a weigher that will be used for selecting a host
+"""),
+    cfg.FloatOpt("ram_weight_multiplier",
+                 default=1.0,
+                 help="""
+RAM weight multiplier ratio.
+
+This option determines how hosts with more or less available RAM are weighed.
+A positive value will result in the scheduler preferring hosts with more
+available RAM, and a negative number will result in the scheduler preferring
+hosts with less available RAM. Another way to look at it is that positive
+values for this option will tend to spread containers across many hosts,
+while negative values will tend to fill up (stack) hosts as much as possible
+before scheduling to a less-used host. The absolute value, whether positive
+or negative, controls how strong the RAM weigher is relative to other
+weighers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'RAMWeigher' weigher is enabled.
+
+Possible values:
+
+* An integer or float value, where the value corresponds to the multiplier
+  ratio for this weigher.
+"""),
+    cfg.FloatOpt("cpu_weight_multiplier",
+                 default=1.0,
+                 help="""
+CPU weight multiplier ratio.
+
+Multiplier used for weighting free vCPUs. A positive value will result in the
+scheduler preferring hosts with more free vCPUs, spreading the containers,
+and a negative number will result in the scheduler preferring hosts with less
+free vCPUs, stacking the containers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'CPUWeigher' weigher is enabled.
+
+Possible values:
+
+* An integer or float value, where the value corresponds to the multiplier
+  ratio for this weigher.
+"""),
+    cfg.FloatOpt("disk_weight_multiplier",
+                 default=1.0,
+                 help="""
+Disk weight multiplier ratio.
+
+Multiplier used for weighing free disk space. A positive value will result in
+the scheduler preferring hosts with more free disk space, spreading the
+containers, and a negative number will result in the scheduler preferring
+hosts with less free disk space, stacking the containers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'DiskWeigher' weigher is enabled.
+
+Possible values:
+
+* An integer or float value, where the value corresponds to the multiplier
+  ratio for this weigher.
+"""),
+    cfg.FloatOpt("num_containers_weight_multiplier",
+                 default=-1.0,
+                 help="""
+Number of containers weight multiplier ratio.
+
+Multiplier used for weighing the number of containers of the hosts. A
+negative value will result in the scheduler preferring hosts with fewer
+containers, spreading the containers, and a positive number will result in
+the scheduler preferring hosts with more containers, stacking the containers.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'NumContainersWeigher' weigher is enabled.
+
+Possible values:
+
+* An integer or float value, where the value corresponds to the multiplier
+  ratio for this weigher.
+"""),
+    cfg.FloatOpt("numa_weight_multiplier",
+                 default=1.0,
+                 help="""
+NUMA weight multiplier ratio.
+
+Multiplier used for weighing how the free dedicated CPUs of the hosts are
+spread across their NUMA nodes when scheduling a container with a dedicated
+CPU policy. A positive value will result in the scheduler preferring hosts
+whose free CPUs are gathered on fewer NUMA nodes, which keeps room for larger
+dedicated containers, and a negative value will have the opposite effect.
+
+This option is only used by the FilterScheduler and its subclasses; if you use
+a different scheduler, this option has no effect. Also note that this setting
+only affects scheduling if the 'NUMAWeigher' weigher is enabled.
+
+Possible values:
+
+* An integer or float value, where the value corresponds to the multiplier
+  ratio for this weigher.
 """),
     cfg.IntOpt("max_placement_results",
                default=1000,
@@ -108,6 +230,24 @@ etc. of the scheduler.
 
 This option is only used by the FilterScheduler; if you use a different
 scheduler, this option has no effect.
+"""),
+    cfg.FloatOpt("allocation_candidates_cache_ttl",
+                 default=0,
+                 min=0,
+                 help="""
+Number of seconds the allocation candidates returned by the placement service
+are reused for the scheduling requests of the same shape.
+
+Requests asking for the same resources, traits and aggregates within this
+period reuse the candidates of the first one instead of querying placement
+again, and identical requests made at the same time share a single query.
+The cached candidates are dropped as soon as claiming the resources of a
+container fails. Set it to 0 to query placement for every request.
+
+Possible values:
+
+* 0 to disable the cache, or a positive number of seconds. A few seconds is
+  enough to absorb the bursts of identical requests.
 """),
 ]
 
@@ -86,6 +86,68 @@ Possible values:
     cfg.StrOpt('key',
                default='',
                help="SSL key file (if separate from cert)."),
+    cfg.IntOpt('stream_token_ttl',
+               default=60,
+               min=1,
+               help="""
+The number of seconds a token granting access to a data stream, such as the
+logs of a container, remains valid. The client has to connect to the
+``zun-wsproxy`` service with the token before it expires. A token can be used
+for a single connection.
+"""),
+    cfg.IntOpt('stream_chunk_size',
+               default=65536,
+               min=1024,
+               help="""
+The maximum number of bytes sent to the client in a single websocket frame
+when relaying a data stream. The next chunk is read from the source only once
+the previous one has been sent, which bounds the memory used per connection.
+"""),
+    cfg.IntOpt('buffer_high_watermark',
+               default=1048576,
+               min=1024,
+               help="""
+The maximum number of bytes buffered by the ``zun-wsproxy`` service for each
+direction of an ``attach`` or ``exec`` connection. Once the data received
+from one side and not yet sent to the other side reaches this size, the
+proxy stops reading from the sending side until the buffer drains to
+``buffer_low_watermark``, so a slow client or container throttles its peer
+instead of growing the memory of the proxy.
+
+Related options:
+
+* buffer_low_watermark
+"""),
+    cfg.IntOpt('buffer_low_watermark',
+               default=262144,
+               min=0,
+               help="""
+The number of bytes a full buffer of an ``attach`` or ``exec`` connection
+has to drain to before the ``zun-wsproxy`` service resumes reading from the
+side sending the data. It should be lower than ``buffer_high_watermark``.
+
+Related options:
+
+* buffer_high_watermark
+"""),
+    cfg.IntOpt('metrics_interval',
+               default=60,
+               min=0,
+               help="""
+The number of seconds between two logs of the metrics of the ``attach`` and
+``exec`` connections relayed by the ``zun-wsproxy`` service: the number of
+active and total connections, the bytes sent to the clients and to the
+containers, and the mean and maximum time the data stayed buffered in the
+proxy. 0 disables the logs.
+"""),
+    cfg.IntOpt('max_archive_size',
+               default=0,
+               min=0,
+               help="""
+The maximum number of bytes of a tar archive streamed from or to a container
+through the ``zun-wsproxy`` service. The transfer is aborted once the limit
+is exceeded. 0 means unlimited.
+"""),
 ]
 
 ALL_OPTS = (wsproxy_opts)
@@ -11,6 +11,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import datetime
 import errno
 import eventlet
@@ -20,6 +21,7 @@ import types
 from docker import errors
 from neutronclient.common import exceptions as n_exc
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import psutil
@@ -28,10 +30,12 @@ import tenacity
 from zun.common import consts
 from zun.common import exception
 from zun.common.i18n import _
+from zun.common import singleflight
 from zun.common import utils
 from zun.common.utils import check_container_id
 from zun.compute import container_actions
 import zun.conf
+from zun.container.docker import events
 from zun.container.docker import host
 from zun.container.docker import utils as docker_utils
 from zun.container import driver
@@ -42,6 +46,10 @@ from zun import objects
 CONF = zun.conf.CONF
 LOG = logging.getLogger(__name__)
 ATTACH_FLAG = "/attach/ws?logs=0&stream=1&stdin=1&stdout=1&stderr=1"
+_IMAGE_PULLS = singleflight.SingleFlight()
+# The status_detail of a container is not synced: the summaries listed by
+# docker don't carry the times it is formatted from, show() fills it in.
+SYNCED_STATE_FIELDS = ('status', 'status_reason', 'addresses', 'host')
 
 
 def is_not_found(e):
@@ -112,6 +120,8 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
         super(DockerDriver, self).__init__()
         self._host = host.Host()
         self._get_host_storage_info()
+        self._state_fingerprints = {}
+        self._event_watcher = None
         self.image_drivers = {}
         for driver_name in CONF.image_driver_list:
             driver = img_driver.load_image_driver(driver_name)
@@ -126,7 +136,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
             host_info)
 
     def load_image(self, image_path=None):
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             if image_path:
                 with open(image_path, 'rb') as fd:
                     LOG.debug('Loading local image %s into docker', image_path)
@@ -178,6 +188,22 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
         if driver_name is None:
             driver_name = CONF.default_image_driver
 
+        # Concurrent pulls of the same image on this host are coalesced:
+        # the first caller pulls the image and the others share its result.
+        # The images found by the drivers other than docker (i.e. glance)
+        # depend on the project, so are only shared within a project.
+        project_id = None
+        if driver_name != 'docker':
+            project_id = context.project_id
+        key = (driver_name, repo, tag, registry.id if registry else None,
+               image_pull_policy, project_id)
+        image, image_loaded = _IMAGE_PULLS.do(
+            key, self._pull_image, context, repo, tag, image_pull_policy,
+            driver_name, registry)
+        return copy.deepcopy(image), image_loaded
+
+    def _pull_image(self, context, repo, tag, image_pull_policy, driver_name,
+                    registry):
         try:
             image_driver = self.image_drivers[driver_name]
             image, image_loaded = image_driver.pull_image(
@@ -191,6 +217,11 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                           'image: %s', str(e))
             raise exception.ZunException(str(e))
 
+        if not image_loaded:
+            # The image tarball is loaded once for all the callers sharing
+            # the pull.
+            self.load_image(image['path'])
+            image_loaded = True
         return image, image_loaded
 
     def search_image(self, context, repo, tag, driver_name, exact_match):
@@ -236,7 +267,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
         return img
 
     def read_tar_image(self, image):
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             LOG.debug('Reading local tar image %s ', image['path'])
             try:
                 docker.read_tar_image(image)
@@ -509,6 +540,9 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
         try:
             if (container.auto_heal and
                     container.status in rebuild_status):
+                # The context is shared with the next containers of the sync
+                # or events of the watcher, set the project of a copy.
+                context = context.elevated()
                 context.project_id = container.project_id
                 objects.ContainerAction.action_start(
                     context, container.uuid, container_actions.REBUILD,
@@ -535,45 +569,76 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
 
     def _get_local_containers(self, context, uuids):
         host_containers = objects.Container.list_by_host(context, CONF.host)
-        uuids = list(set(uuids) | set([c.uuid for c in host_containers]))
+        # Only fetch the records that match a local Docker container but
+        # are not assigned to this host (yet), the records of this host
+        # were already fetched above.
+        uuids = set(uuids) - set([c.uuid for c in host_containers])
+        if not uuids:
+            return host_containers
         containers = objects.Container.list(context,
-                                            filters={'uuid': uuids})
-        return containers
+                                            filters={'uuid': list(uuids)})
+        return host_containers + containers
 
-    def update_containers_states(self, context, containers, manager):
-        local_containers, non_existent_containers = self.list(context)
-        if not local_containers:
-            return
+    def _get_state_fingerprint(self, container):
+        return (container.status, container.status_reason,
+                jsonutils.dumps(container.addresses, sort_keys=True),
+                container.host)
 
-        id_to_local_container_map = {container.container_id: container
-                                     for container in local_containers
-                                     if container.container_id}
-        id_to_container_map = {container.container_id: container
-                               for container in containers
-                               if container.container_id}
-
-        for cid in (id_to_container_map.keys() &
-                    id_to_local_container_map.keys()):
-            container = id_to_container_map[cid]
-            # sync status
-            local_container = id_to_local_container_map[cid]
-            if container.status != local_container.status:
-                old_status = container.status
-                container.status = local_container.status
-                container.save(context)
-                LOG.info('Status of container %s changed from %s to %s',
-                         container.uuid, old_status, container.status)
-            # sync host
-            # Note(kiennt): Current host.
-            cur_host = CONF.host
-            if container.host != cur_host:
-                old_host = container.host
+    def update_containers_states(self, context, manager):
+        """Sync the DB records of the local containers with Docker.
+
+        Only the records of this host, plus the unassigned records matching
+        a local Docker container name, are read. The state fingerprint of
+        each record is compared with the one cached by the previous sync and
+        only the changed records are written back, in one batched update.
+
+        :returns: a dict with the number of rows read and written.
+        """
+        with docker_utils.docker_client() as docker:
+            docker_containers = docker.list_containers()
+        id_to_docker_container = {c['Id']: c for c in docker_containers}
+        uuids = self._get_container_uuids(docker_containers)
+        local_containers = self._get_local_containers(context, uuids)
+
+        # Note(kiennt): Current host.
+        cur_host = CONF.host
+        fingerprints = {}
+        changed_containers = []
+        non_existent_containers = []
+        for container in local_containers:
+            db_fingerprint = self._get_state_fingerprint(container)
+            docker_container = id_to_docker_container.get(
+                container.container_id)
+            docker_state = None
+            if container.status not in (consts.CREATING, consts.DELETING,
+                                        consts.DELETED):
+                if not container.container_id or not docker_container:
+                    non_existent_containers.append(container)
+                    continue
+
+                # Skip populating the record if neither the Docker state nor
+                # the DB record changed since the last sync.
+                docker_state = docker_container.get('State')
+                cached = self._state_fingerprints.get(container.uuid)
+                if cached != (docker_state, db_fingerprint):
+                    self._populate_container(container, docker_container)
+
+            if container.container_id:
                 container.host = cur_host
-                container.save(context)
-                LOG.info('Host of container %s changed from %s to %s',
-                         container.uuid, old_host, container.host)
+            fingerprint = self._get_state_fingerprint(container)
+            fingerprints[container.uuid] = (docker_state, fingerprint)
+            if fingerprint != db_fingerprint:
+                LOG.info('State of container %s changed from %s to %s',
+                         container.uuid, db_fingerprint, fingerprint)
+                changed_containers.append(container)
+
+        if changed_containers:
+            objects.Container.save_all(context, changed_containers,
+                                       SYNCED_STATE_FIELDS)
+        self._state_fingerprints = fingerprints
+
         for container in non_existent_containers:
-            if container.host == CONF.host:
+            if container.host == cur_host:
                 if container.auto_remove:
                     container.status = consts.DELETED
                     container.save(context)
@@ -581,6 +646,20 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
                     self.heal_with_rebuilding_container(context, container,
                                                         manager)
 
+        return {'rows_read': len(local_containers),
+                'rows_written': len(changed_containers)}
+
+    def start_event_watcher(self, context, manager):
+        if not CONF.docker.enable_event_watcher or self._event_watcher:
+            return
+        self._event_watcher = events.EventWatcher(self, manager)
+        self._event_watcher.start(context)
+
+    def stop_event_watcher(self):
+        if self._event_watcher:
+            self._event_watcher.stop()
+            self._event_watcher = None
+
     def show(self, context, container):
         with docker_utils.docker_client() as docker:
             if container.container_id is None:
@@ -831,26 +910,10 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
     @wrap_docker_error
     def show_logs(self, context, container, stdout=True, stderr=True,
                   timestamps=False, tail='all', since=None):
-        with docker_utils.docker_client() as docker:
-            try:
-                tail = int(tail)
-            except ValueError:
-                tail = 'all'
-
-            if since is None or since == 'None':
-                return docker.logs(container.container_id, stdout, stderr,
-                                   False, timestamps, tail, None)
-            else:
-                try:
-                    since = int(since)
-                except ValueError:
-                    try:
-                        since = datetime.datetime.strptime(
-                            since, '%Y-%m-%d %H:%M:%S,%f')
-                    except Exception:
-                        raise
-                return docker.logs(container.container_id, stdout, stderr,
-                                   False, timestamps, tail, since)
+        tail, since = docker_utils.parse_logs_options(tail, since)
+        with docker_utils.docker_client(pooled=False) as docker:
+            return docker.logs(container.container_id, stdout, stderr,
+                               False, timestamps, tail, since)
 
     @check_container_id
     @wrap_docker_error
@@ -864,7 +927,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
             return exec_id
 
     def execute_run(self, exec_id, command):
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             try:
                 with eventlet.Timeout(CONF.docker.execute_timeout):
                     output = docker.exec_start(exec_id, False, False, False)
@@ -950,7 +1013,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
     @check_container_id
     @wrap_docker_error
     def get_archive(self, context, container, path):
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             try:
                 stream, stat = docker.get_archive(
                     container.container_id, path)
@@ -966,8 +1029,19 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
 
     @check_container_id
     @wrap_docker_error
-    def put_archive(self, context, container, path, data):
+    def get_archive_stat(self, context, container, path):
         with docker_utils.docker_client() as docker:
+            try:
+                return docker.get_archive_stat(container.container_id, path)
+            except errors.APIError as api_error:
+                if is_not_found(api_error):
+                    raise exception.Invalid(_("%s") % str(api_error))
+                raise
+
+    @check_container_id
+    @wrap_docker_error
+    def put_archive(self, context, container, path, data):
+        with docker_utils.docker_client(pooled=False) as docker:
             try:
                 docker.put_archive(container.container_id, path, data)
             except errors.APIError as api_error:
@@ -1032,7 +1106,7 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
     @check_container_id
     @wrap_docker_error
     def commit(self, context, container, repository=None, tag=None):
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             repository = str(repository)
             if tag is None or tag == "None":
                 return docker.commit(container.container_id, repository)
@@ -1120,14 +1194,15 @@ class DockerDriver(driver.BaseDriver, driver.ContainerDriver,
     def get_available_nodes(self):
         return [self._host.get_hostname()]
 
-    def get_available_resources(self):
-        data = super(DockerDriver, self).get_available_resources()
+    def get_host_usage(self):
+        data = super(DockerDriver, self).get_host_usage()
 
         info = self.get_host_info()
         data['total_containers'] = info['total_containers']
         data['running_containers'] = info['running_containers']
         data['paused_containers'] = info['paused_containers']
         data['stopped_containers'] = info['stopped_containers']
+        # The rest comes with the same call to docker, so keep it fresh too.
         data['cpus'] = info['cpus']
         data['architecture'] = info['architecture']
         data['os_type'] = info['os_type']
@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+from oslo_log import log as logging
+from oslo_utils import uuidutils
+
+from zun.common import consts
+from zun.common import exception
+from zun.common.i18n import _
+from zun.common import utils
+import zun.conf
+from zun.container.docker import utils as docker_utils
+from zun import objects
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+WATCHED_EVENTS = ['start', 'unpause', 'pause', 'die', 'oom', 'destroy']
+
+
+class EventWatcher(object):
+    """Apply the Docker container events to the container records.
+
+    The watcher subscribes to the event stream of the local Docker daemon
+    and updates the status of the matching containers as soon as an event
+    is received. The periodic sync of the container states is still in
+    charge of reconciling whatever is missed by the watcher.
+    """
+
+    def __init__(self, driver, manager):
+        self.driver = driver
+        self.manager = manager
+        self._running = False
+        self._since = None
+        self._events = None
+
+    def start(self, context):
+        if self._running:
+            return
+        self._running = True
+        utils.spawn_n(self._watch, context)
+
+    def stop(self):
+        self._running = False
+        events = self._events
+        if events is not None:
+            # Unblock the watcher waiting for the next event.
+            events.close()
+
+    def _watch(self, context):
+        LOG.info('Start watching Docker container events.')
+        while self._running:
+            try:
+                with docker_utils.docker_client(pooled=False) as docker:
+                    self._events = docker.events(
+                        since=self._since, decode=True,
+                        filters={'type': 'container',
+                                 'event': WATCHED_EVENTS})
+                    for event in self._events:
+                        # Resume from the last received event if the stream
+                        # gets disconnected.
+                        self._since = event.get('time', self._since)
+                        self.handle_event(context, event)
+                        if not self._running:
+                            break
+            except Exception as e:
+                if self._running:
+                    LOG.warning('Failed to watch Docker container events: %s',
+                                e)
+            finally:
+                self._events = None
+            if self._running:
+                time.sleep(CONF.docker.event_watcher_retry_interval)
+        LOG.info('Stop watching Docker container events.')
+
+    def handle_event(self, context, event):
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        name = attributes.get('name', '')
+        if not name.startswith(consts.NAME_PREFIX):
+            return
+        uuid = name[len(consts.NAME_PREFIX):]
+        if not uuidutils.is_uuid_like(uuid):
+            return
+
+        try:
+            container = objects.Container.get_container_any_type(context,
+                                                                 uuid)
+        except exception.ContainerNotFound:
+            return
+
+        if (container.host != CONF.host or
+                container.container_id != event.get('id') or
+                container.status in (consts.CREATING, consts.DELETING,
+                                     consts.DELETED)):
+            return
+        if container.task_state:
+            # Another thread is performing task on this container and it
+            # will set the container state once it is done.
+            return
+
+        # The status detail is formatted from the times inspected by show(),
+        # clear it rather than keeping the detail of the previous status.
+        action = event.get('Action', event.get('status'))
+        if action in ('start', 'unpause'):
+            container.status = consts.RUNNING
+            container.status_detail = None
+        elif action == 'pause':
+            container.status = consts.PAUSED
+            container.status_detail = None
+        elif action == 'die':
+            container.status = consts.STOPPED
+            container.status_detail = None
+        elif action == 'oom':
+            container.status_reason = _("Container was killed due to out "
+                                        "of memory")
+        elif action == 'destroy':
+            if container.auto_remove:
+                container.status = consts.DELETED
+            else:
+                self.driver.heal_with_rebuilding_container(
+                    context, container, self.manager)
+                return
+
+        if container.obj_what_changed():
+            LOG.info('Status of container %s changed to %s on Docker '
+                     'event %s', container.uuid, container.status, action)
+            container.save(context)
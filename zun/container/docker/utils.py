@@ -10,14 +10,21 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import contextlib
+import datetime
 import sys
 import tarfile
+import threading
+import time
 
 import docker
 from docker import errors
+from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
+from oslo_utils import excutils
+import requests
 
 from zun.common import consts
 from zun.common import exception
@@ -27,26 +34,173 @@ import zun.conf
 
 
 CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
 
 
-@contextlib.contextmanager
-def docker_client():
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _create_client():
     client_kwargs = dict()
     if not CONF.docker.api_insecure:
         client_kwargs['ca_cert'] = CONF.docker.ca_file
         client_kwargs['client_key'] = CONF.docker.key_file
         client_kwargs['client_cert'] = CONF.docker.cert_file
 
+    return DockerHTTPClient(
+        CONF.docker.api_url,
+        CONF.docker.docker_remote_api_version,
+        CONF.docker.default_timeout,
+        **client_kwargs
+    )
+
+
+class DockerClientPool(object):
+    """A pool of Docker API clients shared by the whole process.
+
+    Reusing the clients keeps their HTTP connections (and TLS sessions)
+    alive across the calls to the docker daemon. At most ``size`` clients
+    are handed out at the same time, the other callers wait for a client to
+    be returned, up to ``timeout`` seconds. A client that stayed idle longer
+    than the health check interval is pinged before being handed out again
+    and is transparently replaced if the docker daemon cannot be reached
+    with it.
+    """
+
+    def __init__(self, size, health_check_interval, timeout=None):
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._free = collections.deque()
+        self._lock = threading.Lock()
+        self._semaphore = threading.Semaphore(size)
+        self.stats = {'created': 0, 'waits': 0, 'reconnects': 0,
+                      'timeouts': 0}
+
+    def _create(self):
+        client = _create_client()
+        self.stats['created'] += 1
+        return client
+
+    def _is_healthy(self, client):
+        try:
+            client.ping()
+        except Exception as e:
+            LOG.warning('Docker API client is unhealthy, reconnecting: %s',
+                        e)
+            return False
+        return True
+
+    def get(self):
+        """Get a client of the pool.
+
+        :returns: a client, or None if no client was returned to the pool
+                  within the timeout.
+        """
+        if not self._semaphore.acquire(blocking=False):
+            self.stats['waits'] += 1
+            if not self._semaphore.acquire(timeout=self.timeout):
+                self.stats['timeouts'] += 1
+                return None
+
+        try:
+            with self._lock:
+                client, last_used = (self._free.pop() if self._free
+                                     else (None, None))
+            if client is None:
+                return self._create()
+            if (time.monotonic() - last_used > self.health_check_interval and
+                    not self._is_healthy(client)):
+                client.close()
+                self.stats['reconnects'] += 1
+                return self._create()
+            return client
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._semaphore.release()
+
+    def put(self, client, healthy=True):
+        try:
+            if healthy:
+                with self._lock:
+                    self._free.append((client, time.monotonic()))
+            else:
+                client.close()
+                self.stats['reconnects'] += 1
+        finally:
+            self._semaphore.release()
+
+    def close(self):
+        with self._lock:
+            while self._free:
+                client, _ = self._free.pop()
+                client.close()
+
+
+def get_client_pool():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = DockerClientPool(
+                    CONF.docker.api_client_pool_size,
+                    CONF.docker.api_client_health_check_interval,
+                    CONF.docker.api_client_pool_timeout)
+    return _POOL
+
+
+@contextlib.contextmanager
+def docker_client(pooled=True):
+    """Get a Docker API client.
+
+    :param pooled: whether the client is taken from the process-wide pool.
+                   Long-lived streams (e.g. the event stream) and long calls
+                   (e.g. image pulls or archives) should use a dedicated
+                   client so that they don't hold a pooled client.
+    """
+    client = None
+    if pooled and CONF.docker.api_client_pool_size > 0:
+        pool = get_client_pool()
+        client = pool.get()
+        if client is None:
+            LOG.debug('No pooled docker API client released within %s '
+                      'seconds, use a dedicated client.', pool.timeout)
+    pooled = client is not None
+    if not pooled:
+        client = _create_client()
+
+    healthy = True
     try:
-        yield DockerHTTPClient(
-            CONF.docker.api_url,
-            CONF.docker.docker_remote_api_version,
-            CONF.docker.default_timeout,
-            **client_kwargs
-        )
+        yield client
     except errors.APIError as e:
         desired_exc = exception.DockerError(error_msg=str(e))
         utils.reraise(type(desired_exc), desired_exc, sys.exc_info()[2])
+    except requests.exceptions.ConnectionError:
+        healthy = False
+        raise
+    finally:
+        if pooled:
+            pool.put(client, healthy)
+        else:
+            client.close()
+
+
+def parse_logs_options(tail, since):
+    """Convert the tail and since options of logs to the Docker format."""
+    try:
+        tail = int(tail)
+    except (TypeError, ValueError):
+        tail = 'all'
+
+    if since is None or since == 'None':
+        since = None
+    else:
+        try:
+            since = int(since)
+        except ValueError:
+            since = datetime.datetime.strptime(since, '%Y-%m-%d %H:%M:%S,%f')
+    return tail, since
 
 
 class DockerHTTPClient(docker.APIClient):
@@ -89,6 +243,15 @@ class DockerHTTPClient(docker.APIClient):
                 image_uuid = data[0]['Config'].split('.')[0]
                 image['repo'], image['tag'] = image_uuid, ''
 
+    def get_archive_stat(self, container, path):
+        """Retrieve the stat of a path without transferring its archive."""
+        url = self._url('/containers/{0}/archive', container)
+        res = self.head(url, params={'path': path})
+        self._raise_for_status(res)
+        encoded_stat = res.headers.get('x-docker-container-path-stat')
+        if encoded_stat:
+            return docker.utils.decode_json_header(encoded_stat)
+
     def exec_resize(self, exec_id, height=None, width=None):
         # NOTE(hongbin): This is a temporary work-around for a docker issue
         # See: https://github.com/moby/moby/issues/35561
@@ -164,24 +164,36 @@ class BaseDriver(object):
     def get_host_default_base_size(self):
         return None
 
-    def get_available_resources(self):
-        """Retrieve resource information.
+    def get_host_usage(self):
+        """Retrieve the resource information which changes frequently.
 
-        This method is called when zun-compute launches, and
-        as part of a periodic task that records the results in the DB.
+        This method is called as part of a periodic task, in between the
+        calls to get_available_resources, so it should only probe the host
+        for the information which changes as containers come and go.
 
         :returns: dictionary containing resource info
         """
         data = {}
-
-        numa_topo_obj = self.get_host_numa_topology()
-        data['numa_topology'] = numa_topo_obj
         meminfo = self.get_host_mem()
         (mem_total, mem_free, mem_ava, mem_used) = meminfo
         data['mem_total'] = mem_total // units.Ki
         data['mem_free'] = mem_free // units.Ki
         data['mem_available'] = mem_ava // units.Ki
         data['mem_used'] = mem_used // units.Ki
+        return data
+
+    def get_available_resources(self):
+        """Retrieve resource information.
+
+        This method is called when zun-compute launches, and
+        as part of a periodic task that records the results in the DB.
+
+        :returns: dictionary containing resource info
+        """
+        data = self.get_host_usage()
+
+        numa_topo_obj = self.get_host_numa_topology()
+        data['numa_topology'] = numa_topo_obj
         disk_total, disk_reserved = self.get_total_disk_for_container()
         data['disk_total'] = disk_total - disk_reserved
         disk_quota_supported = self.node_support_disk_quota()
@@ -361,10 +373,18 @@ class ContainerDriver(object):
         """List all containers."""
         raise NotImplementedError()
 
-    def update_containers_states(self, context, containers, manager):
+    def update_containers_states(self, context, manager):
         """Update containers states."""
         raise NotImplementedError()
 
+    def start_event_watcher(self, context, manager):
+        """Start applying the container events to the containers states."""
+        raise NotImplementedError()
+
+    def stop_event_watcher(self):
+        """Stop applying the container events to the containers states."""
+        raise NotImplementedError()
+
     def show(self, context, container):
         """Show the details of a container."""
         raise NotImplementedError()
@@ -430,6 +450,10 @@ class ContainerDriver(object):
         """Copy resource to a container."""
         raise NotImplementedError()
 
+    def get_archive_stat(self, context, container, path):
+        """Get the stat of a resource in a container."""
+        raise NotImplementedError()
+
     def stats(self, context, container):
         """Display stats of the container."""
         raise NotImplementedError()
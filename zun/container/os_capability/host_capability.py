@@ -13,18 +13,25 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_concurrency import processutils
+import os
+
 from oslo_serialization import jsonutils
 
-from zun.common import exception
 from zun.common import utils
 from zun import objects
 from zun.objects import fields
 from zun.pci import utils as pci_utils
 
+# The PCI devices and the NUMA nodes read from sysfs, keyed by the sysfs
+# root and the kind of resource, along with the signature they were read
+# with. They are only read again when the signature changes.
+_sysfs_cache = {}
+
 
 class Host(object):
 
+    sysfs_root = '/sys'
+
     def __init__(self):
         self.capabilities = None
 
@@ -80,29 +87,40 @@ class Host(object):
 
     def get_pci_resources(self):
         addresses = []
-        try:
-            output, status = utils.execute('lspci', '-D', '-nnmm')
-            lines = output.split('\n')
-            for line in lines:
-                if not line:
-                    continue
-                columns = line.split()
-                address = columns[0]
-                addresses.append(address)
-        except processutils.ProcessExecutionError as e:
-            raise exception.CommandError(cmd='lspci',
-                                         error=str(e))
-
-        pci_info = []
-        for addr in addresses:
-            pci_info.append(self._get_pci_dev_info(addr))
-
+        if os.path.isdir(self._pci_devices_path):
+            addresses = sorted(os.listdir(self._pci_devices_path))
+
+        # The devices of the host, and their VFs, only change when they are
+        # added, removed or reconfigured, which adds or removes their
+        # entries under /sys/bus/pci/devices.
+        pci_info = self._get_cached(
+            'pci', tuple(addresses),
+            lambda: [self._get_pci_dev_info(addr) for addr in addresses])
         return jsonutils.dumps(pci_info)
 
+    @property
+    def _pci_devices_path(self):
+        return os.path.join(self.sysfs_root, 'bus', 'pci', 'devices')
+
+    def _get_cached(self, name, signature, load):
+        """Return the result of load, cached as long as the signature."""
+        key = (self.sysfs_root, name)
+        cached = _sysfs_cache.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, load())
+            _sysfs_cache[key] = cached
+        return cached[1]
+
+    def _read_sysfs(self, *path):
+        with open(os.path.join(*path)) as f:
+            return f.read().strip()
+
     def _get_pci_dev_info(self, address):
         """Returns a dict of PCI device."""
+        dev_path = os.path.join(self._pci_devices_path, address)
+        entries = os.listdir(dev_path)
 
-        def _get_device_type(address):
+        def _get_device_type():
             """Get a PCI device's device type.
 
             An assignable PCI device can be a normal PCI device,
@@ -110,24 +128,16 @@ class Host(object):
             Function (VF). Only normal PCI devices or SR-IOV VFs
             are assignable.
             """
-            path = '/sys/bus/pci/devices/' + address + '/'
-            output, status = utils.execute('ls', path)
-            if "physfn" in output:
-                phys_address = None
-                upath = '/sys/bus/pci/devices/%s/physfn/uevent' % address
-                ou, st = utils.execute('cat', upath)
-                lines = ou.split('\n')
-                for line in lines:
-                    if 'PCI_SLOT_NAME' in line:
-                        columns = line.split("=")
-                        phys_address = columns[1]
+            if "physfn" in entries:
+                phys_address = os.path.basename(
+                    os.readlink(os.path.join(dev_path, 'physfn')))
                 return {'dev_type': fields.PciDeviceType.SRIOV_VF,
                         'parent_addr': phys_address}
-            if "virtfn" in output:
+            if any(entry.startswith("virtfn") for entry in entries):
                 return {'dev_type': fields.PciDeviceType.SRIOV_PF}
             return {'dev_type': fields.PciDeviceType.STANDARD}
 
-        def _get_device_capabilities(device, address):
+        def _get_device_capabilities(device):
             """Get PCI VF device's additional capabilities.
 
             If a PCI device is a virtual function, this function reads the PCI
@@ -141,34 +151,28 @@ class Host(object):
                             {'network': pcinet_info.get('capabilities')}}
             return {}
 
-        def _get_vendor_and_product(address):
-            output, status = utils.execute('lspci', '-n', '-s', address)
-            value = output.split()[2]
-            result = value.split(":")
-            return result[0], result[1]
-
-        def _get_numa_node(address):
-            numa_node = None
-            output, status = utils.execute('lspci', '-vmm', '-s', address)
-            lines = output.split('\n')
-            for line in lines:
-                if 'NUMANode' in line:
-                    numa_node = int(line.split(":")[1])
-            return numa_node
+        def _get_numa_node():
+            # The file is missing if the kernel is built without NUMA
+            # support, and holds -1 if the device has no NUMA affinity.
+            if "numa_node" not in entries:
+                return None
+            numa_node = int(self._read_sysfs(dev_path, 'numa_node'))
+            return numa_node if numa_node >= 0 else None
 
         dev_name = 'pci_' + address.replace(":", "_").replace(".", "_")
-        vendor_id, product_id = _get_vendor_and_product(address)
-        numa_node = _get_numa_node(address)
+        # The IDs are in the 0x8086 form
+        vendor_id = self._read_sysfs(dev_path, 'vendor')[2:]
+        product_id = self._read_sysfs(dev_path, 'device')[2:]
         device = {
             "dev_id": dev_name,
             "address": address,
             "product_id": product_id,
             "vendor_id": vendor_id,
-            "numa_node": numa_node
+            "numa_node": _get_numa_node()
         }
         device['label'] = 'label_%(vendor_id)s_%(product_id)s' % device
-        device.update(_get_device_type(address))
-        device.update(_get_device_capabilities(device, address))
+        device.update(_get_device_type())
+        device.update(_get_device_capabilities(device))
         return device
 
     def _get_pcinet_info(self, vf_address):
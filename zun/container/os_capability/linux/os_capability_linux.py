@@ -13,59 +13,63 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from collections import defaultdict
-import errno
-import re
+import os
+
+from oslo_utils import units
 
-from oslo_log import log as logging
-from zun.common import exception
 from zun.common import utils
 from zun.container.os_capability import host_capability
 
 
-LOG = logging.getLogger(__name__)
-
-
 class LinuxHost(host_capability.Host):
 
     def get_cpu_numa_info(self):
-        # TODO(sbiswas7): rootwrap changes for zun required.
-        old_lscpu = False
-        try:
-            output = utils.execute('lscpu', '-p=socket,cpu,online')
-        except exception.CommandError:
-            LOG.info("There was a problem while executing lscpu -p=socket"
-                     ",cpu,online. Try again without the online column.")
-            # There is a possibility that an older version of lscpu is used
-            # So let's try without the online column
-            output = utils.execute('lscpu', '-p=socket,cpu')
-            old_lscpu = True
-
-        if old_lscpu:
-            cpu_sock_pair = re.findall(r"\d+(?:,\d+)?", str(output))
-        else:
-            cpu_sock_pair = re.findall(r"\d+(?:,\d+,[Y/N])?", str(output))
-        sock_map = defaultdict(list)
-        for value in cpu_sock_pair:
-            val = value.split(",")
-            if len(val) == 3 and val[2] == 'Y':
-                sock_map[val[0]].append(int(val[1]))
-            elif len(val) == 2 and old_lscpu:
-                sock_map[val[0]].append(int(val[1]))
-        return sock_map
+        return {str(node_id): cpus
+                for node_id, cpus, mem_total in self._get_numa_nodes()}
 
     def get_mem_numa_info(self):
-        try:
-            output = utils.execute('numactl', '-H')
-        except OSError as e:
-            if e.errno == errno.ENOENT:
-                LOG.info("The program 'numactl' is not installed.")
-                return []
-            else:
-                raise
+        return [mem_total
+                for node_id, cpus, mem_total in self._get_numa_nodes()]
+
+    def _get_numa_nodes(self):
+        """Return the id, online CPUs and memory in MB of the NUMA nodes."""
+        system_path = os.path.join(self.sysfs_root, 'devices', 'system')
+        node_path = os.path.join(system_path, 'node')
+        online_cpus = self._read_sysfs(system_path, 'cpu', 'online')
+        online_nodes = None
+        if os.path.isdir(node_path):
+            online_nodes = self._read_sysfs(node_path, 'online')
+        # The nodes only change when CPUs or nodes go online or offline.
+        return self._get_cached(
+            'numa', (online_nodes, online_cpus),
+            lambda: self._read_numa_nodes(node_path, online_nodes,
+                                          online_cpus))
+
+    def _read_numa_nodes(self, node_path, online_nodes, online_cpus):
+        online_cpus = _parse_cpu_list(online_cpus)
+        if online_nodes is None:
+            # The kernel is built without NUMA support, all the CPUs and
+            # the memory of the host belong to a single node.
+            mem_total = self.get_host_mem()[0] // units.Ki
+            return [(0, sorted(online_cpus), mem_total)]
+
+        nodes = []
+        for node_id in sorted(_parse_cpu_list(online_nodes)):
+            path = os.path.join(node_path, 'node%d' % node_id)
+            cpus = _parse_cpu_list(self._read_sysfs(path, 'cpulist'))
+            mem_total = 0
+            # Lines are in the "Node 0 MemTotal:  32868400 kB" form
+            for line in self._read_sysfs(path, 'meminfo').splitlines():
+                columns = line.split()
+                if columns[2] == 'MemTotal:':
+                    mem_total = int(columns[3]) // units.Ki
+                    break
+            nodes.append((node_id, sorted(cpus & online_cpus), mem_total))
+        return nodes
+
 
-        sizes = re.findall(r"size\: \d*", str(output))
-        mem_numa = []
-        for size in sizes:
-            mem_numa.append(int(size.split(' ')[1]))
-        return mem_numa
+def _parse_cpu_list(cpu_list):
+    """Parse a list of CPUs or nodes of sysfs, e.g. "0-3,8-11"."""
+    if not cpu_list:
+        return set()
+    return utils.parse_floating_cpu(cpu_list)
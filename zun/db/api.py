@@ -47,8 +47,8 @@ def list_containers(context, container_type, filters=None, limit=None,
     :param container_type: The container type
     :param filters: Filters to apply. Defaults to None.
     :param limit: Maximum number of containers to return.
-    :param marker: the last item of the previous page; we return the next
-                   result set.
+    :param marker: the last item of the previous page, or a dict of its
+                   sort key values; we return the next result set.
     :param sort_key: Attribute by which results should be sorted.
     :param sort_dir: Direction in which results should be sorted.
                      (asc, desc)
@@ -133,6 +133,17 @@ def update_container(context, container_type, container_id, values):
         context, container_type, container_id, values)
 
 
+@profiler.trace("db")
+def update_containers(context, values):
+    """Update properties of several containers in one batch.
+
+    :param context: Request context
+    :param values: A list of dicts of the properties to be updated. Each
+                   dict must contain the 'id' of the container to update.
+    """
+    return _get_dbdriver_instance().update_containers(context, values)
+
+
 @profiler.trace("db")
 def list_volume_mappings(context, filters=None, limit=None, marker=None,
                          sort_key=None, sort_dir=None):
@@ -398,8 +409,8 @@ def list_images(context, filters=None,
     :param context: The security context
     :param filters: Filters to apply. Defaults to None.
     :param limit: Maximum number of images to return.
-    :param marker: the last item of the previous page; we
-                    return the next
+    :param marker: the last item of the previous page, or a dict of
+                   its sort key values; we return the next result set.
     :param sort_key: Attribute by which results should be sorted.
     :param sort_dir: Direction in which results should be sorted.
                      (asc, desc)
@@ -431,6 +442,37 @@ def get_image_by_uuid(context, image_uuid):
     return _get_dbdriver_instance().get_image_by_uuid(context, image_uuid)
 
 
+@profiler.trace("db")
+def get_cached_image(context, driver, repo, tag, project_id,
+                     registry_id=None):
+    """Return whether an image driver found an image, and when.
+
+    :param context: The security context
+    :param driver: The name of the image driver.
+    :param repo: The repo of the image.
+    :param tag: The tag of the image.
+    :param project_id: The project which looked for the image.
+    :param registry_id: The id of the registry of the image, if any.
+    :returns: A cached image.
+    """
+    return _get_dbdriver_instance().get_cached_image(
+        context, driver, repo, tag, project_id, registry_id)
+
+
+@profiler.trace("db")
+def cache_image(context, values):
+    """Record whether an image driver found an image.
+
+    The record of the image is created, or refreshed if it exists.
+
+    :param context: The security context
+    :param values: A dict containing the driver, repo, tag, project_id,
+                   registry_id and found attributes of the cached image.
+    :returns: A cached image.
+    """
+    return _get_dbdriver_instance().cache_image(context, values)
+
+
 @profiler.trace("db")
 def list_resource_providers(context, filters=None, limit=None, marker=None,
                             sort_key=None, sort_dir=None):
@@ -740,6 +782,17 @@ def list_compute_nodes(context, filters=None, limit=None, marker=None,
         context, filters, limit, marker, sort_key, sort_dir)
 
 
+@profiler.trace("db")
+def list_compute_node_timestamps(context):
+    """List the last update time of all the compute nodes.
+
+    :param context: The security context
+    :returns: A dict of the time of the last update, or of the creation if
+              never updated, of the compute nodes keyed by their uuid.
+    """
+    return _get_dbdriver_instance().list_compute_node_timestamps(context)
+
+
 @profiler.trace("db")
 def create_compute_node(context, values):
     """Create a new compute node.
@@ -825,6 +878,13 @@ def get_all_pci_device_by_container_uuid(container_uuid):
         container_uuid)
 
 
+@profiler.trace("db")
+def get_all_pci_device_by_container_uuids(container_uuids):
+    """Get PCI devices allocated to any of the given containers."""
+    return _get_dbdriver_instance().get_all_pci_device_by_container_uuids(
+        container_uuids)
+
+
 @profiler.trace("db")
 def get_all_pci_device_by_parent_addr(node_id, parent_addr):
     """Get all PCI devices by parent address."""
@@ -857,9 +917,18 @@ def action_finish(context, values):
 
 
 @profiler.trace("db")
-def actions_get(context, uuid):
-    """Get all container actions for the provided container."""
-    return _get_dbdriver_instance().actions_get(context, uuid)
+def actions_get(context, uuid, limit=None, marker=None):
+    """Get all container actions for the provided container.
+
+    :param context: The security context
+    :param uuid: The uuid of the container.
+    :param limit: Maximum number of actions to return.
+    :param marker: the last item of the previous page, or a dict of its sort
+                   key values; we return the next result set.
+    :returns: A list of container actions, newest first.
+    """
+    return _get_dbdriver_instance().actions_get(context, uuid, limit=limit,
+                                                marker=marker)
 
 
 @profiler.trace("db")
@@ -881,6 +950,21 @@ def action_event_finish(context, values):
     return _get_dbdriver_instance().action_event_finish(context, values)
 
 
+@profiler.trace("db")
+def action_events_record(context, events, actions):
+    """Record a batch of container action events and finished actions.
+
+    :param context: The security context
+    :param events: A list of the values of the events. An event with a
+                   start time is created, otherwise the values finish the
+                   event of the same name started before.
+    :param actions: A list of the values of the finished actions.
+    :returns: The values of the events and actions which were not found.
+    """
+    return _get_dbdriver_instance().action_events_record(context, events,
+                                                         actions)
+
+
 @profiler.trace("db")
 def action_events_get(context, action_id):
     """Get the events by action id."""
@@ -1080,12 +1164,55 @@ def list_exec_instances(context, filters=None, limit=None, marker=None,
         context, filters, limit, marker, sort_key, sort_dir)
 
 
+@profiler.trace("db")
+def create_stream_instance(context, values):
+    """Create a new stream instance.
+
+    The stream instances created longer than the validity period of their
+    token ago are purged.
+
+    :param context: The security context
+    :param values: A dict containing the container_id, token, type, url and
+                   params attributes of the stream instance.
+    :returns: A stream instance.
+    """
+    return _get_dbdriver_instance().create_stream_instance(context, values)
+
+
+@profiler.trace("db")
+def consume_stream_instance(context, token):
+    """Delete a stream instance and return it.
+
+    A stream instance can be consumed only once.
+
+    :param context: The security context
+    :param token: The token of the stream instance.
+    :returns: A stream instance.
+    :raises: StreamInstanceNotFound
+    """
+    return _get_dbdriver_instance().consume_stream_instance(context, token)
+
+
 @profiler.trace('db')
 def count_usage(context, container_type, project_id, flag):
     return _get_dbdriver_instance().count_usage(context, container_type,
                                                 project_id, flag)
 
 
+@profiler.trace('db')
+def count_usages(context, container_type, project_id):
+    """Count the containers of a project and sum their resources.
+
+    :param context: The security context
+    :param container_type: The type of the containers to count.
+    :param project_id: The project to count the usages of.
+    :returns: A dict of the number of containers and the sums of their cpu,
+              memory and disk, keyed by the name of the quota resource.
+    """
+    return _get_dbdriver_instance().count_usages(context, container_type,
+                                                 project_id)
+
+
 @profiler.trace("db")
 def create_registry(context, values):
     """Create a new registry.
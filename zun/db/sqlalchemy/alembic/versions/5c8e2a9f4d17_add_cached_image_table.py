@@ -0,0 +1,49 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add cached_image table
+
+Revision ID: 5c8e2a9f4d17
+Revises: 9a4c1e7b2d53
+Create Date: 2026-10-17 14:03:27.561042
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5c8e2a9f4d17'
+down_revision = '9a4c1e7b2d53'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'cached_image',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('driver', sa.String(length=255), nullable=False),
+        sa.Column('repo', sa.String(length=255), nullable=False),
+        sa.Column('tag', sa.String(length=255), nullable=False),
+        sa.Column('found', sa.Boolean(), nullable=False),
+        sa.Column('project_id', sa.String(length=255), nullable=True),
+        sa.Column('registry_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'driver', 'repo', 'tag', 'project_id', 'registry_id',
+            name='uniq_cached_image0driverrepotagprojectregistry'),
+        mysql_charset='utf8',
+        mysql_engine='InnoDB'
+    )
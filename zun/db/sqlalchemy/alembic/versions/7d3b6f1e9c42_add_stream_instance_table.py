@@ -0,0 +1,50 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add stream_instance table
+
+Revision ID: 7d3b6f1e9c42
+Revises: 5c8e2a9f4d17
+Create Date: 2026-10-17 16:21:08.307215
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '7d3b6f1e9c42'
+down_revision = '5c8e2a9f4d17'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+from zun.db.sqlalchemy import models
+
+
+def upgrade():
+    op.create_table(
+        'stream_instance',
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('container_id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('type', sa.String(length=36), nullable=False),
+        sa.Column('url', sa.String(length=255), nullable=True),
+        sa.Column('params', models.JSONEncodedDict(), nullable=True),
+        sa.ForeignKeyConstraint(['container_id'], ['container.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token', name='uniq_stream_instance0token'),
+        mysql_charset='utf8',
+        mysql_engine='InnoDB'
+    )
@@ -0,0 +1,37 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""add indexes to container
+
+Revision ID: 9a4c1e7b2d53
+Revises: 3f2b36231bee
+Create Date: 2026-10-17 09:12:45.318206
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '9a4c1e7b2d53'
+down_revision = '3f2b36231bee'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('container_host_container_type_idx', 'container',
+                    ['host', 'container_type'])
+    op.create_index('container_project_id_container_type_idx', 'container',
+                    ['project_id', 'container_type'])
+    op.create_index('container_status_task_state_idx', 'container',
+                    ['status', 'task_state'])
+    op.create_index('container_name_idx', 'container', ['name'])
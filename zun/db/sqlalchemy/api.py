@@ -14,6 +14,8 @@
 
 """SQLAlchemy storage backend."""
 
+import datetime
+
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils as db_utils
@@ -99,6 +101,30 @@ def add_identity_filter(query, value):
         raise exception.InvalidIdentity(identity=value)
 
 
+class _KeysetMarker(object):
+    """A pagination marker made of the sort key values of the last row.
+
+    It allows seeking to the next page without fetching the row the
+    previous page ended with.
+    """
+
+    def __init__(self, model, sort_keys, values):
+        for key in sort_keys:
+            if key not in values:
+                raise exception.InvalidParameterValue(
+                    _('The pagination cursor does not match the sort key'))
+            value = values[key]
+            column = getattr(model, key)
+            if value is not None and isinstance(column.type, sa.DateTime):
+                try:
+                    value = timeutils.parse_strtime(value)
+                except (TypeError, ValueError):
+                    raise exception.InvalidParameterValue(
+                        _('Invalid value of %s in the pagination cursor')
+                        % key)
+            setattr(self, key, value)
+
+
 def _paginate_query(model, limit=None, marker=None, sort_key=None,
                     sort_dir=None, query=None, default_sort_key='id'):
     if not query:
@@ -106,6 +132,8 @@ def _paginate_query(model, limit=None, marker=None, sort_key=None,
     sort_keys = [default_sort_key]
     if sort_key and sort_key not in sort_keys:
         sort_keys.insert(0, sort_key)
+    if isinstance(marker, dict):
+        marker = _KeysetMarker(model, sort_keys, marker)
     try:
         query = db_utils.paginate_query(query, model, limit, sort_keys,
                                         marker=marker, sort_dir=sort_dir)
@@ -279,6 +307,18 @@ class Connection(object):
             ref.update(values)
         return ref
 
+    def update_containers(self, context, values):
+        if any('uuid' in v for v in values):
+            msg = _("Cannot overwrite UUID for an existing Container.")
+            raise exception.InvalidParameterValue(err=msg)
+
+        if not values:
+            return
+
+        session = get_session()
+        with session.begin():
+            session.bulk_update_mappings(models.Container, values)
+
     def _add_volume_mappings_filters(self, query, filters):
         filter_names = ['project_id', 'user_id', 'volume_id',
                         'container_path', 'container_uuid']
@@ -580,6 +620,53 @@ class Connection(object):
             except NoResultFound:
                 raise exception.ImageNotFound(image=image_uuid)
 
+    def get_cached_image(self, context, driver, repo, tag, project_id,
+                         registry_id=None):
+        session = get_session()
+        with session.begin():
+            query = model_query(models.CachedImage, session=session)
+            query = query.filter_by(driver=driver, repo=repo, tag=tag,
+                                    project_id=project_id,
+                                    registry_id=registry_id)
+            # The unique constraint does not apply to the NULL registry, so
+            # concurrent services may have recorded an image twice.
+            ref = query.order_by(desc(models.CachedImage.updated_at)).first()
+            if ref is None:
+                raise exception.CachedImageNotFound(driver=driver, repo=repo,
+                                                    tag=tag)
+            return ref
+
+    def cache_image(self, context, values):
+        # The record is refreshed even if found is unchanged.
+        values = dict(values, updated_at=timeutils.utcnow())
+        ref = self._update_cached_image(values)
+        if ref is not None:
+            return ref
+
+        try:
+            session = get_session()
+            with session.begin():
+                ref = models.CachedImage()
+                ref.update(values)
+                ref.save(session=session)
+            return ref
+        except db_exc.DBDuplicateEntry:
+            # Another service cached the image in the meantime.
+            return self._update_cached_image(values)
+
+    def _update_cached_image(self, values):
+        session = get_session()
+        with session.begin():
+            query = model_query(models.CachedImage, session=session)
+            query = query.filter_by(driver=values['driver'],
+                                    repo=values['repo'], tag=values['tag'],
+                                    project_id=values['project_id'],
+                                    registry_id=values.get('registry_id'))
+            ref = query.with_for_update().first()
+            if ref is not None:
+                ref.update(values)
+        return ref
+
     def _add_resource_providers_filters(self, query, filters):
         filter_names = ['name', 'root_provider', 'parent_provider', 'can_host']
         return self._add_filters(query, models.ResourceProvider,
@@ -880,10 +967,19 @@ class Connection(object):
         return ref
 
     def _add_compute_nodes_filters(self, query, filters):
-        filter_names = ['hostname', 'rp_uuid']
+        filter_names = ['uuid', 'hostname', 'rp_uuid']
         return self._add_filters(query, models.ComputeNode, filters=filters,
                                  filter_names=filter_names)
 
+    def list_compute_node_timestamps(self, context):
+        session = get_session()
+        with session.begin():
+            query = session.query(models.ComputeNode.uuid,
+                                  models.ComputeNode.created_at,
+                                  models.ComputeNode.updated_at)
+            return {uuid: updated_at or created_at
+                    for uuid, created_at, updated_at in query}
+
     def list_compute_nodes(self, context, filters=None, limit=None,
                            marker=None, sort_key=None, sort_dir=None):
         session = get_session()
@@ -1014,6 +1110,14 @@ class Connection(object):
                 filter_by(container_uuid=container_uuid).\
                 all()
 
+    def get_all_pci_device_by_container_uuids(self, container_uuids):
+        session = get_session()
+        with session.begin():
+            return model_query(models.PciDevice, session=session).\
+                filter_by(status=consts.ALLOCATED).\
+                filter(models.PciDevice.container_uuid.in_(container_uuids)).\
+                all()
+
     def destroy_pci_device(self, node_id, address):
         session = get_session()
         with session.begin():
@@ -1058,13 +1162,14 @@ class Connection(object):
                     container_uuid=values['container_uuid'])
             return query.one()
 
-    def actions_get(self, context, container_uuid):
+    def actions_get(self, context, container_uuid, limit=None, marker=None):
         """Get all container actions for the provided uuid."""
         session = get_session()
         with session.begin():
             query = model_query(models.ContainerAction, session=session).\
                 filter_by(container_uuid=container_uuid)
-            actions = _paginate_query(models.ContainerAction, sort_dir='desc',
+            actions = _paginate_query(models.ContainerAction, limit=limit,
+                                      marker=marker, sort_dir='desc',
                                       sort_key='created_at', query=query)
 
             return actions
@@ -1160,6 +1265,73 @@ class Connection(object):
 
             return event
 
+    def action_events_record(self, context, events, actions):
+        """Record a batch of action events and finished actions."""
+        session = get_session()
+        dropped = []
+        with session.begin():
+            action_ids = {}
+            keys = set((values['container_uuid'], values['request_id'])
+                       for values in events)
+            if keys:
+                query = model_query(models.ContainerAction, session=session).\
+                    filter(sa.or_(*[sa.and_(
+                        models.ContainerAction.container_uuid == uuid,
+                        models.ContainerAction.request_id == request_id)
+                        for uuid, request_id in keys]))
+                for action in query:
+                    action_ids.setdefault(
+                        (action.container_uuid, action.request_id), action.id)
+
+            # The events with a start time are new, the other ones finish
+            # an event recorded by a previous batch.
+            started = []
+            finished = []
+            for values in events:
+                action_id = action_ids.get((values['container_uuid'],
+                                            values['request_id']))
+                if action_id is None:
+                    dropped.append(values)
+                elif 'start_time' in values:
+                    started.append(dict(values, action_id=action_id))
+                else:
+                    finished.append(dict(values, action_id=action_id))
+
+            if started:
+                columns = models.ContainerActionEvent.__table__.columns.keys()
+                session.bulk_insert_mappings(
+                    models.ContainerActionEvent,
+                    [{k: v for k, v in values.items() if k in columns}
+                     for values in started])
+
+            if finished:
+                db_events = {}
+                query = model_query(models.ContainerActionEvent,
+                                    session=session).\
+                    filter(models.ContainerActionEvent.action_id.in_(
+                        set(values['action_id'] for values in finished)))
+                for event in query:
+                    db_events.setdefault((event.action_id, event.event),
+                                         event)
+                for values in finished:
+                    event = db_events.get((values['action_id'],
+                                           values['event']))
+                    if event is None:
+                        dropped.append(values)
+                        continue
+                    event.update(values)
+                    event.save(session=session)
+
+            for values in actions:
+                query = model_query(models.ContainerAction, session=session).\
+                    filter_by(container_uuid=values['container_uuid']).\
+                    filter_by(request_id=values['request_id']).\
+                    filter_by(action=values['action'])
+                if query.update(values) != 1:
+                    dropped.append(values)
+
+        return dropped
+
     def action_events_get(self, context, action_id):
         session = get_session()
         with session.begin():
@@ -1412,6 +1584,33 @@ class Connection(object):
                     exec_id=values['exec_id'])
             return exec_inst
 
+    def create_stream_instance(self, context, values):
+        session = get_session()
+        with session.begin():
+            # The tokens which were not used in time are purged.
+            expired_before = timeutils.utcnow() - datetime.timedelta(
+                seconds=CONF.websocket_proxy.stream_token_ttl)
+            query = model_query(models.StreamInstance, session=session)
+            query.filter(models.StreamInstance.created_at < expired_before
+                         ).delete(synchronize_session=False)
+            stream_inst = models.StreamInstance()
+            stream_inst.update(values)
+            stream_inst.save(session=session)
+            return stream_inst
+
+    def consume_stream_instance(self, context, token):
+        session = get_session()
+        with session.begin():
+            query = model_query(models.StreamInstance, session=session)
+            stream_inst = query.filter_by(token=token).first()
+            if stream_inst is not None:
+                # The token is consumed by whoever deletes the record first.
+                query = model_query(models.StreamInstance, session=session)
+                count = query.filter_by(id=stream_inst.id).delete()
+                if count == 1:
+                    return stream_inst
+        raise exception.StreamInstanceNotFound(token=token)
+
     def count_usage(self, context, container_type, project_id, flag):
         session = get_session()
         with session.begin():
@@ -1428,8 +1627,27 @@ class Connection(object):
 
             return project_query.first()
 
+    def count_usages(self, context, container_type, project_id):
+        session = get_session()
+        with session.begin():
+            # memory is stored as a string of MiB, it is summed as an integer.
+            containers, cpu, memory, disk = session.query(
+                func.count(models.Container.id),
+                func.sum(models.Container.cpu),
+                func.sum(sa.cast(models.Container.memory, sa.Integer)),
+                func.sum(models.Container.disk)). \
+                filter_by(project_id=project_id). \
+                filter_by(container_type=container_type). \
+                one()
+
+        return {'containers': containers,
+                'cpu': float(cpu or 0),
+                'memory': int(memory or 0),
+                'disk': int(disk or 0)}
+
     def _add_registries_filters(self, query, filters):
-        filter_names = ['name', 'domain', 'username', 'project_id', 'user_id']
+        filter_names = ['id', 'name', 'domain', 'username', 'project_id',
+                        'user_id']
         return self._add_filters(query, models.Registry, filters=filters,
                                  filter_names=filter_names)
 
@@ -133,6 +133,11 @@ class Container(Base):
     __tablename__ = 'container'
     __table_args__ = (
         schema.UniqueConstraint('uuid', name='uniq_container0uuid'),
+        Index('container_host_container_type_idx', 'host', 'container_type'),
+        Index('container_project_id_container_type_idx',
+              'project_id', 'container_type'),
+        Index('container_status_task_state_idx', 'status', 'task_state'),
+        Index('container_name_idx', 'name'),
         table_args()
     )
     id = Column(Integer, primary_key=True)
@@ -255,6 +260,24 @@ class ExecInstance(Base):
         primaryjoin='and_(ExecInstance.container_id==Container.id)')
 
 
+class StreamInstance(Base):
+    """Represents a one-time access to a data stream of a container."""
+
+    __tablename__ = 'stream_instance'
+    __table_args__ = (
+        schema.UniqueConstraint('token', name='uniq_stream_instance0token'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True, nullable=False)
+    container_id = Column(Integer,
+                          ForeignKey('container.id', ondelete="CASCADE"),
+                          nullable=False)
+    token = Column(String(255), nullable=False)
+    type = Column(String(36), nullable=False)
+    url = Column(String(255), nullable=True)
+    params = Column(JSONEncodedDict, nullable=True)
+
+
 class Image(Base):
     """Represents an image. """
 
@@ -275,6 +298,25 @@ class Image(Base):
     host = Column(String(255))
 
 
+class CachedImage(Base):
+    """Represents whether an image was found by an image driver."""
+
+    __tablename__ = 'cached_image'
+    __table_args__ = (
+        schema.UniqueConstraint(
+            'driver', 'repo', 'tag', 'project_id', 'registry_id',
+            name='uniq_cached_image0driverrepotagprojectregistry'),
+        table_args()
+    )
+    id = Column(Integer, primary_key=True)
+    driver = Column(String(255), nullable=False)
+    repo = Column(String(255), nullable=False)
+    tag = Column(String(255), nullable=False)
+    project_id = Column(String(255), nullable=True)
+    registry_id = Column(Integer, nullable=True)
+    found = Column(Boolean, nullable=False)
+
+
 class ResourceProvider(Base):
     """Represents an resource provider. """
 
@@ -0,0 +1,84 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Records of the images found, or not found, by the image drivers.
+
+The records are written and shared by the zun-api workers, which validate
+the image of the containers. The compute hosts do not write them, since an
+image pulled by a host may only be present on that host. They are keyed by
+the image driver and the repo and tag of the image as parsed by
+:func:`zun.common.utils.parse_image_name`, the repo including the domain of
+the registry. Since the images visible to a project depend on its
+credentials, the records are also keyed by the project of the request and
+the registry of the image.
+"""
+
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from zun.common import exception
+import zun.conf
+from zun import objects
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+def _ttl(found):
+    if found:
+        return CONF.api.image_validation_cache_ttl
+    return CONF.api.image_validation_negative_cache_ttl
+
+
+def lookup(context, driver, repo, tag, registry=None):
+    """Return whether the image exists, or None if it is not known.
+
+    :param context: the request context.
+    :param driver: the name of the image driver, defaults to the
+                   default_image_driver option.
+    :param repo: the repo of the image.
+    :param tag: the tag of the image.
+    :param registry: the registry of the image, if any.
+    """
+    driver = driver or CONF.default_image_driver
+    registry_id = registry.id if registry else None
+    try:
+        cached_image = objects.CachedImage.get(context, driver, repo, tag,
+                                               registry_id=registry_id)
+    except exception.CachedImageNotFound:
+        return None
+
+    updated_at = cached_image.updated_at or cached_image.created_at
+    if timeutils.is_older_than(updated_at, _ttl(cached_image.found)):
+        return None
+    return cached_image.found
+
+
+def record(context, driver, repo, tag, found, registry=None):
+    """Record whether the image was found by the image driver.
+
+    Nothing is recorded if the image validation is disabled or if the record
+    would never be used. A failure to record the image is logged, not raised.
+    """
+    if not CONF.api.enable_image_validation or not _ttl(found):
+        return
+
+    driver = driver or CONF.default_image_driver
+    registry_id = registry.id if registry else None
+    try:
+        objects.CachedImage.cache(context, driver, repo, tag, found,
+                                  registry_id=registry_id)
+    except Exception as e:
+        LOG.warning("Failed to record image %(repo)s:%(tag)s of driver "
+                    "%(driver)s: %(error)s",
+                    {'repo': repo, 'tag': tag, 'driver': driver,
+                     'error': str(e)})
@@ -76,7 +76,7 @@ class DockerDriver(driver.ContainerImageDriver):
             auth_config = {'username': CONF.docker.default_registry_username,
                            'password': CONF.docker.default_registry_password}
 
-        with docker_utils.docker_client() as docker:
+        with docker_utils.docker_client(pooled=False) as docker:
             try:
                 docker.pull(repo, tag=tag, auth_config=auth_config)
             except errors.NotFound as e:
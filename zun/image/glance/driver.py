@@ -16,8 +16,12 @@ import io
 import os
 import types
 
+from oslo_concurrency import lockutils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import excutils
 from oslo_utils import fileutils
+from oslo_utils import uuidutils
 
 from zun.common import exception
 from zun.common.i18n import _
@@ -30,6 +34,10 @@ CONF = zun.conf.CONF
 
 LOG = logging.getLogger(__name__)
 
+# The sidecar index of the verified checksums of the image tarballs, stored
+# in the images directory and keyed by image id.
+CHECKSUM_INDEX_FILE = 'checksums.json'
+
 
 class GlanceDriver(driver.ContainerImageDriver):
     def __init__(self):
@@ -49,15 +57,73 @@ class GlanceDriver(driver.ContainerImageDriver):
                                     image_meta.id + '.tar')
             if os.path.isfile(out_path):
                 return {
+                    'id': image_meta.id,
                     'image': repo,
                     'path': out_path,
                     'checksum': image_meta.checksum}
             else:
                 return None
 
+    def _get_checksum_index_path(self):
+        return os.path.join(CONF.glance.images_directory,
+                            CHECKSUM_INDEX_FILE)
+
+    def _load_checksum_index(self):
+        try:
+            with open(self._get_checksum_index_path(), 'r') as fd:
+                return jsonutils.loads(fd.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _get_file_signature(self, image_path):
+        stat = os.stat(image_path)
+        return {'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'inode': stat.st_ino}
+
+    def _get_cached_checksum(self, image_id, image_path):
+        """Return the verified checksum of an image tarball, if still valid.
+
+        The cached checksum is only valid if the size, mtime and inode of
+        the tarball didn't change since it was verified.
+        """
+        entry = self._load_checksum_index().get(image_id)
+        if not entry:
+            return None
+        try:
+            signature = self._get_file_signature(image_path)
+        except OSError:
+            return None
+        if any(entry.get(k) != v for k, v in signature.items()):
+            return None
+        return entry.get('checksum')
+
+    def _record_checksum(self, image_id, image_path, checksum):
+        """Record the verified checksum of an image tarball in the index."""
+        try:
+            entry = self._get_file_signature(image_path)
+            entry['checksum'] = checksum
+            with lockutils.lock(CHECKSUM_INDEX_FILE):
+                index = self._load_checksum_index()
+                index[image_id] = entry
+                index_path = self._get_checksum_index_path()
+                tmp_path = index_path + '.tmp'
+                with open(tmp_path, 'w') as fd:
+                    fd.write(jsonutils.dumps(index))
+                os.replace(tmp_path, index_path)
+        except OSError as e:
+            LOG.warning('Failed to record the checksum of image %s: %s',
+                        image_id, e)
+
     def _verify_md5sum_for_image(self, image):
+        image_id = image.get('id')
         image_path = image['path']
         image_checksum = image['checksum']
+        if (image_id and
+                self._get_cached_checksum(image_id, image_path) ==
+                image_checksum):
+            return True
+
         md5sum = hashlib.md5()
         with open(image_path, 'rb') as fd:
             while True:
@@ -68,6 +134,8 @@ class GlanceDriver(driver.ContainerImageDriver):
                 md5sum.update(data)
         md5sum = md5sum.hexdigest()
         if md5sum == image_checksum:
+            if image_id:
+                self._record_checksum(image_id, image_path, md5sum)
             return True
         return False
 
@@ -101,12 +169,33 @@ class GlanceDriver(driver.ContainerImageDriver):
             images_directory = CONF.glance.images_directory
             fileutils.ensure_tree(images_directory)
             out_path = os.path.join(images_directory, image_meta.id + '.tar')
-            with open(out_path, 'wb') as fd:
-                for chunk in image_chunks:
-                    fd.write(chunk)
+            # Write the image to a temporary file and atomically rename it
+            # so that a concurrent download never exposes a partial tarball.
+            tmp_path = '%s.%s.tmp' % (out_path, uuidutils.generate_uuid())
+            # Compute the checksum while writing the image so that a fresh
+            # download never needs to be read and hashed again.
+            md5sum = hashlib.md5()
+            try:
+                with open(tmp_path, 'wb') as fd:
+                    for chunk in image_chunks:
+                        md5sum.update(chunk)
+                        fd.write(chunk)
+                os.replace(tmp_path, out_path)
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    fileutils.delete_if_exists(tmp_path)
         except Exception as e:
             msg = _('Error occurred while writing image: {0}')
             raise exception.ZunException(msg.format(e))
+        md5sum = md5sum.hexdigest()
+        if md5sum == image_meta.checksum:
+            self._record_checksum(image_meta.id, out_path, md5sum)
+        else:
+            LOG.warning('Checksum of the downloaded image %(repo)s '
+                        '(%(md5sum)s) does not match the one in glance '
+                        '(%(checksum)s)',
+                        {'repo': repo, 'md5sum': md5sum,
+                         'checksum': image_meta.checksum})
         LOG.debug('Image %(repo)s was downloaded to path : %(path)s',
                   {'repo': repo, 'path': out_path})
         image = {'image': image_meta.name, 'tags': image_meta.tags,
@@ -25,6 +25,7 @@ from zun.common import context as zun_context
 from zun.common import exception
 from zun.common.i18n import _
 import zun.conf
+from zun.network import port_pool
 from zun.objects import fields as obj_fields
 from zun.pci import manager as pci_manager
 from zun.pci import utils as pci_utils
@@ -98,6 +99,10 @@ class NeutronAPI(object):
                 neutron_port = self.update_port(neutron_port_id, port_req_body,
                                                 admin=True)
         else:
+            neutron_port = self._take_pooled_port(
+                container, network_uuid, requested_network, device_owner,
+                security_groups, set_binding_host)
+        if neutron_port is None:
             port_dict = {
                 'network_id': network_uuid,
                 'tenant_id': self.context.project_id,
@@ -112,6 +117,11 @@ class NeutronAPI(object):
             if security_groups is not None:
                 port_dict['security_groups'] = security_groups
             neutron_port = self.create_port({'port': port_dict}, admin=True)
+            pool = port_pool.get_pool()
+            if pool and not ip_addr:
+                pool.track(port_pool.pool_key(
+                    network_uuid, self.context.project_id, security_groups),
+                    neutron_port['port'])
 
         neutron_port = neutron_port['port']
         preserve_on_delete = requested_network['preserve_on_delete']
@@ -138,10 +148,33 @@ class NeutronAPI(object):
 
         return addresses, neutron_port
 
+    def _take_pooled_port(self, container, network_uuid, requested_network,
+                          device_owner, security_groups, set_binding_host):
+        pool = port_pool.get_pool()
+        if not pool or requested_network.get('fixed_ip'):
+            return None
+        port = pool.take(port_pool.pool_key(
+            network_uuid, self.context.project_id, security_groups))
+        if port is None:
+            return None
+
+        port_req_body = {'port': {'name': '', 'device_id': container.uuid}}
+        if set_binding_host:
+            port_req_body['port']['device_owner'] = device_owner
+            port_req_body['port'][consts.BINDING_HOST_ID] = container.host
+        try:
+            return self.update_port(port['id'], port_req_body, admin=True)
+        except n_exceptions.PortNotFoundClient:
+            LOG.debug('Pooled port %s no longer exists.', port['id'])
+            return None
+
     def delete_or_unbind_ports(self, ports, ports_to_delete):
+        pool = port_pool.get_pool()
         for port_id in ports:
             try:
                 if port_id in ports_to_delete:
+                    if pool and pool.release(port_id):
+                        continue
                     self.delete_port(port_id)
                 else:
                     self._unbind_port(port_id)
@@ -0,0 +1,249 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pool of the unbound Neutron ports of a compute host.
+
+The ports are pooled by network, project and security groups. A pool is
+known once a container of the host requested a port of its key, and is
+replenished to ``port_pool_min_size`` ports by a background thread. The
+ports handed out by the pool, or created for a key while its pool was empty,
+go back to the pool when the container is deleted, unless the pool holds
+``port_pool_max_size`` ports or the security groups of the port changed.
+
+The pooled ports are named after the host, so that the ports left over by a
+zun-compute which did not stop cleanly are deleted when it starts again.
+"""
+
+import collections
+import threading
+
+from neutronclient.common import exceptions as n_exceptions
+from oslo_log import log as logging
+
+from zun.common import clients
+from zun.common import consts
+from zun.common import context as zun_context
+import zun.conf
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+_pool = None
+
+
+def pool_key(network_id, project_id, security_groups):
+    """Return the key of the pool of the ports matching a request.
+
+    :param security_groups: the IDs of the requested security groups, or
+                            None for the default security group.
+    """
+    if security_groups is not None:
+        security_groups = tuple(sorted(security_groups))
+    return network_id, project_id, security_groups
+
+
+class PortPool(object):
+    """The pools of unbound ports of the host, replenished in the background.
+    """
+
+    def __init__(self, host, min_size, max_size, refill_interval):
+        self.port_name = 'zun-port-pool-%s' % host
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.refill_interval = refill_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pools = collections.defaultdict(collections.deque)
+        # The key and the security groups of the ports taken from, or
+        # created for, a pool, by port ID.
+        self._ports = {}
+        self._running = False
+        self._thread = None
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            context = zun_context.get_admin_context()
+            self._client = clients.OpenStackClients(context).neutron()
+        return self._client
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        self._delete_ports(self._list_leftover_ports())
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and delete the pooled ports."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            ports = [port['id'] for pool in self._pools.values()
+                     for port in pool]
+            self._pools.clear()
+            self._ports.clear()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self._delete_ports(ports)
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.refill_interval)
+            self._wakeup.clear()
+            if self._running:
+                self.refill()
+
+    def take(self, key):
+        """Take a port of the pool of a key.
+
+        :returns: the port, or None if the pool is empty.
+        """
+        with self._lock:
+            if not self._running:
+                return None
+            pool = self._pools[key]
+            port = pool.popleft() if pool else None
+            if len(pool) < self.min_size:
+                self._wakeup.set()
+        if port is not None:
+            self.track(key, port)
+        return port
+
+    def track(self, key, port):
+        """Return the port to the pool of a key once released."""
+        with self._lock:
+            if self._running:
+                self._ports[port['id']] = (key,
+                                           sorted(port['security_groups']))
+
+    def release(self, port_id):
+        """Unbind a released port and return it to its pool.
+
+        :returns: whether the port went back to the pool. If not, the port
+                  is to be deleted by the caller.
+        """
+        with self._lock:
+            key, security_groups = self._ports.pop(port_id, (None, None))
+            if key is None or len(self._pools[key]) >= self.max_size:
+                return False
+
+        client = self._get_client()
+        try:
+            port = client.show_port(port_id)['port']
+            if sorted(port['security_groups']) != security_groups:
+                return False
+            port_req_body = {'port': {
+                'name': self.port_name,
+                'device_id': '',
+                'device_owner': '',
+                consts.BINDING_HOST_ID: None,
+                consts.BINDING_PROFILE: {},
+            }}
+            port = client.update_port(port_id, port_req_body)['port']
+        except Exception:
+            LOG.exception("Unable to return port '%s' to the pool", port_id)
+            return False
+
+        with self._lock:
+            if not self._running:
+                return False
+            self._pools[key].append(port)
+        return True
+
+    def refill(self):
+        """Create the ports missing to the pools."""
+        with self._lock:
+            missing = {key: self.min_size - len(pool)
+                       for key, pool in self._pools.items()
+                       if len(pool) < self.min_size}
+
+        for key, count in missing.items():
+            network_id, project_id, security_groups = key
+            port_dict = {
+                'name': self.port_name,
+                'network_id': network_id,
+                'tenant_id': project_id,
+            }
+            if security_groups is not None:
+                port_dict['security_groups'] = list(security_groups)
+            try:
+                ports = self._get_client().create_port(
+                    {'ports': [dict(port_dict) for i in range(count)]}
+                )['ports']
+            except n_exceptions.NetworkNotFoundClient:
+                LOG.warning('Network %s not found, drop its port pool.',
+                            network_id)
+                with self._lock:
+                    ports = list(self._pools.pop(key, []))
+                self._delete_ports([port['id'] for port in ports])
+                continue
+            except Exception:
+                LOG.exception('Failed to create %(count)d ports of network '
+                              '%(network)s for the pool.',
+                              {'count': count, 'network': network_id})
+                continue
+
+            with self._lock:
+                if self._running:
+                    self._pools[key].extend(ports)
+                    ports = []
+            # The pool stopped while creating the ports.
+            self._delete_ports([port['id'] for port in ports])
+
+    def _list_leftover_ports(self):
+        try:
+            ports = self._get_client().list_ports(
+                name=self.port_name, device_id='')['ports']
+        except Exception:
+            LOG.exception('Failed to list the ports left in the pool.')
+            return []
+        return [port['id'] for port in ports]
+
+    def _delete_ports(self, port_ids):
+        for port_id in port_ids:
+            try:
+                self._get_client().delete_port(port_id)
+            except n_exceptions.PortNotFoundClient:
+                pass
+            except Exception:
+                LOG.exception("Unable to delete pooled port '%s'", port_id)
+
+
+def get_pool():
+    """Return the port pool of the process, or None if not started."""
+    return _pool
+
+
+def start_pool():
+    """Pool the Neutron ports of the host if configured to."""
+    global _pool
+    if not CONF.network.port_pool_min_size:
+        return
+    if _pool is None:
+        _pool = PortPool(CONF.host, CONF.network.port_pool_min_size,
+                         CONF.network.port_pool_max_size,
+                         CONF.network.port_pool_refill_interval)
+    _pool.start()
+
+
+def stop_pool():
+    """Stop pooling the Neutron ports and delete the pooled ports."""
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
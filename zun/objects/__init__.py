@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from zun.objects import cached_image
 from zun.objects import compute_node
 from zun.objects import container
 from zun.objects import container_action
@@ -25,6 +26,7 @@ from zun.objects import registry
 from zun.objects import request_group
 from zun.objects import resource_class
 from zun.objects import resource_provider
+from zun.objects import stream_instance
 from zun.objects import vif
 from zun.objects import volume
 from zun.objects import volume_mapping
@@ -58,6 +60,8 @@ ExecInstance = exec_instance.ExecInstance
 Registry = registry.Registry
 RequestGroup = request_group.RequestGroup
 VIFState = vif.VIFState
+CachedImage = cached_image.CachedImage
+StreamInstance = stream_instance.StreamInstance
 
 __all__ = (
     'Container',
@@ -85,4 +89,6 @@ __all__ = (
     'Registry',
     'RequestGroup',
     'VIFState',
+    'CachedImage',
+    'StreamInstance',
 )
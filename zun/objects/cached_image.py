@@ -0,0 +1,75 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_versionedobjects import fields
+
+from zun.db import api as dbapi
+from zun.objects import base
+
+
+@base.ZunObjectRegistry.register
+class CachedImage(base.ZunPersistentObject, base.ZunObject):
+    # Version 1.0: Initial version
+    # Version 1.1: Add project_id and registry_id
+    VERSION = '1.1'
+
+    fields = {
+        'id': fields.IntegerField(read_only=True),
+        'driver': fields.StringField(),
+        'repo': fields.StringField(),
+        'tag': fields.StringField(),
+        'project_id': fields.StringField(nullable=True),
+        'registry_id': fields.IntegerField(nullable=True),
+        'found': fields.BooleanField(),
+    }
+
+    @staticmethod
+    def _from_db_object(cached_image, db_cached_image):
+        """Converts a database entity to a formal object."""
+        for field in cached_image.fields:
+            setattr(cached_image, field, db_cached_image[field])
+
+        cached_image.obj_reset_changes()
+        return cached_image
+
+    @base.remotable_classmethod
+    def get(cls, context, driver, repo, tag, registry_id=None):
+        """Find whether an image driver found an image for the project.
+
+        :param context: Security context
+        :param driver: the name of the image driver.
+        :param repo: the repo of the image.
+        :param tag: the tag of the image.
+        :param registry_id: the id of the registry of the image, if any.
+        :returns: a :class:`CachedImage` object.
+        """
+        db_cached_image = dbapi.get_cached_image(
+            context, driver, repo, tag, context.project_id, registry_id)
+        return CachedImage._from_db_object(cls(context), db_cached_image)
+
+    @base.remotable_classmethod
+    def cache(cls, context, driver, repo, tag, found, registry_id=None):
+        """Record whether an image driver found an image for the project.
+
+        :param context: Security context
+        :param driver: the name of the image driver.
+        :param repo: the repo of the image.
+        :param tag: the tag of the image.
+        :param found: whether the image was found.
+        :param registry_id: the id of the registry of the image, if any.
+        :returns: a :class:`CachedImage` object.
+        """
+        db_cached_image = dbapi.cache_image(
+            context, {'driver': driver, 'repo': repo, 'tag': tag,
+                      'project_id': context.project_id,
+                      'registry_id': registry_id, 'found': found})
+        return CachedImage._from_db_object(cls(context), db_cached_image)
@@ -36,7 +36,8 @@ class ComputeNode(base.ZunPersistentObject, base.ZunObject):
     # Version 1.12: Add runtimes field
     # Version 1.13: Add enable_cpu_pinning field
     # Version 1.14: Add rp_uuid field
-    VERSION = '1.14'
+    # Version 1.15: Add list_timestamps
+    VERSION = '1.15'
 
     fields = {
         'uuid': fields.UUIDField(read_only=True, nullable=False),
@@ -158,6 +159,16 @@ class ComputeNode(base.ZunPersistentObject, base.ZunObject):
         return ComputeNode._from_db_object_list(
             db_compute_nodes, cls, context)
 
+    @base.remotable_classmethod
+    def list_timestamps(cls, context):
+        """Return the time of the last update of all the compute nodes.
+
+        :param context: Security context.
+        :returns: a dict of the time of the last update, or of the creation
+                  if never updated, of the compute nodes keyed by uuid.
+        """
+        return dbapi.list_compute_node_timestamps(context)
+
     @base.remotable
     def destroy(self, context=None):
         """Delete the ComputeNode from the DB.
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from oslo_log import log as logging
 from oslo_versionedobjects import fields
 
@@ -189,24 +191,32 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
 
     @base.remotable_classmethod
     def list(cls, context, limit=None, marker=None,
-             sort_key=None, sort_dir=None, filters=None):
+             sort_key=None, sort_dir=None, filters=None,
+             expected_attrs=None):
         """Return a list of Container objects.
 
         :param context: Security context.
         :param limit: maximum number of resources to return in a single result.
-        :param marker: pagination marker for large data sets.
+        :param marker: pagination marker for large data sets, either the
+                       last object of the previous page or a dict of its
+                       sort key values.
         :param sort_key: column to sort results by.
         :param sort_dir: direction to sort. "asc" or "desc".
         :param filters: filters when list containers, the filter name could be
                         'name', 'image', 'project_id', 'user_id', 'memory'.
                         For example, filters={'image': 'nginx'}
+        :param expected_attrs: the optional attributes to load for all the
+                               containers at once, e.g. ['registry'].
         :returns: a list of :class:`Container` object.
 
         """
         db_containers = dbapi.list_containers(
             context, cls.container_type, limit=limit, marker=marker,
             sort_key=sort_key, sort_dir=sort_dir, filters=filters)
-        return cls._from_db_object_list(db_containers, cls, context)
+        containers = cls._from_db_object_list(db_containers, cls, context)
+        if expected_attrs:
+            cls._load_attrs_in_bulk(context, containers, expected_attrs)
+        return containers
 
     @base.remotable_classmethod
     def list_by_host(cls, context, host):
@@ -294,6 +304,24 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
 
         self.obj_reset_changes()
 
+    @staticmethod
+    def save_all(context, containers, fields):
+        """Save the given fields of several containers in one batch.
+
+        :param context: Security context.
+        :param containers: a list of :class:`Container` objects.
+        :param fields: the names of the fields to be saved.
+        """
+        values = []
+        for container in containers:
+            updates = {field: getattr(container, field) for field in fields}
+            updates['id'] = container.id
+            values.append(updates)
+        dbapi.update_containers(context, values)
+
+        for container in containers:
+            container.obj_reset_changes(fields)
+
     @base.remotable
     def refresh(self, context=None):
         """Loads updates for this Container.
@@ -358,6 +386,50 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
             self.registry = registry.Registry.get_by_id(
                 self._context, self.registry_id)
 
+    @classmethod
+    def _load_attrs_in_bulk(cls, context, containers, attrs):
+        """Load optional attributes of a list of containers.
+
+        Each attribute is loaded with a single query for all the containers
+        instead of a query per container when it is lazy-loaded.
+        """
+        if not containers:
+            return
+
+        if 'pci_devices' in attrs:
+            devices = collections.defaultdict(list)
+            for device in pci_device.PciDevice.list_by_container_uuids(
+                    context, [c.uuid for c in containers]):
+                devices[device.container_uuid].append(device)
+            for container in containers:
+                container.pci_devices = devices[container.uuid]
+                container.obj_reset_changes(['pci_devices'])
+
+        if 'exec_instances' in attrs:
+            exec_instances = collections.defaultdict(list)
+            for exec_instance in exec_inst.ExecInstance.list_by_container_ids(
+                    context, [c.id for c in containers]):
+                exec_instances[exec_instance.container_id].append(
+                    exec_instance)
+            for container in containers:
+                container.exec_instances = exec_instances[container.id]
+                container.obj_reset_changes(['exec_instances'])
+
+        if 'registry' in attrs:
+            registry_ids = set(c.registry_id for c in containers
+                               if c.registry_id)
+            registries = {}
+            if registry_ids:
+                registries = {r.id: r for r in registry.Registry.list(
+                    context, filters={'id': list(registry_ids)})}
+            for container in containers:
+                if container.registry_id and \
+                        container.registry_id not in registries:
+                    # Leave it to the lazy-loading to report the error
+                    continue
+                container.registry = registries.get(container.registry_id)
+                container.obj_reset_changes(['registry'])
+
     @base.remotable_classmethod
     def get_count(cls, context, project_id, flag):
         """Get the counts of Container objects in the database.
@@ -375,6 +447,17 @@ class ContainerBase(base.ZunPersistentObject, base.ZunObject):
                                   flag)[0] or 0.0
         return usage
 
+    @base.remotable_classmethod
+    def get_usages(cls, context, project_id):
+        """Get the counts of all the resources of a project at once.
+
+        :param context: The request context for database access.
+        :param project_id: The project_id to count across.
+        :returns: A dict of the usage of the containers, memory, cpu and
+                  disk resources, as returned by :meth:`get_count`.
+        """
+        return dbapi.count_usages(context, cls.container_type, project_id)
+
 
 @base.ZunObjectRegistry.register
 class Container(ContainerBase):
@@ -423,7 +506,9 @@ class Container(ContainerBase):
     # Version 1.42: Remove 'meta' attribute
     # Version 1.43: Add 'cni_metadata' attribute
     # Version 1.44: Add 'entrypoint' attribute
-    VERSION = '1.44'
+    # Version 1.45: Add 'expected_attrs' to list
+    # Version 1.46: Add 'get_usages' method
+    VERSION = '1.46'
 
     container_type = consts.TYPE_CONTAINER
 
@@ -435,7 +520,9 @@ class Capsule(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'expected_attrs' to list
+    # Version 1.6: Add 'get_usages' method
+    VERSION = '1.6'
 
     container_type = consts.TYPE_CAPSULE
 
@@ -471,6 +558,26 @@ class Capsule(ContainerBase):
         self.init_containers = CapsuleInitContainer.list_by_capsule_id(
             self._context, self.id)
 
+    @classmethod
+    def _load_attrs_in_bulk(cls, context, capsules, attrs):
+        super(Capsule, cls)._load_attrs_in_bulk(context, capsules, attrs)
+        if not capsules:
+            return
+
+        for attr, container_cls in (('containers', CapsuleContainer),
+                                    ('init_containers',
+                                     CapsuleInitContainer)):
+            if attr not in attrs:
+                continue
+            containers = collections.defaultdict(list)
+            for container in container_cls.list(
+                    context, filters={'capsule_id': [c.id for c in capsules]},
+                    expected_attrs=['registry']):
+                containers[container.capsule_id].append(container)
+            for capsule in capsules:
+                setattr(capsule, attr, containers[capsule.id])
+                capsule.obj_reset_changes([attr])
+
 
 @base.ZunObjectRegistry.register
 class CapsuleContainer(ContainerBase):
@@ -479,7 +586,9 @@ class CapsuleContainer(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'expected_attrs' to list
+    # Version 1.6: Add 'get_usages' method
+    VERSION = '1.6'
 
     container_type = consts.TYPE_CAPSULE_CONTAINER
 
@@ -508,7 +617,9 @@ class CapsuleInitContainer(ContainerBase):
     # Version 1.2: Add 'annotations' attributes
     # Version 1.3: Remove 'meta' attribute
     # Version 1.4: Add 'cni_metadata' attribute
-    VERSION = '1.4'
+    # Version 1.5: Add 'expected_attrs' to list
+    # Version 1.6: Add 'get_usages' method
+    VERSION = '1.6'
 
     container_type = consts.TYPE_CAPSULE_INIT_CONTAINER
 
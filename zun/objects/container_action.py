@@ -28,7 +28,8 @@ class ContainerAction(base.ZunPersistentObject, base.ZunObject):
     # Version 1.0: Initial version
     # Version 1.1: Add uuid column.
     # Version 1.2: Remove uuid column.
-    VERSION = '1.2'
+    # Version 1.3: Add limit and marker to get_by_container_uuid.
+    VERSION = '1.3'
 
     fields = {
         'id': fields.IntegerField(),
@@ -102,15 +103,18 @@ class ContainerAction(base.ZunPersistentObject, base.ZunObject):
             return cls._from_db_object(context, cls(context), db_action)
 
     @base.remotable_classmethod
-    def get_by_container_uuid(cls, context, container_uuid):
-        db_actions = dbapi.actions_get(context, container_uuid)
+    def get_by_container_uuid(cls, context, container_uuid, limit=None,
+                              marker=None):
+        db_actions = dbapi.actions_get(context, container_uuid, limit=limit,
+                                       marker=marker)
         return ContainerAction._from_db_object_list(context, cls, db_actions)
 
 
 @base.ZunObjectRegistry.register
 class ContainerActionEvent(base.ZunPersistentObject, base.ZunObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add record_batch
+    VERSION = '1.1'
     fields = {
         'id': fields.IntegerField(),
         'event': fields.StringField(nullable=True),
@@ -147,6 +151,10 @@ class ContainerActionEvent(base.ZunPersistentObject, base.ZunObject):
     @staticmethod
     def pack_action_event_finish(context, container_uuid, event_name,
                                  exc_val=None, exc_tb=None):
+        if exc_val:
+            exc_val = str(exc_val)
+        if exc_tb and not isinstance(exc_tb, str):
+            exc_tb = ''.join(traceback.format_tb(exc_tb))
         values = {'event': event_name,
                   'container_uuid': container_uuid,
                   'request_id': context.request_id,
@@ -171,10 +179,6 @@ class ContainerActionEvent(base.ZunPersistentObject, base.ZunObject):
     @base.remotable_classmethod
     def event_finish(cls, context, container_uuid, event_name, exc_val=None,
                      exc_tb=None, want_result=None):
-        if exc_val:
-            exc_val = str(exc_val)
-        if exc_tb and not isinstance(exc_tb, str):
-            exc_tb = ''.join(traceback.format_tb(exc_tb))
         values = cls.pack_action_event_finish(context, container_uuid,
                                               event_name, exc_val=exc_val,
                                               exc_tb=exc_tb)
@@ -182,6 +186,14 @@ class ContainerActionEvent(base.ZunPersistentObject, base.ZunObject):
         if want_result:
             return cls._from_db_object(context, cls(context), db_event)
 
+    @base.remotable_classmethod
+    def record_batch(cls, context, events, actions):
+        """Record the packed values of several events and finished actions.
+
+        :returns: the values of the events and actions which were not found.
+        """
+        return dbapi.action_events_record(context, events, actions)
+
     @base.remotable_classmethod
     def get_by_action(cls, context, action_id):
         db_events = dbapi.action_events_get(context, action_id)
@@ -69,7 +69,9 @@ class Image(base.ZunPersistentObject, base.ZunObject):
 
         :param context: Security context.
         :param limit: maximum number of resources to return in a single result.
-        :param marker: pagination marker for large data sets.
+        :param marker: pagination marker for large data sets, either the
+                       last object of the previous page or a dict of its
+                       sort key values.
         :param sort_key: column to sort results by.
         :param sort_dir: direction to sort. "asc" or "desc".
         :param filters: filters when list images, the filter name could be
@@ -0,0 +1,58 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_versionedobjects import fields
+
+from zun.db import api as dbapi
+from zun.objects import base
+from zun.objects import fields as z_fields
+
+
+@base.ZunObjectRegistry.register
+class StreamInstance(base.ZunPersistentObject, base.ZunObject):
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+
+    fields = {
+        'id': fields.IntegerField(),
+        'container_id': fields.IntegerField(nullable=False),
+        'token': fields.StringField(nullable=False),
+        'type': fields.StringField(nullable=False),
+        'url': fields.StringField(nullable=True),
+        'params': z_fields.JsonField(nullable=True),
+    }
+
+    @staticmethod
+    def _from_db_object(stream_inst, db_stream_inst):
+        """Converts a database entity to a formal object."""
+        for field in stream_inst.fields:
+            setattr(stream_inst, field, db_stream_inst[field])
+
+        stream_inst.obj_reset_changes()
+        return stream_inst
+
+    @base.remotable_classmethod
+    def consume(cls, context, token):
+        """Find a stream instance by its token and delete it.
+
+        :param context: Security context
+        :param token: The token of the stream instance.
+        :returns: a :class:`StreamInstance` object.
+        """
+        db_stream_inst = dbapi.consume_stream_instance(context, token)
+        return StreamInstance._from_db_object(cls(context), db_stream_inst)
+
+    @base.remotable
+    def create(self, context):
+        values = self.obj_get_changes()
+        db_stream_inst = dbapi.create_stream_instance(context, values)
+        self._from_db_object(self, db_stream_inst)
@@ -31,8 +31,9 @@ class BaseFilter(object):
         """Yield objects that pass the filter.
 
         Can be overridden in a subclass, if you need to base filtering
-        decisions on all objects.  Otherwise, one can just override
-        _filter_one() to filter a single object.
+        decisions on all objects, or to evaluate the request once for all
+        the objects and return a list of the objects that pass. Otherwise,
+        one can just override _filter_one() to filter a single object.
         """
         for obj in filter_obj_list:
             if self._filter_one(obj, container, extra_spec):
@@ -82,10 +83,9 @@ class BaseFilterHandler(loadables.BaseLoader):
                                                       "start": start_count,
                                                       "end": end_count})
                 if list_objs:
-                    remaining = [(getattr(obj, "host", obj),
-                                  getattr(obj, "nodename", ""))
-                                 for obj in list_objs]
-                    full_filter_results.append((cls_name, remaining))
+                    # The remaining objects are only formatted if all the
+                    # objects are filtered out.
+                    full_filter_results.append((cls_name, list_objs))
                 else:
                     LOG.info("Filter %s returned 0 hosts", cls_name)
                     full_filter_results.append((cls_name, None))
@@ -94,6 +94,11 @@ class BaseFilterHandler(loadables.BaseLoader):
                           "%(obj_len)d host(s)",
                           {'cls_name': cls_name, 'obj_len': len(list_objs)})
         if not list_objs:
+            full_filter_results = [
+                (cls_name, remaining and [(getattr(obj, "host", obj),
+                                           getattr(obj, "nodename", ""))
+                                          for obj in remaining])
+                for cls_name, remaining in full_filter_results]
             cnt_uuid = container.uuid
             msg_dict = {"cnt_uuid": cnt_uuid,
                         "str_results": str(full_filter_results)}
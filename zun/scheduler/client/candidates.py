@@ -0,0 +1,137 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cache of the allocation candidates returned by placement."""
+
+import threading
+import time
+
+from oslo_log import log as logging
+
+import zun.conf
+
+CONF = zun.conf.CONF
+LOG = logging.getLogger(__name__)
+
+_cache = None
+
+
+class _PendingQuery(object):
+    """A query of allocation candidates other requests can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class AllocationCandidateCache(object):
+    """Share the allocation candidates between requests of the same shape.
+
+    The candidates are keyed by the query string of the resource request, so
+    that the requests asking for the same resources, traits and aggregates
+    share them for ``ttl`` seconds. The identical requests made while the
+    candidates are queried wait for the result of that query instead of
+    querying placement on their own. Failed queries are not cached.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get(self, key, query):
+        """Return the candidates of the key and whether they were cached.
+
+        :param key: the shape of the request.
+        :param query: a callable querying placement for the candidates of
+                      the key. It returns a tuple of (allocation_requests,
+                      provider_summaries, allocation_request_version).
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > now:
+                    self.hits += 1
+                    return result, True
+                del self._entries[key]
+            pending = self._pending.get(key)
+            leader = pending is None
+            if leader:
+                self.misses += 1
+                pending = _PendingQuery()
+                self._pending[key] = pending
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result, False
+
+        try:
+            result = query()
+        except Exception as e:
+            pending.error = e
+            raise
+        else:
+            pending.result = result
+            with self._lock:
+                if result[0] and self._pending.get(key) is pending:
+                    self._entries[key] = (time.monotonic() + self.ttl, result)
+        finally:
+            with self._lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+            pending.done.set()
+        return result, False
+
+    def invalidate(self):
+        """Drop all the cached candidates."""
+        with self._lock:
+            self.invalidations += 1
+            self._entries = {}
+            # The result of a query in progress may predate the failure, it
+            # is returned to its waiters but not cached.
+            self._pending = {}
+
+    def stats(self):
+        """Return the counters of the cache."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'coalesced': self.coalesced,
+                    'invalidations': self.invalidations}
+
+
+def get_cache():
+    """Return the cache of the process, or None if it is disabled."""
+    global _cache
+    ttl = CONF.scheduler.allocation_candidates_cache_ttl
+    if not ttl:
+        return None
+    if _cache is None or _cache.ttl != ttl:
+        _cache = AllocationCandidateCache(ttl)
+    return _cache
+
+
+def invalidate():
+    """Drop the cached candidates after a failure to claim them."""
+    if _cache is not None:
+        _cache.invalidate()
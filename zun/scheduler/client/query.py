@@ -14,6 +14,7 @@
 #    under the License.
 
 import collections
+import functools
 
 from keystoneauth1 import exceptions as ks_exc
 from oslo_log import log as logging
@@ -22,6 +23,7 @@ from stevedore import driver
 from zun.common import consts
 from zun.common import exception
 import zun.conf
+from zun.scheduler.client import candidates
 from zun.scheduler.client import report
 from zun.scheduler import request_filter
 from zun.scheduler import utils
@@ -51,16 +53,38 @@ class SchedulerClient(object):
             self.placement_client._ensure_traits(context, consts.CUSTOM_TRAITS)
             self.traits_ensured = True
 
-        alloc_reqs_by_rp_uuid, provider_summaries, allocation_request_version \
-            = None, None, None
         request_filter.process_reqspec(context, extra_specs)
         resources = utils.resources_from_request_spec(
             context, containers[0], extra_specs)
 
+        cache = candidates.get_cache()
+        if cache is None:
+            return self._select_destinations(
+                context, containers, extra_specs,
+                self._get_allocation_candidates(context, resources))
+
+        key = resources.to_querystring()
+        query = functools.partial(self._get_allocation_candidates, context,
+                                  resources)
+        res, cached = cache.get(key, query)
+        LOG.debug("Allocation candidates cache: %s", cache.stats())
+        try:
+            return self._select_destinations(context, containers,
+                                             extra_specs, res)
+        except exception.NoValidHost:
+            if not cached:
+                raise
+        LOG.debug("No valid host in the cached allocation candidates, "
+                  "retrying with fresh ones.")
+        cache.invalidate()
+        res, cached = cache.get(key, query)
+        return self._select_destinations(context, containers, extra_specs,
+                                         res)
+
+    def _get_allocation_candidates(self, context, resources):
         try:
-            res = self.placement_client.get_allocation_candidates(context,
-                                                                  resources)
-            (alloc_reqs, provider_summaries, allocation_request_version) = res
+            return self.placement_client.get_allocation_candidates(context,
+                                                                   resources)
         except (ks_exc.EndpointNotFound,
                 ks_exc.MissingAuthPlugin,
                 ks_exc.Unauthorized,
@@ -68,8 +92,10 @@ class SchedulerClient(object):
                 ks_exc.ConnectFailure):
             # We have to handle the case that we failed to connect to the
             # Placement service.
-            alloc_reqs, provider_summaries, allocation_request_version = (
-                None, None, None)
+            return None, None, None
+
+    def _select_destinations(self, context, containers, extra_specs, res):
+        (alloc_reqs, provider_summaries, allocation_request_version) = res
         if not alloc_reqs:
             LOG.info("Got no allocation candidates from the Placement "
                      "API. This could be due to insufficient resources "
@@ -13,10 +13,12 @@
 """
 The FilterScheduler is for scheduling container to a host according to
 your filters configured.
-You can customize this scheduler by specifying your own Host Filters.
+You can customize this scheduler by specifying your own Host Filters and
+Weighing Functions.
 """
 
 from oslo_log.log import logging
+from oslo_utils import excutils
 
 from zun.common import exception
 from zun.common.i18n import _
@@ -25,8 +27,9 @@ from zun import objects
 from zun.scheduler.client import report
 from zun.scheduler import driver
 from zun.scheduler import filters
-from zun.scheduler.host_state import HostState
+from zun.scheduler import host_manager
 from zun.scheduler import utils
+from zun.scheduler import weights
 
 
 CONF = zun.conf.CONF
@@ -44,39 +47,43 @@ class FilterScheduler(driver.Scheduler):
         self.filter_cls_map = {cls.__name__: cls for cls in filter_classes}
         self.filter_obj_map = {}
         self.enabled_filters = self._choose_host_filters(self._load_filters())
+        self.weight_handler = weights.HostWeightHandler()
+        weigher_classes = self.weight_handler.get_matching_classes(
+            CONF.scheduler.weight_classes)
+        self.weighers = [cls() for cls in weigher_classes]
         self.placement_client = report.SchedulerReportClient()
+        self.host_manager = host_manager.get_host_manager()
 
-    def _schedule(self, context, container, extra_specs, alloc_reqs_by_rp_uuid,
-                  provider_summaries, allocation_request_version=None):
-        """Picks a host according to filters."""
-        elevated = context.elevated()
-
+    def _get_host_states(self, context, provider_summaries):
+        """Get the states of the hosts to schedule the containers on."""
         # NOTE(jaypipes): provider_summaries being None is treated differently
         # from an empty dict. provider_summaries is None when we want to grab
         # all compute nodes.
         # The provider_summaries variable will be an empty dict when the
         # Placement API found no providers that match the requested
-        # constraints, which in turn makes compute_uuids an empty list and
-        # objects.ComputeNode.list will return an empty list
-        # also, which will eventually result in a NoValidHost error.
-        compute_uuids = None
+        # constraints, which in turn makes rp_uuids an empty list and
+        # get_host_states will return an empty list also, which will
+        # eventually result in a NoValidHost error.
+        rp_uuids = None
         if provider_summaries is not None:
-            compute_uuids = list(provider_summaries.keys())
-        if compute_uuids is None:
-            nodes = objects.ComputeNode.list(context)
-        else:
-            nodes = objects.ComputeNode.list(
-                context, filters={'rp_uuid': compute_uuids})
+            rp_uuids = list(provider_summaries.keys())
 
         services = self._get_services_by_host(context)
-        hosts = services.keys()
-        nodes = [node for node in nodes if node.hostname in hosts]
-        host_states = self.get_all_host_state(nodes, services)
+        return self.host_manager.get_host_states(context, services,
+                                                 rp_uuids=rp_uuids)
+
+    def _schedule(self, context, container, host_states, extra_specs,
+                  alloc_reqs_by_rp_uuid, allocation_request_version=None):
+        """Picks a host according to filters."""
+        elevated = context.elevated()
+
         hosts = self._get_filtered_hosts(host_states, container, extra_specs)
         if not hosts:
             msg = _("Is the appropriate service running?")
             raise exception.NoValidHost(reason=msg)
 
+        hosts = self._get_sorted_hosts(container, hosts)
+
         # Attempt to claim the resources against one or more resource
         # providers, looping over the sorted list of possible hosts
         # looking for an allocation_request that contains that host's
@@ -119,6 +126,13 @@ class FilterScheduler(driver.Scheduler):
 
         return claimed_host
 
+    def _get_sorted_hosts(self, container, host_states):
+        """Returns a list of HostState objects sorted by weight."""
+        weighed_hosts = self.weight_handler.get_weighed_objects(
+            self.weighers, host_states, container)
+        LOG.debug("Weighed %(hosts)s", {'hosts': weighed_hosts})
+        return [h.obj for h in weighed_hosts]
+
     def _get_filtered_hosts(self, hosts, container, extra_specs):
         """Filter hosts and return only ones passing all filters."""
 
@@ -151,13 +165,21 @@ class FilterScheduler(driver.Scheduler):
                             alloc_reqs_by_rp_uuid, provider_summaries,
                             allocation_request_version=None):
         """Selects destinations by filters."""
+        # The host states are fetched once for all the containers and the
+        # resources of each selected host are consumed in memory, so that
+        # the following containers of the batch see the updated states.
+        host_states = self._get_host_states(context, provider_summaries)
         dests = []
-        for container in containers:
-            host = self._schedule(context, container, extra_specs,
-                                  alloc_reqs_by_rp_uuid, provider_summaries,
-                                  allocation_request_version)
+        for index, container in enumerate(containers):
+            try:
+                host = self._schedule(context, container, host_states,
+                                      extra_specs, alloc_reqs_by_rp_uuid,
+                                      allocation_request_version)
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    self._cleanup_allocations(context, containers[:index])
             host_state = dict(host=host.hostname, nodename=None,
-                              limits=host.limits)
+                              limits=dict(host.limits))
             dests.append(host_state)
 
         if len(dests) < 1:
@@ -166,6 +188,17 @@ class FilterScheduler(driver.Scheduler):
 
         return dests
 
+    def _cleanup_allocations(self, context, containers):
+        """Remove the allocations claimed for the given containers."""
+        if not containers:
+            return
+        LOG.debug("Cleaning up allocations for %s",
+                  [c.uuid for c in containers])
+        elevated = context.elevated()
+        for container in containers:
+            self.placement_client.delete_allocation_for_container(
+                elevated, container.uuid)
+
     def _choose_host_filters(self, filter_cls_names):
         """Choose good filters
 
@@ -202,15 +235,6 @@ class FilterScheduler(driver.Scheduler):
                     context,
                     'zun-compute')}
 
-    def get_all_host_state(self, nodes, services):
-        host_states = []
-        for node in nodes:
-            host_state = HostState(node.hostname)
-            host_state.update(compute_node=node,
-                              service=services.get(node.hostname))
-            host_states.append(host_state)
-        return host_states
-
     @staticmethod
     def _consume_selected_host(selected_host, container):
         LOG.debug("Selected host: %(host)s", {'host': selected_host})
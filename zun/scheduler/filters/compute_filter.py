@@ -40,8 +40,18 @@ class ComputeFilter(filters.BaseHostFilter):
                        'reason': service.disabled_reason or 'Unknow'})
             return False
         else:
-            if not self.servicegroup_api.service_is_up(service):
-                LOG.warning('%(host_state)s has not been heard from in '
-                            'a while', {'host_state': host_state.hostname})
-                return False
+            return self._service_is_up(host_state)
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        # The disabled hosts are not logged one by one here, the handler
+        # logs how many hosts each filter removed.
+        return [host_state for host_state in filter_obj_list
+                if not host_state.service.disabled and
+                self._service_is_up(host_state)]
+
+    def _service_is_up(self, host_state):
+        if not self.servicegroup_api.service_is_up(host_state.service):
+            LOG.warning('%(host_state)s has not been heard from in '
+                        'a while', {'host_state': host_state.hostname})
+            return False
         return True
@@ -49,3 +49,14 @@ class CPUFilter(filters.BaseHostFilter):
             return False
         host_state.limits['cpu'] = host_state.cpus
         return True
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        if not container.cpu:
+            return list(filter_obj_list)
+
+        request_cpu = container.cpu
+        passed = [host_state for host_state in filter_obj_list
+                  if host_state.cpus - host_state.cpu_used >= request_cpu]
+        for host_state in passed:
+            host_state.limits['cpu'] = host_state.cpus
+        return passed
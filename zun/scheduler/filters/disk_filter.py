@@ -56,3 +56,15 @@ class DiskFilter(filters.BaseHostFilter):
             return False
         host_state.limits['disk'] = host_state.disk_total
         return True
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        if not hasattr(container, 'disk') or not container.disk:
+            return list(filter_obj_list)
+
+        request_disk = container.disk
+        passed = [host_state for host_state in filter_obj_list
+                  if host_state.disk_quota_supported and
+                  host_state.disk_total - host_state.disk_used >= request_disk]
+        for host_state in passed:
+            host_state.limits['disk'] = host_state.disk_total
+        return passed
@@ -50,3 +50,14 @@ class RamFilter(filters.BaseHostFilter):
             return False
         host_state.limits['memory'] = host_state.mem_total
         return True
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        if not container.memory:
+            return list(filter_obj_list)
+
+        request_ram = int(container.memory)
+        passed = [host_state for host_state in filter_obj_list
+                  if host_state.mem_total - host_state.mem_used >= request_ram]
+        for host_state in passed:
+            host_state.limits['memory'] = host_state.mem_total
+        return passed
@@ -37,3 +37,11 @@ class RuntimeFilter(filters.BaseHostFilter):
                        'host_runtime': host_state.runtimes})
             return False
         return True
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        if not hasattr(container, 'runtime') or not container.runtime:
+            return list(filter_obj_list)
+
+        runtime = container.runtime
+        return [host_state for host_state in filter_obj_list
+                if runtime in host_state.runtimes]
@@ -0,0 +1,110 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Manage the states of the compute hosts seen by the scheduler.
+"""
+
+import threading
+
+from oslo_log import log as logging
+
+from zun import objects
+from zun.scheduler.host_state import HostState
+
+LOG = logging.getLogger(__name__)
+
+_host_manager = None
+
+
+class HostManager(object):
+    """Keep the states of the compute hosts in memory between requests.
+
+    The state of a host is only rebuilt from its compute node when the
+    compute node has been updated since it was last read, which saves
+    loading and deserializing the compute nodes for each request. The
+    resources consumed by the containers scheduled on a host stay accounted
+    in its state until the compute node reports a newer usage. Each request
+    is given copies of the states, which consume the resources of the
+    shared states.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The host states and the timestamps of their compute node, keyed by
+        # the uuid of the compute node.
+        self._host_states = {}
+        self._timestamps = {}
+
+    def _refresh(self, context):
+        timestamps = objects.ComputeNode.list_timestamps(context)
+
+        for uuid in set(self._host_states) - set(timestamps):
+            LOG.info('Removing the state of the deleted compute node %s',
+                     uuid)
+            del self._host_states[uuid]
+            del self._timestamps[uuid]
+
+        changed = [uuid for uuid, timestamp in timestamps.items()
+                   if uuid not in self._timestamps or
+                   self._timestamps[uuid] != timestamp]
+        if not changed:
+            return
+        if len(changed) == len(timestamps):
+            nodes = objects.ComputeNode.list(context)
+        else:
+            nodes = objects.ComputeNode.list(context,
+                                             filters={'uuid': changed})
+        LOG.debug('Updating the state of %d compute nodes', len(nodes))
+        for node in nodes:
+            host_state = self._host_states.get(node.uuid)
+            if host_state is None or host_state.hostname != node.hostname:
+                host_state = HostState(node.hostname)
+                self._host_states[node.uuid] = host_state
+            host_state.update(compute_node=node)
+            self._timestamps[node.uuid] = timestamps.get(node.uuid)
+
+    def get_host_states(self, context, services, rp_uuids=None):
+        """Return the states of the hosts with a service.
+
+        :param context: security context.
+        :param services: a dict of the compute services keyed by host.
+        :param rp_uuids: the uuids of the resource providers of the hosts to
+                         return, or None to return all the hosts.
+        """
+        with self._lock:
+            self._refresh(context)
+            # Each request gets its own copy of the states, since the
+            # filters of a request set the limits of the hosts.
+            host_states = [host_state.copy()
+                           for host_state in self._host_states.values()]
+
+        if rp_uuids is not None:
+            rp_uuids = set(rp_uuids)
+            host_states = [host_state for host_state in host_states
+                           if host_state.uuid in rp_uuids]
+        result = []
+        for host_state in host_states:
+            service = services.get(host_state.hostname)
+            if service is None:
+                continue
+            host_state.update(service=service)
+            result.append(host_state)
+        return result
+
+
+def get_host_manager():
+    """Return the host manager shared by the schedulers of the process."""
+    global _host_manager
+    if _host_manager is None:
+        _host_manager = HostManager()
+    return _host_manager
@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import functools
 
 from oslo_log.log import logging
@@ -48,12 +49,28 @@ class HostState(object):
         self.disk_quota_supported = False
         self.runtimes = []
         self.enable_cpu_pinning = False
+        self.total_containers = 0
 
         # Resource oversubscription values for the compute host:
         self.limits = {}
 
         self.updated = None
 
+        # The state this one was copied from for a scheduling request.
+        self._origin = None
+
+    def copy(self):
+        """Return a copy of the state for a scheduling request.
+
+        The limits set by the filters of the request are kept in the copy,
+        and the resources consumed from the copy are also consumed from
+        this state.
+        """
+        host_state = copy.copy(self)
+        host_state.limits = {}
+        host_state._origin = self
+        return host_state
+
     def update(self, compute_node=None, service=None):
         """Update information about a host"""
         @utils.synchronized((self.hostname, compute_node))
@@ -90,6 +107,7 @@ class HostState(object):
         self.disk_quota_supported = compute_node.disk_quota_supported
         self.runtimes = compute_node.runtimes
         self.enable_cpu_pinning = compute_node.enable_cpu_pinning
+        self.total_containers = compute_node.total_containers
         self.updated = compute_node.updated_at
 
     def consume_from_request(self, container):
@@ -104,7 +122,9 @@ class HostState(object):
             # sure its data is valid under concurrent write operations.
             self._locked_consume_from_request(container)
 
-        return _locked(self, container)
+        _locked(self, container)
+        if self._origin is not None:
+            self._origin.consume_from_request(container)
 
     def _locked_consume_from_request(self, container):
         disk = container.disk if container.disk else 0
@@ -114,6 +134,7 @@ class HostState(object):
         self.disk_used += disk
         self.cpu_used += vcpus
         self.mem_free = self.mem_total - self.mem_used
+        self.total_containers += 1
         # TODO(hongbin): track numa_topology and pci devices
 
     def __repr__(self):
@@ -25,6 +25,7 @@ from urllib import parse
 from zun.common import exception
 import zun.conf
 from zun import objects
+from zun.scheduler.client import candidates
 
 
 LOG = logging.getLogger(__name__)
@@ -426,7 +427,16 @@ def claim_resources(ctx, client, container, alloc_req,
     # due to consumer generation conflict, which in this case means the
     # consumer is not new, then we let the AllocationUpdateFailed propagate and
     # fail the build / migrate as the instance is in inconsistent state.
-    return client.claim_resources(
-        ctx, container_uuid, alloc_req, project_id, user_id,
-        allocation_request_version=allocation_request_version,
-        consumer_generation=None)
+    try:
+        claimed = client.claim_resources(
+            ctx, container_uuid, alloc_req, project_id, user_id,
+            allocation_request_version=allocation_request_version,
+            consumer_generation=None)
+    except exception.AllocationUpdateFailed:
+        candidates.invalidate()
+        raise
+    if not claimed:
+        # The allocation candidates shared by the requests of the same shape
+        # no longer match the usage seen by placement.
+        candidates.invalidate()
+    return claimed
@@ -0,0 +1,55 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+NUMA Weigher.  Weigh hosts by the fragmentation of their free pinned CPUs.
+
+The containers with a dedicated CPU policy are pinned to the CPUs of a single
+NUMA node.  A host whose free CPUs are gathered on a few NUMA nodes can fit
+larger dedicated containers than a host whose free CPUs are scattered across
+its nodes, so the former is preferred by default.  The weigher has no effect
+on the containers with a shared CPU policy.
+"""
+
+import zun.conf
+from zun.scheduler import weights
+
+CONF = zun.conf.CONF
+
+
+class NUMAWeigher(weights.BaseHostWeigher):
+    minval = 0
+    maxval = 1
+
+    def weight_multiplier(self):
+        """Override the weight multiplier."""
+        return CONF.scheduler.numa_weight_multiplier
+
+    def weigh_objects(self, weighed_obj_list, container):
+        if container.cpu_policy != 'dedicated':
+            return [0] * len(weighed_obj_list)
+        return super(NUMAWeigher, self).weigh_objects(weighed_obj_list,
+                                                      container)
+
+    def _weigh_object(self, host_state, container):
+        """Higher weights win.
+
+        The weight is the share of the free CPUs of the host which are on
+        its NUMA node with the most free CPUs.
+        """
+        if not host_state.numa_topology:
+            return 0
+        free_cpus = [node.avail_cpus
+                     for node in host_state.numa_topology.nodes]
+        if not sum(free_cpus):
+            return 0
+        return float(max(free_cpus)) / sum(free_cpus)
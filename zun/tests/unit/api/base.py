@@ -23,12 +23,13 @@ import pecan.testing
 from urllib import parse as urlparse
 
 from zun.api import hooks
+from zun.compute import api as compute_api
 import zun.conf
 from zun.tests.unit.db import base
 
 
 PATH_PREFIX = '/v1'
-CURRENT_VERSION = "container 1.40"
+CURRENT_VERSION = "container 1.45"
 
 
 class FunctionalTest(base.DbTestCase):
@@ -48,6 +49,7 @@ class FunctionalTest(base.DbTestCase):
         p = mock.patch('zun.scheduler.client.query.SchedulerClient')
         p.start()
         self.addCleanup(p.stop)
+        self.addCleanup(setattr, compute_api, '_api', None)
 
         # Determine where we are so we can set up paths in the config
         root_dir = self.get_path()
@@ -595,7 +595,10 @@ class TestCapsuleController(api_base.FunctionalTest):
 
         mock_capsule_list.assert_called_once_with(mock.ANY,
                                                   1000, None, 'id', 'asc',
-                                                  filters=None)
+                                                  filters=None,
+                                                  expected_attrs=[
+                                                      'containers',
+                                                      'init_containers'])
         context = mock_capsule_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -625,7 +628,10 @@ class TestCapsuleController(api_base.FunctionalTest):
 
         mock_capsule_list.assert_called_once_with(mock.ANY,
                                                   1000, None, 'id', 'asc',
-                                                  filters=None)
+                                                  filters=None,
+                                                  expected_attrs=[
+                                                      'containers',
+                                                      'init_containers'])
         context = mock_capsule_list.call_args[0][0]
         self.assertIs(True, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -652,7 +658,10 @@ class TestCapsuleController(api_base.FunctionalTest):
 
         mock_capsule_list.assert_called_once_with(mock.ANY,
                                                   1000, None, 'id', 'asc',
-                                                  filters=None)
+                                                  filters=None,
+                                                  expected_attrs=[
+                                                      'containers',
+                                                      'init_containers'])
         context = mock_capsule_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
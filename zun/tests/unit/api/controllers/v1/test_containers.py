@@ -17,6 +17,8 @@ from neutronclient.common import exceptions as n_exc
 from oslo_utils import uuidutils
 from webtest.app import AppError
 
+from zun.api.controllers.v1.containers import ContainersController
+from zun.api import utils as api_utils
 from zun.common import exception
 from zun import objects
 from zun.tests.unit.api import base as api_base
@@ -199,6 +201,100 @@ class TestContainerController(api_base.FunctionalTest):
         self.assertTrue(mock_container_create.call_args[1]['run'] is False)
         mock_neutron_get_network.assert_called_once()
 
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.containers_create')
+    def test_create_multiple_containers(self, mock_containers_create,
+                                        mock_neutron_get_network):
+        params = ('{"name": "MyDocker", "image": "ubuntu",'
+                  '"hostname": "worker", "memory": "512",'
+                  '"min_count": 2, "max_count": 3}')
+        with patch.object(
+                ContainersController, '_check_container_quotas') as mock_quota:
+            response = self.post('/v1/containers/',
+                                 params=params,
+                                 content_type='application/json')
+
+        self.assertEqual(202, response.status_int)
+        mock_quota.assert_called_once_with(mock.ANY, mock.ANY, count=3)
+        self.assertEqual(['MyDocker-1', 'MyDocker-2', 'MyDocker-3'],
+                         [c['name'] for c in response.json['containers']])
+        containers = mock_containers_create.call_args[0][1]
+        self.assertEqual(['worker-1', 'worker-2', 'worker-3'],
+                         [c.hostname for c in containers])
+        self.assertEqual(3, len(set(c.uuid for c in containers)))
+        self.assertIs(False, mock_containers_create.call_args[1]['run'])
+        mock_neutron_get_network.assert_called_once()
+
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.containers_create')
+    def test_create_multiple_containers_over_quota(self,
+                                                   mock_containers_create,
+                                                   mock_neutron_get_network):
+        params = ('{"image": "ubuntu", "min_count": 2, "max_count": 3}')
+        over_quota = exception.OverQuota(overs=['containers'])
+        with patch.object(
+                ContainersController, '_check_container_quotas',
+                side_effect=[over_quota, None]) as mock_quota:
+            response = self.post('/v1/containers/',
+                                 params=params,
+                                 content_type='application/json')
+
+            self.assertEqual(202, response.status_int)
+            mock_quota.assert_has_calls([
+                mock.call(mock.ANY, mock.ANY, count=3),
+                mock.call(mock.ANY, mock.ANY, count=2)])
+            self.assertEqual(2, len(response.json['containers']))
+            self.assertEqual(2, len(mock_containers_create.call_args[0][1]))
+
+            mock_quota.side_effect = over_quota
+            response = self.post('/v1/containers/', params=params,
+                                 content_type='application/json',
+                                 expect_errors=True)
+            self.assertEqual(403, response.status_int)
+
+    @patch('zun.objects.Container.destroy')
+    @patch('zun.network.neutron.NeutronAPI.get_available_network')
+    @patch('zun.compute.api.API.containers_create')
+    def test_create_multiple_containers_failed(self, mock_containers_create,
+                                               mock_neutron_get_network,
+                                               mock_destroy):
+        params = ('{"image": "ubuntu", "min_count": 3, "max_count": 3}')
+        with patch.object(
+                ContainersController, '_build_requested_volumes',
+                side_effect=[{}, {}, exception.ZunException()]):
+            response = self.post('/v1/containers/', params=params,
+                                 content_type='application/json',
+                                 expect_errors=True)
+
+        self.assertEqual(500, response.status_int)
+        # The containers created before the failure are destroyed, and
+        # none of them is scheduled.
+        self.assertEqual(3, mock_destroy.call_count)
+        self.assertFalse(mock_containers_create.called)
+
+    @patch('zun.compute.api.API.containers_create')
+    def test_create_multiple_containers_invalid(self, mock_containers_create):
+        for params in ('{"image": "ubuntu", "min_count": 3, "max_count": 2}',
+                       '{"image": "ubuntu", "max_count": 1001}',
+                       '{"image": "ubuntu", "max_count": 0}',
+                       '{"image": "ubuntu", "max_count": 2,'
+                       '"nets": [{"port": "port1"}]}',
+                       '{"image": "ubuntu", "max_count": 2,'
+                       '"mounts": [{"source": "vol1",'
+                       '"destination": "/data"}]}'):
+            response = self.post('/v1/containers/', params=params,
+                                 content_type='application/json',
+                                 expect_errors=True)
+            self.assertEqual(400, response.status_int)
+
+        headers = {"OpenStack-API-Version": "container 1.43"}
+        response = self.post('/v1/containers/',
+                             params='{"image": "ubuntu", "max_count": 2}',
+                             content_type='application/json',
+                             headers=headers, expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        self.assertFalse(mock_containers_create.called)
+
     @patch('zun.common.context.RequestContext.can')
     @patch('zun.network.neutron.NeutronAPI.get_available_network')
     @patch('zun.compute.api.API.container_create')
@@ -809,9 +905,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         response = self.get('/v1/containers/')
 
-        mock_container_list.assert_called_once_with(mock.ANY,
-                                                    1000, None, 'id', 'asc',
-                                                    filters={})
+        mock_container_list.assert_called_once_with(
+            mock.ANY, 1000, None, 'id', 'asc', filters={},
+            expected_attrs=['registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -831,9 +927,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         response = self.get('/v1/containers/')
 
-        mock_container_list.assert_called_once_with(mock.ANY,
-                                                    1000, None, 'id', 'asc',
-                                                    filters={})
+        mock_container_list.assert_called_once_with(
+            mock.ANY, 1000, None, 'id', 'asc', filters={},
+            expected_attrs=['registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(False, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -854,9 +950,9 @@ class TestContainerController(api_base.FunctionalTest):
 
         response = self.get('/v1/containers/?all_projects=1')
 
-        mock_container_list.assert_called_once_with(mock.ANY,
-                                                    1000, None, 'id', 'asc',
-                                                    filters={})
+        mock_container_list.assert_called_once_with(
+            mock.ANY, 1000, None, 'id', 'asc', filters={},
+            expected_attrs=['registry'])
         context = mock_container_list.call_args[0][0]
         self.assertIs(True, context.all_projects)
         self.assertEqual(200, response.status_int)
@@ -900,6 +996,47 @@ class TestContainerController(api_base.FunctionalTest):
         self.assertEqual(container_list[-1].uuid,
                          actual_containers[0].get('uuid'))
 
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_with_pagination_cursor(self,
+                                                       mock_container_list):
+        container_list = []
+        for id_ in range(4):
+            test_container = utils.create_test_container(
+                id=id_, uuid=uuidutils.generate_uuid(),
+                name='container' + str(id_), context=self.context)
+            container_list.append(objects.Container(self.context,
+                                                    **test_container))
+        mock_container_list.return_value = container_list[2:]
+        cursor = api_utils.encode_cursor(container_list[1], 'name')
+        response = self.get('/v1/containers/?limit=2&sort_key=name&cursor=%s'
+                            % cursor)
+
+        self.assertEqual(200, response.status_int)
+        mock_container_list.assert_called_once_with(
+            mock.ANY, 2, {'name': 'container1', 'id': 1}, 'name', 'asc',
+            filters={}, expected_attrs=['registry'])
+        next_cursor = api_utils.encode_cursor(container_list[3], 'name')
+        self.assertIn('cursor=%s' % next_cursor, response.json['next'])
+        self.assertNotIn('marker=', response.json['next'])
+
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_with_pagination_cursor_invalid(
+            self, mock_container_list):
+        response = self.get('/v1/containers/?cursor=WzFd',
+                            expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        response = self.get(
+            '/v1/containers/?cursor=eyJpZCI6IDF9&marker=%s'
+            % uuidutils.generate_uuid(), expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        headers = {"OpenStack-API-Version": "container 1.42"}
+        response = self.get('/v1/containers/?cursor=eyJpZCI6IDF9',
+                            headers=headers, expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        self.assertIn('Invalid param cursor',
+                      response.json['errors'][0]['detail'])
+        self.assertFalse(mock_container_list.called)
+
     @patch('zun.objects.Container.list')
     def test_get_all_containers_with_filter(self, mock_container_list):
         test_container = utils.get_test_container()
@@ -909,7 +1046,8 @@ class TestContainerController(api_base.FunctionalTest):
         response = self.get('/v1/containers/?name=fake-name')
 
         mock_container_list.assert_called_once_with(
-            mock.ANY, 1000, None, 'id', 'asc', filters={'name': 'fake-name'})
+            mock.ANY, 1000, None, 'id', 'asc', filters={'name': 'fake-name'},
+            expected_attrs=['registry'])
         self.assertEqual(200, response.status_int)
         actual_containers = response.json['containers']
         self.assertEqual(1, len(actual_containers))
@@ -954,15 +1092,94 @@ class TestContainerController(api_base.FunctionalTest):
         containers = [objects.Container(self.context, **test_container)]
         mock_container_list.return_value = containers
         response = self.get('/v1/containers/')
-        mock_container_list.assert_called_once_with(mock.ANY,
-                                                    1000, None, 'id', 'asc',
-                                                    filters={})
+        mock_container_list.assert_called_once_with(
+            mock.ANY, 1000, None, 'id', 'asc', filters={},
+            expected_attrs=['registry'])
         self.assertEqual(200, response.status_int)
         actual_containers = response.json['containers']
         self.assertEqual(1, len(actual_containers))
         self.assertEqual(test_container['uuid'],
                          actual_containers[0].get('uuid'))
 
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_with_fields(self, mock_container_list):
+        containers = []
+        for id_ in range(3):
+            test_container = utils.get_test_container(
+                id=id_, uuid=uuidutils.generate_uuid(),
+                name='container' + str(id_))
+            containers.append(objects.Container(self.context,
+                                                **test_container))
+        mock_container_list.return_value = containers
+
+        with patch('zun.common.context.RequestContext.can',
+                   return_value=True) as mock_can:
+            response = self.get('/v1/containers/?fields=name,status&limit=3')
+
+        self.assertEqual(200, response.status_int)
+        # the policies are evaluated once for all the containers
+        self.assertEqual(3, mock_can.call_count)
+        for container, actual in zip(containers,
+                                     response.json['containers']):
+            self.assertEqual({'uuid', 'name', 'status'}, set(actual))
+            self.assertEqual(container.name, actual['name'])
+        self.assertIn('fields=name,status&', response.json['next'])
+
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_policy_evaluated_once(self,
+                                                      mock_container_list):
+        containers = []
+        for id_ in range(5):
+            test_container = utils.get_test_container(
+                id=id_, uuid=uuidutils.generate_uuid())
+            containers.append(objects.Container(self.context,
+                                                **test_container))
+        mock_container_list.return_value = containers
+
+        with patch('zun.common.context.RequestContext.can',
+                   return_value=True) as mock_can:
+            response = self.get('/v1/containers/')
+
+        self.assertEqual(200, response.status_int)
+        self.assertEqual(5, len(response.json['containers']))
+        policy_actions = [c[0][0] for c in mock_can.call_args_list
+                          if 'get_one:' in c[0][0]]
+        self.assertEqual(len(set(policy_actions)), len(policy_actions))
+
+    @patch('zun.objects.Container.list')
+    def test_get_all_containers_with_invalid_fields(self,
+                                                    mock_container_list):
+        mock_container_list.return_value = []
+        response = self.get('/v1/containers/?fields=name,foo',
+                            expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        self.assertIn('Invalid fields: foo',
+                      response.json['errors'][0]['detail'])
+
+        headers = {"OpenStack-API-Version": "container 1.44"}
+        response = self.get('/v1/containers/?fields=name',
+                            headers=headers, expect_errors=True)
+        self.assertEqual(400, response.status_int)
+        self.assertIn('Invalid param fields',
+                      response.json['errors'][0]['detail'])
+
+    @patch('zun.compute.api.API.container_show')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_one_with_fields(self, mock_container_get_by_uuid,
+                                 mock_container_show):
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_container_get_by_uuid.return_value = test_container_obj
+        mock_container_show.return_value = test_container_obj
+
+        response = self.get('/v1/containers/%s/?fields=image,labels'
+                            % test_container['uuid'])
+
+        self.assertEqual(200, response.status_int)
+        self.assertEqual({'uuid', 'links', 'image', 'labels'},
+                         set(response.json))
+        self.assertEqual(test_container['labels'], response.json['labels'])
+
     @patch('zun.compute.api.API.container_show')
     @patch('zun.objects.Container.get_by_uuid')
     def test_get_one_by_uuid(self, mock_container_get_by_uuid,
@@ -1261,6 +1478,53 @@ class TestContainerController(api_base.FunctionalTest):
         mock_container_logs.assert_called_once_with(
             mock.ANY, test_container_obj, True, True, False, '1', '100000000')
 
+    @patch('zun.compute.api.API.container_logs_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_logs_stream(self, mock_get_by_uuid,
+                             mock_container_logs_stream):
+        mock_container_logs_stream.return_value = {'proxy_url': 'fake-url'}
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        response = self.get(
+            '/v1/containers/%s/logs?stream=True&follow=True&tail=10'
+            % container_uuid)
+        self.assertEqual(200, response.status_int)
+        self.assertEqual({'proxy_url': 'fake-url'}, response.json)
+        mock_container_logs_stream.assert_called_once_with(
+            mock.ANY, test_container_obj, True, True, False, '10', None,
+            True)
+
+    @patch('zun.compute.api.API.container_logs_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_logs_stream_wrong_api_version(self, mock_get_by_uuid,
+                                               mock_container_logs_stream):
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        headers = {"OpenStack-API-Version": "container 1.40"}
+        with self.assertRaisesRegex(AppError, "Invalid param stream"):
+            self.get('/v1/containers/%s/logs?stream=True' % container_uuid,
+                     headers=headers)
+        self.assertFalse(mock_container_logs_stream.called)
+
+    @patch('zun.compute.api.API.container_logs_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_logs_follow_without_stream(self, mock_get_by_uuid,
+                                            mock_container_logs_stream):
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        with self.assertRaisesRegex(AppError, "only supported with stream"):
+            self.get('/v1/containers/%s/logs?follow=True' % container_uuid)
+        self.assertFalse(mock_container_logs_stream.called)
+
     @patch('zun.compute.api.API.container_logs')
     @patch('zun.objects.Container.get_by_uuid')
     def test_get_logs_put_fails(self, mock_get_by_uuid, mock_container_logs):
@@ -1718,6 +1982,45 @@ class TestContainerController(api_base.FunctionalTest):
         container_get_archive.assert_called_once_with(
             mock.ANY, test_container_obj, cmd['path'], mock.ANY)
 
+    @patch('zun.common.utils.validate_container_state')
+    @patch('zun.compute.api.API.container_get_archive_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_archive_stream(self, mock_get_by_uuid,
+                                container_get_archive_stream,
+                                mock_validate):
+        container_get_archive_stream.return_value = {
+            'proxy_url': 'fake-url', 'stat': {}}
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        url = '/v1/containers/%s/%s/' % (container_uuid, 'get_archive')
+        response = self.get(url, {'path': '/home', 'stream': 'True'})
+        self.assertEqual(200, response.status_int)
+        self.assertEqual({'proxy_url': 'fake-url', 'stat': {}},
+                         response.json)
+        container_get_archive_stream.assert_called_once_with(
+            mock.ANY, test_container_obj, '/home')
+
+    @patch('zun.common.utils.validate_container_state')
+    @patch('zun.compute.api.API.container_get_archive_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_get_archive_stream_wrong_api_version(
+            self, mock_get_by_uuid, container_get_archive_stream,
+            mock_validate):
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        url = '/v1/containers/%s/%s/' % (container_uuid, 'get_archive')
+        headers = {"OpenStack-API-Version": "container 1.41"}
+        with self.assertRaisesRegex(AppError, "Invalid param stream"):
+            self.get(url, {'path': '/home', 'stream': 'True'},
+                     headers=headers)
+        self.assertFalse(container_get_archive_stream.called)
+
     def test_get_archive_by_uuid_invalid_state(self):
         uuid = uuidutils.generate_uuid()
         test_object = utils.create_test_container(context=self.context,
@@ -1749,6 +2052,27 @@ class TestContainerController(api_base.FunctionalTest):
         container_put_archive.assert_called_once_with(
             mock.ANY, test_container_obj, cmd['path'], cmd['data'], mock.ANY)
 
+    @patch('zun.common.utils.validate_container_state')
+    @patch('zun.compute.api.API.container_put_archive')
+    @patch('zun.compute.api.API.container_put_archive_stream')
+    @patch('zun.objects.Container.get_by_uuid')
+    def test_put_archive_stream(self, mock_get_by_uuid,
+                                container_put_archive_stream,
+                                container_put_archive, mock_validate):
+        container_put_archive_stream.return_value = {'proxy_url': 'fake-url'}
+        test_container = utils.get_test_container()
+        test_container_obj = objects.Container(self.context, **test_container)
+        mock_get_by_uuid.return_value = test_container_obj
+
+        container_uuid = test_container.get('uuid')
+        url = '/v1/containers/%s/%s/' % (container_uuid, 'put_archive')
+        response = self.post(url, {'path': '/home/', 'stream': 'True'})
+        self.assertEqual(200, response.status_int)
+        self.assertEqual({'proxy_url': 'fake-url'}, response.json)
+        container_put_archive_stream.assert_called_once_with(
+            mock.ANY, test_container_obj, '/home/')
+        self.assertFalse(container_put_archive.called)
+
     def test_put_archive_by_uuid_invalid_state(self):
         uuid = uuidutils.generate_uuid()
         test_object = utils.create_test_container(context=self.context,
@@ -2285,12 +2609,49 @@ class TestContainerActionController(api_base.FunctionalTest):
 
         mock_get_by_container_uuid.assert_called_once_with(
             mock.ANY,
-            test_container['uuid'])
+            test_container['uuid'], limit=None, marker=None)
 
         self.assertEqual(200, response.status_int)
         self.assertEqual(
             self._format_action(test_action),
             self._format_action(response.json['containerActions'][0]))
+        self.assertNotIn('next', response.json)
+
+    @mock.patch('zun.objects.Container.get_by_uuid')
+    @mock.patch('zun.objects.ContainerAction.get_by_container_uuid')
+    def test_list_actions_with_pagination(self, mock_get_by_container_uuid,
+                                          mock_container_get_by_uuid):
+        test_container = utils.get_test_container()
+        container_object = objects.Container(self.context, **test_container)
+        mock_container_get_by_uuid.return_value = container_object
+        action_objects = []
+        for id_ in range(2):
+            test_action = utils.get_test_action_value(
+                id=id_, container_uuid=test_container['uuid'])
+            action_objects.append(
+                objects.ContainerAction(self.context, **test_action))
+        mock_get_by_container_uuid.return_value = action_objects
+
+        url = '/v1/containers/%s/container_actions' % test_container['uuid']
+        cursor = api_utils.encode_cursor(action_objects[0], 'created_at')
+        response = self.get('%s?limit=2&cursor=%s' % (url, cursor))
+
+        self.assertEqual(200, response.status_int)
+        mock_get_by_container_uuid.assert_called_once_with(
+            mock.ANY, test_container['uuid'], limit=2,
+            marker=api_utils.decode_cursor(cursor))
+        self.assertEqual(2, len(response.json['containerActions']))
+        next_cursor = api_utils.encode_cursor(action_objects[1], 'created_at')
+        self.assertIn('limit=2&cursor=%s' % next_cursor, response.json['next'])
+
+        mock_get_by_container_uuid.return_value = action_objects[:1]
+        response = self.get('%s?limit=2' % url)
+        self.assertIsNone(response.json['next'])
+
+        headers = {"OpenStack-API-Version": "container 1.42"}
+        response = self.get('%s?limit=2' % url, headers=headers,
+                            expect_errors=True)
+        self.assertEqual(400, response.status_int)
 
     @mock.patch('zun.objects.Container.get_by_uuid')
     @mock.patch('zun.common.policy.enforce')
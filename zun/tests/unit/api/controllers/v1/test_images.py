@@ -16,6 +16,7 @@ from unittest.mock import patch
 from oslo_utils import uuidutils
 from webtest.app import AppError
 
+from zun.api import utils as api_utils
 from zun.common import exception
 import zun.conf
 from zun import objects
@@ -172,6 +173,30 @@ class TestImageController(api_base.FunctionalTest):
         self.assertEqual(image_list[-1].uuid,
                          actual_images[0].get('uuid'))
 
+    @mock.patch('zun.common.policy.enforce', return_value=True)
+    @patch('zun.objects.Image.list')
+    def test_get_all_images_with_pagination_cursor(
+            self, mock_image_list, mock_policy_enforce):
+        image_list = []
+        for id_ in range(4):
+            test_image = utils.create_test_image(
+                context=self.context,
+                id=id_,
+                repo='testrepo' + str(id_),
+                uuid=uuidutils.generate_uuid())
+            image_list.append(objects.Image(self.context, **test_image))
+        mock_image_list.return_value = image_list[-1:]
+        response = self.get('/v1/images/?limit=3&cursor=%s'
+                            % api_utils.encode_cursor(image_list[2]))
+
+        self.assertEqual(200, response.status_int)
+        mock_image_list.assert_called_once_with(
+            mock.ANY, 3, {'id': 2}, 'id', 'asc', filters=None)
+        actual_images = response.json['images']
+        self.assertEqual(1, len(actual_images))
+        self.assertEqual(image_list[-1].uuid,
+                         actual_images[0].get('uuid'))
+
     @patch('zun.compute.api.API.image_search')
     def test_search_image(self, mock_image_search):
         mock_image_search.return_value = {'name': 'redis', 'stars': 2000}
@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+from unittest import mock
+
 from zun.api import utils
 from zun.common import exception
 from zun.tests import base
@@ -44,3 +47,19 @@ class TestUtils(base.BaseTestCase):
         with self.assertRaisesRegex(exception.InvalidValue,
                                     "Invalid sort direction"):
             utils.validate_sort_dir('abc')
+
+    def test_encode_decode_cursor(self):
+        obj = mock.Mock(id=42, created_at=datetime.datetime(2020, 1, 2, 3, 4))
+        cursor = utils.encode_cursor(obj, 'created_at')
+        self.assertNotIn('=', cursor)
+        self.assertEqual({'created_at': '2020-01-02T03:04:00.000000',
+                          'id': 42},
+                         utils.decode_cursor(cursor))
+        self.assertEqual({'id': 42},
+                         utils.decode_cursor(utils.encode_cursor(obj)))
+        with self.assertRaisesRegex(exception.InvalidValue,
+                                    "Invalid cursor"):
+            utils.decode_cursor('not-a-cursor')
+        with self.assertRaisesRegex(exception.InvalidValue,
+                                    "Invalid cursor"):
+            utils.decode_cursor('WzFd')
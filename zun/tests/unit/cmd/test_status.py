@@ -12,8 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from unittest import mock
-
 from oslo_upgradecheck.upgradecheck import Code
 
 from zun.cmd import status
@@ -26,16 +24,7 @@ class TestUpgradeChecks(base.TestCase):
         super(TestUpgradeChecks, self).setUp()
         self.cmd = status.Checks()
 
-    @mock.patch.object(status.Checks, "_cmd_exists")
-    def test__numactl_check_ok(self, mock_cmd_exists):
-        mock_cmd_exists.return_value = True
-        check_result = self.cmd._numactl_check()
-        self.assertEqual(
-            Code.SUCCESS, check_result.code)
-
-    @mock.patch.object(status.Checks, "_cmd_exists")
-    def test__numactl_check_fail(self, mock_cmd_exists):
-        mock_cmd_exists.return_value = False
-        check_result = self.cmd._numactl_check()
+    def test_check(self):
+        # numactl is not required since the NUMA nodes are read from sysfs.
         self.assertEqual(
-            Code.FAILURE, check_result.code)
+            Code.SUCCESS, self.cmd.check())
@@ -0,0 +1,149 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from oslo_utils import uuidutils
+
+from zun.common import action_events
+from zun.common import context
+from zun.common import utils
+from zun.db import api as dbapi
+from zun import objects
+from zun.tests.unit.db import base
+from zun.tests.unit.db import utils as db_utils
+
+
+class TestBufferedEventWriter(base.DbTestCase):
+
+    def setUp(self):
+        super(TestBufferedEventWriter, self).setUp()
+        self.uuid = uuidutils.generate_uuid()
+        db_utils.create_test_container(context=self.context, uuid=self.uuid)
+        objects.ContainerAction.action_start(self.context, self.uuid,
+                                             'start', want_result=False)
+        self.action = objects.ContainerAction.get_by_request_id(
+            self.context, self.uuid, self.context.request_id)
+        # Flush on demand only
+        self.writer = action_events.BufferedEventWriter(3600, 100)
+        self.writer.start()
+        self.addCleanup(self.writer.stop)
+
+    def _get_events(self):
+        return {e.event: e for e in objects.ContainerActionEvent.get_by_action(
+            self.context, self.action.id)}
+
+    @mock.patch.object(dbapi, 'action_event_finish')
+    @mock.patch.object(dbapi, 'action_event_start')
+    def test_coalesce_start_and_finish(self, mock_start, mock_finish):
+        for name in ('event1', 'event2'):
+            self.writer.event_start(self.context, self.uuid, name)
+        self.writer.event_finish(self.context, self.uuid, 'event1')
+        self.writer.event_finish(self.context, self.uuid, 'event2',
+                                 exc_val=ValueError('boom'), exc_tb='tb')
+        self.assertEqual({}, self._get_events())
+
+        with mock.patch.object(dbapi, 'action_events_record',
+                               wraps=dbapi.action_events_record) as mock_rec:
+            self.writer.flush()
+            self.assertEqual(1, mock_rec.call_count)
+            self.assertEqual(2, len(mock_rec.call_args[0][1]))
+
+        events = self._get_events()
+        self.assertEqual('Success', events['event1'].result)
+        self.assertIsNotNone(events['event1'].start_time)
+        self.assertIsNotNone(events['event1'].finish_time)
+        self.assertEqual('Error', events['event2'].result)
+        self.assertEqual('tb', events['event2'].traceback)
+        self.assertFalse(mock_start.called)
+        self.assertFalse(mock_finish.called)
+
+    def test_finish_after_flush(self):
+        self.writer.event_start(self.context, self.uuid, 'event1')
+        self.writer.flush()
+        self.assertIsNone(self._get_events()['event1'].finish_time)
+
+        self.writer.event_finish(self.context, self.uuid, 'event1')
+        self.writer.action_finish(self.context, self.uuid, 'start')
+        self.writer.flush()
+        events = self._get_events()
+        self.assertEqual(1, len(events))
+        self.assertEqual('Success', events['event1'].result)
+        self.assertIsNotNone(events['event1'].finish_time)
+        action = objects.ContainerAction.get_by_request_id(
+            self.context, self.uuid, self.context.request_id)
+        self.assertIsNotNone(action.finish_time)
+
+    def test_flush_size(self):
+        writer = action_events.BufferedEventWriter(3600, 2)
+        with mock.patch.object(writer, '_wakeup') as mock_wakeup:
+            writer._running = True
+            writer.event_start(self.context, self.uuid, 'event1')
+            self.assertFalse(mock_wakeup.set.called)
+            writer.event_start(self.context, self.uuid, 'event2')
+            mock_wakeup.set.assert_called_once_with()
+
+    def test_flush_missing_action(self):
+        self.writer.event_start(self.context, uuidutils.generate_uuid(),
+                                'event1')
+        self.writer.event_start(self.context, self.uuid, 'event1')
+        self.writer.flush()
+        self.assertEqual(['event1'], list(self._get_events()))
+
+    def test_stop_flushes(self):
+        self.writer.event_start(self.context, self.uuid, 'event1')
+        self.writer.stop()
+        self.assertEqual(['event1'], list(self._get_events()))
+
+        # The events are written right away once stopped
+        self.writer.event_finish(self.context, self.uuid, 'event1')
+        self.assertEqual('Success', self._get_events()['event1'].result)
+
+    @mock.patch.object(objects.ContainerActionEvent, 'event_start')
+    def test_context_without_project(self, mock_start):
+        admin_context = context.get_admin_context()
+        self.writer.event_start(admin_context, self.uuid, 'event1')
+        mock_start.assert_called_once_with(admin_context, self.uuid, 'event1',
+                                           want_result=False)
+
+    def test_event_reporter(self):
+        with mock.patch.object(action_events, '_writer', self.writer):
+            with utils.FinishAction(self.context, 'start', self.uuid), \
+                    utils.EventReporter(self.context, 'event1', self.uuid):
+                pass
+        self.assertEqual({}, self._get_events())
+        self.writer.flush()
+        self.assertEqual('Success', self._get_events()['event1'].result)
+
+
+class TestActionEventsWriter(base.DbTestCase):
+
+    def tearDown(self):
+        action_events.stop_buffered_writer()
+        super(TestActionEventsWriter, self).tearDown()
+
+    def test_start_buffered_writer_disabled(self):
+        action_events.start_buffered_writer()
+        self.assertIs(type(action_events.get_writer()),
+                      action_events.EventWriter)
+
+    def test_start_stop_buffered_writer(self):
+        self.config(action_events_flush_interval=0.5, group='compute')
+        action_events.start_buffered_writer()
+        writer = action_events.get_writer()
+        self.assertIsInstance(writer, action_events.BufferedEventWriter)
+        self.assertEqual(0.5, writer.flush_interval)
+        with mock.patch.object(writer, 'flush') as mock_flush:
+            action_events.stop_buffered_writer()
+            mock_flush.assert_called_with()
+        self.assertIs(type(action_events.get_writer()),
+                      action_events.EventWriter)
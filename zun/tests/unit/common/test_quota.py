@@ -0,0 +1,63 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from zun.common import exception
+from zun.common import quota
+from zun.tests.unit.db import base
+from zun.tests.unit.db import utils
+
+
+class TestQuotaEngine(base.DbTestCase):
+
+    def setUp(self):
+        super(TestQuotaEngine, self).setUp()
+        for i, (cpu, memory) in enumerate([(0.1, '128'), (0.2, '256')]):
+            utils.create_test_container(
+                context=self.context, id=None, uuid=None,
+                name='container-%d' % i, project_id='fake_project',
+                cpu=cpu, memory=memory, disk=10)
+
+    def test_count_as_dict(self):
+        with mock.patch.object(quota.objects.Container, 'get_usages',
+                               wraps=quota.objects.Container.get_usages
+                               ) as mock_usages:
+            counts = quota.QUOTAS.count_as_dict(
+                self.context, ['containers', 'cpu', 'memory', 'disk'],
+                'fake_project')
+
+        mock_usages.assert_called_once_with(self.context, 'fake_project')
+        self.assertEqual({'containers': 2, 'cpu': 0.3, 'memory': 384,
+                          'disk': 20}, counts)
+
+    def test_count_as_dict_unknown_resource(self):
+        self.assertRaises(exception.QuotaResourceUnknown,
+                          quota.QUOTAS.count_as_dict, self.context,
+                          ['containers', 'unknown'], 'fake_project')
+
+    def test_count(self):
+        self.assertEqual(384, quota.QUOTAS.count(self.context, 'memory',
+                                                 'fake_project'))
+        self.assertEqual(0.3, quota.QUOTAS.count(self.context, 'cpu',
+                                                 'fake_project'))
+
+    def test_get_project_quotas_counts_once(self):
+        with mock.patch.object(quota.objects.Container, 'get_usages',
+                               wraps=quota.objects.Container.get_usages
+                               ) as mock_usages:
+            quotas = quota.QUOTAS.get_project_quotas(self.context,
+                                                     'fake_project')
+
+        self.assertEqual(1, mock_usages.call_count)
+        self.assertEqual(2, quotas['containers']['in_use'])
+        self.assertEqual(384, quotas['memory']['in_use'])
@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from zun.common import exception
+from zun.common import singleflight
+from zun.tests import base
+
+
+class TestSingleFlight(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        self.single_flight = singleflight.SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = []
+
+    def _slow_func(self, value, error=None):
+        self.calls.append(value)
+        self.started.set()
+        self.release.wait()
+        if error:
+            raise error
+        return value
+
+    def _run_concurrently(self, key, count, *args):
+        results = []
+
+        def target():
+            try:
+                results.append(self.single_flight.do(key, self._slow_func,
+                                                     *args))
+            except Exception as e:
+                results.append(e)
+
+        leader = threading.Thread(target=target)
+        leader.start()
+        self.started.wait()
+        followers = [threading.Thread(target=target)
+                     for i in range(count - 1)]
+        for t in followers:
+            t.start()
+        # Give the followers the time to join the in-flight call
+        time.sleep(0.1)
+        self.release.set()
+        for t in [leader] + followers:
+            t.join()
+        return results
+
+    def test_share_result(self):
+        results = self._run_concurrently('key', 3, 'value')
+        self.assertEqual(['value'] * 3, results)
+        self.assertEqual(['value'], self.calls)
+        self.assertEqual({}, self.single_flight._calls)
+
+    def test_share_error(self):
+        error = exception.ImageNotFound(image='image')
+        results = self._run_concurrently('key', 3, 'value', error)
+        self.assertEqual([error] * 3, results)
+        self.assertEqual(['value'], self.calls)
+
+    def test_sequential_calls(self):
+        self.release.set()
+        self.assertEqual(1, self.single_flight.do('key', self._slow_func, 1))
+        self.assertEqual(2, self.single_flight.do('key', self._slow_func, 2))
+        self.assertEqual([1, 2], self.calls)
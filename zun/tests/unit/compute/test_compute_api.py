@@ -34,6 +34,12 @@ class TestAPI(base.TestCase):
         p = mock.patch('zun.scheduler.client.query.SchedulerClient')
         p.start()
         self.addCleanup(p.stop)
+        p = mock.patch('zun.image.cache.lookup', return_value=None)
+        self.mock_image_lookup = p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch('zun.image.cache.record')
+        self.mock_image_record = p.start()
+        self.addCleanup(p.stop)
 
         self.compute_api = api.API(self.context)
         self.container = objects.Container(
@@ -86,6 +92,61 @@ class TestAPI(base.TestCase):
         self.assertTrue(mock_image_search.called)
         self.assertTrue(mock_container_create.called)
 
+    @mock.patch('zun.compute.api.API._record_action_start')
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch('zun.compute.rpcapi.API.image_search')
+    @mock.patch('zun.compute.api.API._schedule_container')
+    def test_container_create_image_cached(self, mock_schedule_container,
+                                           mock_image_search,
+                                           mock_container_create,
+                                           mock_record_action_start):
+        CONF.set_override('enable_image_validation', True, group="api")
+        container = self.container
+        container.image_driver = 'docker'
+        mock_schedule_container.return_value = {'host': u'Centos',
+                                                'nodename': None,
+                                                'limits': {}}
+        self.mock_image_lookup.return_value = True
+
+        self.compute_api.container_create(self.context, container,
+                                          {}, None, None, False)
+        self.mock_image_lookup.assert_called_once_with(
+            self.context, 'docker', 'ubuntu', 'latest',
+            registry=container.registry)
+        self.assertFalse(mock_image_search.called)
+        self.assertFalse(self.mock_image_record.called)
+        self.assertTrue(mock_container_create.called)
+
+    @mock.patch('zun.compute.api.API._record_action_start')
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch('zun.compute.rpcapi.API.image_search')
+    @mock.patch('zun.compute.api.API._schedule_container')
+    def test_container_create_image_not_cached(self, mock_schedule_container,
+                                               mock_image_search,
+                                               mock_container_create,
+                                               mock_record_action_start):
+        CONF.set_override('enable_image_validation', True, group="api")
+        container = self.container
+        container.image_driver = 'docker'
+        mock_schedule_container.return_value = {'host': u'Centos',
+                                                'nodename': None,
+                                                'limits': {}}
+        mock_image_search.return_value = []
+
+        self.compute_api.container_create(self.context, container,
+                                          {}, None, None, False)
+        self.assertTrue(mock_image_search.called)
+        self.mock_image_record.assert_called_once_with(
+            self.context, 'docker', 'ubuntu', 'latest', False,
+            registry=container.registry)
+
+        self.mock_image_lookup.return_value = False
+        mock_image_search.reset_mock()
+        self.compute_api.container_create(self.context, container,
+                                          {}, None, None, False)
+        self.assertFalse(mock_image_search.called)
+        self.assertEqual(1, self.mock_image_record.call_count)
+
     @mock.patch('zun.compute.api.API._schedule_container')
     @mock.patch.object(objects.Container, 'save')
     def test_schedule_container_exception(self, mock_save,
@@ -100,6 +161,63 @@ class TestAPI(base.TestCase):
         self.assertTrue(mock_save.called)
         self.assertEqual(consts.ERROR, container.status)
 
+    @mock.patch('zun.compute.api.API._record_action_start')
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch('zun.compute.rpcapi.API.image_search')
+    def test_containers_create(self, mock_image_search,
+                               mock_container_create,
+                               mock_record_action_start):
+        CONF.set_override('enable_image_validation', True, group="api")
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container(
+                                            id=i, uuid='uuid%d' % i))
+                      for i in range(3)]
+        select_destinations = (
+            self.compute_api.scheduler_client.select_destinations)
+        select_destinations.return_value = [
+            {'host': 'host1', 'nodename': None, 'limits': {}},
+            {'host': 'host2', 'nodename': None, 'limits': {}},
+            {'host': 'host1', 'nodename': None, 'limits': {}}]
+        mock_image_search.return_value = [mock.MagicMock()]
+        requested_networks = [{'network': 'net'}]
+
+        self.compute_api.containers_create(
+            self.context, containers, {}, requested_networks, {}, False)
+
+        select_destinations.assert_called_once_with(self.context,
+                                                    containers, {})
+        mock_image_search.assert_called_once_with(
+            self.context, containers[0].image, containers[0].image_driver,
+            True, containers[0].registry, 'host1')
+        self.assertEqual(3, mock_record_action_start.call_count)
+        mock_container_create.assert_has_calls([
+            mock.call(self.context, 'host1', containers[0], {},
+                      requested_networks, {}, False, None),
+            mock.call(self.context, 'host2', containers[1], {},
+                      requested_networks, {}, False, None),
+            mock.call(self.context, 'host1', containers[2], {},
+                      requested_networks, {}, False, None)])
+
+    @mock.patch('zun.compute.rpcapi.API.container_create')
+    @mock.patch.object(objects.Container, 'save')
+    def test_containers_create_no_valid_host(self, mock_save,
+                                             mock_container_create):
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container(
+                                            id=i, uuid='uuid%d' % i))
+                      for i in range(2)]
+        select_destinations = (
+            self.compute_api.scheduler_client.select_destinations)
+        select_destinations.side_effect = exception.NoValidHost(
+            reason='not enough host')
+
+        self.compute_api.containers_create(self.context, containers, {},
+                                           None, {}, False)
+
+        self.assertEqual(2, mock_save.call_count)
+        self.assertEqual([consts.ERROR] * 2, [c.status for c in containers])
+        self.assertFalse(mock_container_create.called)
+
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
     @mock.patch('zun.compute.rpcapi.API.image_search')
@@ -142,7 +260,7 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.DELETE, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_delete",
+            self.context, container.host, "container_delete",
             container=container, force=False)
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -159,7 +277,7 @@ class TestAPI(base.TestCase):
         self.compute_api.container_show(
             self.context, container)
         mock_call.assert_called_once_with(
-            container.host, "container_show",
+            self.context, container.host, "container_show",
             container=container)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -171,7 +289,7 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.REBOOT, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_reboot",
+            self.context, container.host, "container_reboot",
             container=container, timeout=10)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -184,7 +302,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.STOP, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_stop", container=container, timeout=10)
+            self.context, container.host, "container_stop",
+            container=container, timeout=10)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
@@ -196,7 +315,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.START, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_start", container=container)
+            self.context, container.host, "container_start",
+            container=container)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
@@ -208,7 +328,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.PAUSE, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_pause", container=container)
+            self.context, container.host, "container_pause",
+            container=container)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
     @mock.patch.object(objects.ContainerAction, 'action_start')
@@ -220,7 +341,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.UNPAUSE, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_unpause", container=container)
+            self.context, container.host, "container_unpause",
+            container=container)
 
     @mock.patch('zun.compute.rpcapi.API._call')
     @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
@@ -236,10 +358,33 @@ class TestAPI(base.TestCase):
         self.compute_api.container_logs(
             self.context, container, 1, 1, 1, 1, 1)
         mock_call.assert_called_once_with(
-            container.host, "container_logs",
+            self.context, container.host, "container_logs",
             container=container, stdout=1, stderr=1,
             timestamps=1, tail=1, since=1)
 
+    @mock.patch('zun.compute.rpcapi.API._call')
+    @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
+    @mock.patch('zun.objects.ZunService.list_by_binary')
+    def test_container_logs_stream(self, mock_srv_list,
+                                   mock_srv_up, mock_call):
+        mock_call.return_value = {'token': 'fake-token'}
+        container = self.container
+        srv = objects.ZunService(
+            self.context,
+            **utils.get_test_zun_service(host=container.host))
+        mock_srv_list.return_value = [srv]
+        mock_srv_up.return_value = True
+        result = self.compute_api.container_logs_stream(
+            self.context, container, True, True, False, 'all', None, True)
+        self.assertEqual(
+            {'proxy_url': '%s?token=fake-token&uuid=%s&stream=1' % (
+                CONF.websocket_proxy.base_url, container.uuid)},
+            result)
+        mock_call.assert_called_once_with(
+            self.context, container.host, "container_logs_stream",
+            container=container, stdout=True, stderr=True,
+            timestamps=False, tail='all', since=None, follow=True)
+
     @mock.patch('zun.compute.rpcapi.API._call')
     @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
     @mock.patch('zun.objects.ZunService.list_by_binary')
@@ -254,7 +399,7 @@ class TestAPI(base.TestCase):
         self.compute_api.container_exec(
             self.context, container, "/bin/bash", True, True)
         mock_call.assert_called_once_with(
-            container.host, "container_exec",
+            self.context, container.host, "container_exec",
             container=container, command="/bin/bash",
             run=True, interactive=True)
 
@@ -276,7 +421,7 @@ class TestAPI(base.TestCase):
         self.assertIn('fake-token', result['proxy_url'])
         self.assertIn('fake-exec-id', result['proxy_url'])
         mock_call.assert_called_once_with(
-            container.host, "container_exec",
+            self.context, container.host, "container_exec",
             container=container, command="/bin/bash",
             run=True, interactive=True)
 
@@ -294,7 +439,7 @@ class TestAPI(base.TestCase):
         self.compute_api.container_exec_resize(
             self.context, container, '123', 10, 5)
         mock_call.assert_called_once_with(
-            container.host, "container_exec_resize",
+            self.context, container.host, "container_exec_resize",
             exec_id='123', height=10, width=5)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -307,7 +452,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.KILL, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "container_kill", container=container, signal=9)
+            self.context, container.host, "container_kill",
+            container=container, signal=9)
 
     @mock.patch('zun.compute.rpcapi.API._call')
     @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
@@ -323,7 +469,7 @@ class TestAPI(base.TestCase):
         self.compute_api.container_update(
             self.context, container, {})
         mock_call.assert_called_once_with(
-            container.host, "container_update",
+            self.context, container.host, "container_update",
             container=container, patch={})
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -340,7 +486,7 @@ class TestAPI(base.TestCase):
         mock_srv_up.return_value = True
         url = self.compute_api.container_attach(self.context, container)
         mock_call.assert_called_once_with(
-            container.host, "container_attach",
+            self.context, container.host, "container_attach",
             container=container)
         expected_url = '%s?token=%s&uuid=%s' % (
             CONF.websocket_proxy.base_url, 'fake-token', container.uuid)
@@ -359,7 +505,7 @@ class TestAPI(base.TestCase):
         mock_srv_up.return_value = True
         self.compute_api.container_resize(self.context, container, 10, 5)
         mock_call.assert_called_once_with(
-            container.host, "container_resize",
+            self.context, container.host, "container_resize",
             container=container, height=10, width=5)
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -375,7 +521,7 @@ class TestAPI(base.TestCase):
         mock_srv_up.return_value = True
         self.compute_api.container_top(self.context, container, "")
         mock_call.assert_called_once_with(
-            container.host, "container_top",
+            self.context, container.host, "container_top",
             container=container, ps_args="")
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -392,7 +538,7 @@ class TestAPI(base.TestCase):
         self.compute_api.container_get_archive(
             self.context, container, "/root", True)
         mock_call.assert_called_once_with(
-            container.host, "container_get_archive",
+            self.context, container.host, "container_get_archive",
             container=container, path="/root", encode_data=True)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -405,7 +551,7 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.ADD_SECURITY_GROUP, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "add_security_group",
+            self.context, container.host, "add_security_group",
             container=container, security_group={})
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -418,7 +564,7 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.REMOVE_SECURITY_GROUP, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "remove_security_group",
+            self.context, container.host, "remove_security_group",
             container=container, security_group={})
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -435,9 +581,54 @@ class TestAPI(base.TestCase):
         self.compute_api.container_put_archive(
             self.context, container, "/root", {}, True)
         mock_call.assert_called_once_with(
-            container.host, "container_put_archive",
+            self.context, container.host, "container_put_archive",
             container=container, path="/root", data={}, decode_data=True)
 
+    @mock.patch('zun.compute.rpcapi.API._call')
+    @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
+    @mock.patch('zun.objects.ZunService.list_by_binary')
+    def test_container_get_archive_stream(self, mock_srv_list,
+                                          mock_srv_up, mock_call):
+        mock_call.return_value = {'token': 'fake-token', 'stat': {}}
+        container = self.container
+        srv = objects.ZunService(
+            self.context,
+            **utils.get_test_zun_service(host=container.host))
+        mock_srv_list.return_value = [srv]
+        mock_srv_up.return_value = True
+        result = self.compute_api.container_get_archive_stream(
+            self.context, container, "/root")
+        self.assertEqual(
+            {'proxy_url': '%s?token=fake-token&uuid=%s&stream=1' % (
+                CONF.websocket_proxy.base_url, container.uuid),
+             'stat': {}},
+            result)
+        mock_call.assert_called_once_with(
+            self.context, container.host, "container_get_archive_stream",
+            container=container, path="/root")
+
+    @mock.patch('zun.compute.rpcapi.API._call')
+    @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
+    @mock.patch('zun.objects.ZunService.list_by_binary')
+    def test_container_put_archive_stream(self, mock_srv_list,
+                                          mock_srv_up, mock_call):
+        mock_call.return_value = {'token': 'fake-token'}
+        container = self.container
+        srv = objects.ZunService(
+            self.context,
+            **utils.get_test_zun_service(host=container.host))
+        mock_srv_list.return_value = [srv]
+        mock_srv_up.return_value = True
+        result = self.compute_api.container_put_archive_stream(
+            self.context, container, "/root")
+        self.assertEqual(
+            {'proxy_url': '%s?token=fake-token&uuid=%s&stream=1' % (
+                CONF.websocket_proxy.base_url, container.uuid)},
+            result)
+        mock_call.assert_called_once_with(
+            self.context, container.host, "container_put_archive_stream",
+            container=container, path="/root")
+
     @mock.patch('zun.compute.rpcapi.API._call')
     @mock.patch('zun.api.servicegroup.ServiceGroup.service_is_up')
     @mock.patch('zun.objects.ZunService.list_by_binary')
@@ -451,7 +642,7 @@ class TestAPI(base.TestCase):
         mock_srv_up.return_value = True
         self.compute_api.container_stats(self.context, container)
         mock_call.assert_called_once_with(
-            container.host, "container_stats",
+            self.context, container.host, "container_stats",
             container=container)
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -472,7 +663,7 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.COMMIT, want_result=False)
         mock_call.assert_called_once_with(
-            container.host, "container_commit",
+            self.context, container.host, "container_commit",
             container=container, repository="ubuntu", tag="latest")
 
     @mock.patch('zun.compute.rpcapi.API._call')
@@ -480,7 +671,7 @@ class TestAPI(base.TestCase):
         self.compute_api.image_search(
             self.context, "ubuntu", "glance", True, None)
         mock_call.assert_called_once_with(
-            None, "image_search", image="ubuntu", registry=None,
+            self.context, None, "image_search", image="ubuntu", registry=None,
             image_driver_name="glance", exact_match=True)
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -493,7 +684,8 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.NETWORK_ATTACH, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "network_attach", container=container,
+            self.context, container.host, "network_attach",
+            container=container,
             requested_network={})
 
     @mock.patch('zun.compute.rpcapi.API._cast')
@@ -506,10 +698,33 @@ class TestAPI(base.TestCase):
             self.context, container.uuid,
             container_actions.NETWORK_DETACH, want_result=False)
         mock_cast.assert_called_once_with(
-            container.host, "network_detach", container=container, network={})
+            self.context, container.host, "network_detach",
+            container=container, network={})
 
     @mock.patch('zun.compute.rpcapi.API.network_create')
     def test_network_create(self, mock_network_create):
         network = self.network
         self.compute_api.network_create(self.context, network)
         self.assertTrue(mock_network_create.called)
+
+
+class TestGetAPI(base.TestCase):
+
+    def setUp(self):
+        super(TestGetAPI, self).setUp()
+        p = mock.patch('zun.scheduler.client.query.SchedulerClient')
+        self.mock_client = p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(setattr, api, '_api', None)
+
+    @mock.patch('os.getpid')
+    def test_get_api(self, mock_getpid):
+        mock_getpid.return_value = 100
+        compute_api = api.get_api()
+        self.assertIs(compute_api, api.get_api())
+        self.assertEqual(1, self.mock_client.call_count)
+
+        # A forked worker builds its own.
+        mock_getpid.return_value = 101
+        self.assertIsNot(compute_api, api.get_api())
+        self.assertEqual(2, self.mock_client.call_count)
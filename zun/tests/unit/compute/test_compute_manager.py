@@ -17,17 +17,20 @@ from unittest import mock
 from io import StringIO
 from oslo_utils import uuidutils
 
+from zun.common import action_events
 from zun.common import consts
 from zun.common import exception
 from zun.compute import claims
 from zun.compute import manager
 import zun.conf
+from zun.network import port_pool
 from zun import objects
 from zun.objects.container import Container
 from zun.objects.container_action import ContainerAction
 from zun.objects.container_action import ContainerActionEvent
 from zun.objects.exec_instance import ExecInstance
 from zun.objects.image import Image
+from zun.objects.stream_instance import StreamInstance
 from zun.objects.volume_mapping import VolumeMapping
 from zun.objects.zun_network import ZunNetwork
 from zun.tests import base
@@ -197,13 +200,15 @@ class TestManager(base.TestCase):
         self.assertEqual("Creation Failed", container.status_reason)
         self.assertIsNone(container.task_state)
 
+    @mock.patch('zun.image.cache.record')
     @mock.patch.object(ContainerActionEvent, 'event_start')
     @mock.patch.object(ContainerActionEvent, 'event_finish')
     @mock.patch.object(Container, 'save')
     @mock.patch.object(fake_driver, 'pull_image')
     @mock.patch.object(fake_driver, 'create')
     def test_container_create(self, mock_create, mock_pull, mock_save,
-                              mock_event_finish, mock_event_start):
+                              mock_event_finish, mock_event_start,
+                              mock_record):
         container = Container(self.context, **utils.get_test_container())
         image = {'image': 'repo', 'path': 'out_path', 'driver': 'glance'}
         mock_pull.return_value = image, False
@@ -215,6 +220,9 @@ class TestManager(base.TestCase):
         mock_save.assert_called_with(self.context)
         mock_pull.assert_any_call(self.context, container.image, '',
                                   'always', 'glance', registry=None)
+        # The image may only be present on this host, the image cache is
+        # only written by the image validation of the API.
+        mock_record.assert_not_called()
         mock_create.assert_called_once_with(self.context, container, image,
                                             networks, volumes)
         mock_event_start.assert_called_once()
@@ -1066,6 +1074,56 @@ class TestManager(base.TestCase):
                           self.context, container, True, True,
                           False, 'all', None)
 
+    @mock.patch.object(StreamInstance, 'create', autospec=True)
+    def test_container_logs_stream(self, mock_create):
+        container = Container(self.context, **utils.get_test_container())
+        result = self.compute_manager.container_logs_stream(
+            self.context, container, True, False, False, '10', None, True)
+        stream = mock_create.call_args[0][0]
+        self.assertEqual(result['token'], stream.token)
+        self.assertEqual('logs', stream.type)
+        self.assertEqual(container.id, stream.container_id)
+        self.assertEqual(zun.conf.CONF.docker.docker_remote_api_url,
+                         stream.url)
+        self.assertEqual({'stdout': True, 'stderr': False,
+                          'timestamps': False, 'tail': '10', 'since': None,
+                          'follow': True}, stream.params)
+
+    @mock.patch.object(StreamInstance, 'create', autospec=True)
+    @mock.patch.object(fake_driver, 'get_archive_stat')
+    def test_container_get_archive_stream(self, mock_stat, mock_create):
+        mock_stat.return_value = {'name': 'root'}
+        container = Container(self.context, **utils.get_test_container())
+        result = self.compute_manager.container_get_archive_stream(
+            self.context, container, '/root')
+        self.assertEqual({'name': 'root'}, result['stat'])
+        stream = mock_create.call_args[0][0]
+        self.assertEqual(result['token'], stream.token)
+        self.assertEqual('get_archive', stream.type)
+        self.assertEqual({'path': '/root'}, stream.params)
+        self.assertEqual(container.id, stream.container_id)
+        mock_stat.assert_called_once_with(self.context, container, '/root')
+
+    @mock.patch.object(StreamInstance, 'create', autospec=True)
+    @mock.patch.object(fake_driver, 'get_archive_stat')
+    def test_container_put_archive_stream(self, mock_stat, mock_create):
+        container = Container(self.context, **utils.get_test_container())
+        result = self.compute_manager.container_put_archive_stream(
+            self.context, container, '/root')
+        stream = mock_create.call_args[0][0]
+        self.assertEqual(result['token'], stream.token)
+        self.assertEqual('put_archive', stream.type)
+        self.assertEqual({'path': '/root'}, stream.params)
+        mock_stat.assert_called_once_with(self.context, container, '/root')
+
+    @mock.patch.object(fake_driver, 'get_archive_stat')
+    def test_container_put_archive_stream_failed(self, mock_stat):
+        container = Container(self.context, **utils.get_test_container())
+        mock_stat.side_effect = exception.DockerError
+        self.assertRaises(exception.DockerError,
+                          self.compute_manager.container_put_archive_stream,
+                          self.context, container, '/root')
+
     @mock.patch.object(fake_driver, 'execute_run')
     @mock.patch.object(fake_driver, 'execute_create')
     def test_container_execute(self, mock_execute_create, mock_execute_run):
@@ -1450,3 +1508,46 @@ class TestManager(base.TestCase):
         network = ZunNetwork(self.context, **utils.get_test_network())
         self.compute_manager.network_delete(self.context, network)
         mock_delete.assert_any_call(self.context, network)
+
+    @mock.patch.object(fake_driver, 'update_containers_states', create=True)
+    def test_sync_container_state(self, mock_update):
+        mock_update.return_value = {'rows_read': 3, 'rows_written': 1}
+        self.compute_manager.sync_container_state(self.context)
+        mock_update.assert_called_once_with(mock.ANY, self.compute_manager)
+        stats = self.compute_manager.sync_container_state_stats
+        self.assertEqual(3, stats['rows_read'])
+        self.assertEqual(1, stats['rows_written'])
+        self.assertIn('duration', stats)
+
+    @mock.patch.object(fake_driver, 'start_event_watcher')
+    def test_start_event_watcher(self, mock_start):
+        self.compute_manager.start_event_watcher(self.context)
+        mock_start.assert_called_once_with(self.context, self.compute_manager)
+
+    def test_start_event_watcher_not_implemented(self):
+        # The fake driver doesn't support watching events
+        self.compute_manager.start_event_watcher(self.context)
+
+    @mock.patch.object(fake_driver, 'stop_event_watcher')
+    def test_stop_event_watcher(self, mock_stop):
+        self.compute_manager.stop_event_watcher()
+        mock_stop.assert_called_once_with()
+
+    def test_stop_event_watcher_not_implemented(self):
+        self.compute_manager.stop_event_watcher()
+
+    @mock.patch.object(action_events, 'stop_buffered_writer')
+    @mock.patch.object(action_events, 'start_buffered_writer')
+    def test_start_stop_action_event_writer(self, mock_start, mock_stop):
+        self.compute_manager.start_action_event_writer()
+        mock_start.assert_called_once_with()
+        self.compute_manager.stop_action_event_writer()
+        mock_stop.assert_called_once_with()
+
+    @mock.patch.object(port_pool, 'stop_pool')
+    @mock.patch.object(port_pool, 'start_pool')
+    def test_start_stop_port_pool(self, mock_start, mock_stop):
+        self.compute_manager.start_port_pool()
+        mock_start.assert_called_once_with()
+        self.compute_manager.stop_port_pool()
+        mock_stop.assert_called_once_with()
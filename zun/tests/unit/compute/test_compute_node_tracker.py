@@ -19,6 +19,8 @@ from zun.compute import compute_node_tracker
 from zun import objects
 from zun.tests import base
 from zun.tests.unit.container import fake_driver
+from zun.tests.unit.db import base as db_base
+from zun.tests.unit.db import utils as db_utils
 from zun.tests.unit.objects import utils as obj_utils
 
 
@@ -73,3 +75,90 @@ class TestNodeStracker(base.TestCase):
         self.assertTrue(mock_claim.called)
         self.assertTrue(mock_container_update.called)
         self.assertTrue(mock_update.called)
+
+
+class TestNodeTrackerAudit(db_base.DbTestCase):
+
+    def setUp(self):
+        super(TestNodeTrackerAudit, self).setUp()
+        self.container_driver = fake_driver.FakeDriver()
+        self.tracker = compute_node_tracker.ComputeNodeTracker(
+            'testhost', self.container_driver, fake_driver.FakeDriver(),
+            mock.MagicMock())
+        self.node = db_utils.create_test_compute_node(
+            context=self.context, hostname='testhost', mem_total=4096,
+            mem_used=0, mem_free=4096, cpu_used=0, running_containers=0,
+            disk_used=0, numa_topology=None)
+        self.resources = {'mem_total': 4096, 'mem_free': 3072,
+                          'mem_available': 3072, 'mem_used': 1024,
+                          'total_containers': 1, 'running_containers': 1,
+                          'paused_containers': 0, 'stopped_containers': 0,
+                          'cpus': 48, 'disk_total': 80}
+        self.container = obj_utils.create_test_container(
+            self.context, host='testhost', memory='512', cpu=1.0, disk=0)
+
+        patcher = mock.patch.object(self.tracker, 'disabled',
+                                    return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(self.tracker, '_update_to_placement')
+        self.mock_placement = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(objects.Container, 'list_by_host')
+    @mock.patch.object(fake_driver.FakeDriver, 'get_host_usage')
+    @mock.patch.object(fake_driver.FakeDriver, 'get_available_resources')
+    def test_update_available_resources(self, mock_resources, mock_usage,
+                                        mock_list):
+        self.config(resource_audit_interval=600, group='compute')
+        mock_resources.side_effect = lambda: dict(self.resources)
+        mock_usage.side_effect = lambda: dict(self.resources,
+                                              mem_available=2048)
+        mock_list.return_value = [self.container]
+
+        node = self.tracker.update_available_resources(self.context)
+        self.assertEqual(512, node.mem_used)
+        self.assertEqual(1, node.running_containers)
+        self.assertEqual(1, mock_list.call_count)
+        self.assertFalse(mock_usage.called)
+        self.assertEqual(1, self.mock_placement.call_count)
+
+        # Until the next audit, the host is only probed for its usage and
+        # the usage tracked from the containers is kept.
+        with mock.patch.object(objects.ComputeNode, 'save') as mock_save:
+            node = self.tracker.update_available_resources(self.context)
+            mock_save.assert_called_once_with()
+            self.assertEqual({'mem_available'}, node.obj_what_changed())
+        self.assertEqual(512, node.mem_used)
+        self.assertEqual(1, node.running_containers)
+        self.assertEqual(1, mock_list.call_count)
+        self.assertEqual(1, mock_resources.call_count)
+        self.assertEqual(2, self.mock_placement.call_count)
+
+        # Nothing is written back when nothing changed.
+        node.obj_reset_changes()
+        with mock.patch.object(objects.ComputeNode, 'save') as mock_save:
+            self.tracker.update_available_resources(self.context)
+            self.assertFalse(mock_save.called)
+
+        self.config(resource_audit_interval=0, group='compute')
+        self.tracker.update_available_resources(self.context)
+        self.assertEqual(2, mock_list.call_count)
+        self.assertEqual(2, mock_resources.call_count)
+
+    @mock.patch.object(objects.Container, 'list_by_host')
+    @mock.patch.object(fake_driver.FakeDriver, 'get_available_resources')
+    def test_remove_usage_from_container(self, mock_resources, mock_list):
+        mock_resources.side_effect = lambda: dict(self.resources)
+        mock_list.return_value = [self.container]
+        self.tracker.update_available_resources(self.context)
+        self.mock_placement.reset_mock()
+
+        with mock.patch.object(self.tracker, '_get_compute_node') as mock_get:
+            self.tracker.remove_usage_from_container(self.context,
+                                                     self.container)
+            self.assertFalse(mock_get.called)
+        node = objects.ComputeNode.get_by_uuid(self.context, self.node.uuid)
+        self.assertEqual(0, node.mem_used)
+        self.assertEqual(0, node.running_containers)
+        self.assertFalse(self.mock_placement.called)
@@ -11,6 +11,7 @@
 # under the License.
 
 from collections import defaultdict
+import datetime
 from unittest import mock
 
 from docker import errors
@@ -63,6 +64,62 @@ class TestDockerDriver(base.DriverTestCase):
         self.dfc_context_manager.__enter__.return_value = self.mock_docker
         self.addCleanup(dfc_patcher.stop)
 
+    @mock.patch('zun.container.docker.driver._IMAGE_PULLS')
+    def test_pull_image(self, mock_pulls):
+        image = {'image': 'nginx', 'path': None, 'driver': 'docker'}
+        mock_pulls.do.return_value = (image, True)
+        registry = mock.Mock(id=1)
+        ret_image, image_loaded = self.driver.pull_image(
+            self.context, 'nginx', 'latest', 'ifnotpresent', 'docker',
+            registry)
+        mock_pulls.do.assert_called_once_with(
+            ('docker', 'nginx', 'latest', 1, 'ifnotpresent', None),
+            self.driver._pull_image, self.context, 'nginx', 'latest',
+            'ifnotpresent', 'docker', registry)
+        # The callers sharing a pull don't share the image dict
+        self.assertEqual(image, ret_image)
+        self.assertIsNot(image, ret_image)
+        self.assertTrue(image_loaded)
+
+    @mock.patch('zun.container.docker.driver._IMAGE_PULLS')
+    def test_pull_image_glance(self, mock_pulls):
+        image = {'image': 'nginx', 'path': '/tmp/nginx', 'driver': 'glance'}
+        mock_pulls.do.return_value = (image, True)
+        self.driver.pull_image(self.context, 'nginx', 'latest',
+                               'ifnotpresent', 'glance')
+        # The glance images are only shared within a project.
+        mock_pulls.do.assert_called_once_with(
+            ('glance', 'nginx', 'latest', None, 'ifnotpresent',
+             self.context.project_id),
+            self.driver._pull_image, self.context, 'nginx', 'latest',
+            'ifnotpresent', 'glance', None)
+
+    def test_pull_image_with_image_driver(self):
+        image_driver = mock.Mock()
+        image_driver.pull_image.return_value = (
+            {'image': 'nginx', 'path': None}, True)
+        self.driver.image_drivers = {'docker': image_driver}
+        image, image_loaded = self.driver.pull_image(
+            self.context, 'nginx', 'latest', 'always', 'docker')
+        image_driver.pull_image.assert_called_once_with(
+            self.context, 'nginx', 'latest', 'always', None)
+        self.assertEqual({'image': 'nginx', 'path': None, 'driver': 'docker'},
+                         image)
+        self.assertTrue(image_loaded)
+
+    @mock.patch.object(DockerDriver, 'load_image')
+    def test_pull_image_loads_image(self, mock_load):
+        image_driver = mock.Mock()
+        image_driver.pull_image.return_value = (
+            {'image': 'nginx', 'path': '/tmp/nginx.tar'}, False)
+        self.driver.image_drivers = {'glance': image_driver}
+        image, image_loaded = self.driver.pull_image(
+            self.context, 'nginx', 'latest', 'always', 'glance')
+        # The tarball is loaded within the shared pull, so the callers
+        # don't load it again.
+        mock_load.assert_called_once_with('/tmp/nginx.tar')
+        self.assertTrue(image_loaded)
+
     def test_inspect_image_path_is_none(self):
         self.mock_docker.inspect_image = mock.Mock()
         mock_image = mock.MagicMock()
@@ -485,31 +542,125 @@ class TestDockerDriver(base.DriverTestCase):
         self.assertIn(mock_container_2, local_containers)
         self.assertIn(mock_container_3, local_containers)
 
-    @mock.patch('zun.objects.container.Container.save')
-    def test_update_containers_states(self, mock_save):
+    @mock.patch('zun.objects.container.Container.save_all')
+    def test_update_containers_states(self, mock_save_all):
         mock_container = obj_utils.get_test_container(
             self.context, status='Running', host='host1')
-        mock_container_2 = obj_utils.get_test_container(
-            self.context, status='Stopped')
         conf.CONF.set_override('host', 'host2')
-        with mock.patch.object(self.driver, 'list') as mock_list:
-            mock_list.return_value = ([mock_container_2], [])
+        self.mock_docker.list_containers.return_value = [
+            {'Id': mock_container.container_id, 'State': 'exited',
+             'Names': ['/%s%s' % (consts.NAME_PREFIX, mock_container.uuid)]}]
+        with mock.patch.object(self.driver,
+                               '_get_local_containers') as mock_local:
+            mock_local.return_value = [mock_container]
             self.assertEqual(mock_container.host, 'host1')
             self.assertEqual(mock_container.status, 'Running')
-            self.driver.update_containers_states(
-                self.context, [mock_container], mock.Mock())
+            stats = self.driver.update_containers_states(
+                self.context, mock.Mock())
+            mock_local.assert_called_once_with(self.context,
+                                               [mock_container.uuid])
             self.assertEqual(mock_container.host, 'host2')
             self.assertEqual(mock_container.status, 'Stopped')
+            mock_save_all.assert_called_once_with(
+                self.context, [mock_container],
+                ('status', 'status_reason', 'addresses', 'host'))
+            self.assertEqual({'rows_read': 1, 'rows_written': 1}, stats)
+
+    @mock.patch('zun.objects.container.Container.save_all')
+    def test_update_containers_states_unchanged(self, mock_save_all):
+        mock_container = obj_utils.get_test_container(
+            self.context, status='Stopped', host='host1', task_state=None)
+        conf.CONF.set_override('host', 'host1')
+        self.mock_docker.list_containers.return_value = [
+            {'Id': mock_container.container_id, 'State': 'exited',
+             'Names': ['/%s%s' % (consts.NAME_PREFIX, mock_container.uuid)]}]
+        with mock.patch.object(self.driver,
+                               '_get_local_containers') as mock_local, \
+                mock.patch.object(self.driver,
+                                  '_populate_container') as mock_populate:
+            mock_local.return_value = [mock_container]
+            stats = self.driver.update_containers_states(
+                self.context, mock.Mock())
+            self.assertEqual({'rows_read': 1, 'rows_written': 0}, stats)
+            self.assertEqual(1, mock_populate.call_count)
+
+            # The cached fingerprint is still valid so the record is not
+            # populated again.
+            stats = self.driver.update_containers_states(
+                self.context, mock.Mock())
+            self.assertEqual({'rows_read': 1, 'rows_written': 0}, stats)
+            self.assertEqual(1, mock_populate.call_count)
+            self.assertFalse(mock_save_all.called)
+
+    @mock.patch('zun.objects.container.Container.save_all')
+    def test_update_containers_states_keeps_status_detail(self,
+                                                          mock_save_all):
+        mock_container = obj_utils.get_test_container(
+            self.context, status='Running', status_reason=None,
+            status_detail='Up 5 mins', host='host1', task_state=None)
+        conf.CONF.set_override('host', 'host1')
+        self.mock_docker.list_containers.return_value = [
+            {'Id': mock_container.container_id, 'State': 'running',
+             'Status': 'Up 5 minutes',
+             'Names': ['/%s%s' % (consts.NAME_PREFIX, mock_container.uuid)]}]
+        with mock.patch.object(self.driver,
+                               '_get_local_containers') as mock_local:
+            mock_local.return_value = [mock_container]
+            stats = self.driver.update_containers_states(
+                self.context, mock.Mock())
+            self.assertEqual({'rows_read': 1, 'rows_written': 0}, stats)
+            self.assertFalse(mock_save_all.called)
+
+    @mock.patch('zun.objects.container.Container.save')
+    def test_update_containers_states_non_existent(self, mock_save):
+        mock_container = obj_utils.get_test_container(
+            self.context, status='Running', host='host1', auto_remove=True)
+        conf.CONF.set_override('host', 'host1')
+        self.mock_docker.list_containers.return_value = []
+        with mock.patch.object(self.driver,
+                               '_get_local_containers') as mock_local:
+            mock_local.return_value = [mock_container]
+            stats = self.driver.update_containers_states(
+                self.context, mock.Mock())
+            self.assertEqual(consts.DELETED, mock_container.status)
+            mock_save.assert_called_once_with(self.context)
+            self.assertEqual({'rows_read': 1, 'rows_written': 0}, stats)
+
+    @mock.patch('zun.container.docker.events.EventWatcher.start')
+    def test_start_event_watcher(self, mock_start):
+        manager = mock.Mock()
+        self.driver.start_event_watcher(self.context, manager)
+        self.driver.start_event_watcher(self.context, manager)
+        mock_start.assert_called_once_with(self.context)
+
+    @mock.patch('zun.container.docker.events.EventWatcher.stop')
+    @mock.patch('zun.container.docker.events.EventWatcher.start')
+    def test_stop_event_watcher(self, mock_start, mock_stop):
+        self.driver.start_event_watcher(self.context, mock.Mock())
+        self.driver.stop_event_watcher()
+        mock_stop.assert_called_once_with()
+        self.driver.stop_event_watcher()
+        mock_stop.assert_called_once_with()
+
+    @mock.patch('zun.container.docker.events.EventWatcher.start')
+    def test_start_event_watcher_disabled(self, mock_start):
+        CONF.set_override('enable_event_watcher', False, group='docker')
+        self.driver.start_event_watcher(self.context, mock.Mock())
+        self.assertFalse(mock_start.called)
 
     def test_heal_with_rebuilding_container(self):
         mock_compute_manager = mock.Mock()
         mock_container = obj_utils.get_test_container(
             self.context, status='Running',
-            auto_heal=True, task_state=None)
+            auto_heal=True, task_state=None, project_id='other_project')
         self.driver.heal_with_rebuilding_container(
             self.context, mock_container, mock_compute_manager)
         mock_compute_manager.container_rebuild.assert_called_once_with(
-            self.context, mock_container)
+            mock.ANY, mock_container)
+        context = mock_compute_manager.container_rebuild.call_args[0][0]
+        self.assertEqual('other_project', context.project_id)
+        # The context of the caller is left untouched.
+        self.assertEqual('fake_project', self.context.project_id)
 
     @mock.patch('zun.compute.api.API.container_rebuild')
     def test_heal_with_rebuilding_exception(self, mock_container_rebuild):
@@ -682,6 +833,32 @@ class TestDockerDriver(base.DriverTestCase):
             mock_container.container_id, True, True, False, False,
             'all', None)
 
+    def test_show_logs_with_options(self):
+        self.mock_docker.logs = mock.Mock()
+        mock_container = mock.MagicMock()
+        self.driver.show_logs(self.context, mock_container, tail='10',
+                              since='2000-01-01 01:01:01,000')
+        self.mock_docker.logs.assert_called_once_with(
+            mock_container.container_id, True, True, False, False,
+            10, datetime.datetime(2000, 1, 1, 1, 1, 1))
+
+    def test_get_archive_stat(self):
+        self.mock_docker.get_archive_stat = mock.Mock(
+            return_value={'name': 'root'})
+        mock_container = mock.MagicMock()
+        stat = self.driver.get_archive_stat(self.context, mock_container,
+                                            '/root')
+        self.assertEqual({'name': 'root'}, stat)
+        self.mock_docker.get_archive_stat.assert_called_once_with(
+            mock_container.container_id, '/root')
+
+    def test_get_archive_stat_not_found(self):
+        self.mock_docker.get_archive_stat = mock.Mock(
+            side_effect=errors.APIError('404 Not Found'))
+        mock_container = mock.MagicMock()
+        self.assertRaises(exception.Invalid, self.driver.get_archive_stat,
+                          self.context, mock_container, '/fake')
+
     def test_execute_create(self):
         self.mock_docker.exec_create = mock.Mock(return_value={'Id': 'test'})
         mock_container = mock.MagicMock()
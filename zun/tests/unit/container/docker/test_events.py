@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from unittest import mock
+
+from zun.common import consts
+from zun.common import exception
+from zun import conf
+from zun.container.docker import events
+from zun.container.docker import utils as docker_utils
+from zun.objects.container import Container
+from zun.tests.unit.container import base
+from zun.tests.unit.objects import utils as obj_utils
+
+
+class TestEventWatcher(base.DriverTestCase):
+
+    def setUp(self):
+        super(TestEventWatcher, self).setUp()
+        conf.CONF.set_override('host', 'host1')
+        self.driver = mock.Mock()
+        self.manager = mock.Mock()
+        self.watcher = events.EventWatcher(self.driver, self.manager)
+        self.container = obj_utils.get_test_container(
+            self.context, status=consts.RUNNING, host='host1',
+            task_state=None, auto_remove=False)
+        p = mock.patch.object(Container, 'get_container_any_type',
+                              return_value=self.container)
+        self.mock_get = p.start()
+        self.addCleanup(p.stop)
+
+    def _event(self, action, **attributes):
+        attributes.setdefault(
+            'name', consts.NAME_PREFIX + self.container.uuid)
+        return {'Action': action, 'id': self.container.container_id,
+                'time': 1000, 'Actor': {'Attributes': attributes}}
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_die(self, mock_save):
+        self.watcher.handle_event(self.context,
+                                  self._event('die', exitCode='137'))
+        self.assertEqual(consts.STOPPED, self.container.status)
+        self.assertIsNone(self.container.status_detail)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_start(self, mock_save):
+        self.container.status = consts.STOPPED
+        self.watcher.handle_event(self.context, self._event('start'))
+        self.assertEqual(consts.RUNNING, self.container.status)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_pause(self, mock_save):
+        self.watcher.handle_event(self.context, self._event('pause'))
+        self.assertEqual(consts.PAUSED, self.container.status)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_oom(self, mock_save):
+        self.watcher.handle_event(self.context, self._event('oom'))
+        self.assertEqual(consts.RUNNING, self.container.status)
+        self.assertIn('out of memory', self.container.status_reason)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_destroy_auto_remove(self, mock_save):
+        self.container.auto_remove = True
+        self.watcher.handle_event(self.context, self._event('destroy'))
+        self.assertEqual(consts.DELETED, self.container.status)
+        mock_save.assert_called_once_with(self.context)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_destroy_heal(self, mock_save):
+        self.watcher.handle_event(self.context, self._event('destroy'))
+        self.driver.heal_with_rebuilding_container.assert_called_once_with(
+            self.context, self.container, self.manager)
+        self.assertFalse(mock_save.called)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_skipped(self, mock_save):
+        # not a zun container
+        self.watcher.handle_event(self.context,
+                                  self._event('die', name='other'))
+        self.assertFalse(self.mock_get.called)
+        # a task is performed on the container
+        self.container.task_state = consts.CONTAINER_STOPPING
+        self.watcher.handle_event(self.context, self._event('die'))
+        # the container is on another host
+        self.container.task_state = None
+        self.container.host = 'host2'
+        self.watcher.handle_event(self.context, self._event('die'))
+        self.assertEqual(consts.RUNNING, self.container.status)
+        self.assertFalse(mock_save.called)
+
+    @mock.patch.object(Container, 'save')
+    def test_handle_event_container_not_found(self, mock_save):
+        self.mock_get.side_effect = exception.ContainerNotFound(
+            container=self.container.uuid)
+        self.watcher.handle_event(self.context, self._event('die'))
+        self.assertFalse(mock_save.called)
+
+    @mock.patch('time.sleep')
+    @mock.patch.object(docker_utils, 'docker_client')
+    def test_watch_reconnect(self, mock_client, mock_sleep):
+        mock_docker = mock.MagicMock()
+        mock_client.return_value.__enter__.return_value = mock_docker
+        event = self._event('pause')
+
+        def fake_events(since, decode, filters):
+            if since is None:
+                yield event
+                raise Exception('connection lost')
+            self.watcher._running = False
+            return
+            yield
+
+        mock_docker.events.side_effect = fake_events
+        self.watcher._running = True
+        with mock.patch.object(self.watcher, 'handle_event') as mock_handle:
+            self.watcher._watch(self.context)
+            mock_handle.assert_called_once_with(self.context, event)
+        mock_client.assert_called_with(pooled=False)
+        self.assertEqual(2, mock_docker.events.call_count)
+        mock_docker.events.assert_called_with(
+            since=1000, decode=True,
+            filters={'type': 'container', 'event': events.WATCHED_EVENTS})
+        mock_sleep.assert_called_once_with(5)
+
+    def test_stop(self):
+        stream = mock.Mock()
+        self.watcher._running = True
+        self.watcher._events = stream
+        self.watcher.stop()
+        self.assertFalse(self.watcher._running)
+        stream.close.assert_called_once_with()
@@ -10,10 +10,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
 from unittest import mock
 
+from docker import errors
 from oslo_serialization import jsonutils
+import requests
 
+from zun.common import exception
 from zun.container.docker import utils as docker_utils
 from zun.tests.unit.container import base
 
@@ -74,3 +78,119 @@ class TestDockerHTTPClient(base.DriverTestCase):
         self.client.read_tar_image(fake_image)
         self.assertEqual('fake_config', fake_image['repo'])
         self.assertEqual('', fake_image['tag'])
+
+    @mock.patch.object(docker_utils.DockerHTTPClient, 'head')
+    def test_get_archive_stat(self, mock_head):
+        stat = {'name': 'root', 'size': 4096}
+        mock_head.return_value.status_code = 200
+        mock_head.return_value.headers = {
+            'x-docker-container-path-stat': base64.b64encode(
+                jsonutils.dump_as_bytes(stat))}
+        self.assertEqual(stat,
+                         self.client.get_archive_stat('fake-id', '/root'))
+        mock_head.assert_called_once_with(mock.ANY, params={'path': '/root'})
+        self.assertTrue(
+            mock_head.call_args[0][0].endswith('/containers/fake-id/archive'))
+
+
+class TestDockerClientPool(base.DriverTestCase):
+
+    def setUp(self):
+        super(TestDockerClientPool, self).setUp()
+        p = mock.patch.object(docker_utils, '_create_client',
+                              side_effect=lambda: mock.Mock())
+        self.mock_create = p.start()
+        self.addCleanup(p.stop)
+        self.pool = docker_utils.DockerClientPool(2, 60, timeout=0.01)
+
+    def test_reuse_client(self):
+        client = self.pool.get()
+        self.pool.put(client)
+        self.assertIs(client, self.pool.get())
+        self.assertEqual(1, self.mock_create.call_count)
+        self.assertFalse(client.ping.called)
+
+    def test_pool_size(self):
+        client1 = self.pool.get()
+        client2 = self.pool.get()
+        self.assertIsNot(client1, client2)
+        self.assertFalse(self.pool._semaphore.acquire(blocking=False))
+        self.pool.put(client1)
+        self.assertIs(client1, self.pool.get())
+        self.assertEqual(2, self.pool.stats['created'])
+
+    def test_pool_timeout(self):
+        self.pool.get()
+        self.pool.get()
+        self.assertIsNone(self.pool.get())
+        self.assertEqual(1, self.pool.stats['timeouts'])
+
+    @mock.patch.object(docker_utils, 'get_client_pool')
+    def test_docker_client_pool_timeout(self, mock_get_pool):
+        mock_get_pool.return_value = self.pool
+        clients = [self.pool.get(), self.pool.get()]
+        with docker_utils.docker_client() as client:
+            self.assertNotIn(client, clients)
+        # The dedicated client is closed rather than pooled.
+        client.close.assert_called_once_with()
+        self.assertEqual(0, len(self.pool._free))
+
+    @mock.patch('time.monotonic')
+    def test_reconnect_unhealthy_client(self, mock_time):
+        mock_time.return_value = 0
+        client = self.pool.get()
+        self.pool.put(client)
+        client.ping.side_effect = Exception('connection refused')
+        mock_time.return_value = 61
+        new_client = self.pool.get()
+        self.assertIsNot(client, new_client)
+        client.ping.assert_called_once_with()
+        client.close.assert_called_once_with()
+        self.assertEqual(1, self.pool.stats['reconnects'])
+
+    def test_put_unhealthy_client(self):
+        client = self.pool.get()
+        self.pool.put(client, healthy=False)
+        client.close.assert_called_once_with()
+        self.assertIsNot(client, self.pool.get())
+        self.assertEqual(1, self.pool.stats['reconnects'])
+
+    @mock.patch.object(docker_utils, 'get_client_pool')
+    def test_docker_client(self, mock_get_pool):
+        mock_get_pool.return_value = self.pool
+        with docker_utils.docker_client() as client1:
+            pass
+        with docker_utils.docker_client() as client2:
+            pass
+        self.assertIs(client1, client2)
+        self.assertEqual(1, self.mock_create.call_count)
+
+    @mock.patch.object(docker_utils, 'get_client_pool')
+    def test_docker_client_connection_error(self, mock_get_pool):
+        mock_get_pool.return_value = self.pool
+
+        def use_client():
+            with docker_utils.docker_client() as client:
+                raise requests.exceptions.ConnectionError()
+            return client
+
+        self.assertRaises(requests.exceptions.ConnectionError, use_client)
+        self.assertEqual(1, self.pool.stats['reconnects'])
+        self.assertEqual(0, len(self.pool._free))
+
+    @mock.patch.object(docker_utils, 'get_client_pool')
+    def test_docker_client_api_error(self, mock_get_pool):
+        mock_get_pool.return_value = self.pool
+
+        def use_client():
+            with docker_utils.docker_client():
+                raise errors.APIError('error')
+
+        self.assertRaises(exception.DockerError, use_client)
+        self.assertEqual(1, len(self.pool._free))
+
+    def test_docker_client_not_pooled(self):
+        with docker_utils.docker_client(pooled=False) as client:
+            pass
+        client.close.assert_called_once_with()
+        self.assertEqual(0, len(self.pool._free))
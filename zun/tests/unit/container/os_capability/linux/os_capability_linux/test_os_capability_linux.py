@@ -13,90 +13,19 @@
 # under the License.
 
 import builtins
+import os
 from unittest import mock
 from unittest.mock import mock_open
 
+import fixtures
 from oslo_serialization import jsonutils
 
-from zun.common import exception
+from zun.container.os_capability import host_capability
 from zun.container.os_capability.linux import os_capability_linux
+from zun import objects
 from zun.tests import base
 
-LSCPU_ON = """# The following is the parsable format, which can be fed to other
-# programs. Each different item in every column has an unique ID
-# starting from zero.
-# Socket,CPU,Online
-0,0,Y
-0,8,Y
-1,16,Y
-1,24,Y
-2,32,Y"""
-
-LSCPU_NO_ONLINE = """# The following is the parsable format, which can be fed to
-# programs. Each different item in every column has an unique ID
-# starting from zero.
-# Socket,CPU
-0,0
-0,1
-1,2
-1,3"""
-
-
-class TestOSCapability(base.BaseTestCase):
-    @mock.patch('zun.common.utils.execute')
-    def test_get_cpu_numa_info_with_online(self, mock_output):
-        mock_output.return_value = LSCPU_ON
-        output = os_capability_linux.LinuxHost().get_cpu_numa_info()
-        expected_output = {'0': [0, 8], '1': [16, 24], '2': [32]}
-        self.assertEqual(expected_output, output)
-
-    @mock.patch('zun.common.utils.execute')
-    def test_get_cpu_numa_info_exception(self, mock_output):
-        mock_output.side_effect = exception.CommandError()
-        self.assertRaises(exception.CommandError,
-                          os_capability_linux.LinuxHost().get_cpu_numa_info)
-
-    @mock.patch('zun.common.utils.execute')
-    def test_get_cpu_numa_info_without_online(self, mock_output):
-        mock_output.side_effect = [exception.CommandError(),
-                                   LSCPU_NO_ONLINE]
-        expected_output = {'0': [0, 1], '1': [2, 3]}
-        output = os_capability_linux.LinuxHost().get_cpu_numa_info()
-        self.assertEqual(expected_output, output)
-
-    def test_get_host_mem(self):
-        data = ('MemTotal:        3882464 kB\nMemFree:         3514608 kB\n'
-                'MemAvailable:    3556372 kB\n')
-        m_open = mock_open(read_data=data)
-        with mock.patch.object(builtins, "open", m_open,
-                               create=True):
-            output = os_capability_linux.LinuxHost().get_host_mem()
-            used = (3882464 - 3556372)
-            self.assertEqual((3882464, 3514608, 3556372, used), output)
-
-    @mock.patch('zun.pci.utils.get_ifname_by_pci_address')
-    @mock.patch('zun.pci.utils.get_net_name_by_vf_pci_address')
-    @mock.patch('zun.common.utils.execute')
-    def test_get_pci_resource(self, mock_output, mock_netname,
-                              mock_ifname):
-        mock_netname.return_value = 'net_enp2s0f3_ec_38_8f_79_11_2b'
-        mock_ifname.return_value = 'enp2s0f3'
-        value1 = '''0000:02:10.7 "Ethernet controller...." ""'''
-        value2 = '02:10.7 0200: 8086:1520 (rev 01)'
-        value3 = '''Slot:   02:10.7
-        Class:  Ethernet controller
-        Vendor: Intel Corporation
-        Device: I350 Ethernet Controller Virtual Function
-        Rev:    01
-        NUMANode:   0'''
-        value4 = 'class physfn'
-        value5 = '''DRIVER=igbvf
-        PCI_CLASS=20000
-        PCI_ID=8086:1520
-        PCI_SUBSYS_ID=FFFF:0000
-        PCI_SLOT_NAME=0000:02:10.7
-        MODALIAS=pci:v00008086d00001520sv0000FFFFsd00000000bc02sc00i00'''
-        value6 = '''Features for enp2s0f3:
+ETHTOOL = '''Features for enp2s0f3:
 rx-checksumming: on
 tx-checksumming: on
 scatter-gather: on
@@ -123,32 +52,164 @@ rx-fcs: off [fixed]
 tx-vlan-stag-hw-insert: off [fixed]
 rx-vlan-stag-hw-parse: off [fixed]
 rx-vlan-stag-filter: off [fixed]'''
-        values = [(value1, 0),
-                  (value2, 0),
-                  (value3, 0),
-                  (value4, 0),
-                  (value5, 0),
-                  (value6, 0)]
-        mock_output.side_effect = values
-        expected = {"dev_id": "pci_0000_02_10_7",
-                    "address": "0000:02:10.7",
-                    "vendor_id": "8086",
-                    "product_id": "1520",
-                    "numa_node": 0,
-                    "label": "label_8086_1520",
-                    "dev_type": "VF",
-                    "parent_addr": "0000:02:10.7"}
-        output = os_capability_linux.LinuxHost().get_pci_resources()
-
-        pci_infos = jsonutils.loads(output)
-        for pci_info in pci_infos:
-            self.assertEqual(expected['dev_id'], str(pci_info['dev_id']))
-            self.assertEqual(expected['address'], str(pci_info['address']))
-            self.assertEqual(expected['product_id'],
-                             str(pci_info['product_id']))
-            self.assertEqual(expected['vendor_id'], str(pci_info['vendor_id']))
-            self.assertEqual(expected['numa_node'], pci_info['numa_node'])
-            self.assertEqual(expected['label'], str(pci_info['label']))
-            self.assertEqual(expected['dev_type'], str(pci_info['dev_type']))
-            self.assertEqual(expected['parent_addr'],
-                             str(pci_info['parent_addr']))
+
+
+class TestOSCapability(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestOSCapability, self).setUp()
+        self.addCleanup(host_capability._sysfs_cache.clear)
+        self.sysfs = self.useFixture(fixtures.TempDir()).path
+        self.host = os_capability_linux.LinuxHost()
+        self.host.sysfs_root = self.sysfs
+        self._write('devices/system/cpu/online', '0-3,8')
+
+    def _write(self, path, data):
+        path = os.path.join(self.sysfs, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(data + '\n')
+
+    def _link(self, path, target):
+        path = os.path.join(self.sysfs, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.symlink(target, path)
+
+    def _add_node(self, node_id, cpus, mem_total):
+        path = 'devices/system/node/node%d/' % node_id
+        self._write(path + 'cpulist', cpus)
+        self._write(path + 'meminfo',
+                    'Node %(id)d MemTotal:       %(mem)d kB\n'
+                    'Node %(id)d MemFree:        1024 kB' %
+                    {'id': node_id, 'mem': mem_total})
+
+    def _add_pci_device(self, address, vendor, device, numa_node=None):
+        path = 'bus/pci/devices/%s/' % address
+        self._write(path + 'vendor', vendor)
+        self._write(path + 'device', device)
+        if numa_node is not None:
+            self._write(path + 'numa_node', numa_node)
+
+    def test_get_cpu_numa_info(self):
+        self._write('devices/system/node/online', '0-1')
+        self._add_node(0, '0-1,8', 32 * 1024 * 1024)
+        self._add_node(1, '2-3,9', 16 * 1024 * 1024)
+        self.assertEqual({'0': [0, 1, 8], '1': [2, 3]},
+                         self.host.get_cpu_numa_info())
+        self.assertEqual([32 * 1024, 16 * 1024],
+                         self.host.get_mem_numa_info())
+
+    def test_get_cpu_numa_info_memory_only_node(self):
+        self._write('devices/system/node/online', '0,2')
+        self._add_node(0, '0-3', 32 * 1024 * 1024)
+        self._add_node(2, '', 64 * 1024 * 1024)
+        self.assertEqual({'0': [0, 1, 2, 3], '2': []},
+                         self.host.get_cpu_numa_info())
+        self.assertEqual([32 * 1024, 64 * 1024],
+                         self.host.get_mem_numa_info())
+
+    @mock.patch.object(os_capability_linux.LinuxHost, 'get_host_mem')
+    def test_get_cpu_numa_info_without_numa(self, mock_mem):
+        mock_mem.return_value = (8 * 1024 * 1024, 0, 0, 0)
+        self.assertEqual({'0': [0, 1, 2, 3, 8]},
+                         self.host.get_cpu_numa_info())
+        self.assertEqual([8 * 1024], self.host.get_mem_numa_info())
+
+    def test_get_numa_info_cached(self):
+        self._write('devices/system/node/online', '0')
+        self._add_node(0, '0-3,8', 32 * 1024 * 1024)
+        self.assertEqual({'0': [0, 1, 2, 3, 8]},
+                         self.host.get_cpu_numa_info())
+        self._add_node(0, '0-3,8', 16 * 1024 * 1024)
+        self.assertEqual([32 * 1024], self.host.get_mem_numa_info())
+
+        # A CPU going offline invalidates the cached nodes.
+        self._write('devices/system/cpu/online', '0-3')
+        self.assertEqual({'0': [0, 1, 2, 3]}, self.host.get_cpu_numa_info())
+        self.assertEqual([16 * 1024], self.host.get_mem_numa_info())
+
+    def test_get_host_numa_topology(self):
+        self._write('devices/system/node/online', '0-1')
+        self._add_node(0, '0-1', 32 * 1024 * 1024)
+        self._add_node(1, '2-3', 16 * 1024 * 1024)
+        numa_topology = objects.NUMATopology()
+        self.host.get_host_numa_topology(numa_topology)
+        self.assertEqual([0, 1], [node.id for node in numa_topology.nodes])
+        self.assertEqual({2, 3}, numa_topology.nodes[1].cpuset)
+        self.assertEqual(16 * 1024, numa_topology.nodes[1].mem_total)
+
+    def test_get_host_mem(self):
+        data = ('MemTotal:        3882464 kB\nMemFree:         3514608 kB\n'
+                'MemAvailable:    3556372 kB\n')
+        m_open = mock_open(read_data=data)
+        with mock.patch.object(builtins, "open", m_open,
+                               create=True):
+            output = os_capability_linux.LinuxHost().get_host_mem()
+            used = (3882464 - 3556372)
+            self.assertEqual((3882464, 3514608, 3556372, used), output)
+
+    @mock.patch('zun.pci.utils.get_ifname_by_pci_address')
+    @mock.patch('zun.pci.utils.get_net_name_by_vf_pci_address')
+    @mock.patch('zun.common.utils.execute')
+    def test_get_pci_resource(self, mock_output, mock_netname,
+                              mock_ifname):
+        mock_netname.return_value = 'net_enp2s0f3_ec_38_8f_79_11_2b'
+        mock_ifname.return_value = 'enp2s0f3'
+        mock_output.return_value = (ETHTOOL, '')
+        self._add_pci_device('0000:02:00.0', '0x8086', '0x1521', '0')
+        self._link('bus/pci/devices/0000:02:00.0/virtfn0', '../0000:02:10.7')
+        self._add_pci_device('0000:02:10.7', '0x8086', '0x1520', '0')
+        self._link('bus/pci/devices/0000:02:10.7/physfn', '../0000:02:00.0')
+        self._add_pci_device('0000:00:01.0', '0x1af4', '0x1045', '-1')
+
+        pci_infos = jsonutils.loads(self.host.get_pci_resources())
+
+        self.assertEqual([
+            {"dev_id": "pci_0000_00_01_0",
+             "address": "0000:00:01.0",
+             "vendor_id": "1af4",
+             "product_id": "1045",
+             "numa_node": None,
+             "label": "label_1af4_1045",
+             "dev_type": "PCI"},
+            {"dev_id": "pci_0000_02_00_0",
+             "address": "0000:02:00.0",
+             "vendor_id": "8086",
+             "product_id": "1521",
+             "numa_node": 0,
+             "label": "label_8086_1521",
+             "dev_type": "PF"},
+            {"dev_id": "pci_0000_02_10_7",
+             "address": "0000:02:10.7",
+             "vendor_id": "8086",
+             "product_id": "1520",
+             "numa_node": 0,
+             "label": "label_8086_1520",
+             "dev_type": "VF",
+             "parent_addr": "0000:02:00.0",
+             "capabilities": {"network": ["rx", "tx", "sg", "tso", "gro",
+                                          "rxvlan", "txvlan", "rxhash"]}},
+        ], pci_infos)
+        mock_output.assert_called_once_with('ethtool', '-k', 'enp2s0f3')
+
+    @mock.patch('zun.common.utils.execute')
+    def test_get_pci_resource_cached(self, mock_output):
+        self._add_pci_device('0000:00:01.0', '0x1af4', '0x1045')
+        pci_infos = jsonutils.loads(self.host.get_pci_resources())
+        self.assertEqual(['0000:00:01.0'],
+                         [pci_info['address'] for pci_info in pci_infos])
+        self.assertIsNone(pci_infos[0]['numa_node'])
+
+        self._write('bus/pci/devices/0000:00:01.0/device', '0x1000')
+        pci_infos = jsonutils.loads(self.host.get_pci_resources())
+        self.assertEqual('1045', pci_infos[0]['product_id'])
+
+        # A device being added invalidates the cached devices.
+        self._add_pci_device('0000:00:02.0', '0x1af4', '0x1045')
+        pci_infos = jsonutils.loads(self.host.get_pci_resources())
+        self.assertEqual(['1000', '1045'],
+                         [pci_info['product_id'] for pci_info in pci_infos])
+        self.assertFalse(mock_output.called)
+
+    def test_get_pci_resource_without_pci(self):
+        self.assertEqual([], jsonutils.loads(self.host.get_pci_resources()))
@@ -0,0 +1,83 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for manipulating cached images via the DB API"""
+
+import datetime
+from unittest import mock
+
+from oslo_utils import timeutils
+
+from zun.common import exception
+from zun.db import api as dbapi
+from zun.db.sqlalchemy import api as sqla_api
+from zun.tests.unit.db import base
+
+
+class DbCachedImageTestCase(base.DbTestCase):
+
+    def _cache_image(self, found, repo='ubuntu', project_id='fake_project',
+                     registry_id=None):
+        return dbapi.cache_image(self.context,
+                                 {'driver': 'docker', 'repo': repo,
+                                  'tag': 'latest', 'found': found,
+                                  'project_id': project_id,
+                                  'registry_id': registry_id})
+
+    def test_cache_image(self):
+        self._cache_image(True)
+        res = dbapi.get_cached_image(self.context, 'docker', 'ubuntu',
+                                     'latest', 'fake_project')
+        self.assertTrue(res.found)
+        self.assertIsNotNone(res.updated_at)
+
+    def test_cache_image_refresh(self):
+        self._cache_image(False)
+        later = timeutils.utcnow() + datetime.timedelta(seconds=60)
+        with mock.patch.object(timeutils, 'utcnow', return_value=later):
+            self._cache_image(False)
+        res = dbapi.get_cached_image(self.context, 'docker', 'ubuntu',
+                                     'latest', 'fake_project')
+        self.assertFalse(res.found)
+        self.assertEqual(later.replace(microsecond=0),
+                         res.updated_at.replace(microsecond=0))
+
+        self._cache_image(True)
+        res = dbapi.get_cached_image(self.context, 'docker', 'ubuntu',
+                                     'latest', 'fake_project')
+        self.assertTrue(res.found)
+
+    def test_cache_image_concurrently_cached(self):
+        self._cache_image(False, registry_id=1)
+        with mock.patch.object(sqla_api.Connection, '_update_cached_image',
+                               side_effect=[None, mock.sentinel.ref]):
+            self.assertEqual(mock.sentinel.ref,
+                             self._cache_image(True, registry_id=1))
+
+    def test_get_cached_image_not_found(self):
+        self._cache_image(True, repo='other')
+        self.assertRaises(exception.CachedImageNotFound,
+                          dbapi.get_cached_image, self.context, 'docker',
+                          'ubuntu', 'latest', 'fake_project')
+
+    def test_get_cached_image_by_project_and_registry(self):
+        self._cache_image(True, project_id='other_project')
+        self._cache_image(False, registry_id=1)
+        self.assertRaises(exception.CachedImageNotFound,
+                          dbapi.get_cached_image, self.context, 'docker',
+                          'ubuntu', 'latest', 'fake_project')
+        res = dbapi.get_cached_image(self.context, 'docker', 'ubuntu',
+                                     'latest', 'fake_project', 1)
+        self.assertFalse(res.found)
+        res = dbapi.get_cached_image(self.context, 'docker', 'ubuntu',
+                                     'latest', 'other_project')
+        self.assertTrue(res.found)
@@ -119,6 +119,39 @@ class DbComputeNodeTestCase(base.DbTestCase):
             filters={'hostname': node1.hostname})
         self.assertEqual([node1.uuid], [r.uuid for r in res])
 
+    def test_list_compute_nodes_with_uuid_filter(self):
+        node1 = utils.create_test_compute_node(
+            hostname='node-one',
+            uuid=uuidutils.generate_uuid(),
+            rp_uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        utils.create_test_compute_node(
+            hostname='node-two',
+            uuid=uuidutils.generate_uuid(),
+            rp_uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        res = dbapi.list_compute_nodes(
+            self.context, filters={'uuid': [node1.uuid]})
+        self.assertEqual([node1.uuid], [r.uuid for r in res])
+
+    def test_list_compute_node_timestamps(self):
+        node1 = utils.create_test_compute_node(
+            hostname='node-one',
+            uuid=uuidutils.generate_uuid(),
+            rp_uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        node2 = utils.create_test_compute_node(
+            hostname='node-two',
+            uuid=uuidutils.generate_uuid(),
+            rp_uuid=uuidutils.generate_uuid(),
+            context=self.context)
+        node2 = dbapi.update_compute_node(self.context, node2.uuid,
+                                          {'mem_used': 256})
+        res = dbapi.list_compute_node_timestamps(self.context)
+        self.assertEqual({node1.uuid: node1.created_at,
+                          node2.uuid: node2.updated_at}, res)
+        self.assertIsNotNone(node2.updated_at)
+
     def test_destroy_compute_node(self):
         node = utils.create_test_compute_node(context=self.context)
         dbapi.destroy_compute_node(self.context, node.uuid)
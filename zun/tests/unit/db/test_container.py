@@ -12,6 +12,7 @@
 
 """Tests for manipulating Containers via the DB API"""
 
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from zun.common import consts
@@ -138,6 +139,40 @@ class DbContainerTestCase(base.DbTestCase):
                           consts.TYPE_CONTAINER,
                           sort_key='foo')
 
+    def test_list_containers_with_keyset_marker(self):
+        containers = []
+        for i in range(5):
+            containers.append(utils.create_test_container(
+                uuid=uuidutils.generate_uuid(),
+                context=self.context,
+                name='container' + str(i % 2)))
+        expected = sorted(containers, key=lambda c: (c.name, c.id))
+        marker = {'name': expected[1].name, 'id': expected[1].id}
+        res = dbapi.list_containers(
+            self.context, consts.TYPE_CONTAINER, limit=2, marker=marker,
+            sort_key='name')
+        self.assertEqual([c.id for c in expected[2:4]], [r.id for r in res])
+
+        expected = sorted(containers, key=lambda c: (c.created_at, c.id),
+                          reverse=True)
+        marker = {'created_at': expected[1].created_at.strftime(
+            timeutils.PERFECT_TIME_FORMAT), 'id': expected[1].id}
+        res = dbapi.list_containers(
+            self.context, consts.TYPE_CONTAINER, marker=marker,
+            sort_key='created_at', sort_dir='desc')
+        self.assertEqual([c.id for c in expected[2:]], [r.id for r in res])
+
+    def test_list_containers_with_invalid_keyset_marker(self):
+        self.assertRaises(exception.InvalidParameterValue,
+                          dbapi.list_containers, self.context,
+                          consts.TYPE_CONTAINER, marker={'id': 1},
+                          sort_key='name')
+        self.assertRaises(exception.InvalidParameterValue,
+                          dbapi.list_containers, self.context,
+                          consts.TYPE_CONTAINER,
+                          marker={'created_at': 'foo', 'id': 1},
+                          sort_key='created_at')
+
     def test_list_containers_with_filters(self):
         container1 = utils.create_test_container(
             name='container-one',
@@ -247,9 +282,64 @@ class DbContainerTestCase(base.DbTestCase):
                           consts.TYPE_CONTAINER,
                           container_uuid, {'image': new_image})
 
+    def test_update_containers(self):
+        container1 = utils.create_test_container(
+            uuid=uuidutils.generate_uuid(), name='container-one',
+            context=self.context)
+        container2 = utils.create_test_container(
+            uuid=uuidutils.generate_uuid(), name='container-two',
+            context=self.context)
+
+        dbapi.update_containers(self.context, [
+            {'id': container1.id, 'status': 'Stopped', 'host': 'host1'},
+            {'id': container2.id, 'status': 'Paused', 'host': 'host1'}])
+        res1 = dbapi.get_container_by_uuid(
+            self.context, container1.container_type, container1.uuid)
+        res2 = dbapi.get_container_by_uuid(
+            self.context, container2.container_type, container2.uuid)
+        self.assertEqual('Stopped', res1.status)
+        self.assertEqual('Paused', res2.status)
+        self.assertEqual('host1', res1.host)
+        self.assertEqual('host1', res2.host)
+
+    def test_update_containers_uuid(self):
+        container = utils.create_test_container(context=self.context)
+        self.assertRaises(exception.InvalidParameterValue,
+                          dbapi.update_containers, self.context,
+                          [{'id': container.id, 'uuid': ''}])
+
     def test_update_container_uuid(self):
         container = utils.create_test_container(context=self.context)
         self.assertRaises(exception.InvalidParameterValue,
                           dbapi.update_container, self.context,
                           container.container_type,
                           container.id, {'uuid': ''})
+
+    def test_count_usages(self):
+        for i, (cpu, memory, disk) in enumerate(
+                [(0.5, '512', 10), (1.5, '1024', 20)]):
+            utils.create_test_container(
+                context=self.context, uuid=uuidutils.generate_uuid(),
+                name='container-%d' % i, project_id='fake_project',
+                cpu=cpu, memory=memory, disk=disk)
+        utils.create_test_container(
+            context=self.context, uuid=uuidutils.generate_uuid(),
+            name='other', project_id='other_project', cpu=4.0,
+            memory='4096', disk=40)
+
+        usages = dbapi.count_usages(self.context, consts.TYPE_CONTAINER,
+                                    'fake_project')
+        self.assertEqual({'containers': 2, 'cpu': 2.0, 'memory': 1536,
+                          'disk': 30}, usages)
+        self.assertIsInstance(usages['memory'], int)
+        for flag in ('containers', 'cpu', 'memory', 'disk'):
+            self.assertEqual(usages[flag], dbapi.count_usage(
+                self.context, consts.TYPE_CONTAINER, 'fake_project',
+                flag)[0])
+
+    def test_count_usages_no_containers(self):
+        self.assertEqual({'containers': 0, 'cpu': 0.0, 'memory': 0,
+                          'disk': 0},
+                         dbapi.count_usages(self.context,
+                                            consts.TYPE_CONTAINER,
+                                            'fake_project'))
@@ -114,6 +114,22 @@ class DbContainerActionTestCase(_DBContainerActionBase):
         actions = dbapi.actions_get(self.context, uuid1)
         self._assertEqualListsOfObjects(expected, actions)
 
+    def test_container_actions_get_paginated(self):
+        uuid = uuidutils.generate_uuid()
+        action_values = self._create_action_values(uuid)
+        actions = []
+        for i in range(3):
+            action_values['action'] = 'test-action-%d' % i
+            actions.append(dbapi.action_start(self.context, action_values))
+        actions.reverse()
+
+        page = dbapi.actions_get(self.context, uuid, limit=2)
+        self.assertEqual([a.id for a in actions[:2]], [a.id for a in page])
+        marker = {'created_at': page[-1].created_at.strftime(
+            timeutils.PERFECT_TIME_FORMAT), 'id': page[-1].id}
+        page = dbapi.actions_get(self.context, uuid, limit=2, marker=marker)
+        self.assertEqual([actions[2].id], [a.id for a in page])
+
     def test_container_action_get_by_container_and_request(self):
         """Ensure we can get an action by container UUID and request_id"""
         uuid1 = uuidutils.generate_uuid()
@@ -220,3 +236,53 @@ class DbContainerActionTestCase(_DBContainerActionBase):
 
         self._assertEqualOrderedListOfObjects([event3, event2, event1], events,
                                               ['container_uuid', 'request_id'])
+
+    def test_container_action_events_record(self):
+        uuid = uuidutils.generate_uuid()
+        action = dbapi.action_start(self.context,
+                                    self._create_action_values(uuid))
+        dbapi.action_event_start(self.context,
+                                 self._create_event_values(uuid, 'fake1'))
+
+        finish_time = timeutils.utcnow() + timedelta(seconds=5)
+        finished = self._create_event_values(
+            uuid, 'fake1', extra={'finish_time': finish_time,
+                                  'result': 'Success'})
+        del finished['start_time']
+        coalesced = self._create_event_values(
+            uuid, 'fake2', extra={'finish_time': finish_time,
+                                  'result': 'Error', 'traceback': 'tb'})
+        started = self._create_event_values(uuid, 'fake3')
+        finished_action = {'container_uuid': uuid,
+                           'request_id': self.context.request_id,
+                           'action': 'create_container',
+                           'finish_time': finish_time}
+        dropped = dbapi.action_events_record(
+            self.context, [finished, coalesced, started], [finished_action])
+        self.assertEqual([], dropped)
+
+        events = {e.event: e for e in dbapi.action_events_get(
+            self.context, action['id'])}
+        self.assertEqual(['fake1', 'fake2', 'fake3'], sorted(events))
+        self.assertEqual('Success', events['fake1'].result)
+        self.assertEqual(finish_time, events['fake1'].finish_time)
+        self.assertEqual('Error', events['fake2'].result)
+        self.assertEqual('tb', events['fake2'].traceback)
+        self.assertEqual(coalesced['start_time'], events['fake2'].start_time)
+        self.assertIsNone(events['fake3'].finish_time)
+        action = dbapi.action_get_by_request_id(self.context, uuid,
+                                                self.context.request_id)
+        self.assertEqual(finish_time, action.finish_time)
+
+    def test_container_action_events_record_without_action(self):
+        uuid = uuidutils.generate_uuid()
+        started = self._create_event_values(uuid)
+        finished = self._create_event_values(uuid)
+        del finished['start_time']
+        finished_action = {'container_uuid': uuid,
+                           'request_id': self.context.request_id,
+                           'action': 'create_container',
+                           'finish_time': timeutils.utcnow()}
+        dropped = dbapi.action_events_record(
+            self.context, [started, finished], [finished_action])
+        self.assertEqual([started, finished, finished_action], dropped)
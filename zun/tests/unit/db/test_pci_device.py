@@ -164,6 +164,21 @@ class DbPciDeviceTestCase(base.DbTestCase, base.ModelsObjectComparatorMixin):
             '00000000-0000-0000-0000-000000000010')
         self._assertEqualListsOfObjects(results, [v1], self.ignored_keys)
 
+    def test_get_pci_device_by_container_uuids(self):
+        v1, v2 = self._create_fake_pci_devs()
+        v1['status'] = z_fields.PciDeviceStatus.ALLOCATED
+        v2['status'] = z_fields.PciDeviceStatus.ALLOCATED
+        v2['container_uuid'] = '00000000-0000-0000-0000-000000000011'
+        dbapi.update_pci_device(v1['compute_node_uuid'],
+                                v1['address'], v1)
+        dbapi.update_pci_device(v2['compute_node_uuid'],
+                                v2['address'], v2)
+        results = dbapi.get_all_pci_device_by_container_uuids(
+            ['00000000-0000-0000-0000-000000000010',
+             '00000000-0000-0000-0000-000000000011',
+             '00000000-0000-0000-0000-000000000012'])
+        self._assertEqualListsOfObjects(results, [v1, v2], self.ignored_keys)
+
     def test_update_pci_device(self):
         v1, v2 = self._create_fake_pci_devs()
         v1['status'] = z_fields.PciDeviceStatus.ALLOCATED
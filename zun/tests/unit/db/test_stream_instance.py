@@ -0,0 +1,62 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for manipulating stream instances via the DB API"""
+
+import datetime
+from unittest import mock
+
+from oslo_utils import timeutils
+
+from zun.common import exception
+import zun.conf
+from zun.db import api as dbapi
+from zun.tests.unit.db import base
+
+CONF = zun.conf.CONF
+
+
+class DbStreamInstanceTestCase(base.DbTestCase):
+
+    def _create_stream_instance(self, token='fake-token'):
+        return dbapi.create_stream_instance(
+            self.context, {'container_id': 1, 'token': token,
+                           'type': 'logs', 'url': 'fake-url',
+                           'params': {'follow': True}})
+
+    def test_consume_stream_instance(self):
+        self._create_stream_instance()
+        res = dbapi.consume_stream_instance(self.context, 'fake-token')
+        self.assertEqual(1, res.container_id)
+        self.assertEqual('logs', res.type)
+        self.assertEqual({'follow': True}, res.params)
+        # A token can be used once.
+        self.assertRaises(exception.StreamInstanceNotFound,
+                          dbapi.consume_stream_instance, self.context,
+                          'fake-token')
+
+    def test_consume_stream_instance_not_found(self):
+        self._create_stream_instance(token='other-token')
+        self.assertRaises(exception.StreamInstanceNotFound,
+                          dbapi.consume_stream_instance, self.context,
+                          'fake-token')
+
+    def test_create_stream_instance_purges_expired(self):
+        CONF.set_override('stream_token_ttl', 60, group='websocket_proxy')
+        earlier = timeutils.utcnow() - datetime.timedelta(seconds=61)
+        with mock.patch.object(timeutils, 'utcnow', return_value=earlier):
+            self._create_stream_instance(token='expired-token')
+        self._create_stream_instance()
+        self.assertRaises(exception.StreamInstanceNotFound,
+                          dbapi.consume_stream_instance, self.context,
+                          'expired-token')
+        dbapi.consume_stream_instance(self.context, 'fake-token')
@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
 import os
 import shutil
 import tempfile
@@ -92,14 +93,15 @@ class TestDriver(base.BaseTestCase):
         image_meta.name = 'image'
         image_meta.tags = ['latest']
         mock_find_image.return_value = image_meta
-        mock_download_image.return_value = 'content'
+        mock_download_image.return_value = [b'content']
         CONF.set_override('images_directory', self.test_dir, group='glance')
         out_path = os.path.join(self.test_dir, '1234' + '.tar')
-        mock_open_file = mock.mock_open()
-        with mock.patch('zun.image.glance.driver.open', mock_open_file):
-            ret = self.driver.pull_image(None, 'image', 'latest', 'always',
-                                         None)
-        mock_open_file.assert_any_call(out_path, 'wb')
+        ret = self.driver.pull_image(None, 'image', 'latest', 'always',
+                                     None)
+        with open(out_path, 'rb') as fd:
+            self.assertEqual(b'content', fd.read())
+        self.assertEqual(['1234.tar'], [f for f in os.listdir(self.test_dir)
+                                        if f.endswith('tar')])
         self.assertTrue(mock_search_on_host.called)
         self.assertTrue(mock_should_pull_image.called)
         self.assertTrue(mock_find_image.called)
@@ -107,6 +109,76 @@ class TestDriver(base.BaseTestCase):
         self.assertEqual(({'image': 'image', 'path': out_path,
                            'tags': ['latest']}, False), ret)
 
+    @mock.patch.object(driver.GlanceDriver, '_search_image_on_host')
+    @mock.patch('zun.image.glance.utils.download_image_in_chunks')
+    @mock.patch('zun.image.glance.utils.find_image')
+    def test_pull_image_write_failure(self, mock_find_image,
+                                      mock_download_image,
+                                      mock_search_on_host):
+        mock_search_on_host.return_value = None
+        image_meta = mock.MagicMock()
+        image_meta.id = '1234'
+        mock_find_image.return_value = image_meta
+
+        def chunks():
+            yield b'con'
+            raise IOError('connection lost')
+
+        mock_download_image.return_value = chunks()
+        CONF.set_override('images_directory', self.test_dir, group='glance')
+        self.assertRaises(exception.ZunException, self.driver.pull_image,
+                          None, 'image', 'latest', 'always', None)
+        # Neither the partial tarball nor the temporary file are left
+        self.assertEqual([], os.listdir(self.test_dir))
+
+    def _write_image(self, image_id, content):
+        CONF.set_override('images_directory', self.test_dir, group='glance')
+        path = os.path.join(self.test_dir, image_id + '.tar')
+        with open(path, 'wb') as fd:
+            fd.write(content)
+        return {'id': image_id, 'image': 'nginx', 'path': path,
+                'checksum': hashlib.md5(content).hexdigest()}
+
+    def test_verify_md5sum_for_image_cached(self):
+        image = self._write_image('1234', b'content')
+        self.assertTrue(self.driver._verify_md5sum_for_image(image))
+        with mock.patch('hashlib.md5') as mock_md5:
+            self.assertTrue(self.driver._verify_md5sum_for_image(image))
+            self.assertFalse(mock_md5.called)
+
+    def test_verify_md5sum_for_image_file_changed(self):
+        image = self._write_image('1234', b'content')
+        self.assertTrue(self.driver._verify_md5sum_for_image(image))
+        with open(image['path'], 'wb') as fd:
+            fd.write(b'corrupted content')
+        self.assertFalse(self.driver._verify_md5sum_for_image(image))
+
+    def test_verify_md5sum_for_image_mismatch(self):
+        image = self._write_image('1234', b'content')
+        image['checksum'] = 'xxx'
+        self.assertFalse(self.driver._verify_md5sum_for_image(image))
+        self.assertIsNone(self.driver._get_cached_checksum('1234',
+                                                           image['path']))
+
+    @mock.patch.object(driver.GlanceDriver, '_search_image_on_host')
+    @mock.patch('zun.image.glance.utils.download_image_in_chunks')
+    @mock.patch('zun.image.glance.utils.find_image')
+    def test_pull_image_record_checksum(self, mock_find_image,
+                                        mock_download_image,
+                                        mock_search_on_host):
+        mock_search_on_host.return_value = None
+        image_meta = mock.MagicMock()
+        image_meta.id = '1234'
+        image_meta.checksum = hashlib.md5(b'content').hexdigest()
+        mock_find_image.return_value = image_meta
+        mock_download_image.return_value = [b'con', b'tent']
+        CONF.set_override('images_directory', self.test_dir, group='glance')
+        image, _ = self.driver.pull_image(None, 'image', 'latest', 'always',
+                                          None)
+        self.assertEqual(image_meta.checksum,
+                         self.driver._get_cached_checksum('1234',
+                                                          image['path']))
+
     @mock.patch('zun.common.utils.should_pull_image')
     def test_pull_image_not_found(self, mock_should_pull_image):
         mock_should_pull_image.return_value = True
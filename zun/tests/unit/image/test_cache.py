@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+from unittest import mock
+
+from oslo_utils import timeutils
+
+from zun.common import exception
+from zun.image import cache
+from zun import objects
+from zun.tests.unit.db import base
+
+
+class TestImageCache(base.DbTestCase):
+
+    def setUp(self):
+        super(TestImageCache, self).setUp()
+        self.config(enable_image_validation=True,
+                    image_validation_cache_ttl=3600,
+                    image_validation_negative_cache_ttl=60, group='api')
+        self.config(default_image_driver='docker')
+
+    def _later(self, seconds):
+        return timeutils.utcnow() + datetime.timedelta(seconds=seconds)
+
+    def test_lookup_not_cached(self):
+        self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                       'latest'))
+
+    def test_lookup_found(self):
+        cache.record(self.context, None, 'ubuntu', 'latest', True)
+        self.assertTrue(cache.lookup(self.context, 'docker', 'ubuntu',
+                                     'latest'))
+        self.assertIsNone(cache.lookup(self.context, 'glance', 'ubuntu',
+                                       'latest'))
+        self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                       '22.04'))
+        with mock.patch.object(timeutils, 'utcnow',
+                               return_value=self._later(3601)):
+            self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                           'latest'))
+
+    def test_lookup_not_found(self):
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', False)
+        self.assertFalse(cache.lookup(self.context, 'docker', 'ubuntu',
+                                      'latest'))
+        with mock.patch.object(timeutils, 'utcnow',
+                               return_value=self._later(61)):
+            self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                           'latest'))
+
+    def test_record_disabled(self):
+        self.config(image_validation_negative_cache_ttl=0, group='api')
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', False)
+        self.assertRaises(exception.CachedImageNotFound,
+                          objects.CachedImage.get, self.context, 'docker',
+                          'ubuntu', 'latest')
+
+        self.config(enable_image_validation=False, group='api')
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', True)
+        self.assertRaises(exception.CachedImageNotFound,
+                          objects.CachedImage.get, self.context, 'docker',
+                          'ubuntu', 'latest')
+
+    @mock.patch.object(objects.CachedImage, 'cache',
+                       side_effect=exception.ZunException)
+    def test_record_failed(self, mock_cache):
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', True)
+        mock_cache.assert_called_once_with(self.context, 'docker', 'ubuntu',
+                                           'latest', True, registry_id=None)
+
+    def test_lookup_other_project(self):
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', False)
+        other_context = self.context.elevated()
+        other_context.project_id = 'other-project'
+        self.assertIsNone(cache.lookup(other_context, 'docker', 'ubuntu',
+                                       'latest'))
+
+    def test_lookup_registry(self):
+        registry = mock.Mock(id=1)
+        cache.record(self.context, 'docker', 'ubuntu', 'latest', True,
+                     registry=registry)
+        self.assertTrue(cache.lookup(self.context, 'docker', 'ubuntu',
+                                     'latest', registry=registry))
+        self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                       'latest'))
+        self.assertIsNone(cache.lookup(self.context, 'docker', 'ubuntu',
+                                       'latest', registry=mock.Mock(id=2)))
@@ -0,0 +1,102 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import copy
+import itertools
+import threading
+import time
+
+from neutronclient.common import exceptions as n_exceptions
+from oslo_utils import uuidutils
+
+
+class FakeNeutronClient(object):
+    """An in-memory Neutron client managing the ports of networks.
+
+    :param latency: the number of seconds each call of a method sleeps, by
+                    method name, e.g. to simulate the cost of creating a port.
+                    A bulk create sleeps this time for each port.
+    """
+
+    def __init__(self, networks=('fake-net-id',), latency=None):
+        self.networks = set(networks)
+        self.latency = latency or {}
+        self.ports = {}
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+        self._ips = itertools.count(2)
+
+    def _call(self, name, count=1):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency.get(name):
+            time.sleep(self.latency[name] * count)
+
+    def _new_port(self, values):
+        if values['network_id'] not in self.networks:
+            raise n_exceptions.NetworkNotFoundClient()
+        ip = next(self._ips)
+        port = {
+            'id': uuidutils.generate_uuid(),
+            'name': '',
+            'device_id': '',
+            'device_owner': '',
+            'mac_address': 'fa:16:3e:00:%02x:%02x' % (ip // 256, ip % 256),
+            'fixed_ips': [{'ip_address': '10.5.%d.%d' % (ip // 256, ip % 256),
+                           'subnet_id': 'fake-subnet-id'}],
+            'security_groups': ['default-sg'],
+            'status': 'DOWN',
+        }
+        port.update(copy.deepcopy(values))
+        for fixed_ip in port['fixed_ips']:
+            fixed_ip.setdefault('subnet_id', 'fake-subnet-id')
+        with self._lock:
+            self.ports[port['id']] = port
+        return copy.deepcopy(port)
+
+    def create_port(self, body=None):
+        if 'ports' in body:
+            self._call('create_port', len(body['ports']))
+            return {'ports': [self._new_port(values)
+                              for values in body['ports']]}
+        self._call('create_port')
+        return {'port': self._new_port(body['port'])}
+
+    def update_port(self, port, body=None):
+        self._call('update_port')
+        with self._lock:
+            if port not in self.ports:
+                raise n_exceptions.PortNotFoundClient()
+            self.ports[port].update(copy.deepcopy(body['port']))
+            return {'port': copy.deepcopy(self.ports[port])}
+
+    def show_port(self, port, **_params):
+        self._call('show_port')
+        with self._lock:
+            if port not in self.ports:
+                raise n_exceptions.PortNotFoundClient()
+            return {'port': copy.deepcopy(self.ports[port])}
+
+    def list_ports(self, **filters):
+        self._call('list_ports')
+        with self._lock:
+            ports = [copy.deepcopy(port) for port in self.ports.values()
+                     if all(port.get(attr) == value
+                            for attr, value in filters.items())]
+        return {'ports': ports}
+
+    def delete_port(self, port):
+        self._call('delete_port')
+        with self._lock:
+            if self.ports.pop(port, None) is None:
+                raise n_exceptions.PortNotFoundClient()
@@ -0,0 +1,152 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from zun.common import clients
+from zun.common import consts
+from zun.network import neutron
+from zun.network import port_pool
+from zun.tests import base
+from zun.tests.unit.network import fake_neutron
+
+KEY = port_pool.pool_key('fake-net-id', 'fake_project', None)
+
+
+class TestPortPool(base.TestCase):
+
+    def setUp(self):
+        super(TestPortPool, self).setUp()
+        self.client = fake_neutron.FakeNeutronClient()
+        p = mock.patch.object(clients.OpenStackClients, 'neutron',
+                              return_value=self.client)
+        p.start()
+        self.addCleanup(p.stop)
+        # The pools are refilled by the tests rather than in the background.
+        p = mock.patch.object(port_pool.PortPool, '_run')
+        p.start()
+        self.addCleanup(p.stop)
+        self.config(host='fake-host')
+        self.config(port_pool_min_size=2, port_pool_max_size=3,
+                    group='network')
+        port_pool.start_pool()
+        self.addCleanup(port_pool.stop_pool)
+        self.pool = port_pool.get_pool()
+        self.neutron_api = neutron.NeutronAPI(self.context)
+        self.container = mock.Mock(uuid='fake-uuid', host='fake-host')
+
+    def _create_port(self, security_groups=None, **requested_network):
+        requested_network.setdefault('preserve_on_delete', False)
+        addresses, port = self.neutron_api.create_or_update_port(
+            self.container, 'fake-net-id', requested_network,
+            'compute:kuryr', security_groups, set_binding_host=True)
+        return port
+
+    def test_start_pool_disabled(self):
+        port_pool.stop_pool()
+        self.config(port_pool_min_size=0, group='network')
+        port_pool.start_pool()
+        self.assertIsNone(port_pool.get_pool())
+
+    def test_start_deletes_leftover_ports(self):
+        port_pool.stop_pool()
+        leftover = self.client.create_port({'port': {
+            'network_id': 'fake-net-id', 'name': 'zun-port-pool-fake-host'}})
+        port_pool.start_pool()
+        self.assertNotIn(leftover['port']['id'], self.client.ports)
+
+    def test_take_and_refill(self):
+        self.assertIsNone(self.pool.take(KEY))
+        self.pool.refill()
+        # The ports of a pool are created in bulk.
+        self.assertEqual(1, self.client.calls['create_port'])
+        self.assertEqual(2, len(self.client.ports))
+        port = self.pool.take(KEY)
+        self.assertEqual('zun-port-pool-fake-host', port['name'])
+        self.assertEqual('fake_project', port['tenant_id'])
+        self.pool.refill()
+        self.assertEqual(3, len(self.client.ports))
+
+    def test_create_or_update_port_from_pool(self):
+        self._create_port()
+        self.assertEqual(1, self.client.calls['create_port'])
+        self.pool.refill()
+        self.client.calls.clear()
+
+        port = self._create_port()
+        self.assertEqual(0, self.client.calls['create_port'])
+        self.assertEqual(1, self.client.calls['update_port'])
+        self.assertEqual('', port['name'])
+        self.assertEqual('fake-uuid', port['device_id'])
+        self.assertEqual('compute:kuryr', port['device_owner'])
+        self.assertEqual('fake-host', port[consts.BINDING_HOST_ID])
+
+    def test_create_or_update_port_pooled_port_deleted(self):
+        self.pool.take(KEY)
+        self.pool.refill()
+        self.client.ports.clear()
+        port = self._create_port()
+        self.assertEqual(2, self.client.calls['create_port'])
+        self.assertIn(port['id'], self.client.ports)
+
+    def test_create_or_update_port_fixed_ip(self):
+        self.pool.take(KEY)
+        self.pool.refill()
+        self.client.calls.clear()
+        port = self._create_port(fixed_ip='10.5.0.100')
+        self.assertEqual(1, self.client.calls['create_port'])
+        self.pool.refill()
+        self.neutron_api.delete_or_unbind_ports([port['id']], [port['id']])
+        self.assertNotIn(port['id'], self.client.ports)
+
+    def test_release_port(self):
+        port = self._create_port()
+        self.neutron_api.delete_or_unbind_ports([port['id']], [port['id']])
+        self.assertEqual(0, self.client.calls['delete_port'])
+        released = self.client.ports[port['id']]
+        self.assertEqual('', released['device_id'])
+        self.assertIsNone(released[consts.BINDING_HOST_ID])
+        self.assertEqual(port['id'], self.pool.take(KEY)['id'])
+
+    def test_release_port_pool_full(self):
+        port = self._create_port()
+        self.pool.refill()
+        self.pool.max_size = 2
+        self.neutron_api.delete_or_unbind_ports([port['id']], [port['id']])
+        self.assertNotIn(port['id'], self.client.ports)
+
+    def test_release_port_security_groups_changed(self):
+        port = self._create_port(security_groups=['sg1'])
+        self.client.update_port(port['id'], {'port': {
+            'security_groups': ['sg1', 'sg2']}})
+        self.neutron_api.delete_or_unbind_ports([port['id']], [port['id']])
+        self.assertNotIn(port['id'], self.client.ports)
+
+    def test_release_preserved_port(self):
+        port = self._create_port()
+        self.neutron_api.delete_or_unbind_ports([port['id']], [])
+        self.assertIn(port['id'], self.client.ports)
+        self.assertIsNone(self.pool.take(KEY))
+
+    def test_refill_network_not_found(self):
+        key = port_pool.pool_key('other-net-id', 'fake_project', ['sg1'])
+        self.pool.take(key)
+        self.pool.refill()
+        self.assertEqual({}, self.client.ports)
+        self.pool.refill()
+        self.assertEqual(1, self.client.calls['create_port'])
+
+    def test_stop_deletes_pooled_ports(self):
+        port = self._create_port()
+        self.pool.refill()
+        port_pool.stop_pool()
+        self.assertEqual([port['id']], list(self.client.ports))
@@ -14,6 +14,7 @@
 
 from unittest import mock
 
+from oslo_utils import uuidutils
 from testtools.matchers import HasLength
 
 from zun.common import consts
@@ -67,6 +68,34 @@ class TestCapsuleObject(base.DbTestCase):
                                                   limit=None, marker=None,
                                                   sort_key=None, sort_dir=None)
 
+    def test_list_with_expected_attrs(self):
+        for i in range(2):
+            capsule = utils.create_test_container(
+                context=self.context, uuid=uuidutils.generate_uuid(),
+                name='capsule%d' % i, container_type=consts.TYPE_CAPSULE)
+            for container_type in (consts.TYPE_CAPSULE_CONTAINER,
+                                   consts.TYPE_CAPSULE_INIT_CONTAINER):
+                utils.create_test_container(
+                    context=self.context, uuid=uuidutils.generate_uuid(),
+                    name='%s-%s' % (capsule.name, container_type),
+                    container_type=container_type, capsule_id=capsule.id)
+        with mock.patch.object(
+                self.dbapi, 'list_containers',
+                wraps=self.dbapi.list_containers) as mock_get_list:
+            capsules = objects.Capsule.list(
+                self.context,
+                expected_attrs=['containers', 'init_containers'])
+            self.assertEqual(3, mock_get_list.call_count)
+        self.assertThat(capsules, HasLength(2))
+        for capsule in capsules:
+            self.assertEqual(['%s-%s' % (capsule.name,
+                                         consts.TYPE_CAPSULE_CONTAINER)],
+                             [c.name for c in capsule.containers])
+            self.assertEqual(['%s-%s' % (capsule.name,
+                                         consts.TYPE_CAPSULE_INIT_CONTAINER)],
+                             [c.name for c in capsule.init_containers])
+            self.assertEqual({}, capsule.obj_get_changes())
+
     def test_create(self):
         with mock.patch.object(self.dbapi, 'create_container',
                                autospec=True) as mock_create_capsule:
@@ -119,6 +119,44 @@ class TestContainerObject(base.DbTestCase):
                                                   limit=None, marker=None,
                                                   sort_key=None, sort_dir=None)
 
+    def test_list_with_expected_attrs(self):
+        registry = utils.create_test_registry(context=self.context)
+        for i in range(3):
+            container = utils.create_test_container(
+                context=self.context, uuid=uuidutils.generate_uuid(),
+                name='container%d' % i, registry_id=registry.id)
+            utils.create_test_exec_instance(
+                context=self.context, container_id=container.id,
+                exec_id='exec%d' % i)
+        with mock.patch.object(
+                self.dbapi, 'get_registry_by_id',
+                wraps=self.dbapi.get_registry_by_id) as mock_get_registry, \
+                mock.patch.object(
+                    self.dbapi, 'list_exec_instances',
+                    wraps=self.dbapi.list_exec_instances) as mock_list_execs:
+            containers = objects.Container.list(
+                self.context,
+                expected_attrs=['registry', 'exec_instances', 'pci_devices'])
+            self.assertThat(containers, HasLength(3))
+            for container in containers:
+                self.assertEqual(registry.uuid, container.registry.uuid)
+                self.assertThat(container.exec_instances, HasLength(1))
+                self.assertEqual(container.id,
+                                 container.exec_instances[0].container_id)
+                self.assertEqual([], container.pci_devices)
+                self.assertEqual({}, container.obj_get_changes())
+            self.assertFalse(mock_get_registry.called)
+            self.assertEqual(1, mock_list_execs.call_count)
+
+    def test_list_with_expected_attrs_no_registry(self):
+        utils.create_test_container(context=self.context)
+        with mock.patch.object(self.dbapi, 'list_registries',
+                               autospec=True) as mock_list_registries:
+            containers = objects.Container.list(self.context,
+                                                expected_attrs=['registry'])
+            self.assertIsNone(containers[0].registry)
+            self.assertFalse(mock_list_registries.called)
+
     def test_create(self):
         with mock.patch.object(self.dbapi, 'create_container',
                                autospec=True) as mock_create_container:
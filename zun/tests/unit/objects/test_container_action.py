@@ -52,8 +52,8 @@ class TestContainerActionObject(base.DbTestCase):
             mock_get_actions.return_value = [self.fake_action]
             actions = objects.ContainerAction.get_by_container_uuid(
                 self.context, container_ident)
-            mock_get_actions.assert_called_once_with(self.context,
-                                                     container_ident)
+            mock_get_actions.assert_called_once_with(
+                self.context, container_ident, limit=None, marker=None)
 
             self.assertThat(actions, HasLength(1))
             self.assertIsInstance(actions[0], objects.ContainerAction)
@@ -344,10 +344,11 @@ class TestObject(test_base.TestCase, _TestObject):
 # For more information on object version testing, read
 # https://docs.openstack.org/zun/latest/
 object_data = {
-    'Capsule': '1.4-66820eeca01c71b41db2270e7321ffe4',
-    'CapsuleContainer': '1.4-740c49be2097362c640f39765cf2706e',
-    'CapsuleInitContainer': '1.4-740c49be2097362c640f39765cf2706e',
-    'Container': '1.44-63357c7ce1fa6b6fdb462296b8d556cf',
+    'CachedImage': '1.1-8f1a6889b18144f78bdd2738ee71421f',
+    'Capsule': '1.6-75f14f5ca1e52622e31f6eeb8876c6ea',
+    'CapsuleContainer': '1.6-8536243bab823a5144696123ae02195f',
+    'CapsuleInitContainer': '1.6-8536243bab823a5144696123ae02195f',
+    'Container': '1.46-04680270e62f34ba085e40d25a7bfe1e',
     'Cpuset': '1.0-06c4e6335683c18b87e2e54080f8c341',
     'Volume': '1.0-034768f2f5c5e89acb5ee45c6d3f3403',
     'VolumeMapping': '1.5-57febc66526185a75a744637e7a387c7',
@@ -358,20 +359,21 @@ object_data = {
     'ResourceClass': '1.1-d661c7675b3cd5b8c3618b68ba64324e',
     'ResourceProvider': '1.0-92b427359d5a4cf9ec6c72cbe630ee24',
     'ZunService': '1.2-deff2a74a9ce23baa231ae12f39a6189',
-    'PciDevice': '1.1-6e3f0851ad1cf12583e6af4df1883979',
-    'ComputeNode': '1.14-5cf09346721129068d1f72482309276f',
+    'PciDevice': '1.2-3c4ae0c247073b836fcaf9fa52147de4',
+    'ComputeNode': '1.15-c9bc4910d8d243bc14dbc3579c4e32d2',
     'PciDevicePool': '1.0-3f5ddc3ff7bfa14da7f6c7e9904cc000',
     'PciDevicePoolList': '1.0-15ecf022a68ddbb8c2a6739cfc9f8f5e',
     'Quota': '1.3-fcaaaf4b6e983207edba27a1cf8e51ab',
     'QuotaClass': '1.2-4739583a70891fbc145031228fb8001e',
     'ContainerPCIRequest': '1.0-b060f9f9f734bedde79a71a4d3112ee0',
     'ContainerPCIRequests': '1.0-7b8f7f044661fe4e24e6949c035af2c4',
-    'ContainerAction': '1.2-4ae05fe3d1576c211c2425e4db190ef2',
-    'ContainerActionEvent': '1.0-2974d0a6f5d4821fd4e223a88c10181a',
+    'ContainerAction': '1.3-f7056bd6bfaade17e99d881ae848bde8',
+    'ContainerActionEvent': '1.1-4b3cadde0371ebb395be8ebb3c4a5399',
     'ZunNetwork': '1.2-f0a65c31e98868ac64bd30c09245b516',
-    'ExecInstance': '1.0-59464e7b96db847c0abb1e96d3cec30a',
+    'ExecInstance': '1.1-92aa0a1a2991a1e94ee6552c3654e863',
     'Registry': '1.0-9fddfae03f3ca052cc26c924642b9268',
     'RequestGroup': '1.0-5e08d68d0a63b729778340d608ec4eae',
+    'StreamInstance': '1.0-0b7cb4a60851289d832aee10a90d8a74',
 }
 
 
@@ -0,0 +1,54 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from zun import objects
+from zun.tests.unit.db import base
+
+
+class TestStreamInstanceObject(base.DbTestCase):
+
+    def setUp(self):
+        super(TestStreamInstanceObject, self).setUp()
+        self.fake_stream_inst = {
+            'id': 43,
+            'container_id': 42,
+            'token': 'fake-token',
+            'type': 'logs',
+            'url': 'fake-url',
+            'params': {'follow': True},
+            'created_at': None,
+            'updated_at': None,
+        }
+
+    def test_consume(self):
+        with mock.patch.object(self.dbapi, 'consume_stream_instance',
+                               autospec=True) as mock_consume:
+            mock_consume.return_value = self.fake_stream_inst
+            stream_inst = objects.StreamInstance.consume(self.context,
+                                                         'fake-token')
+            mock_consume.assert_called_once_with(self.context, 'fake-token')
+            self.assertEqual('logs', stream_inst.type)
+            self.assertEqual({'follow': True}, stream_inst.params)
+            self.assertEqual(self.context, stream_inst._context)
+
+    def test_create(self):
+        with mock.patch.object(self.dbapi, 'create_stream_instance',
+                               autospec=True) as mock_create:
+            mock_create.return_value = self.fake_stream_inst
+            stream_inst = objects.StreamInstance(
+                self.context, **self.fake_stream_inst)
+            stream_inst.create(self.context)
+            mock_create.assert_called_once_with(self.context,
+                                                self.fake_stream_inst)
+            self.assertEqual(self.context, stream_inst._context)
@@ -0,0 +1,140 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+from unittest import mock
+
+from zun.common import exception
+from zun import objects
+from zun.scheduler.client import candidates
+from zun.scheduler import utils
+from zun.tests import base
+from zun.tests.unit.db import utils as db_utils
+
+
+class AllocationCandidateCacheTestCase(base.TestCase):
+
+    def setUp(self):
+        super(AllocationCandidateCacheTestCase, self).setUp()
+        self.cache = candidates.AllocationCandidateCache(10)
+        self.result = (['alloc_req'], {'rp_uuid': {}}, '1.29')
+
+    def test_get(self):
+        query = mock.Mock(return_value=self.result)
+        self.assertEqual((self.result, False), self.cache.get('key', query))
+        self.assertEqual((self.result, True), self.cache.get('key', query))
+        query.assert_called_once_with()
+
+        other = ([], {}, '1.29')
+        query = mock.Mock(return_value=other)
+        self.assertEqual((other, False), self.cache.get('other', query))
+        self.assertEqual({'hits': 1, 'misses': 2, 'coalesced': 0,
+                          'invalidations': 0}, self.cache.stats())
+
+    @mock.patch('time.monotonic')
+    def test_get_expired(self, mock_monotonic):
+        query = mock.Mock(return_value=self.result)
+        mock_monotonic.return_value = 100
+        self.cache.get('key', query)
+        mock_monotonic.return_value = 111
+        self.assertEqual((self.result, False), self.cache.get('key', query))
+        self.assertEqual(2, query.call_count)
+
+    def test_get_failed_query_not_cached(self):
+        failed = (None, None, None)
+        query = mock.Mock(return_value=failed)
+        self.cache.get('key', query)
+        self.assertEqual((failed, False), self.cache.get('key', query))
+        self.assertEqual(2, query.call_count)
+
+        query = mock.Mock(side_effect=exception.ZunException)
+        self.assertRaises(exception.ZunException, self.cache.get, 'key',
+                          query)
+        self.assertEqual({}, self.cache._pending)
+
+    def test_get_coalesce(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def query():
+            started.set()
+            release.wait()
+            return self.result
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(self.cache.get('key', query)))
+        leader.start()
+        started.wait()
+        waiters = [threading.Thread(
+            target=lambda: results.append(self.cache.get('key', query)))
+            for i in range(2)]
+        for waiter in waiters:
+            waiter.start()
+        while self.cache.stats()['coalesced'] < 2:
+            release.wait(0.01)
+        release.set()
+        for thread in [leader] + waiters:
+            thread.join()
+
+        self.assertEqual([(self.result, False)] * 3, results)
+        self.assertEqual({'hits': 0, 'misses': 1, 'coalesced': 2,
+                          'invalidations': 0}, self.cache.stats())
+
+    def test_invalidate(self):
+        query = mock.Mock(return_value=self.result)
+        self.cache.get('key', query)
+        self.cache.invalidate()
+        self.assertEqual((self.result, False), self.cache.get('key', query))
+        self.assertEqual(2, query.call_count)
+        self.assertEqual(1, self.cache.stats()['invalidations'])
+
+
+class GetCacheTestCase(base.TestCase):
+
+    def setUp(self):
+        super(GetCacheTestCase, self).setUp()
+        self.addCleanup(setattr, candidates, '_cache', None)
+
+    def test_get_cache_disabled(self):
+        self.assertIsNone(candidates.get_cache())
+
+    def test_get_cache(self):
+        self.config(allocation_candidates_cache_ttl=5, group='scheduler')
+        cache = candidates.get_cache()
+        self.assertEqual(5, cache.ttl)
+        self.assertIs(cache, candidates.get_cache())
+
+    def test_claim_failure_invalidates(self):
+        self.config(allocation_candidates_cache_ttl=5, group='scheduler')
+        cache = candidates.get_cache()
+        container = objects.Container(self.context,
+                                      **db_utils.get_test_container())
+        client = mock.Mock()
+
+        client.claim_resources.return_value = True
+        self.assertTrue(utils.claim_resources(self.context, client,
+                                              container, {}))
+        self.assertEqual(0, cache.stats()['invalidations'])
+
+        client.claim_resources.return_value = False
+        self.assertFalse(utils.claim_resources(self.context, client,
+                                               container, {}))
+        self.assertEqual(1, cache.stats()['invalidations'])
+
+        client.claim_resources.side_effect = (
+            exception.AllocationUpdateFailed(consumer_uuid=container.uuid,
+                                             error='conflict'))
+        self.assertRaises(exception.AllocationUpdateFailed,
+                          utils.claim_resources, self.context, client,
+                          container, {})
+        self.assertEqual(2, cache.stats()['invalidations'])
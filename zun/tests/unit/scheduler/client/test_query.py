@@ -15,7 +15,9 @@ from unittest import mock
 
 from oslo_config import cfg
 
+from zun.common import exception
 from zun import objects
+from zun.scheduler.client import candidates
 from zun.scheduler.client import query as scheduler_client
 from zun.scheduler import filter_scheduler
 from zun.tests import base
@@ -74,3 +76,67 @@ class SchedulerClientTestCase(base.TestCase):
         mock_select_destinations.assert_called_once_with(
             'ctxt', containers, extra_spec, alloc_reqs_by_rp_uuid,
             mock_provider_summaries, mock.sentinel.alloc_request_version)
+
+    @mock.patch('zun.scheduler.filter_scheduler.FilterScheduler'
+                '.select_destinations')
+    def test_select_destinations_cached(self, mock_select_destinations):
+        self.config(allocation_candidates_cache_ttl=10, group='scheduler')
+        self.addCleanup(setattr, candidates, '_cache', None)
+        mock_alloc_req = {
+            "allocations": {
+                mock.sentinel.rp_uuid: [mock.sentinel.alloc_req]
+            }
+        }
+        self.mock_placement_client.get_allocation_candidates.return_value = (
+            [mock_alloc_req], {mock.sentinel.rp_uuid: {}},
+            mock.sentinel.alloc_request_version
+        )
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container())]
+
+        self.client.select_destinations(self.context, containers, {})
+        self.client_cls().select_destinations(self.context, containers, {})
+        self.assertEqual(
+            1, self.mock_placement_client.get_allocation_candidates.call_count)
+        self.assertEqual(2, mock_select_destinations.call_count)
+        self.assertEqual({'hits': 1, 'misses': 1, 'coalesced': 0,
+                          'invalidations': 0},
+                         candidates.get_cache().stats())
+
+    @mock.patch('zun.scheduler.filter_scheduler.FilterScheduler'
+                '.select_destinations')
+    def test_select_destinations_cached_no_valid_host(
+            self, mock_select_destinations):
+        self.config(allocation_candidates_cache_ttl=10, group='scheduler')
+        self.addCleanup(setattr, candidates, '_cache', None)
+        mock_alloc_req = {
+            "allocations": {
+                mock.sentinel.rp_uuid: [mock.sentinel.alloc_req]
+            }
+        }
+        self.mock_placement_client.get_allocation_candidates.return_value = (
+            [mock_alloc_req], {mock.sentinel.rp_uuid: {}},
+            mock.sentinel.alloc_request_version
+        )
+        containers = [objects.Container(self.context,
+                                        **utils.get_test_container())]
+        self.client.select_destinations(self.context, containers, {})
+
+        # The cached candidates are outdated, fresh ones are queried.
+        mock_select_destinations.side_effect = [
+            exception.NoValidHost(reason=''), mock.sentinel.dests]
+        self.assertEqual(
+            mock.sentinel.dests,
+            self.client.select_destinations(self.context, containers, {}))
+        self.assertEqual(
+            2, self.mock_placement_client.get_allocation_candidates.call_count)
+
+        # The fresh candidates are not retried.
+        mock_select_destinations.side_effect = exception.NoValidHost(
+            reason='')
+        candidates.get_cache().invalidate()
+        self.assertRaises(exception.NoValidHost,
+                          self.client.select_destinations, self.context,
+                          containers, {})
+        self.assertEqual(
+            3, self.mock_placement_client.get_allocation_candidates.call_count)
@@ -67,3 +67,20 @@ class TestComputeFilter(base.TestCase):
         self.assertFalse(filts_cls.host_passes(host, container,
                                                extra_spec))
         service_up_mock.assert_called_once_with(service)
+
+    def test_compute_filter_filter_all(self, service_up_mock):
+        filt_cls = compute_filter.ComputeFilter()
+        container = objects.Container(self.context)
+        hosts = []
+        for i, disabled in enumerate([False, True, False]):
+            service = objects.ZunService(self.context)
+            service.disabled = disabled
+            service.disabled_reason = None
+            hosts.append(fakes.FakeHostState('host%d' % i,
+                                             {'service': service}))
+        service_up_mock.side_effect = [True, False]
+        self.assertEqual([hosts[0]],
+                         filt_cls.filter_all(hosts, container, {}))
+        self.assertEqual([mock.call(hosts[0].service),
+                          mock.call(hosts[2].service)],
+                         service_up_mock.call_args_list)
@@ -43,3 +43,15 @@ class TestCPUFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_cpu_filter_filter_all(self):
+        self.filt_cls = cpu_filter.CPUFilter()
+        container = objects.Container(self.context)
+        container.cpu = 4.0
+        hosts = [fakes.FakeHostState('host%d' % i,
+                                     {'cpus': 8, 'cpu_used': used})
+                 for i, used in enumerate([0.0, 6.0, 4.0])]
+        self.assertEqual([hosts[0], hosts[2]],
+                         self.filt_cls.filter_all(hosts, container, {}))
+        self.assertEqual({'cpu': 8}, hosts[2].limits)
+        self.assertEqual({}, hosts[1].limits)
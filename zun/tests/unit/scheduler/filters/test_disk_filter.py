@@ -68,3 +68,20 @@ class TestDiskFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_disk_filter_filter_all(self):
+        self.filt_cls = disk_filter.DiskFilter()
+        container = objects.Container(self.context)
+        container.disk = 20
+        hosts = [fakes.FakeHostState('host%d' % i,
+                                     {'disk_total': 80, 'disk_used': used,
+                                      'disk_quota_supported': quota})
+                 for i, (used, quota) in enumerate([(40, True), (70, True),
+                                                    (0, False)])]
+        self.assertEqual([hosts[0]],
+                         self.filt_cls.filter_all(hosts, container, {}))
+        self.assertEqual({'disk': 80}, hosts[0].limits)
+
+        container.disk = 0
+        self.assertEqual(hosts,
+                         self.filt_cls.filter_all(iter(hosts), container, {}))
@@ -43,3 +43,20 @@ class TestRamFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_ram_filter_filter_all(self):
+        self.filt_cls = ram_filter.RamFilter()
+        container = objects.Container(self.context)
+        container.memory = '4096'
+        hosts = [fakes.FakeHostState('host%d' % i,
+                                     {'mem_total': 1024 * 128,
+                                      'mem_used': 1024 * used})
+                 for i, used in enumerate([1, 127, 124])]
+        self.assertEqual([hosts[0], hosts[2]],
+                         self.filt_cls.filter_all(hosts, container, {}))
+        self.assertEqual({'memory': 1024 * 128}, hosts[0].limits)
+        self.assertEqual({}, hosts[1].limits)
+
+        container.memory = None
+        self.assertEqual(hosts,
+                         self.filt_cls.filter_all(iter(hosts), container, {}))
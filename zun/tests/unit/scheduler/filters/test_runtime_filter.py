@@ -50,3 +50,13 @@ class TestRuntimeFilter(base.TestCase):
         extra_spec = {}
         self.assertFalse(self.filt_cls.host_passes(host, container,
                                                    extra_spec))
+
+    def test_runtime_filter_filter_all(self):
+        self.filt_cls = runtime_filter.RuntimeFilter()
+        container = objects.Container(self.context)
+        container.runtime = 'runc'
+        hosts = [fakes.FakeHostState('host%d' % i, {'runtimes': runtimes})
+                 for i, runtimes in enumerate([['runc'], ['kata-runtime'],
+                                               ['kata-runtime', 'runc']])]
+        self.assertEqual([hosts[0], hosts[2]],
+                         self.filt_cls.filter_all(hosts, container, {}))
@@ -17,6 +17,7 @@ from unittest import mock
 
 
 from zun.scheduler import base_filters
+from zun.scheduler import filters
 from zun.tests import base
 
 
@@ -39,3 +40,39 @@ class BaseFilterTestCase(base.TestCase):
         base_filter.run_filter_once_per_request = False
         result = base_filter.run_filter_for_index(2)
         self.assertTrue(result)
+
+
+class FakeFilter1(filters.BaseHostFilter):
+
+    def filter_all(self, filter_obj_list, container, extra_spec):
+        return [obj for obj in filter_obj_list if obj != 'obj2']
+
+
+class FakeFilter2(filters.BaseHostFilter):
+
+    def host_passes(self, host_state, container, extra_spec):
+        return False
+
+
+class BaseFilterHandlerTestCase(base.TestCase):
+    """Test case for base filter handler class."""
+
+    def setUp(self):
+        super(BaseFilterHandlerTestCase, self).setUp()
+        self.handler = filters.HostFilterHandler()
+        self.container = mock.Mock(uuid='fake_uuid')
+
+    def test_get_filtered_objects(self):
+        result = self.handler.get_filtered_objects(
+            [FakeFilter1()], ['obj1', 'obj2', 'obj3'], self.container, {})
+        self.assertEqual(['obj1', 'obj3'], result)
+
+    @mock.patch.object(base_filters, 'LOG')
+    def test_get_filtered_objects_none_passes(self, mock_log):
+        result = self.handler.get_filtered_objects(
+            [FakeFilter1(), FakeFilter2()], ['obj1', 'obj2', 'obj3'],
+            self.container, {})
+        self.assertEqual([], result)
+        full_msg = mock_log.debug.call_args_list[-1][0][0]
+        self.assertIn("('FakeFilter1', [('obj1', ''), ('obj3', '')]), "
+                      "('FakeFilter2', None)", full_msg)
@@ -0,0 +1,65 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Tests for base weights
+"""
+
+from zun.scheduler import base_weights
+from zun.scheduler import weights
+from zun.tests import base
+
+
+class _FakeWeigher(base_weights.BaseWeigher):
+
+    def __init__(self, multiplier=1.0, minval=None, maxval=None):
+        self.multiplier = multiplier
+        self.minval = minval
+        self.maxval = maxval
+
+    def weight_multiplier(self):
+        return self.multiplier
+
+    def _weigh_object(self, obj, container):
+        return obj
+
+
+class BaseWeightsTestCase(base.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual([], base_weights.normalize([]))
+        self.assertEqual([0.0, 0.0], base_weights.normalize([2, 2]))
+        self.assertEqual([0.0, 0.5, 1.0], base_weights.normalize([1, 2, 3]))
+        self.assertEqual([0.25, 0.5, 0.75],
+                         base_weights.normalize([1, 2, 3], minval=0,
+                                                maxval=4))
+
+    def test_get_weighed_objects(self):
+        handler = weights.HostWeightHandler()
+        weighers = [_FakeWeigher(), _FakeWeigher(multiplier=-2.0)]
+        weighed_objs = handler.get_weighed_objects(weighers, [1, 3, 2], None)
+        self.assertEqual([1, 2, 3], [obj.obj for obj in weighed_objs])
+        self.assertEqual([0.0, -0.5, -1.0],
+                         [obj.weight for obj in weighed_objs])
+
+    def test_get_weighed_objects_zero_multiplier(self):
+        handler = weights.HostWeightHandler()
+        weigher = _FakeWeigher(multiplier=0)
+        weighed_objs = handler.get_weighed_objects([weigher], [1, 3], None)
+        self.assertEqual([1, 3], [obj.obj for obj in weighed_objs])
+        self.assertEqual([0.0, 0.0], [obj.weight for obj in weighed_objs])
+
+    def test_get_weighed_objects_with_bounds(self):
+        handler = weights.HostWeightHandler()
+        weigher = _FakeWeigher(minval=0, maxval=10)
+        weighed_objs = handler.get_weighed_objects([weigher], [1, 5], None)
+        self.assertEqual([0.5, 0.1], [obj.weight for obj in weighed_objs])
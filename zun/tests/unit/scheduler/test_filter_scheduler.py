@@ -13,14 +13,17 @@
 from unittest import mock
 
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
 from zun.api import servicegroup
 from zun.common import context
 from zun.common import exception
 from zun import objects
 from zun.scheduler import filter_scheduler
+from zun.scheduler import host_manager
 from zun.tests import base
 from zun.tests.unit.db import utils
+from zun.tests.unit.scheduler import fakes
 from zun.tests.unit.scheduler.fakes import FakeService
 
 
@@ -36,8 +39,13 @@ class FilterSchedulerTestCase(base.TestCase):
                        return_value=self.mock_placement_client)
         p.start()
         self.addCleanup(p.stop)
+        p = mock.patch.object(objects.ComputeNode, 'list_timestamps',
+                              return_value={})
+        self.mock_list_timestamps = p.start()
+        self.addCleanup(p.stop)
         self.context = context.RequestContext('fake_user', 'fake_project')
         self.driver = self.driver_cls()
+        self.driver.host_manager = host_manager.HostManager()
 
     @mock.patch.object(servicegroup.ServiceGroup, 'service_is_up')
     @mock.patch.object(objects.ComputeNode, 'list')
@@ -79,6 +87,7 @@ class FilterSchedulerTestCase(base.TestCase):
         test_container = utils.get_test_container()
         containers = [objects.Container(self.context, **test_container)]
         node1 = objects.ComputeNode(self.context)
+        node1.uuid = uuidutils.generate_uuid()
         node1.rp_uuid = mock.sentinel.node1_rp_uuid
         node1.updated_at = timeutils.utcnow()
         node1.cpus = 48
@@ -96,7 +105,9 @@ class FilterSchedulerTestCase(base.TestCase):
         node1.disk_quota_supported = True
         node1.runtimes = ['runc']
         node1.enable_cpu_pinning = False
+        node1.total_containers = 0
         node2 = objects.ComputeNode(self.context)
+        node2.uuid = uuidutils.generate_uuid()
         node2.rp_uuid = mock.sentinel.node2_rp_uuid
         node2.updated_at = timeutils.utcnow()
         node2.cpus = 48
@@ -114,7 +125,9 @@ class FilterSchedulerTestCase(base.TestCase):
         node2.disk_quota_supported = True
         node2.runtimes = ['runc']
         node2.enable_cpu_pinning = False
+        node2.total_containers = 0
         node3 = objects.ComputeNode(self.context)
+        node3.uuid = uuidutils.generate_uuid()
         node3.rp_uuid = mock.sentinel.node3_rp_uuid
         node3.updated_at = timeutils.utcnow()
         node3.cpus = 48
@@ -132,7 +145,9 @@ class FilterSchedulerTestCase(base.TestCase):
         node3.disk_quota_supported = True
         node3.runtimes = ['runc']
         node3.enable_cpu_pinning = False
+        node3.total_containers = 0
         node4 = objects.ComputeNode(self.context)
+        node4.uuid = uuidutils.generate_uuid()
         node4.rp_uuid = mock.sentinel.node4_rp_uuid
         node4.updated_at = timeutils.utcnow()
         node4.cpus = 48
@@ -150,8 +165,11 @@ class FilterSchedulerTestCase(base.TestCase):
         node4.disk_quota_supported = True
         node4.runtimes = ['runc']
         node4.enable_cpu_pinning = False
+        node4.total_containers = 0
         nodes = [node1, node2, node3, node4]
         mock_compute_list.return_value = nodes
+        self.mock_list_timestamps.return_value = {
+            node.uuid: node.updated_at for node in nodes}
 
         mock_service_is_up.return_value = True
         extra_spec = {}
@@ -201,3 +219,147 @@ class FilterSchedulerTestCase(base.TestCase):
                           containers, extra_spec, mock_alloc_reqs_by_rp_uuid,
                           mock_provider_summaries,
                           mock.sentinel.alloc_request_version)
+
+    def _create_containers(self, count):
+        containers = []
+        for i in range(count):
+            test_container = utils.get_test_container(
+                id=i, uuid=uuidutils.generate_uuid())
+            containers.append(objects.Container(self.context,
+                                                **test_container))
+        return containers
+
+    def _create_host_states(self, count):
+        host_states = []
+        for i in range(count):
+            host_states.append(mock.Mock(uuid='rp%d' % i,
+                                         hostname='host%d' % i,
+                                         limits={}))
+        return host_states
+
+    @mock.patch.object(filter_scheduler.FilterScheduler, '_get_host_states')
+    def test_select_destinations_batch(self, mock_get_host_states):
+        containers = self._create_containers(3)
+        host1, host2 = self._create_host_states(2)
+        mock_get_host_states.return_value = [host1, host2]
+        self.driver.filter_handler.get_filtered_objects = mock.Mock(
+            side_effect=lambda filters, hosts, *args: list(hosts))
+        # Keep the order of the hosts
+        self.driver.weighers = []
+        self.mock_placement_client.claim_resources.side_effect = [
+            True, True, False, True]
+        alloc_reqs_by_rp_uuid = {'rp0': [mock.sentinel.alloc_req1],
+                                 'rp1': [mock.sentinel.alloc_req2]}
+
+        dests = self.driver.select_destinations(
+            self.context, containers, {}, alloc_reqs_by_rp_uuid, {})
+
+        self.assertEqual(['host0', 'host0', 'host1'],
+                         [dest['host'] for dest in dests])
+        mock_get_host_states.assert_called_once_with(self.context, {})
+        host1.consume_from_request.assert_has_calls(
+            [mock.call(containers[0]), mock.call(containers[1])])
+        host2.consume_from_request.assert_called_once_with(containers[2])
+        self.assertFalse(
+            self.mock_placement_client.delete_allocation_for_container.called)
+
+    @mock.patch.object(filter_scheduler.FilterScheduler, '_get_host_states')
+    def test_select_destinations_batch_no_valid_host(self,
+                                                     mock_get_host_states):
+        containers = self._create_containers(3)
+        mock_get_host_states.return_value = self._create_host_states(1)
+        self.driver.filter_handler.get_filtered_objects = mock.Mock(
+            side_effect=lambda filters, hosts, *args: list(hosts))
+        # Keep the order of the hosts
+        self.driver.weighers = []
+        self.mock_placement_client.claim_resources.side_effect = [
+            True, True, False]
+        alloc_reqs_by_rp_uuid = {'rp0': [mock.sentinel.alloc_req]}
+
+        self.assertRaises(exception.NoValidHost,
+                          self.driver.select_destinations, self.context,
+                          containers, {}, alloc_reqs_by_rp_uuid, {})
+
+        delete_allocation = (
+            self.mock_placement_client.delete_allocation_for_container)
+        self.assertEqual(
+            [containers[0].uuid, containers[1].uuid],
+            [c[0][1] for c in delete_allocation.call_args_list])
+
+    @mock.patch.object(filter_scheduler.FilterScheduler, '_get_host_states')
+    def test_select_destinations_batch_unexpected_error(
+            self, mock_get_host_states):
+        containers = self._create_containers(3)
+        mock_get_host_states.return_value = self._create_host_states(1)
+        self.driver.filter_handler.get_filtered_objects = mock.Mock(
+            side_effect=lambda filters, hosts, *args: list(hosts))
+        self.driver.weighers = []
+        self.mock_placement_client.claim_resources.side_effect = [
+            True, exception.ZunException()]
+        alloc_reqs_by_rp_uuid = {'rp0': [mock.sentinel.alloc_req]}
+
+        self.assertRaises(exception.ZunException,
+                          self.driver.select_destinations, self.context,
+                          containers, {}, alloc_reqs_by_rp_uuid, {})
+
+        delete_allocation = (
+            self.mock_placement_client.delete_allocation_for_container)
+        self.assertEqual(
+            [containers[0].uuid],
+            [c[0][1] for c in delete_allocation.call_args_list])
+
+    @mock.patch.object(filter_scheduler.FilterScheduler, '_get_host_states')
+    def test_select_destinations_weighed(self, mock_get_host_states):
+        containers = self._create_containers(2)
+        host_states = []
+        for i, mem_used in enumerate([1024 * 3, 1024, 1024 * 2]):
+            host_states.append(fakes.FakeHostState(
+                'host%d' % i, {'uuid': 'rp%d' % i, 'mem_total': 1024 * 4,
+                               'mem_used': mem_used, 'cpus': 4,
+                               'disk_total': 80}))
+        mock_get_host_states.return_value = host_states
+        self.driver.filter_handler.get_filtered_objects = mock.Mock(
+            side_effect=lambda filters, hosts, *args: list(hosts))
+        self.mock_placement_client.claim_resources.side_effect = [
+            False, True, True]
+        alloc_reqs_by_rp_uuid = {'rp%d' % i: [getattr(mock.sentinel,
+                                                      'alloc_req%d' % i)]
+                                 for i in range(3)}
+
+        dests = self.driver.select_destinations(
+            self.context, containers, {}, alloc_reqs_by_rp_uuid, {})
+
+        # The host with the most free memory is tried first.
+        self.assertEqual(['host2', 'host1'], [dest['host'] for dest in dests])
+        self.assertEqual(
+            [mock.sentinel.alloc_req1, mock.sentinel.alloc_req2,
+             mock.sentinel.alloc_req1],
+            [c[0][2] for c in
+             self.mock_placement_client.claim_resources.call_args_list])
+
+    def test_get_sorted_hosts(self):
+        # The RAM weigher prefers host0, the CPU weigher host1 and the
+        # containers weigher host0.
+        host_states = []
+        for i, (mem_used, cpu_used, total_containers) in enumerate(
+                [(1024, 3, 0), (1024 * 3, 0, 2), (1024 * 2, 2, 4)]):
+            host_states.append(fakes.FakeHostState(
+                'host%d' % i, {'mem_total': 1024 * 4, 'mem_used': mem_used,
+                               'cpus': 4, 'cpu_used': cpu_used,
+                               'total_containers': total_containers}))
+        container = objects.Container(self.context, cpu_policy='shared')
+
+        sorted_hosts = self.driver._get_sorted_hosts(container, host_states)
+        self.assertEqual(['host0', 'host1', 'host2'],
+                         [h.hostname for h in sorted_hosts])
+
+        self.config(ram_weight_multiplier=0.0, group='scheduler')
+        sorted_hosts = self.driver._get_sorted_hosts(container, host_states)
+        self.assertEqual(['host1', 'host0', 'host2'],
+                         [h.hostname for h in sorted_hosts])
+
+        self.config(cpu_weight_multiplier=3.0, ram_weight_multiplier=1.0,
+                    group='scheduler')
+        sorted_hosts = self.driver._get_sorted_hosts(container, host_states)
+        self.assertEqual(['host1', 'host0', 'host2'],
+                         [h.hostname for h in sorted_hosts])
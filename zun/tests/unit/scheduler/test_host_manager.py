@@ -0,0 +1,160 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+from unittest import mock
+
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from zun.common import context
+from zun import objects
+from zun.scheduler import host_manager
+from zun.tests import base
+from zun.tests.unit.scheduler.fakes import FakeService
+
+
+class HostManagerTestCase(base.TestCase):
+    """Test case for HostManager."""
+
+    def setUp(self):
+        super(HostManagerTestCase, self).setUp()
+        self.context = context.get_admin_context()
+        self.host_manager = host_manager.HostManager()
+        self.updated_at = timeutils.utcnow() - datetime.timedelta(minutes=1)
+        self.nodes = [self._make_node('host%d' % i) for i in range(3)]
+        self.services = {
+            node.hostname: FakeService('zun-compute', node.hostname)
+            for node in self.nodes}
+
+        p = mock.patch.object(objects.ComputeNode, 'list_timestamps',
+                              side_effect=self._list_timestamps)
+        self.mock_list_timestamps = p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch.object(objects.ComputeNode, 'list',
+                              side_effect=self._list)
+        self.mock_list = p.start()
+        self.addCleanup(p.stop)
+
+    def _make_node(self, hostname):
+        node = objects.ComputeNode(self.context)
+        node.uuid = uuidutils.generate_uuid()
+        node.rp_uuid = uuidutils.generate_uuid()
+        node.hostname = hostname
+        node.updated_at = self.updated_at
+        node.cpus = 8
+        node.cpu_used = 0.0
+        node.mem_total = 1024
+        node.mem_used = 0
+        node.mem_free = 1024
+        node.mem_available = 1024
+        node.disk_total = 80
+        node.disk_used = 0
+        node.numa_topology = None
+        node.labels = {}
+        node.pci_device_pools = None
+        node.disk_quota_supported = True
+        node.runtimes = ['runc']
+        node.enable_cpu_pinning = False
+        node.total_containers = 0
+        return node
+
+    def _list_timestamps(self, context):
+        return {node.uuid: node.updated_at for node in self.nodes}
+
+    def _list(self, context, filters=None):
+        if filters is None:
+            return list(self.nodes)
+        return [node for node in self.nodes if node.uuid in filters['uuid']]
+
+    def _get_host_states(self, rp_uuids=None):
+        host_states = self.host_manager.get_host_states(
+            self.context, self.services, rp_uuids=rp_uuids)
+        return {host_state.hostname: host_state for host_state in host_states}
+
+    def test_get_host_states(self):
+        host_states = self._get_host_states()
+        self.assertEqual({'host0', 'host1', 'host2'}, set(host_states))
+        for node in self.nodes:
+            host_state = host_states[node.hostname]
+            self.assertEqual(node.rp_uuid, host_state.uuid)
+            self.assertEqual(self.services[node.hostname], host_state.service)
+        self.mock_list.assert_called_once_with(self.context)
+
+    def test_get_host_states_cached(self):
+        host_states = self._get_host_states()
+        self.mock_list.reset_mock()
+        self.assertEqual(set(host_states), set(self._get_host_states()))
+        self.assertFalse(self.mock_list.called)
+        self.assertEqual(2, self.mock_list_timestamps.call_count)
+
+    def test_get_host_states_refresh_changed_node(self):
+        self._get_host_states()
+        self.mock_list.reset_mock()
+        self.nodes[1].mem_used = 512
+        self.nodes[1].updated_at = timeutils.utcnow()
+
+        host_states = self._get_host_states()
+        self.mock_list.assert_called_once_with(
+            self.context, filters={'uuid': [self.nodes[1].uuid]})
+        self.assertEqual(512, host_states['host1'].mem_used)
+        self.assertEqual(0, host_states['host0'].mem_used)
+
+    def test_get_host_states_new_and_deleted_nodes(self):
+        self._get_host_states()
+        del self.nodes[0]
+        self.nodes.append(self._make_node('host3'))
+        self.services['host3'] = FakeService('zun-compute', 'host3')
+
+        host_states = self._get_host_states()
+        self.assertEqual({'host1', 'host2', 'host3'}, set(host_states))
+        self.mock_list.assert_called_with(
+            self.context, filters={'uuid': [self.nodes[-1].uuid]})
+
+    def test_get_host_states_keep_consumed_resources(self):
+        container = mock.Mock(disk=10, memory='256', cpu=1)
+        self._get_host_states()['host0'].consume_from_request(container)
+
+        # A report older than the consumption does not drop the claim.
+        self.nodes[0].updated_at = self.updated_at + datetime.timedelta(
+            seconds=1)
+        host_state = self._get_host_states()['host0']
+        self.assertEqual(256, host_state.mem_used)
+        self.assertEqual(1, host_state.total_containers)
+
+        # A newer report replaces it.
+        self.nodes[0].updated_at = timeutils.utcnow() + datetime.timedelta(
+            seconds=1)
+        host_state = self._get_host_states()['host0']
+        self.assertEqual(0, host_state.mem_used)
+        self.assertEqual(0, host_state.total_containers)
+
+    def test_get_host_states_filtered(self):
+        del self.services['host2']
+        host_states = self._get_host_states(
+            rp_uuids=[self.nodes[0].rp_uuid, self.nodes[2].rp_uuid])
+        self.assertEqual(['host0'], list(host_states))
+
+    def test_get_host_states_own_limits(self):
+        host_state = self._get_host_states()['host0']
+        host_state.limits['cpu'] = 8
+        # The states of another request do not share the limits.
+        other_host_state = self._get_host_states()['host0']
+        self.assertIsNot(host_state, other_host_state)
+        self.assertEqual({}, other_host_state.limits)
+        self.assertEqual({'cpu': 8}, host_state.limits)
+
+    def test_get_host_manager(self):
+        self.addCleanup(setattr, host_manager, '_host_manager', None)
+        manager = host_manager.get_host_manager()
+        self.assertIsInstance(manager, host_manager.HostManager)
+        self.assertIs(manager, host_manager.get_host_manager())
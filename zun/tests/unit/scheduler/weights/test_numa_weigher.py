@@ -0,0 +1,67 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from zun.common import context
+from zun import objects
+from zun.scheduler import weights
+from zun.scheduler.weights import numa
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+
+
+class TestNUMAWeigher(base.TestCase):
+
+    def setUp(self):
+        super(TestNUMAWeigher, self).setUp()
+        self.context = context.RequestContext('fake_user', 'fake_project')
+        self.weight_handler = weights.HostWeightHandler()
+        self.weighers = [numa.NUMAWeigher()]
+        self.container = objects.Container(self.context)
+        self.container.cpu_policy = 'dedicated'
+
+    def _get_weighed_host(self, hosts):
+        return self.weight_handler.get_weighed_objects(self.weighers, hosts,
+                                                       self.container)[0]
+
+    def _get_all_hosts(self):
+        host_values = [
+            ('host1', {'numa_topology': self._get_numa([2, 2])}),
+            ('host2', {'numa_topology': self._get_numa([4, 0])}),
+            ('host3', {'numa_topology': self._get_numa([3, 1])}),
+            ('host4', {'numa_topology': None}),
+        ]
+        return [fakes.FakeHostState(host, values)
+                for host, values in host_values]
+
+    def _get_numa(self, free_cpus):
+        nodes = []
+        for i, free in enumerate(free_cpus):
+            cpuset = set(range(i * 4, i * 4 + 4))
+            nodes.append(objects.NUMANode(
+                id=i, cpuset=cpuset,
+                pinned_cpus=set(sorted(cpuset)[free:]),
+                mem_total=1024, mem_available=1024))
+        return objects.NUMATopology(nodes=nodes)
+
+    def test_default_of_least_fragmented_first(self):
+        weighed_hosts = self.weight_handler.get_weighed_objects(
+            self.weighers, self._get_all_hosts(), self.container)
+        self.assertEqual(['host2', 'host3', 'host1', 'host4'],
+                         [h.obj.hostname for h in weighed_hosts])
+        self.assertEqual([1.0, 0.75, 0.5, 0.0],
+                         [h.weight for h in weighed_hosts])
+
+    def test_shared_cpu_policy(self):
+        self.container.cpu_policy = 'shared'
+        weighed_hosts = self.weight_handler.get_weighed_objects(
+            self.weighers, self._get_all_hosts(), self.container)
+        self.assertEqual([0.0] * 4, [h.weight for h in weighed_hosts])
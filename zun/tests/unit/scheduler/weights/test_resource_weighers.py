@@ -0,0 +1,124 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import testscenarios
+
+from zun.common import context
+import zun.conf
+from zun import objects
+from zun.scheduler import weights
+from zun.scheduler.weights import cpu
+from zun.scheduler.weights import disk
+from zun.scheduler.weights import num_containers
+from zun.scheduler.weights import ram
+from zun.tests import base
+from zun.tests.unit.scheduler import fakes
+
+CONF = zun.conf.CONF
+
+
+class TestResourceWeighers(testscenarios.WithScenarios, base.TestCase):
+    """Test the weighers of a single resource of the hosts.
+
+    Each scenario gives the values of the resource on three hosts and the
+    weights they are normalized to, before the multiplier is applied, and
+    the values of a host where the resource weighs 0.
+    """
+
+    scenarios = [
+        ('ram', dict(
+            weigher_cls=ram.RAMWeigher,
+            multiplier_opt='ram_weight_multiplier',
+            host_values=[{'mem_total': 1024, 'mem_used': 512},
+                         {'mem_total': 2048, 'mem_used': 0},
+                         {'mem_total': 2048, 'mem_used': 1024}],
+            normalized=[0.25, 1.0, 0.5],
+            zero_values={'mem_total': 2048, 'mem_used': 2048})),
+        ('cpu', dict(
+            weigher_cls=cpu.CPUWeigher,
+            multiplier_opt='cpu_weight_multiplier',
+            host_values=[{'cpus': 4, 'cpu_used': 3.5},
+                         {'cpus': 8, 'cpu_used': 0},
+                         {'cpus': 8, 'cpu_used': 4}],
+            normalized=[0.0625, 1.0, 0.5],
+            zero_values={'cpus': 8, 'cpu_used': 8})),
+        ('disk', dict(
+            weigher_cls=disk.DiskWeigher,
+            multiplier_opt='disk_weight_multiplier',
+            host_values=[{'disk_total': 100, 'disk_used': 90},
+                         {'disk_total': 200, 'disk_used': 0},
+                         {'disk_total': 200, 'disk_used': 100}],
+            normalized=[0.05, 1.0, 0.5],
+            zero_values={'disk_total': 200, 'disk_used': 200})),
+        ('num_containers', dict(
+            weigher_cls=num_containers.NumContainersWeigher,
+            multiplier_opt='num_containers_weight_multiplier',
+            host_values=[{'total_containers': 10},
+                         {'total_containers': 0},
+                         {'total_containers': 5}],
+            normalized=[1.0, 0.0, 0.5],
+            zero_values={'total_containers': 0})),
+    ]
+
+    def setUp(self):
+        super(TestResourceWeighers, self).setUp()
+        self.context = context.RequestContext('fake_user', 'fake_project')
+        self.weight_handler = weights.HostWeightHandler()
+        self.weighers = [self.weigher_cls()]
+        self.container = objects.Container(self.context)
+
+    def _get_weighed_hosts(self, host_values):
+        hosts = [fakes.FakeHostState('host%d' % i, values)
+                 for i, values in enumerate(host_values)]
+        weighed_hosts = self.weight_handler.get_weighed_objects(
+            self.weighers, hosts, self.container)
+        return [(h.obj.hostname, h.weight) for h in weighed_hosts]
+
+    def _expected(self, multiplier):
+        expected = [('host%d' % i, multiplier * weight)
+                    for i, weight in enumerate(self.normalized)]
+        return sorted(expected, key=lambda h: h[1], reverse=True)
+
+    def test_default_multiplier(self):
+        multiplier = getattr(CONF.scheduler, self.multiplier_opt)
+        self.assertEqual(self._expected(multiplier),
+                         self._get_weighed_hosts(self.host_values))
+
+    def test_multiplier_scaled(self):
+        self.config(group='scheduler', **{self.multiplier_opt: 2.0})
+        self.assertEqual(self._expected(2.0),
+                         self._get_weighed_hosts(self.host_values))
+
+    def test_multiplier_negative(self):
+        self.config(group='scheduler', **{self.multiplier_opt: -1.0})
+        self.assertEqual(self._expected(-1.0),
+                         self._get_weighed_hosts(self.host_values))
+
+    def test_multiplier_zero(self):
+        # The weigher is skipped, the hosts keep their order.
+        self.config(group='scheduler', **{self.multiplier_opt: 0.0})
+        self.assertEqual([('host0', 0.0), ('host1', 0.0), ('host2', 0.0)],
+                         self._get_weighed_hosts(self.host_values))
+
+    def test_all_hosts_equal(self):
+        self.config(group='scheduler', **{self.multiplier_opt: 1.0})
+        weighed_hosts = self._get_weighed_hosts([self.host_values[0]] * 3)
+        self.assertEqual(['host0', 'host1', 'host2'],
+                         [host for host, weight in weighed_hosts])
+        self.assertEqual(1, len(set(weight for host, weight in weighed_hosts)))
+
+    def test_all_hosts_zero(self):
+        # The lowest and highest weights are equal, so they are all
+        # normalized to 0.
+        self.config(group='scheduler', **{self.multiplier_opt: 1.0})
+        self.assertEqual([('host0', 0.0), ('host1', 0.0), ('host2', 0.0)],
+                         self._get_weighed_hosts([self.zero_values] * 3))
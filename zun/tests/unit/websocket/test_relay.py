@@ -0,0 +1,197 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import selectors
+import socket
+from unittest import mock
+
+from zun.tests import base
+from zun.websocket import relay
+
+
+class FakeClientEndpoint(object):
+    """A client sending the given frames, then closing the connection."""
+
+    side = relay.CLIENT
+
+    def __init__(self, frames, blocked=False):
+        self.sock, self.peer = socket.socketpair()
+        self.frames = list(frames)
+        self.sent = []
+        self.blocked = blocked
+        if self.frames:
+            self.peer.send(b'x')
+
+    def close(self):
+        self.sock.close()
+        self.peer.close()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def pending(self):
+        return False
+
+    def recv(self):
+        self.sock.recv(1)
+        if not self.frames:
+            raise relay.ConnectionClosed(self.side, 1001, 'going away')
+        frames, self.frames = self.frames, []
+        # Close the connection once the frames are relayed.
+        self.peer.send(b'x')
+        return frames
+
+    def send(self, data):
+        if self.blocked:
+            return 0
+        self.sent.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class TestRelayBuffer(base.BaseTestCase):
+
+    def test_watermarks(self):
+        buf = relay.RelayBuffer(high=10, low=4)
+        buf.append(b'a' * 6)
+        self.assertFalse(buf.paused)
+        buf.append(b'b' * 4)
+        self.assertTrue(buf.paused)
+        self.assertIsNotNone(buf.consume(6))
+        self.assertFalse(buf.paused)
+        self.assertEqual(4, buf.size)
+
+    def test_consume_partial(self):
+        buf = relay.RelayBuffer(high=10, low=4)
+        data = b'abcdef'
+        buf.append(data)
+        self.assertIsNone(buf.consume(2))
+        remaining = buf.peek()
+        # The remaining data is a view of the received buffer, not a copy.
+        self.assertIs(data, remaining.obj)
+        self.assertEqual(b'cdef', bytes(remaining))
+        self.assertIsNotNone(buf.consume(4))
+        self.assertFalse(buf)
+
+    def test_append_empty(self):
+        buf = relay.RelayBuffer(high=10, low=4)
+        buf.append(b'')
+        self.assertFalse(buf)
+
+
+class TestRelay(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestRelay, self).setUp()
+        self.target_sock, self.container_sock = socket.socketpair()
+        self.addCleanup(self.target_sock.close)
+        self.addCleanup(self.container_sock.close)
+        self.target = relay.SocketEndpoint(self.target_sock, 1024)
+        self.metrics = relay.ProxyMetrics()
+
+    def _client(self, frames, blocked=False):
+        client = FakeClientEndpoint(frames, blocked=blocked)
+        self.addCleanup(client.close)
+        return client
+
+    def test_relay_to_target(self):
+        client = self._client([b'ls', b' -l\n'])
+        proxy = relay.Relay(client, self.target, 1024, 256,
+                            metrics=self.metrics)
+        exc = self.assertRaises(relay.ConnectionClosed, proxy.run)
+        self.assertEqual((relay.CLIENT, 1001), (exc.side, exc.code))
+        self.assertEqual(b'ls -l\n', self.container_sock.recv(1024))
+
+        stats = self.metrics.snapshot()
+        self.assertEqual(0, stats['active_connections'])
+        self.assertEqual(1, stats['connections'])
+        self.assertEqual(6, stats['bytes_to_target'])
+        self.assertEqual(0, stats['bytes_to_client'])
+
+    def test_relay_to_client(self):
+        client = self._client([])
+        self.container_sock.send(b'output')
+        self.container_sock.shutdown(socket.SHUT_WR)
+        proxy = relay.Relay(client, self.target, 1024, 256,
+                            metrics=self.metrics)
+        exc = self.assertRaises(relay.ConnectionClosed, proxy.run)
+        self.assertEqual(relay.TARGET, exc.side)
+        self.assertEqual([b'output'], client.sent)
+        self.assertEqual(6, self.metrics.snapshot()['bytes_to_client'])
+
+    def test_backpressure(self):
+        client = self._client([], blocked=True)
+        proxy = relay.Relay(client, self.target, 8, 2)
+        selector = selectors.DefaultSelector()
+        self.addCleanup(selector.close)
+
+        proxy._update_selector(selector)
+        self.assertEqual(selectors.EVENT_READ,
+                         selector.get_key(self.target).events)
+
+        proxy.buffers[relay.CLIENT].append(b'x' * 8)
+        proxy._update_selector(selector)
+        # The target is no longer read while the client does not drain.
+        self.assertRaises(KeyError, selector.get_key, self.target)
+        self.assertEqual(selectors.EVENT_READ | selectors.EVENT_WRITE,
+                         selector.get_key(client).events)
+
+        client.blocked = False
+        proxy._write(client)
+        proxy._update_selector(selector)
+        self.assertEqual(selectors.EVENT_READ,
+                         selector.get_key(self.target).events)
+
+    def test_partial_send(self):
+        sock = mock.Mock()
+        sock.send.side_effect = [3, BlockingIOError]
+        target = relay.SocketEndpoint(sock, 1024)
+        proxy = relay.Relay(self._client([]), target, 1024, 256)
+        data = b'payload'
+        proxy.buffers[relay.TARGET].append(data)
+        proxy._write(target)
+        self.assertEqual(b'load', bytes(proxy.buffers[relay.TARGET].peek()))
+        # The rest of the data is sent from a view of the received buffer.
+        self.assertIs(data, sock.send.call_args[0][0].obj)
+
+    def test_heartbeat(self):
+        client = self._client([b'data'])
+        ping = mock.Mock()
+        proxy = relay.Relay(client, self.target, 1024, 256, heartbeat=10,
+                            ping=ping)
+        clock = itertools.chain([0], itertools.repeat(11))
+        with mock.patch('time.monotonic', side_effect=clock):
+            self.assertRaises(relay.ConnectionClosed, proxy.run)
+        ping.assert_called_once_with()
+
+
+class TestWebSocketEndpoint(base.BaseTestCase):
+
+    def test_recv(self):
+        ws = mock.Mock()
+        ws.recv.return_value = 'text'
+        endpoint = relay.WebSocketEndpoint(ws)
+        self.assertEqual([b'text'], endpoint.recv())
+
+        ws.recv.return_value = ''
+        exc = self.assertRaises(relay.ConnectionClosed, endpoint.recv)
+        self.assertEqual(relay.TARGET, exc.side)
+
+    def test_pending(self):
+        ws = mock.Mock()
+        ws.frame_buffer.recv_buffer = [b'next frame']
+        self.assertTrue(relay.WebSocketEndpoint(ws).pending())
+        ws.frame_buffer.recv_buffer = []
+        self.assertFalse(relay.WebSocketEndpoint(ws).pending())
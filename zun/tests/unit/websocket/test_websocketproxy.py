@@ -0,0 +1,295 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import threading
+import time
+from unittest import mock
+
+import docker
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from zun.common import exception
+import zun.conf
+from zun.tests import base
+from zun.tests.unit.db import utils
+from zun.websocket import relay
+from zun.websocket import websocketproxy
+
+CONF = zun.conf.CONF
+
+
+class FakeCClose(Exception):
+
+    def __init__(self, code, reason):
+        super(FakeCClose, self).__init__(code, reason)
+        self.code = code
+        self.reason = reason
+
+
+class TestZunProxyRequestHandler(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestZunProxyRequestHandler, self).setUp()
+        self.handler = websocketproxy.ZunProxyRequestHandlerBase()
+        self.handler.request = mock.Mock()
+        self.handler.headers = {'Host': 'fake-host'}
+        self.handler.CClose = FakeCClose
+        self.handler.send_frames = mock.Mock(return_value=0)
+        self.handler.recv_frames = mock.Mock(return_value=([], False))
+        self.handler.send_ping = mock.Mock()
+        self.handler.msg = mock.Mock()
+        self.handler.vmsg = mock.Mock()
+        self.container = mock.Mock(**utils.get_test_container())
+        self.ctx = mock.Mock()
+        p = mock.patch.object(websocketproxy.select, 'select',
+                              return_value=([], [], []))
+        self.mock_select = p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch.object(websocketproxy.objects.StreamInstance,
+                              'consume')
+        self.mock_consume = p.start()
+        self.addCleanup(p.stop)
+
+    def test_do_stream_proxy(self):
+        CONF.set_override('stream_chunk_size', 1024,
+                          group='websocket_proxy')
+        data = b'x' * 1500
+        exc = self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                                iter([data, 'y']))
+        self.assertEqual(1000, exc.code)
+        self.assertEqual([mock.call([data[:1024]]),
+                          mock.call([data[1024:]]),
+                          mock.call([b'y'])],
+                         self.handler.send_frames.call_args_list)
+
+    def test_do_stream_proxy_backpressure(self):
+        # the first frame is sent only partially
+        self.handler.send_frames.side_effect = [1, 0]
+        self.mock_select.side_effect = [([], [], []),
+                                        ([], [self.handler.request], []),
+                                        ([], [], [])]
+        self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                          iter([b'data']))
+        self.assertEqual([mock.call([b'data']), mock.call()],
+                         self.handler.send_frames.call_args_list)
+        self.assertEqual(3, self.mock_select.call_count)
+
+    def test_do_stream_proxy_client_closed(self):
+        self.mock_select.return_value = ([self.handler.request], [], [])
+        self.handler.recv_frames.return_value = (
+            [], {'code': 1001, 'reason': 'going away'})
+        exc = self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                                iter([b'a', b'b']))
+        self.assertEqual(1001, exc.code)
+        # the stream is not read once the client is gone
+        self.handler.send_frames.assert_called_once_with([b'a'])
+
+    def test_do_stream_proxy_too_large(self):
+        exc = self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                                iter([b'a' * 10, b'b' * 10]), max_size=15)
+        self.assertEqual(1009, exc.code)
+        self.handler.send_frames.assert_called_once_with([b'a' * 10])
+
+    def test_do_stream_proxy_cancel(self):
+        cancelled = threading.Event()
+
+        def chunks():
+            yield b'a'
+            # the read is interrupted once the stream is cancelled
+            cancelled.wait(10)
+            raise OSError()
+
+        self.mock_select.return_value = ([self.handler.request], [], [])
+        self.handler.recv_frames.return_value = (
+            [], {'code': 1001, 'reason': 'going away'})
+        exc = self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                                chunks(), cancel=cancelled.set)
+        self.assertEqual(1001, exc.code)
+        self.assertTrue(cancelled.is_set())
+
+    def test_do_stream_proxy_cancel_target_closed(self):
+        cancel = mock.Mock()
+
+        def select(rlist, wlist, xlist, timeout):
+            # let the stream be relayed while the client is watched
+            time.sleep(0.01)
+            return [], [], []
+
+        self.mock_select.side_effect = select
+        exc = self.assertRaises(FakeCClose, self.handler.do_stream_proxy,
+                                iter([b'a', b'b']), cancel=cancel)
+        self.assertEqual(1000, exc.code)
+        self.assertEqual([mock.call([b'a']), mock.call([b'b'])],
+                         self.handler.send_frames.call_args_list)
+        self.assertFalse(cancel.called)
+
+    def test_recv_stream(self):
+        self.mock_select.return_value = ([self.handler.request], [], [])
+        self.handler.recv_frames.side_effect = [
+            ([b'a', b'b'], False), ([], False),
+            ([b'c'], {'code': 1000, 'reason': ''})]
+        self.assertEqual([b'a', b'b', b'c'],
+                         list(self.handler.recv_stream()))
+
+    def test_recv_stream_too_large(self):
+        self.mock_select.return_value = ([self.handler.request], [], [])
+        self.handler.recv_frames.return_value = ([b'a' * 10], False)
+        data = self.handler.recv_stream(max_size=15)
+        self.assertEqual(b'a' * 10, next(data))
+        exc = self.assertRaises(FakeCClose, next, data)
+        self.assertEqual(1009, exc.code)
+
+    @mock.patch('zun.websocket.relay.Relay')
+    def test_do_socket_proxy(self, mock_relay_cls):
+        self.handler.server = mock.Mock(heartbeat=None)
+        mock_relay_cls.return_value.run.side_effect = (
+            relay.ConnectionClosed(relay.TARGET, 1000, 'Target closed'))
+        target = mock.Mock()
+        exc = self.assertRaises(FakeCClose, self.handler.do_socket_proxy,
+                                target)
+        self.assertEqual((1000, 'Target closed'), (exc.code, exc.reason))
+        client, endpoint = mock_relay_cls.call_args[0][:2]
+        self.assertIs(self.handler, client.handler)
+        self.assertIs(target, endpoint.sock)
+        target.setblocking.assert_called_once_with(False)
+        self.assertIs(self.handler.server.metrics,
+                      mock_relay_cls.call_args[1]['metrics'])
+
+    def _create_stream_token(self, stream_type, **params):
+        stream = mock.Mock(container_id=self.container.id,
+                           token=uuidutils.generate_uuid(), type=stream_type,
+                           url='tcp://fake-host:2375', params=params,
+                           created_at=timeutils.utcnow())
+        self.mock_consume.return_value = stream
+        return stream.token
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_logs(self, mock_client_cls):
+        token = self._create_stream_token(
+            'logs', stdout=True, stderr=False, timestamps=False, tail='10',
+            since=None, follow=True)
+        mock_client = mock_client_cls.return_value
+        logs = mock_client.logs.return_value
+        with mock.patch.object(self.handler,
+                               'do_stream_proxy') as mock_proxy:
+            self.handler._new_stream_client(self.ctx, self.container, token,
+                                            self.container.uuid)
+            mock_proxy.assert_called_once_with(logs, cancel=logs.close)
+        self.mock_consume.assert_called_once_with(self.ctx, token)
+        mock_client_cls.assert_called_once_with(
+            base_url='tcp://fake-host:2375')
+        mock_client.logs.assert_called_once_with(
+            self.container.container_id, stdout=True, stderr=False,
+            timestamps=False, stream=True, follow=True, tail=10, since=None)
+        logs.close.assert_called_once_with()
+        mock_client.close.assert_called_once_with()
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_logs_not_followed(self, mock_client_cls):
+        token = self._create_stream_token(
+            'logs', stdout=True, stderr=True, timestamps=False, tail='all',
+            since=None, follow=False)
+        logs = mock_client_cls.return_value.logs.return_value
+        with mock.patch.object(self.handler,
+                               'do_stream_proxy') as mock_proxy:
+            self.handler._new_stream_client(self.ctx, self.container, token,
+                                            self.container.uuid)
+            mock_proxy.assert_called_once_with(logs, cancel=None)
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_get_archive(self, mock_client_cls):
+        CONF.set_override('max_archive_size', 1024,
+                          group='websocket_proxy')
+        token = self._create_stream_token('get_archive', path='/root')
+        mock_client = mock_client_cls.return_value
+        chunks = mock.Mock()
+        mock_client.get_archive.return_value = (chunks, {})
+        with mock.patch.object(self.handler,
+                               'do_stream_proxy') as mock_proxy:
+            self.handler._new_stream_client(self.ctx, self.container, token,
+                                            self.container.uuid)
+            mock_proxy.assert_called_once_with(chunks, max_size=1024)
+        mock_client.get_archive.assert_called_once_with(
+            self.container.container_id, '/root',
+            chunk_size=CONF.websocket_proxy.stream_chunk_size)
+        chunks.close.assert_called_once_with()
+        mock_client.close.assert_called_once_with()
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_put_archive(self, mock_client_cls):
+        token = self._create_stream_token('put_archive', path='/root')
+        mock_client = mock_client_cls.return_value
+        self.mock_select.return_value = ([self.handler.request], [], [])
+        self.handler.recv_frames.side_effect = [
+            ([b'a'], False), ([b'b'], {'code': 1000, 'reason': ''})]
+        received = []
+        mock_client.put_archive.side_effect = (
+            lambda container_id, path, data: received.extend(data))
+        exc = self.assertRaises(FakeCClose,
+                                self.handler._new_stream_client,
+                                self.ctx, self.container, token,
+                                self.container.uuid)
+        self.assertEqual(1000, exc.code)
+        self.assertEqual([b'a', b'b'], received)
+        mock_client.put_archive.assert_called_once_with(
+            self.container.container_id, '/root', mock.ANY)
+        mock_client.close.assert_called_once_with()
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_put_archive_failed(self, mock_client_cls):
+        token = self._create_stream_token('put_archive', path='/root')
+        mock_client = mock_client_cls.return_value
+        mock_client.put_archive.side_effect = docker.errors.APIError('error')
+        exc = self.assertRaises(FakeCClose,
+                                self.handler._new_stream_client,
+                                self.ctx, self.container, token,
+                                self.container.uuid)
+        self.assertEqual(1011, exc.code)
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_invalid_token(self, mock_client_cls):
+        # the token was consumed, or never granted
+        token = uuidutils.generate_uuid()
+        self.mock_consume.side_effect = exception.StreamInstanceNotFound(
+            token=token)
+        self.assertRaises(exception.InvalidWebsocketToken,
+                          self.handler._new_stream_client,
+                          self.ctx, self.container, token,
+                          self.container.uuid)
+        self.mock_consume.side_effect = None
+        # the token was granted for another container
+        token = self._create_stream_token('logs')
+        self.mock_consume.return_value.container_id = 0
+        self.assertRaises(exception.InvalidWebsocketToken,
+                          self.handler._new_stream_client,
+                          self.ctx, self.container, token,
+                          self.container.uuid)
+        token = self._create_stream_token('fake-type')
+        self.assertRaises(exception.InvalidWebsocketToken,
+                          self.handler._new_stream_client,
+                          self.ctx, self.container, token,
+                          self.container.uuid)
+        self.assertFalse(mock_client_cls.called)
+
+    @mock.patch('docker.APIClient')
+    def test_new_stream_client_expired_token(self, mock_client_cls):
+        CONF.set_override('stream_token_ttl', 60, group='websocket_proxy')
+        token = self._create_stream_token('logs')
+        self.mock_consume.return_value.created_at = (
+            timeutils.utcnow() - datetime.timedelta(seconds=61))
+        self.assertRaises(exception.InvalidWebsocketToken,
+                          self.handler._new_stream_client,
+                          self.ctx, self.container, token,
+                          self.container.uuid)
+        self.assertFalse(mock_client_cls.called)
@@ -0,0 +1,359 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Event-driven relay of the data of a websocket proxy connection.
+
+The relay waits on the client and the target of a connection with the
+selector of the platform (epoll on Linux) until one of them is ready, rather
+than polling them. The data received from one side is queued for the other
+side in a buffer bounded by watermarks: once it holds ``high`` bytes the
+relay stops reading from the side sending the data, which lets TCP throttle
+it, and resumes once the buffer drained to ``low`` bytes. The received
+buffers are relayed as they are, a buffer partially sent to a socket is
+sliced with a memoryview rather than copied.
+"""
+
+import collections
+import multiprocessing
+import selectors
+import ssl
+import time
+
+import websocket
+
+CLIENT = 'client'
+TARGET = 'target'
+
+
+class ConnectionClosed(Exception):
+    """Raised when a side of the relayed connection is closed."""
+
+    def __init__(self, side, code=1000, reason=''):
+        super(ConnectionClosed, self).__init__(side, code, reason)
+        self.side = side
+        self.code = code
+        self.reason = reason
+
+
+class RelayBuffer(object):
+    """The data queued for a side of the connection."""
+
+    def __init__(self, high, low):
+        self.high = high
+        self.low = low
+        self.size = 0
+        self.paused = False
+        self._chunks = collections.deque()
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    def append(self, data):
+        if not len(data):
+            return
+        self._chunks.append((data, time.monotonic()))
+        self.size += len(data)
+        if self.size >= self.high:
+            self.paused = True
+
+    def peek(self):
+        return self._chunks[0][0]
+
+    def consume(self, sent):
+        """Drop the sent bytes of the first chunk.
+
+        :returns: the number of seconds the chunk was queued if it was sent
+                  entirely, else None.
+        """
+        data, queued_at = self._chunks[0]
+        self.size -= sent
+        if self.paused and self.size <= self.low:
+            self.paused = False
+        if sent < len(data):
+            self._chunks[0] = (memoryview(data)[sent:], queued_at)
+            return None
+        self._chunks.popleft()
+        return time.monotonic() - queued_at
+
+
+class ClientEndpoint(object):
+    """The websocket of the client, framed by the request handler."""
+
+    side = CLIENT
+
+    def __init__(self, handler):
+        self.handler = handler
+        # Whether the handler holds a frame it could not send entirely.
+        self.blocked = False
+
+    def fileno(self):
+        return self.handler.request.fileno()
+
+    def pending(self):
+        return self.handler.request.pending()
+
+    def recv(self):
+        bufs, closed = self.handler.recv_frames()
+        if closed:
+            raise ConnectionClosed(self.side, closed['code'],
+                                   closed['reason'])
+        return bufs
+
+    def send(self, data):
+        if self.blocked:
+            return 0
+        self.blocked = self.handler.send_frames([data])
+        return len(data)
+
+    def flush(self):
+        self.blocked = self.handler.send_frames()
+
+
+class SocketEndpoint(object):
+    """A stream socket of the target, such as the socket of an exec."""
+
+    side = TARGET
+    blocked = False
+
+    def __init__(self, sock, recv_size):
+        self.sock = sock
+        self.recv_size = recv_size
+        self.sock.setblocking(False)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def pending(self):
+        return isinstance(self.sock, ssl.SSLSocket) and self.sock.pending()
+
+    def recv(self):
+        try:
+            data = self.sock.recv(self.recv_size)
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return []
+        if not data:
+            raise ConnectionClosed(self.side, 1000, 'Target closed')
+        return [data]
+
+    def send(self, data):
+        try:
+            return self.sock.send(data)
+        except (BlockingIOError, ssl.SSLWantWriteError):
+            return 0
+
+    def flush(self):
+        pass
+
+
+class WebSocketEndpoint(object):
+    """A websocket of the target, such as the attach websocket of docker.
+
+    The frames are sent as binary frames, each of them in a single call.
+    """
+
+    side = TARGET
+    blocked = False
+
+    def __init__(self, ws):
+        self.ws = ws
+
+    def fileno(self):
+        return self.ws.fileno()
+
+    def pending(self):
+        # The websocket client reads ahead of the frame it returns.
+        sock = self.ws.sock
+        return bool(self.ws.frame_buffer.recv_buffer) or (
+            isinstance(sock, ssl.SSLSocket) and sock.pending())
+
+    def recv(self):
+        try:
+            data = self.ws.recv()
+        except websocket.WebSocketConnectionClosedException:
+            data = None
+        if not data:
+            raise ConnectionClosed(self.side, 1000, 'Target closed')
+        if isinstance(data, str):
+            data = data.encode()
+        return [data]
+
+    def send(self, data):
+        self.ws.send(data, opcode=websocket.ABNF.OPCODE_BINARY)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class ProxyMetrics(object):
+    """Counters of the relayed connections.
+
+    The counters are kept in shared memory, so that the connections relayed
+    by the processes forked by the proxy update the counters of the proxy.
+    """
+
+    FIELDS = ('active_connections', 'connections', 'bytes_to_client',
+              'bytes_to_target', 'chunks', 'latency_total', 'latency_max')
+
+    def __init__(self):
+        self._values = multiprocessing.Array('d', len(self.FIELDS))
+        self._index = {name: i for i, name in enumerate(self.FIELDS)}
+
+    def connection_opened(self):
+        with self._values.get_lock():
+            self._values[self._index['active_connections']] += 1
+            self._values[self._index['connections']] += 1
+
+    def connection_closed(self):
+        with self._values.get_lock():
+            self._values[self._index['active_connections']] -= 1
+
+    def data_sent(self, side, size, latency=None):
+        """Count the bytes sent to a side.
+
+        :param latency: the number of seconds the chunk of data was queued,
+                        if it was entirely sent.
+        """
+        field = 'bytes_to_client' if side == CLIENT else 'bytes_to_target'
+        with self._values.get_lock():
+            self._values[self._index[field]] += size
+            if latency is not None:
+                self._values[self._index['chunks']] += 1
+                self._values[self._index['latency_total']] += latency
+                latency_max = self._index['latency_max']
+                self._values[latency_max] = max(self._values[latency_max],
+                                                latency)
+
+    def snapshot(self):
+        """Return the counters, with the mean latency in milliseconds."""
+        with self._values.get_lock():
+            values = dict(zip(self.FIELDS, self._values[:]))
+        chunks = values.pop('chunks')
+        latency_total = values.pop('latency_total')
+        stats = {name: int(value) for name, value in values.items()
+                 if name != 'latency_max'}
+        stats['latency_mean_ms'] = (
+            latency_total / chunks * 1000 if chunks else 0.0)
+        stats['latency_max_ms'] = values['latency_max'] * 1000
+        return stats
+
+
+class Relay(object):
+    """Relay the data between the client and the target of a connection."""
+
+    def __init__(self, client, target, high, low, heartbeat=None,
+                 ping=None, metrics=None):
+        """Initialize the relay.
+
+        :param client: the endpoint of the client.
+        :param target: the endpoint of the target.
+        :param high: the number of bytes queued for a side above which the
+                     relay stops reading from the other side.
+        :param low: the number of bytes queued for a side below which the
+                    relay resumes reading from the other side.
+        :param heartbeat: the number of seconds between two calls of ping,
+                          or None.
+        :param ping: a callable sending a ping to the client.
+        :param metrics: the :class:`ProxyMetrics` to update, or None.
+        """
+        self.endpoints = {CLIENT: client, TARGET: target}
+        self.peers = {CLIENT: target, TARGET: client}
+        self.buffers = {CLIENT: RelayBuffer(high, low),
+                        TARGET: RelayBuffer(high, low)}
+        self.heartbeat = heartbeat
+        self.ping = ping
+        self.metrics = metrics
+
+    def run(self):
+        """Relay the data until a side closes the connection.
+
+        :raises: :class:`ConnectionClosed` once a side is closed.
+        """
+        if self.metrics:
+            self.metrics.connection_opened()
+        selector = selectors.DefaultSelector()
+        try:
+            self._run(selector)
+        finally:
+            selector.close()
+            if self.metrics:
+                self.metrics.connection_closed()
+
+    def _run(self, selector):
+        next_ping = None
+        if self.heartbeat:
+            next_ping = time.monotonic() + self.heartbeat
+        while True:
+            self._update_selector(selector)
+            timeout = None
+            if next_ping is not None:
+                now = time.monotonic()
+                if now >= next_ping:
+                    self.ping()
+                    next_ping = now + self.heartbeat
+                timeout = next_ping - now
+
+            ready = {}
+            for endpoint in self.endpoints.values():
+                # Data already read from the socket does not wake it up.
+                if self._can_read(endpoint) and endpoint.pending():
+                    ready[endpoint] = selectors.EVENT_READ
+            for key, mask in selector.select(0 if ready else timeout):
+                ready[key.fileobj] = ready.get(key.fileobj, 0) | mask
+
+            for endpoint, mask in ready.items():
+                if mask & selectors.EVENT_WRITE:
+                    self._write(endpoint)
+            for endpoint, mask in ready.items():
+                if mask & selectors.EVENT_READ and self._can_read(endpoint):
+                    self._read(endpoint)
+
+    def _update_selector(self, selector):
+        registered = selector.get_map()
+        for endpoint in self.endpoints.values():
+            events = 0
+            if self._can_read(endpoint):
+                events |= selectors.EVENT_READ
+            if self.buffers[endpoint.side] or endpoint.blocked:
+                events |= selectors.EVENT_WRITE
+
+            key = registered.get(endpoint.fileno())
+            if key is None:
+                if events:
+                    selector.register(endpoint, events)
+            elif not events:
+                selector.unregister(endpoint)
+            elif key.events != events:
+                selector.modify(endpoint, events)
+
+    def _can_read(self, endpoint):
+        # The data of a side is read only while its peer has room for it.
+        return not self.buffers[self.peers[endpoint.side].side].paused
+
+    def _read(self, endpoint):
+        peer = self.peers[endpoint.side]
+        buf = self.buffers[peer.side]
+        for data in endpoint.recv():
+            buf.append(data)
+        self._write(peer)
+
+    def _write(self, endpoint):
+        if endpoint.blocked:
+            endpoint.flush()
+        buf = self.buffers[endpoint.side]
+        while buf and not endpoint.blocked:
+            sent = endpoint.send(buf.peek())
+            if not sent:
+                break
+            latency = buf.consume(sent)
+            if self.metrics:
+                self.metrics.data_sent(endpoint.side, sent, latency)
@@ -21,10 +21,12 @@ import errno
 import select
 import socket
 import sys
+import threading
 import time
 
 import docker
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from urllib import parse as urlparse
 import websockify
@@ -33,7 +35,9 @@ from zun.common import context
 from zun.common import exception
 from zun.common.i18n import _
 import zun.conf
+from zun.container.docker import utils as docker_utils
 from zun import objects
+from zun.websocket import relay
 from zun.websocket.websocketclient import WebSocketClient
 
 LOG = logging.getLogger(__name__)
@@ -57,119 +61,127 @@ class ZunProxyRequestHandlerBase(object):
 
         return origin_proto in expected_protos
 
-    def _send_buffer(self, buff, target, send_all=False):
-        size = len(buff)
-        tosend = size
-        already_sent = 0
-
-        while tosend > 0:
-            try:
-                # i should be able to send a bytearray
-                sent = target.send(buff[already_sent:])
-                if sent == 0:
-                    raise RuntimeError('socket connection broken')
-
-                already_sent += sent
-                tosend -= sent
-
-            except socket.error as e:
-                # if full buffers then wait for them to drain and try again
-                if e.errno in [errno.EAGAIN, errno.EWOULDBLOCK]:
-                    if send_all:
-                        continue
-                    return buff[already_sent:]
-                else:
-                    raise exception.SocketException(str(e))
-        return None
-
-    def _handle_ins_outs(self, target, ins, outs):
-        """Handle the select file ins and outs
-
-        Handle the operation ins and outs from select
+    def do_websocket_proxy(self, target):
+        """Proxy the client WebSocket to a target WebSocket."""
+        self._do_relay(relay.WebSocketEndpoint(target))
+
+    def do_socket_proxy(self, target):
+        """Proxy the client WebSocket to a target socket."""
+        self._do_relay(relay.SocketEndpoint(
+            target, CONF.websocket_proxy.stream_chunk_size))
+
+    def _do_relay(self, target):
+        proxy = relay.Relay(
+            relay.ClientEndpoint(self), target,
+            CONF.websocket_proxy.buffer_high_watermark,
+            CONF.websocket_proxy.buffer_low_watermark,
+            heartbeat=getattr(self.server, 'heartbeat', None),
+            ping=self.send_ping,
+            metrics=getattr(self.server, 'metrics', None))
+        try:
+            proxy.run()
+        except relay.ConnectionClosed as e:
+            self.msg(_("%s closed connection"), e.side.capitalize())
+            raise self.CClose(e.code, e.reason)
+
+    def do_stream_proxy(self, chunks, max_size=0, cancel=None):
+        """Relay a data stream to the client WebSocket.
+
+        The data is sent in frames of bounded size and the next chunk is
+        pulled from the stream only once the pending frames are flushed, so
+        that a slow client throttles the reads instead of having the data
+        buffered in the proxy.
+
+        A stream which can wait long for its next chunk, such as followed
+        logs, is given a ``cancel`` callable. The client WebSocket is then
+        watched while waiting for the stream, and the stream is cancelled
+        as soon as the client is gone.
         """
-        if self.request in outs:
-            # Send queued target data to the client
-            self.c_pend = self.send_frames(self.cqueue)
-            self.cqueue = []
-
-        if self.request in ins:
-            # Receive client data, decode it, and queue for target
-            bufs, closed = self.recv_frames()
-            self.tqueue.extend(bufs)
-            if closed:
-                self.msg(_("Client closed connection:"
-                           "%(host)s:%(port)s") % {
-                    'host': self.server.target_host,
-                    'port': self.server.target_port})
-                raise self.CClose(closed['code'], closed['reason'])
-
-        if target in outs:
-            while self.tqueue:
-                payload = self.tqueue.pop(0)
-                remaining = self._send_buffer(payload, target)
-                if remaining is not None:
-                    self.tqueue.appendleft(remaining)
+        chunk_size = CONF.websocket_proxy.stream_chunk_size
+        watcher = None
+        if cancel is not None:
+            watcher = ClientWatcher(self, cancel)
+            watcher.start()
+        sent = 0
+        try:
+            for data in chunks:
+                if isinstance(data, str):
+                    data = data.encode()
+                sent += len(data)
+                if max_size and sent > max_size:
+                    raise self.CClose(1009, "Data too large")
+                for start in range(0, len(data), chunk_size):
+                    pending = self._send_frames(
+                        watcher, [data[start:start + chunk_size]])
+                    while pending:
+                        self._wait_for_client()
+                        pending = self._send_frames(watcher)
+                if watcher is None:
+                    self._check_client_closed()
+                elif watcher.closed:
                     break
-
-        if target in ins:
-            # Receive target data, encode it and queue for client
-            buf = target.recv()
-            if len(buf) == 0:
-                self.msg(_("Client closed connection:"
-                           "%(host)s:%(port)s") % {
-                    'host': self.server.target_host,
-                    'port': self.server.target_port})
-                raise self.CClose(1000, "Target closed")
-            if isinstance(buf, str):
-                buf = buf.encode()
-            self.cqueue.append(buf)
-
-    def do_websocket_proxy(self, target):
-        """Proxy websocket link
-
-        Proxy client WebSocket to normal target socket.
+        except Exception:
+            # Cancelling the stream interrupts the pending read.
+            if watcher is None or not watcher.closed:
+                raise
+        finally:
+            if watcher is not None:
+                watcher.stop()
+        if watcher is not None and watcher.closed:
+            self.msg(_("Client closed connection"))
+            raise self.CClose(watcher.closed['code'],
+                              watcher.closed['reason'])
+        raise self.CClose(1000, "Target closed")
+
+    def _send_frames(self, watcher, *bufs):
+        if watcher is None:
+            return self.send_frames(*bufs)
+        with watcher.lock:
+            return self.send_frames(*bufs)
+
+    def recv_stream(self, max_size=0):
+        """Yield the data sent by the client until it closes the WebSocket.
+
+        The frames are read only when the consumer asks for more data, so
+        that a slow target throttles the client.
         """
-        self.cqueue = []
-        self.tqueue = []
-        self.c_pend = 0
-        rlist = [self.request, target]
-
-        if self.server.heartbeat:
-            now = time.time()
-            self.heartbeat = now + self.server.heartbeat
-        else:
-            self.heartbeat = None
+        received = 0
+        while True:
+            self._wait_for_client(read=True)
+            bufs, closed = self.recv_frames()
+            for buf in bufs:
+                received += len(buf)
+                if max_size and received > max_size:
+                    raise self.CClose(1009, "Data too large")
+                yield buf
+            if closed:
+                return
 
+    def _wait_for_client(self, read=False):
+        rlist = [self.request] if read else []
+        wlist = [] if read else [self.request]
         while True:
-            wlist = []
-
-            if self.heartbeat is not None:
-                now = time.time()
-                if now > self.heartbeat:
-                    self.heartbeat = now + self.server.heartbeat
-                    self.send_ping()
-
-            if self.tqueue:
-                wlist.append(target)
-            if self.cqueue or self.c_pend:
-                wlist.append(self.request)
             try:
-                ins, outs, excepts = select.select(rlist, wlist, [], 1)
-            except (select.error, OSError):
-                exc = sys.exc_info()[1]
-                if hasattr(exc, 'errno'):
-                    err = exc.errno
-                else:
-                    err = exc[0]
-                if err != errno.EINTR:
+                ins, outs, excepts = select.select(rlist, wlist,
+                                                   [self.request], 1)
+            except (select.error, OSError) as e:
+                if getattr(e, 'errno', None) != errno.EINTR:
                     raise
-                else:
-                    continue
-
+                continue
             if excepts:
                 raise exception.SocketException()
-
-            self._handle_ins_outs(target, ins, outs)
+            if ins or outs:
+                return
+
+    def _check_client_closed(self):
+        ins, outs, excepts = select.select([self.request], [], [], 0)
+        if ins:
+            # The data sent by the client are irrelevant to a stream, only
+            # the close frame is looked at.
+            bufs, closed = self.recv_frames()
+            if closed:
+                self.msg(_("Client closed connection"))
+                raise self.CClose(closed['code'], closed['reason'])
 
     def new_websocket_client(self):
         """Called after a new WebSocket connection has been established."""
@@ -193,6 +205,7 @@ class ZunProxyRequestHandlerBase(object):
         token = urlparse.parse_qs(query).get("token", [""]).pop()
         uuid = urlparse.parse_qs(query).get("uuid", [""]).pop()
         exec_id = urlparse.parse_qs(query).get("exec_id", [""]).pop()
+        stream = urlparse.parse_qs(query).get("stream", [""]).pop()
 
         ctx = context.get_admin_context(all_projects=True)
 
@@ -203,6 +216,8 @@ class ZunProxyRequestHandlerBase(object):
 
         if exec_id:
             self._new_exec_client(container, token, uuid, exec_id)
+        elif stream:
+            self._new_stream_client(ctx, container, token, uuid)
         else:
             self._new_websocket_client(container, token, uuid)
 
@@ -258,13 +273,85 @@ class ZunProxyRequestHandlerBase(object):
             tsock = tsock._sock
 
         try:
-            self.do_proxy(tsock)
+            self.do_socket_proxy(tsock)
         finally:
             if tsock:
                 tsock.shutdown(socket.SHUT_RDWR)
                 tsock.close()
                 self.vmsg(_("%s: Closed target") % exec_instance.url)
 
+    def _new_stream_client(self, ctx, container, token, uuid):
+        payload = self._consume_stream_token(ctx, container, token)
+
+        access_url = '%s?token=%s&uuid=%s&stream=1' % (
+            CONF.websocket_proxy.base_url, token, uuid)
+
+        self._verify_origin(access_url)
+
+        handlers = {'logs': self._stream_logs,
+                    'get_archive': self._stream_get_archive,
+                    'put_archive': self._stream_put_archive}
+        handler = handlers.get(payload.get('type'))
+        if handler is None:
+            raise exception.InvalidWebsocketToken(token)
+
+        client = docker.APIClient(base_url=payload['url'])
+        try:
+            handler(client, payload)
+        finally:
+            client.close()
+            self.vmsg(_("%(url)s: Closed %(type)s stream") % payload)
+
+    def _consume_stream_token(self, ctx, container, token):
+        # The token is consumed even if invalid, so that it can be used once.
+        try:
+            stream = objects.StreamInstance.consume(ctx, token)
+        except exception.StreamInstanceNotFound:
+            raise exception.InvalidWebsocketToken(token)
+        if (stream.container_id != container.id or
+                timeutils.is_older_than(
+                    stream.created_at,
+                    CONF.websocket_proxy.stream_token_ttl)):
+            raise exception.InvalidWebsocketToken(token)
+        return dict(stream.params, type=stream.type, url=stream.url,
+                    container_id=container.container_id)
+
+    def _stream_logs(self, client, payload):
+        tail, since = docker_utils.parse_logs_options(payload['tail'],
+                                                      payload['since'])
+        logs = client.logs(payload['container_id'],
+                           stdout=payload['stdout'],
+                           stderr=payload['stderr'],
+                           timestamps=payload['timestamps'],
+                           stream=True, follow=payload['follow'],
+                           tail=tail, since=since)
+        try:
+            # The followed logs may not be written for long.
+            self.do_stream_proxy(
+                logs, cancel=logs.close if payload['follow'] else None)
+        finally:
+            logs.close()
+
+    def _stream_get_archive(self, client, payload):
+        chunks, stat = client.get_archive(
+            payload['container_id'], payload['path'],
+            chunk_size=CONF.websocket_proxy.stream_chunk_size)
+        try:
+            self.do_stream_proxy(
+                chunks, max_size=CONF.websocket_proxy.max_archive_size)
+        finally:
+            chunks.close()
+
+    def _stream_put_archive(self, client, payload):
+        data = self.recv_stream(
+            max_size=CONF.websocket_proxy.max_archive_size)
+        try:
+            client.put_archive(payload['container_id'], payload['path'],
+                               data)
+        except docker.errors.APIError as e:
+            raise self.CClose(1011, str(e))
+        raise self.CClose(1000, "Archive extracted")
+
     def _verify_origin(self, access_url):
         # Verify Origin
         expected_origin_hostname = self.headers.get('Host')
@@ -301,6 +388,56 @@ class ZunProxyRequestHandlerBase(object):
                 raise exception.ValidationError(detail)
 
 
+class ClientWatcher(object):
+    """Watch the client WebSocket of a stream from a separate thread.
+
+    The data sent by the client are irrelevant to a stream, only the close
+    frame is looked at. Once the client closed the WebSocket, or the
+    connection is lost, ``cancel`` is called to interrupt the stream.
+
+    The frames are sent and received under ``lock``, since receiving a
+    ping frame sends a pong frame.
+    """
+
+    def __init__(self, handler, cancel, interval=1):
+        self.handler = handler
+        self.cancel = cancel
+        self.interval = interval
+        self.lock = threading.Lock()
+        # The code and the reason of the closure of the client WebSocket.
+        self.closed = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        sock = self.handler.request
+        while not self._stopped.is_set():
+            try:
+                ins, outs, excepts = select.select([sock], [], [sock],
+                                                   self.interval)
+                if excepts:
+                    raise exception.SocketException()
+                if not ins:
+                    continue
+                with self.lock:
+                    bufs, closed = self.handler.recv_frames()
+            except Exception:
+                closed = {'code': 1006, 'reason': 'Connection lost'}
+            if closed:
+                self.closed = closed
+                self.cancel()
+                return
+
+
 class ZunProxyRequestHandler(ZunProxyRequestHandlerBase,
                              websockify.ProxyRequestHandler):
     def __init__(self, *args, **kwargs):
@@ -311,6 +448,20 @@ class ZunProxyRequestHandler(ZunProxyRequestHandlerBase,
 
 
 class ZunWebSocketProxy(websockify.WebSocketProxy):
+    def __init__(self, *args, **kwargs):
+        super(ZunWebSocketProxy, self).__init__(*args, **kwargs)
+        self.metrics = relay.ProxyMetrics()
+        self._metrics_logged_at = time.monotonic()
+
     @staticmethod
     def get_logger():
         return LOG
+
+    def poll(self):
+        interval = CONF.websocket_proxy.metrics_interval
+        if not interval:
+            return
+        now = time.monotonic()
+        if now - self._metrics_logged_at >= interval:
+            self._metrics_logged_at = now
+            LOG.info("Relayed connections: %s", self.metrics.snapshot())